@@ -10,11 +10,15 @@ import json
 
 from app.core.client_id import get_client_id
 from app.core.feature_flags import require_feature
+from app.core.location_filters import get_bbox_filter_sql
 from app.deps.auth import get_current_user_optional, User
 from services.db_service import fetch, execute
+from services.reaction_counter_service import get_reaction_counts, reactions_join_sql, toggle_reaction
 
 router = APIRouter(prefix="/activity", tags=["activity"])
 
+_ACTIVITY_REACTIONS_JOIN = reactions_join_sql("activity", "ast.id")
+
 
 class ActivityUser(BaseModel):
     id: str  # UUID as string
@@ -202,13 +206,7 @@ async def get_own_activity(
                 THEN true 
                 ELSE false 
             END as is_promoted,
-            COALESCE(
-                json_object_agg(
-                    DISTINCT reaction_counts.reaction_type, 
-                    reaction_counts.count
-                ) FILTER (WHERE reaction_counts.reaction_type IS NOT NULL),
-                '{{}}'::json
-            ) as reactions,
+            COALESCE(rc.reactions, '{{}}'::jsonb) as reactions,
             MAX(user_reaction_join.reaction_type) as user_reaction
         FROM activity_stream ast
         LEFT JOIN locations l ON ast.location_id = l.id
@@ -222,11 +220,7 @@ async def get_own_activity(
         ) like_counts ON like_counts.activity_id = ast.id
         LEFT JOIN activity_likes al ON {like_join_condition}
         LEFT JOIN activity_bookmarks ab ON {bookmark_join_condition}
-        LEFT JOIN (
-            SELECT activity_id, reaction_type, COUNT(*)::int as count
-            FROM activity_reactions
-            GROUP BY activity_id, reaction_type
-        ) reaction_counts ON reaction_counts.activity_id = ast.id
+        {_ACTIVITY_REACTIONS_JOIN}
         LEFT JOIN activity_reactions user_reaction_join ON 
             user_reaction_join.activity_id = ast.id 
             AND ({user_reaction_condition})
@@ -236,7 +230,7 @@ async def get_own_activity(
             ast.created_at, ast.media_url, up.id, up.display_name, 
             up.avatar_url, ur.primary_role, ur.secondary_role,
             like_counts.like_count, al.id, ab.id, pl.id, pl.status, 
-            pl.promotion_type, pl.starts_at, pl.ends_at
+            pl.promotion_type, pl.starts_at, pl.ends_at, rc.reactions
         ORDER BY is_promoted DESC, ast.created_at DESC
         LIMIT ${param_num} OFFSET ${param_num + 1}
     """
@@ -348,15 +342,15 @@ async def get_nearby_activity(
     window_start = datetime.now() - time_window if time_window else None
     
     # Build SQL query with bounding box filter
-    # Join activity_stream with locations to get coordinates
+    # Join activity_stream with locations to get coordinates; the bbox resolves to
+    # tile_key ranges so locations are found via idx_locations_tile_key_id
+    bbox_sql, params = get_bbox_filter_sql((lat_min, lat_max, lng_min, lng_max), alias="l")
     conditions = [
         "l.lat IS NOT NULL",
         "l.lng IS NOT NULL",
-        "l.lat BETWEEN $1 AND $2",
-        "l.lng BETWEEN $3 AND $4",
+        bbox_sql,
     ]
-    params = [lat_min, lat_max, lng_min, lng_max]
-    param_num = 5
+    param_num = len(params) + 1
     
     if window_start:
         conditions.append(f"ast.created_at >= ${param_num}")
@@ -403,13 +397,7 @@ async def get_nearby_activity(
                 THEN true 
                 ELSE false 
             END as is_promoted,
-            COALESCE(
-                json_object_agg(
-                    DISTINCT reaction_counts.reaction_type, 
-                    reaction_counts.count
-                ) FILTER (WHERE reaction_counts.reaction_type IS NOT NULL),
-                '{{}}'::json
-            ) as reactions,
+            COALESCE(rc.reactions, '{{}}'::jsonb) as reactions,
             MAX(user_reaction_join.reaction_type) as user_reaction
         FROM activity_stream ast
         INNER JOIN locations l ON ast.location_id = l.id
@@ -423,11 +411,7 @@ async def get_nearby_activity(
         ) like_counts ON like_counts.activity_id = ast.id
         LEFT JOIN activity_likes al ON {like_join_condition}
         LEFT JOIN activity_bookmarks ab ON {bookmark_join_condition}
-        LEFT JOIN (
-            SELECT activity_id, reaction_type, COUNT(*)::int as count
-            FROM activity_reactions
-            GROUP BY activity_id, reaction_type
-        ) reaction_counts ON reaction_counts.activity_id = ast.id
+        {_ACTIVITY_REACTIONS_JOIN}
         LEFT JOIN activity_reactions user_reaction_join ON 
             user_reaction_join.activity_id = ast.id 
             AND ({user_reaction_condition})
@@ -437,7 +421,7 @@ async def get_nearby_activity(
             ast.created_at, ast.media_url, up.id, up.display_name, 
             up.avatar_url, ur.primary_role, ur.secondary_role,
             like_counts.like_count, al.id, ab.id, pl.id, pl.status, 
-            pl.promotion_type, pl.starts_at, pl.ends_at
+            pl.promotion_type, pl.starts_at, pl.ends_at, rc.reactions
         ORDER BY is_promoted DESC, ast.created_at DESC
         LIMIT ${param_num}
     """
@@ -528,13 +512,7 @@ async def get_location_activity(
                 THEN true 
                 ELSE false 
             END as is_promoted,
-            COALESCE(
-                json_object_agg(
-                    DISTINCT reaction_counts.reaction_type, 
-                    reaction_counts.count
-                ) FILTER (WHERE reaction_counts.reaction_type IS NOT NULL),
-                '{{}}'::json
-            ) as reactions,
+            COALESCE(rc.reactions, '{{}}'::jsonb) as reactions,
             MAX(user_reaction_join.reaction_type) as user_reaction
         FROM activity_stream ast
         LEFT JOIN locations l ON ast.location_id = l.id
@@ -548,11 +526,7 @@ async def get_location_activity(
         ) like_counts ON like_counts.activity_id = ast.id
         LEFT JOIN activity_likes al ON {like_join_condition}
         LEFT JOIN activity_bookmarks ab ON {bookmark_join_condition}
-        LEFT JOIN (
-            SELECT activity_id, reaction_type, COUNT(*)::int as count
-            FROM activity_reactions
-            GROUP BY activity_id, reaction_type
-        ) reaction_counts ON reaction_counts.activity_id = ast.id
+        {_ACTIVITY_REACTIONS_JOIN}
         LEFT JOIN activity_reactions user_reaction_join ON 
             user_reaction_join.activity_id = ast.id 
             AND ({user_reaction_condition})
@@ -562,7 +536,7 @@ async def get_location_activity(
             ast.created_at, ast.media_url, up.id, up.display_name, 
             up.avatar_url, ur.primary_role, ur.secondary_role,
             like_counts.like_count, al.id, ab.id, pl.id, pl.status, 
-            pl.promotion_type, pl.starts_at, pl.ends_at
+            pl.promotion_type, pl.starts_at, pl.ends_at, rc.reactions
         ORDER BY is_promoted DESC, ast.created_at DESC
         LIMIT $2 OFFSET $3
     """
@@ -691,59 +665,13 @@ async def toggle_activity_reaction(
     if not check_rows:
         raise HTTPException(status_code=404, detail="Activity not found")
     
-    # Check if already reacted with this type
-    if user_id:
-        check_reaction_sql = """
-            SELECT id FROM activity_reactions 
-            WHERE activity_id = $1 AND user_id = $2 AND reaction_type = $3
-        """
-        existing = await fetch(check_reaction_sql, activity_id, user_id, request.reaction_type)
-    else:
-        check_reaction_sql = """
-            SELECT id FROM activity_reactions 
-            WHERE activity_id = $1 AND client_id = $2 AND reaction_type = $3
-        """
-        existing = await fetch(check_reaction_sql, activity_id, client_id, request.reaction_type)
-    
-    if existing:
-        # Remove reaction
-        if user_id:
-            delete_sql = """
-                DELETE FROM activity_reactions 
-                WHERE activity_id = $1 AND user_id = $2 AND reaction_type = $3
-            """
-            await execute(delete_sql, activity_id, user_id, request.reaction_type)
-        else:
-            delete_sql = """
-                DELETE FROM activity_reactions 
-                WHERE activity_id = $1 AND client_id = $2 AND reaction_type = $3
-            """
-            await execute(delete_sql, activity_id, client_id, request.reaction_type)
-        is_active = False
-    else:
-        # Add reaction
-        if user_id:
-            insert_sql = """
-                INSERT INTO activity_reactions (activity_id, user_id, reaction_type) 
-                VALUES ($1, $2, $3) ON CONFLICT DO NOTHING
-            """
-            await execute(insert_sql, activity_id, user_id, request.reaction_type)
-        else:
-            insert_sql = """
-                INSERT INTO activity_reactions (activity_id, client_id, reaction_type) 
-                VALUES ($1, $2, $3) ON CONFLICT DO NOTHING
-            """
-            await execute(insert_sql, activity_id, client_id, request.reaction_type)
-        is_active = True
-    
-    # Get updated count
-    count_sql = """
-        SELECT COUNT(*) as count 
-        FROM activity_reactions 
-        WHERE activity_id = $1 AND reaction_type = $2
-    """
-    count_rows = await fetch(count_sql, activity_id, request.reaction_type)
-    count = count_rows[0]["count"] if count_rows else 0
+    is_active, count = await toggle_reaction(
+        "activity",
+        activity_id,
+        request.reaction_type,
+        user_id=user_id,
+        client_id=client_id,
+    )
     
     return {
         "reaction_type": request.reaction_type,
@@ -765,21 +693,8 @@ async def get_activity_reactions(
     if not check_rows:
         raise HTTPException(status_code=404, detail="Activity not found")
     
-    # Get reaction counts grouped by type
-    counts_sql = """
-        SELECT reaction_type, COUNT(*) as count
-        FROM activity_reactions
-        WHERE activity_id = $1
-        GROUP BY reaction_type
-        ORDER BY count DESC, reaction_type ASC
-    """
-    count_rows = await fetch(counts_sql, activity_id)
-    
-    # Build reactions dict dynamically from database results
-    reactions: Dict[str, int] = {}
-    for row in count_rows:
-        reaction_type = row["reaction_type"]
-        reactions[reaction_type] = row["count"]
+    # Get reaction counts
+    reactions: Dict[str, int] = await get_reaction_counts("activity", activity_id)
     
     return {"reactions": reactions}
 
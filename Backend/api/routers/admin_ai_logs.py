@@ -8,8 +8,15 @@ from typing import Any, Dict, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app.deps.admin_auth import AdminUser, verify_admin_user
-from app.models.admin_ai_logs import AILogDetail, AILogItem, AILogsResponse
+from app.models.admin_ai_logs import (
+    AICacheActionStats,
+    AICacheStatsResponse,
+    AILogDetail,
+    AILogItem,
+    AILogsResponse,
+)
 from services.ai_explanation import generate_ai_explanation
+from services.ai_response_cache import get_ai_cache_stats
 from services.db_service import fetch, fetchrow
 
 
@@ -43,6 +50,7 @@ async def get_ai_logs(
     news_id: Optional[int] = Query(default=None, description="Filter by news item ID"),
     source_key: Optional[str] = Query(default=None, description="Filter by news source key"),
     source_name: Optional[str] = Query(default=None, description="Filter by news source name"),
+    cache_hit: Optional[bool] = Query(default=None, description="Filter on responses served from the AI response cache"),
     limit: int = Query(default=20, ge=1, le=200, description="Number of items per page"),
     offset: int = Query(default=0, ge=0, description="Offset for pagination"),
     admin: AdminUser = Depends(verify_admin_user),
@@ -87,6 +95,11 @@ async def get_ai_logs(
         except Exception:
             raise HTTPException(status_code=400, detail="Invalid 'since' timestamp format. Use ISO format.")
     
+    if cache_hit is not None:
+        filters.append(f"{table_alias}.cache_hit = ${param_idx}")
+        params.append(cache_hit)
+        param_idx += 1
+    
     if news_only:
         filters.append(f"{table_alias}.news_id IS NOT NULL")
         filters.append(f"{table_alias}.action_type LIKE 'news.%'")
@@ -131,6 +144,7 @@ async def get_ai_logs(
             {table_alias}.validated_output,
             {table_alias}.is_success,
             {table_alias}.error_message,
+            {table_alias}.cache_hit,
             {table_alias}.created_at
             {select_news_columns}
         FROM ai_logs {table_alias}
@@ -205,6 +219,7 @@ async def get_ai_logs(
                 validated_output=parsed_validated,
                 is_success=row_dict.get("is_success", True),
                 error_message=row_dict.get("error_message"),
+                cache_hit=bool(row_dict.get("cache_hit") or False),
                 explanation=explanation,
                 news_source_key=row_dict.get("news_source_key"),
                 news_source_name=row_dict.get("news_source_name"),
@@ -240,6 +255,7 @@ async def get_ai_log_detail(
             ai.validated_output,
             ai.is_success,
             ai.error_message,
+            ai.cache_hit,
             ai.created_at,
             rin.source_key AS news_source_key,
             rin.source_name AS news_source_name,
@@ -265,9 +281,75 @@ async def get_ai_log_detail(
         validated_output=_coerce_json_object(row_dict.get("validated_output")),
         is_success=row_dict.get("is_success", True),
         error_message=row_dict.get("error_message"),
+        cache_hit=bool(row_dict.get("cache_hit") or False),
         created_at=row_dict["created_at"],
         news_source_key=row_dict.get("news_source_key"),
         news_source_name=row_dict.get("news_source_name"),
         news_title=row_dict.get("news_title"),
     )
 
+
+
+@router.get("/cache/stats", response_model=AICacheStatsResponse)
+async def get_ai_cache_stats_endpoint(
+    hours: int = Query(default=24, ge=1, le=24 * 30, description="Window in hours for ai_logs hit rates"),
+    admin: AdminUser = Depends(verify_admin_user),
+) -> AICacheStatsResponse:
+    """
+    AI response cache hit rates per action_type (from ai_logs.cache_hit), the
+    size of ai_response_cache, and the in-process L1 counters of this API instance.
+    """
+    rows = await fetch(
+        """
+        SELECT
+            action_type,
+            COUNT(*) AS total,
+            COUNT(*) FILTER (WHERE cache_hit) AS hits
+        FROM ai_logs
+        WHERE created_at >= NOW() - make_interval(hours => $1)
+          AND is_success = true
+        GROUP BY action_type
+        ORDER BY total DESC
+        """,
+        int(hours),
+    )
+    per_action: List[AICacheActionStats] = []
+    total_calls = 0
+    total_hits = 0
+    for row in rows:
+        rec = dict(row)
+        total = int(rec.get("total") or 0)
+        hits = int(rec.get("hits") or 0)
+        total_calls += total
+        total_hits += hits
+        per_action.append(
+            AICacheActionStats(
+                action_type=rec["action_type"],
+                total=total,
+                hits=hits,
+                hit_rate=round(hits / total, 4) if total else 0.0,
+            )
+        )
+
+    size_row = await fetchrow(
+        """
+        SELECT
+            COUNT(*) AS entries,
+            COUNT(*) FILTER (WHERE expires_at <= NOW()) AS expired,
+            COALESCE(SUM(hit_count), 0) AS total_hits
+        FROM ai_response_cache
+        """
+    )
+    size = dict(size_row) if size_row else {}
+
+    return AICacheStatsResponse(
+        window_hours=hours,
+        total=total_calls,
+        hits=total_hits,
+        hit_rate=round(total_hits / total_calls, 4) if total_calls else 0.0,
+        by_action_type=per_action,
+        cache_entries=int(size.get("entries") or 0),
+        cache_expired_entries=int(size.get("expired") or 0),
+        cache_total_hits=int(size.get("total_hits") or 0),
+        process=get_ai_cache_stats(),
+    )
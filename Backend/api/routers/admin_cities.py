@@ -16,7 +16,7 @@ from app.models.admin_cities import (
 from app.models.metrics import CitiesOverview, CityReadiness
 from app.core.logging import get_logger
 from app.workers.discovery_bot import load_cities_config
-from services.metrics_service import _city_progress, _compute_city_bbox
+from services.metrics_service import _all_city_progress, _city_progress, _compute_city_bbox
 from services.cities_config_service import (
     calculate_center_from_bbox,
     calculate_district_bbox,
@@ -115,6 +115,16 @@ async def get_cities_overview(
         
         city_readiness_list: List[CityReadiness] = []
         
+        # Progress for all cities with districts in one grouped query
+        try:
+            progress_by_city = await _all_city_progress([
+                key for key, data in cities_def.items()
+                if isinstance(data, dict) and isinstance(data.get("districts"), dict) and data.get("districts")
+            ])
+        except Exception as e:
+            logger.warning("failed_to_compute_city_progress", error=str(e), exc_info=e)
+            progress_by_city = {}
+        
         for city_key, city_data in cities_def.items():
             if not isinstance(city_data, dict):
                 logger.warning("invalid_city_data", city_key=city_key)
@@ -131,23 +141,12 @@ async def get_cities_overview(
             coverage_ratio = 0.0
             growth_weekly: float | None = None
             
-            if has_districts:
-                try:
-                    progress = await _city_progress(city_key)
-                    if progress:
-                        verified_count = progress.verified_count
-                        candidate_count = progress.candidate_count
-                        coverage_ratio = progress.coverage_ratio
-                        growth_weekly = progress.growth_weekly
-                except Exception as e:
-                    # Log error but continue processing other cities
-                    logger.warning(
-                        "failed_to_compute_city_progress",
-                        city_key=city_key,
-                        error=str(e),
-                        exc_info=e
-                    )
-                    # Keep default values (0 counts, 0.0 coverage)
+            progress = progress_by_city.get(city_key) if has_districts else None
+            if progress:
+                verified_count = progress.verified_count
+                candidate_count = progress.candidate_count
+                coverage_ratio = progress.coverage_ratio
+                growth_weekly = progress.growth_weekly
             
             # Determine readiness status
             readiness_status, readiness_notes = _determine_readiness_status(
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+import hmac
+
 import asyncpg
-from datetime import datetime, timedelta, timezone
-from typing import Optional, Tuple
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
 
 from app.models.metrics import (
     CategoryHealthResponse,
@@ -12,13 +13,18 @@ from app.models.metrics import (
     MetricsSnapshot,
     NewsMetricsSnapshot,
 )
+from app.deps.admin_auth import AdminUser, verify_admin_user
 from app.services.metrics_service import (
     category_health_metrics,
     generate_event_metrics_snapshot,
-    generate_metrics_snapshot,
     generate_news_metrics_snapshot,
     location_state_metrics,
 )
+from services.config_cache_service import get_config_cache_stats
+from app.core.rate_limiting import get_rate_limit_stats
+from services.map_payload_service import get_map_payload_stats
+from services.metrics_snapshot_service import get_metrics_snapshot, get_metrics_snapshot_stats
+from services import db_query_stats
 
 
 router = APIRouter(
@@ -26,36 +32,20 @@ router = APIRouter(
     tags=["admin-metrics"],
 )
 
-# Simple in-memory cache for metrics snapshot
-# Cache for 30 seconds to reduce database load while keeping data reasonably fresh
-_metrics_cache: Optional[Tuple[datetime, MetricsSnapshot]] = None
-_METRICS_CACHE_TTL = timedelta(seconds=30)
-
 
 @router.get("/snapshot", response_model=MetricsSnapshot)
-async def get_metrics_snapshot() -> MetricsSnapshot:
+async def get_metrics_snapshot_endpoint(
+    refresh: bool = False,
+    admin: AdminUser = Depends(verify_admin_user),
+) -> MetricsSnapshot:
     """
-    Get metrics snapshot with 30-second caching to reduce database load.
-    
-    The cache helps prevent slow query issues when multiple admin users
-    access the dashboard simultaneously, especially during active discovery runs.
+    Get the materialized metrics snapshot (services.metrics_snapshot_service).
+
+    Served from memory; a background task regenerates it every METRICS_SNAPSHOT_REFRESH_S.
+    `refresh=true` regenerates it before answering. generated_at / age_seconds / stale
+    tell how old the numbers are.
     """
-    global _metrics_cache
-    
-    # Check cache
-    now = datetime.now(timezone.utc)
-    if _metrics_cache is not None:
-        cached_time, cached_snapshot = _metrics_cache
-        if now - cached_time < _METRICS_CACHE_TTL:
-            return cached_snapshot
-    
-    # Generate fresh snapshot
-    snapshot = await generate_metrics_snapshot()
-    
-    # Update cache
-    _metrics_cache = (now, snapshot)
-    
-    return snapshot
+    return await get_metrics_snapshot(refresh=refresh)
 
 
 @router.get("/categories", response_model=CategoryHealthResponse)
@@ -118,3 +108,76 @@ async def get_event_metrics_snapshot() -> EventMetricsSnapshot:
         raise HTTPException(status_code=503, detail="event metrics unavailable") from exc
 
 
+@router.get("/config_cache")
+async def get_config_cache_metrics(
+    admin: AdminUser = Depends(verify_admin_user),
+) -> dict:
+    """
+    Returns hit/miss/reload counters of the cities/categories config cache.
+    
+    In steady state `yaml_parses` and `db_loads` stay flat while `hits` grows.
+    """
+    return get_config_cache_stats()
+
+
+@router.get("/rate_limits")
+async def get_rate_limit_metrics(
+    admin: AdminUser = Depends(verify_admin_user),
+) -> dict:
+    """
+    Returns the active rate limit backend, p50/p99 latency of the check call per
+    backend (this process) and flush/hydrate counters of the in-memory backend.
+    """
+    return get_rate_limit_stats()
+
+
+@router.get("/map_cache")
+async def get_map_cache_metrics(
+    admin: AdminUser = Depends(verify_admin_user),
+) -> dict:
+    """
+    Returns tile hit/miss, 304 and invalidation counters of the GET /locations/map cache.
+    """
+    return get_map_payload_stats()
+
+
+@router.get("/snapshot_cache")
+async def get_snapshot_cache_metrics(
+    admin: AdminUser = Depends(verify_admin_user),
+) -> dict:
+    """
+    Returns refresh counters, last generation time and age of the materialized snapshot.
+    """
+    return get_metrics_snapshot_stats()
+
+
+@router.get("/db_queries")
+async def get_db_query_metrics(
+    limit: int = Query(50, ge=1, le=500),
+    sort: str = Query("total_ms", pattern="^(total_ms|calls|p99_ms|pool_wait_ms)$"),
+    admin: AdminUser = Depends(verify_admin_user),
+) -> dict:
+    """
+    Returns per-fingerprint latency percentiles, calls, rows and pool wait of this
+    process' DB queries (services.db_query_stats). Empty unless DB_QUERY_STATS_ENABLED.
+    """
+    return db_query_stats.get_query_stats(limit=limit, sort=sort)
+
+
+@router.get("/db_queries/prometheus", response_class=PlainTextResponse)
+async def get_db_query_metrics_prometheus(
+    authorization: str | None = Header(default=None),
+) -> PlainTextResponse:
+    """
+    Same stats in Prometheus text format, for a scraper with
+    `Authorization: Bearer <DB_QUERY_STATS_PROMETHEUS_TOKEN>`. 404 when no token is set.
+    """
+    token = db_query_stats.DB_QUERY_STATS_PROMETHEUS_TOKEN
+    if not token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(authorization or "", f"Bearer {token}"):
+        raise HTTPException(status_code=401, detail="invalid scrape token")
+    return PlainTextResponse(
+        db_query_stats.render_prometheus(),
+        media_type="text/plain; version=0.0.4",
+    )
@@ -12,7 +12,8 @@ from pydantic import BaseModel
 from app.core.client_id import get_client_id
 from app.core.feature_flags import require_feature
 from app.models.events_public import EventsListResponse
-from services.db_service import fetch, execute
+from services.db_service import fetch
+from services.reaction_counter_service import get_reaction_counts, toggle_reaction
 from services.event_categories_service import get_event_category_keys
 from services.events_public_service import list_public_events
 
@@ -162,59 +163,13 @@ async def toggle_event_reaction(
     if not check_rows:
         raise HTTPException(status_code=404, detail="Event not found")
     
-    # Check if already reacted with this type
-    if user_id:
-        check_reaction_sql = """
-            SELECT id FROM event_reactions 
-            WHERE event_id = $1 AND user_id = $2 AND reaction_type = $3
-        """
-        existing = await fetch(check_reaction_sql, event_id, user_id, request.reaction_type)
-    else:
-        check_reaction_sql = """
-            SELECT id FROM event_reactions 
-            WHERE event_id = $1 AND client_id = $2 AND reaction_type = $3
-        """
-        existing = await fetch(check_reaction_sql, event_id, client_id, request.reaction_type)
-    
-    if existing:
-        # Remove reaction
-        if user_id:
-            delete_sql = """
-                DELETE FROM event_reactions 
-                WHERE event_id = $1 AND user_id = $2 AND reaction_type = $3
-            """
-            await execute(delete_sql, event_id, user_id, request.reaction_type)
-        else:
-            delete_sql = """
-                DELETE FROM event_reactions 
-                WHERE event_id = $1 AND client_id = $2 AND reaction_type = $3
-            """
-            await execute(delete_sql, event_id, client_id, request.reaction_type)
-        is_active = False
-    else:
-        # Add reaction
-        if user_id:
-            insert_sql = """
-                INSERT INTO event_reactions (event_id, user_id, reaction_type) 
-                VALUES ($1, $2, $3) ON CONFLICT DO NOTHING
-            """
-            await execute(insert_sql, event_id, user_id, request.reaction_type)
-        else:
-            insert_sql = """
-                INSERT INTO event_reactions (event_id, client_id, reaction_type) 
-                VALUES ($1, $2, $3) ON CONFLICT DO NOTHING
-            """
-            await execute(insert_sql, event_id, client_id, request.reaction_type)
-        is_active = True
-    
-    # Get updated count
-    count_sql = """
-        SELECT COUNT(*) as count 
-        FROM event_reactions 
-        WHERE event_id = $1 AND reaction_type = $2
-    """
-    count_rows = await fetch(count_sql, event_id, request.reaction_type)
-    count = count_rows[0]["count"] if count_rows else 0
+    is_active, count = await toggle_reaction(
+        "event",
+        event_id,
+        request.reaction_type,
+        user_id=user_id,
+        client_id=client_id,
+    )
     
     return {
         "reaction_type": request.reaction_type,
@@ -239,21 +194,8 @@ async def get_event_reactions(
     
     user_id = None  # TODO: Extract from auth session
     
-    # Get reaction counts grouped by type
-    counts_sql = """
-        SELECT reaction_type, COUNT(*) as count
-        FROM event_reactions
-        WHERE event_id = $1
-        GROUP BY reaction_type
-        ORDER BY count DESC, reaction_type ASC
-    """
-    count_rows = await fetch(counts_sql, event_id)
-    
-    # Build reactions dict dynamically from database results
-    reactions: Dict[str, int] = {}
-    for row in count_rows:
-        reaction_type = row["reaction_type"]
-        reactions[reaction_type] = row["count"]
+    # Get reaction counts
+    reactions: Dict[str, int] = await get_reaction_counts("event", event_id)
     
     # Get user's reaction if any
     user_reaction = None
@@ -1,14 +1,16 @@
 from __future__ import annotations
 
 from typing import Any, List, Optional, Tuple
-from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Query
+from fastapi.responses import Response
 from pydantic import BaseModel
 
 from services.db_service import fetch, fetchrow
 from app.services.category_map import normalize_category
 # Import shared filter definition (single source of truth for Admin metrics and public API)
-from app.core.location_filters import get_verified_filter_sql
+from app.core.location_filters import get_public_map_filter_sql, get_verified_filter_sql
 from app.deps.auth import get_current_user, User
+from services.map_payload_service import MapBBoxTooLarge, get_map_payload
 
 router = APIRouter(
     prefix="/locations",
@@ -112,6 +114,12 @@ async def list_locations(
         ge=0,
         description="Number of records to skip for pagination",
     ),
+    cursor: Optional[int] = Query(
+        None,
+        ge=1,
+        description="Keyset cursor: only return rows with id < cursor (from the X-Next-Cursor header of the previous page)",
+    ),
+    response: Response = None,
 ):
     """
     Public list of diaspora locations for the map.
@@ -130,6 +138,9 @@ async def list_locations(
       locations within the bounding box are returned.
     - limit: Maximum number of records to return (default 200, max 10000).
     - offset: Number of records to skip for pagination (default 0).
+    - cursor: Keyset pagination. Rows are ordered by id DESC; pass the X-Next-Cursor
+      response header of a full page to get the next one. Prefer this over offset:
+      deep offsets still read and discard every skipped row.
 
     NOTE: This endpoint uses the shared filter definition from
     app.core.location_filters to maintain parity with Admin metrics.
@@ -140,37 +151,13 @@ async def list_locations(
     # Parse and validate bbox
     bbox_tuple = parse_bbox(bbox)
     
-    # Use shared filter definition for VERIFIED locations (single source of truth)
-    # This ensures parity with Admin metrics verified count
+    # Shared public map filter: VERIFIED (same definition as Admin metrics) OR
+    # high-confidence PENDING/CANDIDATE, both limited to bbox when given
     # Use "l" alias for locations table
-    verified_filter_sql, verified_params = get_verified_filter_sql(bbox=bbox_tuple, alias="l")
-    
-    # High-confidence PENDING/CANDIDATE filter (additional to shared VERIFIED filter)
-    # Apply bbox filter to pending filter as well
-    pending_conditions = [
-        "l.state IN ('PENDING_VERIFICATION', 'CANDIDATE')",
-        "(l.confidence_score IS NOT NULL AND l.confidence_score >= 0.90)",
-        "(l.is_retired = false OR l.is_retired IS NULL)",
-        "l.lat IS NOT NULL",
-        "l.lng IS NOT NULL",
-    ]
-    
-    # Add bbox filter to pending if provided
-    pending_params = []
-    param_num = len(verified_params) + 1
-    if bbox_tuple:
-        lat_min, lat_max, lng_min, lng_max = bbox_tuple
-        pending_conditions.append(f"l.lat BETWEEN ${param_num} AND ${param_num + 1}")
-        pending_conditions.append(f"l.lng BETWEEN ${param_num + 2} AND ${param_num + 3}")
-        pending_params = [float(lat_min), float(lat_max), float(lng_min), float(lng_max)]
-        param_num += 4
-    
-    pending_filter_sql = " AND ".join(pending_conditions)
-    
-    # Combine both filters with OR
-    # Parameter placeholders: verified_params use $1, $2, etc.
-    # pending_params continue from where verified_params end
-    all_params = list(verified_params) + pending_params
+    filter_sql, all_params = get_public_map_filter_sql(bbox=bbox_tuple, alias="l")
+    if cursor is not None:
+        all_params.append(cursor)
+        filter_sql = f"({filter_sql}) AND l.id < ${len(all_params)}"
     
     # Calculate parameter numbers for LIMIT and OFFSET
     limit_param_num = len(all_params) + 1
@@ -190,16 +177,16 @@ async def list_locations(
             COALESCE(blc.status::text, NULL) as claim_status
         FROM locations l
         LEFT JOIN business_location_claims blc ON l.id = blc.location_id
-        WHERE ({verified_filter_sql}) OR ({pending_filter_sql})
+        WHERE {filter_sql}
         ORDER BY l.id DESC
         LIMIT ${limit_param_num} OFFSET ${offset_param_num}
     """
     
-    # Combine parameters: verified_params, pending_params, limit, offset
+    # Combine parameters: filter params, limit, offset
     all_params = all_params + [limit, offset]
     
     # Log request parameters
-    print(f"[locations] query: bbox={bbox}, limit={limit}, offset={offset}, params_count={len(all_params)}")
+    print(f"[locations] query: bbox={bbox}, limit={limit}, offset={offset}, cursor={cursor}, params_count={len(all_params)}")
 
     try:
         data = await fetch(sql, *all_params)
@@ -262,6 +249,8 @@ async def list_locations(
             claim_status = r.get("claim_status")
             r["has_verified_badge"] = (claim_status == "approved")
 
+        if response is not None and len(rows) == limit:
+            response.headers["X-Next-Cursor"] = rows[-1]["id"]
         return rows
 
     except Exception as e:
@@ -290,8 +279,50 @@ async def list_locations_slash(
         ge=0,
         description="Number of records to skip for pagination",
     ),
+    cursor: Optional[int] = Query(
+        None,
+        ge=1,
+        description="Keyset cursor: only return rows with id < cursor (from the X-Next-Cursor header of the previous page)",
+    ),
+    response: Response = None,
 ):
-    return await list_locations(state=state, bbox=bbox, limit=limit, offset=offset)
+    return await list_locations(
+        state=state, bbox=bbox, limit=limit, offset=offset, cursor=cursor, response=response,
+    )
+
+
+@router.get("/map")
+async def get_map_locations(
+    bbox: Optional[str] = Query(
+        None,
+        description="Bounding box in format 'west,south,east,north' (WGS84 degrees). Snapped outward to cache tiles.",
+    ),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+) -> Response:
+    """
+    Compact map payload: same visibility rules as the list endpoint, columnar per tile.
+
+    {"format": 1, "version", "tile_deg", "categories": [[raw, key, label], ...],
+     "states": [...], "tiles": [{"tile", "id", "lat", "lng", "cat", "state", "conf",
+     "rating", "name", "address", "badge"}, ...]}
+
+    `cat` and `state` are indices into `categories` / `states`. Tiles are cached
+    server-side and the response carries an ETag; send If-None-Match to get a 304
+    while nothing in the viewport changed.
+    """
+    bbox_tuple = parse_bbox(bbox)
+    try:
+        body, etag = await get_map_payload(bbox_tuple, if_none_match=if_none_match)
+    except MapBBoxTooLarge as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"[locations/map] query failed: {e}")
+        raise HTTPException(status_code=503, detail="database unavailable")
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if body is None:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.get("/count")
@@ -317,36 +348,13 @@ async def count_locations(
     # Parse and validate bbox
     bbox_tuple = parse_bbox(bbox)
     
-    # Use shared filter definition for VERIFIED locations (single source of truth)
-    verified_filter_sql, verified_params = get_verified_filter_sql(bbox=bbox_tuple)
-    
-    # High-confidence PENDING/CANDIDATE filter (same as list endpoint)
-    pending_conditions = [
-        "state IN ('PENDING_VERIFICATION', 'CANDIDATE')",
-        "(confidence_score IS NOT NULL AND confidence_score >= 0.90)",
-        "(is_retired = false OR is_retired IS NULL)",
-        "lat IS NOT NULL",
-        "lng IS NOT NULL",
-    ]
-    
-    # Add bbox filter to pending if provided
-    pending_params = []
-    param_num = len(verified_params) + 1
-    if bbox_tuple:
-        lat_min, lat_max, lng_min, lng_max = bbox_tuple
-        pending_conditions.append(f"lat BETWEEN ${param_num} AND ${param_num + 1}")
-        pending_conditions.append(f"lng BETWEEN ${param_num + 2} AND ${param_num + 3}")
-        pending_params = [float(lat_min), float(lat_max), float(lng_min), float(lng_max)]
-    
-    pending_filter_sql = " AND ".join(pending_conditions)
-    
-    # Combine both filters with OR
-    all_params = list(verified_params) + pending_params
+    # Same shared filter as the list endpoint
+    filter_sql, all_params = get_public_map_filter_sql(bbox=bbox_tuple)
     
     sql = f"""
         SELECT COUNT(*) as count
         FROM locations
-        WHERE ({verified_filter_sql}) OR ({pending_filter_sql})
+        WHERE {filter_sql}
     """
     
     # Log request parameters
@@ -21,6 +21,7 @@ from app.models.news_public import (
     NewsListResponse,
 )
 from services.db_service import fetch, execute
+from services.reaction_counter_service import get_reaction_counts, toggle_reaction
 from services.news_feed_rules import FeedType
 from services.news_service import (
     list_news_by_feed,
@@ -465,59 +466,13 @@ async def toggle_news_reaction(
             # If insert fails, log but continue - the reaction insert will fail with a clearer error
             logger.warning("news_reaction_dummy_record_failed", news_id=news_id, error=str(e))
     
-    # Check if already reacted with this type
-    if user_id:
-        check_reaction_sql = """
-            SELECT id FROM news_reactions 
-            WHERE news_id = $1 AND user_id = $2 AND reaction_type = $3
-        """
-        existing = await fetch(check_reaction_sql, news_id, user_id, request.reaction_type)
-    else:
-        check_reaction_sql = """
-            SELECT id FROM news_reactions 
-            WHERE news_id = $1 AND client_id = $2 AND reaction_type = $3
-        """
-        existing = await fetch(check_reaction_sql, news_id, client_id, request.reaction_type)
-    
-    if existing:
-        # Remove reaction
-        if user_id:
-            delete_sql = """
-                DELETE FROM news_reactions 
-                WHERE news_id = $1 AND user_id = $2 AND reaction_type = $3
-            """
-            await execute(delete_sql, news_id, user_id, request.reaction_type)
-        else:
-            delete_sql = """
-                DELETE FROM news_reactions 
-                WHERE news_id = $1 AND client_id = $2 AND reaction_type = $3
-            """
-            await execute(delete_sql, news_id, client_id, request.reaction_type)
-        is_active = False
-    else:
-        # Add reaction
-        if user_id:
-            insert_sql = """
-                INSERT INTO news_reactions (news_id, user_id, reaction_type) 
-                VALUES ($1, $2, $3) ON CONFLICT DO NOTHING
-            """
-            await execute(insert_sql, news_id, user_id, request.reaction_type)
-        else:
-            insert_sql = """
-                INSERT INTO news_reactions (news_id, client_id, reaction_type)
-                VALUES ($1, $2, $3) ON CONFLICT DO NOTHING
-            """
-            await execute(insert_sql, news_id, client_id, request.reaction_type)
-        is_active = True
-    
-    # Get updated count
-    count_sql = """
-        SELECT COUNT(*) as count 
-        FROM news_reactions 
-        WHERE news_id = $1 AND reaction_type = $2
-    """
-    count_rows = await fetch(count_sql, news_id, request.reaction_type)
-    count = count_rows[0]["count"] if count_rows else 0
+    is_active, count = await toggle_reaction(
+        "news",
+        news_id,
+        request.reaction_type,
+        user_id=user_id,
+        client_id=client_id,
+    )
     
     return {
         "reaction_type": request.reaction_type,
@@ -539,21 +494,8 @@ async def get_news_reactions(
     
     user_id = None  # TODO: Extract from auth session
     
-    # Get reaction counts grouped by type
-    counts_sql = """
-        SELECT reaction_type, COUNT(*) as count
-        FROM news_reactions
-        WHERE news_id = $1
-        GROUP BY reaction_type
-        ORDER BY count DESC, reaction_type ASC
-    """
-    count_rows = await fetch(counts_sql, news_id)
-    
-    # Build reactions dict dynamically from database results
-    reactions: Dict[str, int] = {}
-    for row in count_rows:
-        reaction_type = row["reaction_type"]
-        reactions[reaction_type] = row["count"]
+    # Get reaction counts
+    reactions: Dict[str, int] = await get_reaction_counts("news", news_id)
     
     # Get user's reaction if any
     user_reaction = None
@@ -15,11 +15,14 @@ from app.core.feature_flags import require_feature
 from app.deps.auth import get_current_user_optional, User
 from app.deps.rate_limiting import require_rate_limit_factory
 from services.db_service import fetch, execute
+from services.reaction_counter_service import reactions_join_sql
 from services.xp_service import award_xp
 from services.activity_summary_service import update_user_activity_summary
 
 router = APIRouter(prefix="/locations", tags=["notes"])
 
+_NOTE_REACTIONS_JOIN = reactions_join_sql("activity", "note_activity.id")
+
 
 class NoteCreate(BaseModel):
     content: str  # 3-1000 chars
@@ -142,9 +145,9 @@ async def get_notes(
     if sort_by not in valid_sorts:
         sort_by = "reactions_desc"
     
-    # Query notes with reaction counts from activity_stream and activity_reactions
-    # Match activity_stream entries by location_id, activity_type='note', and timestamp proximity
-    sql = """
+    # Reaction counts from reaction_counters, for the activity_stream entry of each note
+    # (matched by location_id, activity_type='note', timestamp proximity and content)
+    sql = f"""
         SELECT 
             ln.id,
             ln.location_id,
@@ -153,18 +156,21 @@ async def get_notes(
             ln.created_at,
             ln.updated_at,
             COALESCE(
-                (
-                    SELECT COUNT(*)::int
-                    FROM activity_reactions ar
-                    INNER JOIN activity_stream ast ON ar.activity_id = ast.id
-                    WHERE ast.activity_type = 'note'
-                      AND ast.location_id = ln.location_id
-                      AND ABS(EXTRACT(EPOCH FROM (ast.created_at - ln.created_at))) < 10
-                      AND ast.payload::text LIKE '%' || LEFT(ln.content, 30) || '%'
-                ),
+                (SELECT SUM(r.value::int) FROM jsonb_each_text(rc.reactions) r),
                 0
-            ) as reaction_count
+            )::int as reaction_count
         FROM location_notes ln
+        LEFT JOIN LATERAL (
+            SELECT ast.id
+            FROM activity_stream ast
+            WHERE ast.activity_type = 'note'
+              AND ast.location_id = ln.location_id
+              AND ABS(EXTRACT(EPOCH FROM (ast.created_at - ln.created_at))) < 10
+              AND ast.payload::text LIKE '%' || LEFT(ln.content, 30) || '%'
+            ORDER BY ABS(EXTRACT(EPOCH FROM (ast.created_at - ln.created_at)))
+            LIMIT 1
+        ) note_activity ON TRUE
+        {_NOTE_REACTIONS_JOIN}
         WHERE ln.location_id = $1
     """
     
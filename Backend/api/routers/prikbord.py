@@ -13,6 +13,7 @@ import json
 from app.deps.auth import get_current_user, get_current_user_optional, User
 from app.deps.admin_auth import verify_admin_user, AdminUser
 from services.db_service import fetch, fetchrow, execute
+from services.reaction_counter_service import get_reaction_counts, reactions_join_sql, toggle_reaction
 from services.link_preview_service import get_link_preview_service, Platform
 from services.og_validation_service import get_og_validation_service
 from app.core.logging import logger
@@ -20,6 +21,8 @@ from app.core.client_id import get_client_id
 
 router = APIRouter(prefix="/prikbord", tags=["prikbord"])
 
+_LINK_REACTIONS_JOIN = reactions_join_sql("shared_link", "shared_links.id")
+
 
 # Request/Response models
 class SharedLinkCreate(BaseModel):
@@ -364,8 +367,9 @@ async def list_links(
         order_by = "ORDER BY created_at DESC"
     
     sql = f"""
-        SELECT *
+        SELECT shared_links.*, rc.reactions
         FROM shared_links
+        {_LINK_REACTIONS_JOIN}
         WHERE {where_clause}
         {order_by}
         LIMIT ${param_idx} OFFSET ${param_idx + 1}
@@ -584,59 +588,13 @@ async def toggle_link_reaction(
     if not check_row:
         raise HTTPException(status_code=404, detail="Link not found")
     
-    # Check if already reacted with this type
-    if user_id:
-        check_reaction_sql = """
-            SELECT id FROM shared_link_reactions 
-            WHERE link_id = $1 AND user_id = $2 AND reaction_type = $3
-        """
-        existing = await fetchrow(check_reaction_sql, link_id, user_id, request.reaction_type)
-    else:
-        check_reaction_sql = """
-            SELECT id FROM shared_link_reactions 
-            WHERE link_id = $1 AND client_id = $2 AND reaction_type = $3
-        """
-        existing = await fetchrow(check_reaction_sql, link_id, client_id, request.reaction_type)
-    
-    if existing:
-        # Remove reaction
-        if user_id:
-            delete_sql = """
-                DELETE FROM shared_link_reactions 
-                WHERE link_id = $1 AND user_id = $2 AND reaction_type = $3
-            """
-            await execute(delete_sql, link_id, user_id, request.reaction_type)
-        else:
-            delete_sql = """
-                DELETE FROM shared_link_reactions 
-                WHERE link_id = $1 AND client_id = $2 AND reaction_type = $3
-            """
-            await execute(delete_sql, link_id, client_id, request.reaction_type)
-        is_active = False
-    else:
-        # Add reaction
-        if user_id:
-            insert_sql = """
-                INSERT INTO shared_link_reactions (link_id, user_id, reaction_type) 
-                VALUES ($1, $2, $3) ON CONFLICT DO NOTHING
-            """
-            await execute(insert_sql, link_id, user_id, request.reaction_type)
-        else:
-            insert_sql = """
-                INSERT INTO shared_link_reactions (link_id, client_id, reaction_type) 
-                VALUES ($1, $2, $3) ON CONFLICT DO NOTHING
-            """
-            await execute(insert_sql, link_id, client_id, request.reaction_type)
-        is_active = True
-    
-    # Get updated count
-    count_sql = """
-        SELECT COUNT(*) as count 
-        FROM shared_link_reactions 
-        WHERE link_id = $1 AND reaction_type = $2
-    """
-    count_rows = await fetch(count_sql, link_id, request.reaction_type)
-    count = count_rows[0]["count"] if count_rows else 0
+    is_active, count = await toggle_reaction(
+        "shared_link",
+        link_id,
+        request.reaction_type,
+        user_id=user_id,
+        client_id=client_id,
+    )
     
     return {
         "reaction_type": request.reaction_type,
@@ -658,21 +616,8 @@ async def get_link_reactions(
     if not check_row:
         raise HTTPException(status_code=404, detail="Link not found")
     
-    # Get reaction counts grouped by type
-    counts_sql = """
-        SELECT reaction_type, COUNT(*) as count
-        FROM shared_link_reactions
-        WHERE link_id = $1
-        GROUP BY reaction_type
-        ORDER BY count DESC, reaction_type ASC
-    """
-    count_rows = await fetch(counts_sql, link_id)
-    
-    # Build reactions dict dynamically from database results
-    reactions: dict = {}
-    for row in count_rows:
-        reaction_type = row["reaction_type"]
-        reactions[reaction_type] = row["count"]
+    # Get reaction counts
+    reactions: dict = await get_reaction_counts("shared_link", link_id)
     
     # Get user's reaction if authenticated
     user_reaction = None
@@ -895,18 +840,11 @@ async def _build_link_response(row: dict, current_user: Optional[User] = None) -
             elif interaction["interaction_type"] == "bookmark":
                 is_bookmarked = True
     
-    # Get reaction counts
-    reactions_sql = """
-        SELECT reaction_type, COUNT(*) as count
-        FROM shared_link_reactions
-        WHERE link_id = $1
-        GROUP BY reaction_type
-        ORDER BY count DESC, reaction_type ASC
-    """
-    reaction_rows = await fetch(reactions_sql, row["id"])
-    reactions = {}
-    for r_row in reaction_rows:
-        reactions[r_row["reaction_type"]] = r_row["count"]
+    # Get reaction counts (list_links already joined them)
+    if "reactions" in row:
+        reactions = json.loads(row["reactions"]) if row["reactions"] else {}
+    else:
+        reactions = await get_reaction_counts("shared_link", row["id"])
     
     # Get user's reaction if authenticated
     user_reaction = None
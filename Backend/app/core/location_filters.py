@@ -11,14 +11,141 @@ The verified filter includes:
 - is_retired = false OR is_retired IS NULL
 - lat IS NOT NULL AND lng IS NOT NULL
 - Optional bounding box filter for geographic scoping
+
+With LOCATION_TILE_INDEX_ENABLED (off until migration 101 is applied), bounding
+boxes are also matched through locations.tile_key: a Z-order key over a
+2^16 x 2^16 lat/lng grid, generated by Postgres on every write. A bbox is covered
+by at most LOCATION_TILE_KEY_MAX_RANGES key ranges, which the (tile_key, id) index
+answers with range scans; the exact lat/lng BETWEEN stays as recheck because the
+ranges over-cover.
 """
 
-from typing import Optional, Tuple
+import math
+import os
+from typing import List, Optional, Tuple
 
 
 # Confidence threshold for verified locations (matches frontend map)
 VERIFIED_CONFIDENCE_THRESHOLD = 0.80
 
+# PENDING_VERIFICATION/CANDIDATE rows above this are auto-surfaced on the public map
+PENDING_CONFIDENCE_THRESHOLD = 0.90
+
+# Tile key grid; must match public.location_tile_key() in migration 101
+TILE_KEY_BITS = 16
+LOCATION_TILE_INDEX_ENABLED = os.getenv("LOCATION_TILE_INDEX_ENABLED", "false").lower() in ("1", "true", "yes")
+LOCATION_TILE_KEY_MAX_RANGES = int(os.getenv("LOCATION_TILE_KEY_MAX_RANGES", "16"))
+
+_TILE_CELLS = 1 << TILE_KEY_BITS
+
+
+def _tile_cell(value: float, offset: float, span: float) -> int:
+    # Same float operations, in the same order, as the SQL function
+    cell = math.floor((value + offset) / span * float(_TILE_CELLS))
+    return min(_TILE_CELLS - 1, max(0, cell))
+
+
+def _spread_bits(v: int) -> int:
+    v = (v | (v << 8)) & 0x00FF00FF
+    v = (v | (v << 4)) & 0x0F0F0F0F
+    v = (v | (v << 2)) & 0x33333333
+    return (v | (v << 1)) & 0x55555555
+
+
+def location_tile_key(lat: float, lng: float) -> int:
+    """Z-order tile key of a coordinate (lat bits on odd positions, lng bits on even)."""
+    y = _tile_cell(float(lat), 90.0, 180.0)
+    x = _tile_cell(float(lng), 180.0, 360.0)
+    return (_spread_bits(y) << 1) | _spread_bits(x)
+
+
+def _merge_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    merged: List[Tuple[int, int]] = []
+    for lo, hi in sorted(ranges):
+        if merged and lo <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+def tile_key_ranges(
+    bbox: Tuple[float, float, float, float],
+    max_ranges: Optional[int] = None,
+) -> List[Tuple[int, int]]:
+    """
+    Inclusive tile_key ranges covering (lat_min, lat_max, lng_min, lng_max).
+
+    Walks the quadtree top-down and stops refining as soon as the next level would
+    need more than `max_ranges` ranges; partially covered nodes are then emitted
+    whole, so the result may over-cover but never misses a row.
+    """
+    max_ranges = max(1, max_ranges or LOCATION_TILE_KEY_MAX_RANGES)
+    lat_min, lat_max, lng_min, lng_max = bbox
+    y0, y1 = _tile_cell(float(lat_min), 90.0, 180.0), _tile_cell(float(lat_max), 90.0, 180.0)
+    x0, x1 = _tile_cell(float(lng_min), 180.0, 360.0), _tile_cell(float(lng_max), 180.0, 360.0)
+
+    def node_range(level: int, y: int, x: int) -> Tuple[int, int]:
+        shift = 2 * (TILE_KEY_BITS - level)
+        lo = ((_spread_bits(y) << 1) | _spread_bits(x)) << shift
+        return lo, lo + (1 << shift) - 1
+
+    full: List[Tuple[int, int]] = []
+    partial = [(0, 0, 0)]  # (level, y, x); a node at `level` spans 2^(BITS-level) cells
+    while partial:
+        next_full: List[Tuple[int, int]] = []
+        next_partial: List[Tuple[int, int, int]] = []
+        for level, y, x in partial:
+            size = 1 << (TILE_KEY_BITS - level - 1)
+            for cy in (2 * y, 2 * y + 1):
+                ny0, ny1 = cy * size, cy * size + size - 1
+                if ny1 < y0 or ny0 > y1:
+                    continue
+                for cx in (2 * x, 2 * x + 1):
+                    nx0, nx1 = cx * size, cx * size + size - 1
+                    if nx1 < x0 or nx0 > x1:
+                        continue
+                    if y0 <= ny0 and ny1 <= y1 and x0 <= nx0 and nx1 <= x1:
+                        next_full.append(node_range(level + 1, cy, cx))
+                    else:
+                        next_partial.append((level + 1, cy, cx))
+        candidate = full + next_full + [node_range(*n) for n in next_partial]
+        if len(_merge_ranges(candidate)) > max_ranges:
+            break
+        full += next_full
+        partial = next_partial
+    return _merge_ranges(full + [node_range(*n) for n in partial])
+
+
+def get_bbox_filter_sql(
+    bbox: Tuple[float, float, float, float],
+    alias: str = "",
+    param_start: int = 1,
+) -> Tuple[str, list]:
+    """
+    Bbox condition with parameters numbered from `param_start`.
+
+    lat/lng BETWEEN come first ($start..$start+3), followed by the tile_key range
+    pairs when LOCATION_TILE_INDEX_ENABLED.
+    """
+    prefix = f"{alias}." if alias else ""
+    lat_min, lat_max, lng_min, lng_max = bbox
+    n = param_start
+    conditions = [
+        f"{prefix}lat BETWEEN ${n} AND ${n + 1}",
+        f"{prefix}lng BETWEEN ${n + 2} AND ${n + 3}",
+    ]
+    params: list = [float(lat_min), float(lat_max), float(lng_min), float(lng_max)]
+    n += 4
+    if LOCATION_TILE_INDEX_ENABLED:
+        ranges = []
+        for lo, hi in tile_key_ranges(bbox):
+            ranges.append(f"{prefix}tile_key BETWEEN ${n} AND ${n + 1}")
+            params.extend([lo, hi])
+            n += 2
+        conditions.append(f"({' OR '.join(ranges)})")
+    return " AND ".join(conditions), params
+
 
 def get_verified_filter_sql(
     bbox: Optional[Tuple[float, float, float, float]] = None,
@@ -70,16 +197,46 @@ def get_verified_filter_sql(
 
     # Optional bbox filter
     if bbox:
-        lat_min, lat_max, lng_min, lng_max = bbox
-        conditions.append(f"{prefix}lat BETWEEN ${param_num} AND ${param_num + 1}")
-        conditions.append(f"{prefix}lng BETWEEN ${param_num + 2} AND ${param_num + 3}")
-        params.extend([float(lat_min), float(lat_max), float(lng_min), float(lng_max)])
-        param_num += 4
+        bbox_sql, bbox_params = get_bbox_filter_sql(bbox, alias=alias, param_start=param_num)
+        conditions.append(bbox_sql)
+        params.extend(bbox_params)
+        param_num += len(bbox_params)
 
     sql = " AND ".join(conditions)
     return sql, params
 
 
+def get_public_map_filter_sql(
+    bbox: Optional[Tuple[float, float, float, float]] = None,
+    alias: str = "",
+) -> Tuple[str, list]:
+    """
+    WHERE clause for everything the public map shows (list, count and map endpoints).
+
+    ((verified filter) OR (high-confidence PENDING_VERIFICATION/CANDIDATE, not retired,
+    with coordinates)), AND the bbox condition when `bbox` is given. The bbox is applied
+    once at the top level so the tile_key index serves both halves.
+    """
+    prefix = f"{alias}." if alias else ""
+    verified_sql, params = get_verified_filter_sql(bbox=None, alias=alias)
+
+    pending_conditions = [
+        f"{prefix}state IN ('PENDING_VERIFICATION', 'CANDIDATE')",
+        f"({prefix}confidence_score IS NOT NULL AND {prefix}confidence_score >= {PENDING_CONFIDENCE_THRESHOLD:.2f})",
+        f"({prefix}is_retired = false OR {prefix}is_retired IS NULL)",
+        f"{prefix}lat IS NOT NULL",
+        f"{prefix}lng IS NOT NULL",
+    ]
+    pending_sql = " AND ".join(pending_conditions)
+    sql = f"(({verified_sql}) OR ({pending_sql}))"
+    params = list(params)
+    if bbox:
+        bbox_sql, bbox_params = get_bbox_filter_sql(bbox, alias=alias, param_start=len(params) + 1)
+        sql = f"{sql} AND {bbox_sql}"
+        params.extend(bbox_params)
+    return sql, params
+
+
 def get_verified_filter_params() -> dict:
     """
     Return filter parameters as a dictionary for UI display.
@@ -4,12 +4,24 @@ Rate limiting service using sliding window algorithm.
 
 Uses the rate_limits table to track requests per key (client_id, user_id, or IP)
 with a sliding window approach.
+
+Two backends share the same time-bucketed counting (see _bucket_seconds):
+- "memory" (default): counters live in-process, so check + increment costs no DB
+  round trip. Increments are flushed to rate_limits in the background; the flush
+  upsert returns the DB totals, which folds in other instances' counts.
+- "db": every check is a SUM query plus an upsert on rate_limits (original
+  behaviour). Select with RATE_LIMIT_BACKEND=db.
 """
 
 from __future__ import annotations
 
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict, deque
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
 from app.core.rate_limits_config import get_rate_limit
 from services.db_service import fetch, execute
@@ -17,6 +29,28 @@ from app.core.logging import get_logger
 
 logger = get_logger()
 
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").strip().lower()
+RATE_LIMIT_FLUSH_INTERVAL_S = float(os.getenv("RATE_LIMIT_FLUSH_INTERVAL_S", "2"))
+RATE_LIMIT_MEMORY_MAX_KEYS = int(os.getenv("RATE_LIMIT_MEMORY_MAX_KEYS", "100000"))
+# Latency samples kept per backend for p50/p99
+RATE_LIMIT_LATENCY_SAMPLES = 2048
+
+
+def _bucket_seconds(window_seconds: int) -> int:
+    """Bucket size for a window; buckets are the unit stored in rate_limits.window_start."""
+    # For 60s window: round down to nearest minute
+    # For 300s window: round down to nearest 5 minutes
+    if window_seconds <= 60:
+        return 60  # 1 minute buckets
+    if window_seconds <= 300:
+        return 60  # Still use 1 minute buckets for 5min windows
+    return 300  # 5 minute buckets for longer windows
+
+
+def _bucket_start(ts: float, window_seconds: int) -> int:
+    bucket_seconds = _bucket_seconds(window_seconds)
+    return (int(ts) // bucket_seconds) * bucket_seconds
+
 
 async def check_rate_limit(
     key_type: str,
@@ -41,10 +75,7 @@ async def check_rate_limit(
         True if under limit (allowed), False if over limit (blocked)
     """
     # Get default limits from config if not provided
-    if limit is None or window_seconds is None:
-        default_limit, default_window = get_rate_limit(action)
-        limit = limit or default_limit
-        window_seconds = window_seconds or default_window
+    limit, window_seconds = _resolve_limits(action, limit, window_seconds)
     
     # Calculate window start time (sliding window)
     now = datetime.now(timezone.utc)
@@ -84,24 +115,10 @@ async def increment_rate_limit(key_type: str, key_value: str, action: str) -> No
     """
     _, window_seconds = get_rate_limit(action)
     
-    # Calculate window start time (bucket)
+    # Calculate window start time (bucket), rounded down to the bucket boundary
     # For a 60 second window, we bucket by minute: 00, 01, 02, etc.
     now = datetime.now(timezone.utc)
-    
-    # Calculate the bucket start time (rounded down to window boundary)
-    # For 60s window: round down to nearest minute
-    # For 300s window: round down to nearest 5 minutes
-    bucket_seconds = window_seconds
-    if window_seconds <= 60:
-        bucket_seconds = 60  # 1 minute buckets
-    elif window_seconds <= 300:
-        bucket_seconds = 60  # Still use 1 minute buckets for 5min windows
-    else:
-        bucket_seconds = 300  # 5 minute buckets for longer windows
-    
-    # Round down to bucket boundary
-    bucket_timestamp = int(now.timestamp())
-    bucket_timestamp = (bucket_timestamp // bucket_seconds) * bucket_seconds
+    bucket_timestamp = _bucket_start(now.timestamp(), window_seconds)
     window_start = datetime.fromtimestamp(bucket_timestamp, tz=timezone.utc)
     
     # Upsert: increment count if exists, create with count=1 if not
@@ -125,59 +142,373 @@ async def increment_rate_limit(key_type: str, key_value: str, action: str) -> No
         # Rate limiting is defensive, not critical path
 
 
-async def check_and_increment_rate_limit(
-    key_type: str,
-    key_value: str,
-    action: str,
-    limit: Optional[int] = None,
-    window_seconds: Optional[int] = None,
-) -> bool:
-    """
-    Check rate limit and increment counter if allowed.
-    
-    This is a convenience function that combines check and increment.
-    Returns True if allowed, False if blocked.
-    
-    Args:
-        key_type: Type of key ('client_id', 'user_id', or 'ip')
-        key_value: The actual key value
-        action: Action name
-        limit: Optional custom limit
-        window_seconds: Optional custom window
-        
-    Returns:
-        True if allowed, False if blocked
-    """
-    # Check first
-    allowed = await check_rate_limit(key_type, key_value, action, limit, window_seconds)
-    
-    # Only increment if allowed
-    if allowed:
-        await increment_rate_limit(key_type, key_value, action)
-    
-    return allowed
+def _resolve_limits(action: str, limit: Optional[int], window_seconds: Optional[int]) -> Tuple[int, int]:
+    if limit is None or window_seconds is None:
+        default_limit, default_window = get_rate_limit(action)
+        limit = limit or default_limit
+        window_seconds = window_seconds or default_window
+    return limit, window_seconds
 
 
+class _LatencyRecorder:
+    """Ring buffer of check latencies (ms) with nearest-rank percentiles."""
 
+    def __init__(self, size: Optional[int] = None):
+        self._samples: Deque[float] = deque(maxlen=size or RATE_LIMIT_LATENCY_SAMPLES)
+        self.calls = 0
 
+    def record(self, ms: float) -> None:
+        self._samples.append(ms)
+        self.calls += 1
 
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        idx = min(len(ordered) - 1, max(0, math.ceil(pct / 100.0 * len(ordered)) - 1))
+        return round(ordered[idx], 3)
 
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "samples": len(self._samples),
+            "p50_ms": self.percentile(50),
+            "p99_ms": self.percentile(99),
+        }
 
 
+class DbRateLimitBackend:
+    """Original DB-only limiter: SUM over rate_limits, then an upsert, per check."""
 
+    name = "db"
 
+    async def check_and_increment(
+        self,
+        key_type: str,
+        key_value: str,
+        action: str,
+        limit: int,
+        window_seconds: int,
+    ) -> bool:
+        allowed = await check_rate_limit(key_type, key_value, action, limit, window_seconds)
+        # Only increment if allowed
+        if allowed:
+            await increment_rate_limit(key_type, key_value, action)
+        return allowed
 
+    async def flush(self) -> int:
+        return 0
 
+    def stats(self) -> Dict[str, Any]:
+        return {}
 
 
+class _KeyState:
+    __slots__ = ("buckets", "hydrated")
 
+    def __init__(self) -> None:
+        self.buckets: Dict[int, int] = {}  # bucket start (epoch s) -> count
+        self.hydrated = False
 
 
+_Key = Tuple[str, str, str]
 
+HYDRATE_SQL = """
+    SELECT EXTRACT(EPOCH FROM window_start)::bigint AS bucket, count
+    FROM rate_limits
+    WHERE key_type = $1
+      AND key_value = $2
+      AND action = $3
+      AND window_start >= $4
+"""
 
+# Adds the pending deltas and returns the resulting DB totals (all instances)
+FLUSH_SQL = """
+    INSERT INTO rate_limits (key_type, key_value, action, window_start, count, created_at)
+    SELECT t.key_type, t.key_value, t.action, to_timestamp(t.bucket), t.delta, now()
+    FROM unnest($1::text[], $2::text[], $3::text[], $4::bigint[], $5::int[])
+        AS t(key_type, key_value, action, bucket, delta)
+    ON CONFLICT (key_type, key_value, action, window_start)
+    DO UPDATE SET count = rate_limits.count + EXCLUDED.count
+    RETURNING key_type, key_value, action, EXTRACT(EPOCH FROM window_start)::bigint AS bucket, count
+"""
 
 
+class MemoryRateLimitBackend:
+    """
+    In-process limiter over the same time buckets as the rate_limits table.
 
+    A key is hydrated from rate_limits the first time this process sees it; after
+    that check + increment is a dict operation without an await in between, so it
+    is atomic per process. Increments accumulate in `_pending` and are written by
+    flush(); the returned totals replace the local bucket counts so increments from
+    other instances show up within one flush interval.
+    """
 
+    name = "memory"
+
+    def __init__(
+        self,
+        *,
+        max_keys: int = RATE_LIMIT_MEMORY_MAX_KEYS,
+        clock=time.time,
+        hydrate: bool = True,
+    ):
+        self.max_keys = max(1, int(max_keys))
+        self._clock = clock
+        self._hydrate_enabled = hydrate
+        self._keys: "OrderedDict[_Key, _KeyState]" = OrderedDict()
+        self._pending: Dict[Tuple[str, str, str, int], int] = {}
+        self._hydrating: Dict[_Key, asyncio.Future] = {}
+        self.flushes = 0
+        self.flush_errors = 0
+        self.hydrate_errors = 0
+        self.evictions = 0
+
+    async def _hydrate(self, key: _Key, state: _KeyState, window_seconds: int) -> None:
+        if state.hydrated:
+            return
+        if not self._hydrate_enabled:
+            state.hydrated = True
+            return
+        pending = self._hydrating.get(key)
+        if pending is not None:
+            await asyncio.shield(pending)
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._hydrating[key] = fut
+        try:
+            since = datetime.fromtimestamp(self._clock() - window_seconds, tz=timezone.utc)
+            rows = await fetch(HYDRATE_SQL, key[0], key[1], key[2], since)
+            for row in rows:
+                bucket = int(row["bucket"])
+                state.buckets[bucket] = max(state.buckets.get(bucket, 0), int(row["count"] or 0))
+        except Exception as e:
+            # Start from local counts only; the next flush reconciles this key
+            self.hydrate_errors += 1
+            logger.warning("rate_limit_hydrate_failed", key_type=key[0], action=key[2], error=str(e))
+        finally:
+            state.hydrated = True
+            self._hydrating.pop(key, None)
+            fut.set_result(None)
+
+    def _state(self, key: _Key) -> _KeyState:
+        state = self._keys.get(key)
+        if state is None:
+            state = _KeyState()
+            self._keys[key] = state
+            if len(self._keys) > self.max_keys:
+                self._evict()
+        else:
+            self._keys.move_to_end(key)
+        return state
+
+    def _evict(self) -> None:
+        # Least recently used first; pending deltas live in _pending and survive eviction
+        while len(self._keys) > self.max_keys:
+            self._keys.popitem(last=False)
+            self.evictions += 1
+
+    async def check_and_increment(
+        self,
+        key_type: str,
+        key_value: str,
+        action: str,
+        limit: int,
+        window_seconds: int,
+    ) -> bool:
+        key = (key_type, key_value, action)
+        state = self._state(key)
+        if not state.hydrated:
+            await self._hydrate(key, state, window_seconds)
+
+        now = self._clock()
+        window_start = now - window_seconds
+        total = sum(count for bucket, count in state.buckets.items() if bucket >= window_start)
+        if total >= limit:
+            return False
+
+        # Same bucket the DB backend would write (bucket size follows the configured window)
+        _, config_window = get_rate_limit(action)
+        bucket = _bucket_start(now, config_window)
+        state.buckets[bucket] = state.buckets.get(bucket, 0) + 1
+        pending_key = (key_type, key_value, action, bucket)
+        self._pending[pending_key] = self._pending.get(pending_key, 0) + 1
+        return True
+
+    def _prune(self) -> None:
+        now = self._clock()
+        for key in list(self._keys.keys()):
+            state = self._keys[key]
+            try:
+                _, window_seconds = get_rate_limit(key[2])
+            except ValueError:
+                window_seconds = 3600
+            horizon = now - window_seconds - _bucket_seconds(window_seconds)
+            for bucket in [b for b in state.buckets if b < horizon]:
+                del state.buckets[bucket]
+            if not state.buckets and state.hydrated:
+                del self._keys[key]
+
+    async def flush(self) -> int:
+        """Write pending increments to rate_limits; returns the number of buckets flushed."""
+        self._prune()
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        items = list(pending.items())
+        try:
+            rows = await fetch(
+                FLUSH_SQL,
+                [k[0] for k, _ in items],
+                [k[1] for k, _ in items],
+                [k[2] for k, _ in items],
+                [k[3] for k, _ in items],
+                [delta for _, delta in items],
+            )
+        except Exception as e:
+            # Put the deltas back; they go out with the next flush
+            for k, delta in items:
+                self._pending[k] = self._pending.get(k, 0) + delta
+            self.flush_errors += 1
+            logger.warning("rate_limit_flush_failed", buckets=len(items), error=str(e))
+            return 0
+
+        for row in rows:
+            key = (row["key_type"], row["key_value"], row["action"])
+            state = self._keys.get(key)
+            if state is None:
+                continue
+            bucket = int(row["bucket"])
+            # DB total + whatever was counted locally since the snapshot was taken
+            unflushed = self._pending.get((key[0], key[1], key[2], bucket), 0)
+            state.buckets[bucket] = max(state.buckets.get(bucket, 0), int(row["count"] or 0) + unflushed)
+        self.flushes += 1
+        return len(items)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "keys": len(self._keys),
+            "pending_buckets": len(self._pending),
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "hydrate_errors": self.hydrate_errors,
+            "evictions": self.evictions,
+        }
+
+
+_backends: Dict[str, Any] = {}
+_latency: Dict[str, _LatencyRecorder] = {}
+_flush_task: Optional[asyncio.Task] = None
+
+
+def get_rate_limit_backend(name: Optional[str] = None):
+    """Backend instance for `name` (default RATE_LIMIT_BACKEND); unknown names fall back to db."""
+    name = (name or RATE_LIMIT_BACKEND or "db").lower()
+    if name not in ("memory", "db"):
+        name = "db"
+    backend = _backends.get(name)
+    if backend is None:
+        backend = MemoryRateLimitBackend() if name == "memory" else DbRateLimitBackend()
+        _backends[name] = backend
+    return backend
+
+
+def _ensure_flusher(backend) -> None:
+    """Start the periodic flush task in the running loop (once)."""
+    global _flush_task
+    if not isinstance(backend, MemoryRateLimitBackend):
+        return
+    if _flush_task is not None and not _flush_task.done():
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    _flush_task = loop.create_task(_flush_loop(backend))
+
+
+async def _flush_loop(backend: MemoryRateLimitBackend) -> None:
+    while True:
+        await asyncio.sleep(RATE_LIMIT_FLUSH_INTERVAL_S)
+        try:
+            await backend.flush()
+        except Exception as e:
+            logger.warning("rate_limit_flush_loop_error", error=str(e))
+
+
+def start_rate_limit_flusher() -> None:
+    """Start background flushing for the configured backend (app startup)."""
+    _ensure_flusher(get_rate_limit_backend())
+
+
+async def stop_rate_limit_flusher() -> None:
+    """Cancel the flush task and write out pending increments (app shutdown)."""
+    global _flush_task
+    task, _flush_task = _flush_task, None
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+    backend = _backends.get("memory")
+    if backend is not None:
+        await backend.flush()
+
+
+def get_rate_limit_stats() -> Dict[str, Any]:
+    """Active backend, p50/p99 check latency per backend used, and backend counters."""
+    return {
+        "backend": get_rate_limit_backend().name,
+        "latency": {name: rec.stats() for name, rec in _latency.items()},
+        "backends": {name: backend.stats() for name, backend in _backends.items()},
+    }
+
+
+def reset_rate_limit_state() -> None:
+    """Drop backends, latency samples and the flush task reference (tests/benchmarks)."""
+    global _flush_task
+    _backends.clear()
+    _latency.clear()
+    _flush_task = None
 
 
+async def check_and_increment_rate_limit(
+    key_type: str,
+    key_value: str,
+    action: str,
+    limit: Optional[int] = None,
+    window_seconds: Optional[int] = None,
+    *,
+    backend: Optional[str] = None,
+) -> bool:
+    """
+    Check rate limit and increment counter if allowed.
+    
+    This is a convenience function that combines check and increment.
+    Returns True if allowed, False if blocked.
+    
+    Args:
+        key_type: Type of key ('client_id', 'user_id', or 'ip')
+        key_value: The actual key value
+        action: Action name
+        limit: Optional custom limit
+        window_seconds: Optional custom window
+        backend: "memory" or "db"; defaults to RATE_LIMIT_BACKEND
+        
+    Returns:
+        True if allowed, False if blocked
+    """
+    limit, window_seconds = _resolve_limits(action, limit, window_seconds)
+    impl = get_rate_limit_backend(backend)
+    _ensure_flusher(impl)
+
+    started = time.perf_counter()
+    allowed = await impl.check_and_increment(key_type, key_value, action, limit, window_seconds)
+    recorder = _latency.get(impl.name)
+    if recorder is None:
+        recorder = _latency[impl.name] = _LatencyRecorder()
+    recorder.record((time.perf_counter() - started) * 1000.0)
+    
+    return allowed
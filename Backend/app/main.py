@@ -25,7 +25,10 @@ from typing import Dict, Optional
 
 from app.core.logging import configure_logging, logger
 from app.core.request_id import set_request_id, clear_request_id
+from app.core.rate_limiting import start_rate_limit_flusher, stop_rate_limit_flusher
 from services.db_service import init_db_pool
+from services.config_cache_service import refresh_config_cache
+from services.metrics_snapshot_service import start_metrics_snapshot_refresher, stop_metrics_snapshot_refresher
 from app.core.db_monitor import DbSessionMonitor
 
 # Routers from the top-level `api/routers` package:
@@ -131,9 +134,20 @@ def _cors_headers(origin: Optional[str]) -> Dict[str, str]:
 async def _startup_db_pool() -> None:
     await init_db_pool()
     db_session_monitor.start()
+    # Warm the cities/categories config cache DB-first so requests never parse YAML
+    try:
+        await refresh_config_cache()
+    except Exception as e:
+        logger.warning("config_cache_warmup_failed", error=str(e))
+    # Background flush of in-memory rate limit counters to rate_limits
+    start_rate_limit_flusher()
+    # Materialized /admin/metrics/snapshot, regenerated every METRICS_SNAPSHOT_REFRESH_S
+    start_metrics_snapshot_refresher()
 
 @app.on_event("shutdown")
 async def _shutdown_cleanup() -> None:
+    await stop_rate_limit_flusher()
+    await stop_metrics_snapshot_refresher()
     await db_session_monitor.stop()
 
 class RequestIdMiddleware(BaseHTTPMiddleware):
@@ -181,7 +195,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "HEAD"],
     allow_headers=["*"],
-    expose_headers=["Content-Length"],
+    expose_headers=["Content-Length", "X-Next-Cursor"],
 )
 
 # Add RequestIdMiddleware after CORS (will be innermost, executes first on requests)
@@ -20,6 +20,7 @@ class AILogItem(BaseModel):
     validated_output: Optional[Dict[str, Any]] = None
     is_success: bool
     error_message: Optional[str] = None
+    cache_hit: bool = False
     explanation: str
     news_source_key: Optional[str] = None
     news_source_name: Optional[str] = None
@@ -47,8 +48,32 @@ class AILogDetail(BaseModel):
     validated_output: Optional[Any] = None
     is_success: bool
     error_message: Optional[str] = None
+    cache_hit: bool = False
     created_at: datetime
     news_source_key: Optional[str] = None
     news_source_name: Optional[str] = None
     news_title: Optional[str] = None
 
+
+
+class AICacheActionStats(BaseModel):
+    """Cache hit rate for one ai_logs action_type."""
+
+    action_type: str
+    total: int
+    hits: int
+    hit_rate: float
+
+
+class AICacheStatsResponse(BaseModel):
+    """AI response cache metrics for the admin AI logs view."""
+
+    window_hours: int
+    total: int
+    hits: int
+    hit_rate: float
+    by_action_type: List[AICacheActionStats]
+    cache_entries: int
+    cache_expired_entries: int
+    cache_total_hits: int
+    process: Dict[str, Any]
@@ -69,5 +69,7 @@ class EventPageRaw(EventPageRawBase):
     id: int
     fetched_at: datetime
     created_at: datetime
+    reduced_body: Optional[str] = None
+    reduced_version: Optional[int] = None
 
 
@@ -210,6 +210,10 @@ class MetricsSnapshot(BaseModel):
     workers: List[WorkerStatus] = Field(default_factory=list)
     current_runs: List[WorkerRunStatus] = Field(default_factory=list)
     stale_candidates: Optional[StaleCandidates] = None
+    # Set when served from services.metrics_snapshot_service
+    generated_at: Optional[datetime] = None
+    age_seconds: Optional[float] = None
+    stale: Optional[bool] = None
 
 
 class CategoryHealth(BaseModel):
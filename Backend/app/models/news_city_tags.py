@@ -169,13 +169,23 @@ def clear_city_tags_cache() -> None:
     _load_city_tags_from_path.cache_clear()
 
 
+def load_city_tags(path: Optional[Path] = None) -> Dict[str, List[CityTag]]:
+    """
+    Return the parsed registry as {country: [CityTag, ...]}.
+
+    The same (cached) object is returned until clear_city_tags_cache(), so callers
+    that compile derived structures can use its identity as the config version.
+    Treat it as read-only.
+    """
+    cfg_path = Path(path) if path else NEWS_CITY_TAGS_YML
+    return _load_city_tags_from_path(str(cfg_path.resolve()))
+
+
 def _get_city_tags(country: str, path: Optional[Path] = None) -> List[CityTag]:
     key = country.strip().lower()
     if key not in SUPPORTED_COUNTRIES:
         return []
-    cfg_path = Path(path) if path else NEWS_CITY_TAGS_YML
-    tags_by_country = _load_city_tags_from_path(str(cfg_path.resolve()))
-    return list(tags_by_country.get(key, []))
+    return list(load_city_tags(path).get(key, []))
 
 
 def get_aliases(country: str, path: Optional[Path] = None) -> Dict[str, CityTag]:
@@ -89,6 +89,10 @@ class NewsPageRaw(NewsPageRawBase):
     id: int
     fetched_at: datetime
     created_at: datetime
+    reduced_body: Optional[str] = Field(
+        default=None, description="response_body reduced to structured text for AI extraction"
+    )
+    reduced_version: Optional[int] = Field(default=None, description="REDUCER_VERSION of reduced_body")
 
 
 
@@ -1,24 +1,52 @@
 # -*- coding: utf-8 -*-
 """
-Provider Factory — OSM Overpass provider only
-- Returns OSM service instance for cost-effective discovery
+Provider Factory — OSM discovery providers
+- "overpass" (default): OsmPlacesService against the public Overpass API
+- "osm_extract": OsmExtractPlacesService over a local extract (OSM_EXTRACT_PATH),
+  for bulk onboarding without Overpass rate limits
 - No Google API dependencies to avoid costs
 """
 
 from __future__ import annotations
 
+import os
+from typing import Any, Dict, List, Optional
+
 from services.osm_service import OsmPlacesService
 
+DISCOVERY_PROVIDERS = ("overpass", "osm_extract")
+DISCOVERY_PROVIDER = os.getenv("DISCOVERY_PROVIDER", "overpass").strip().lower()
+
 
-def get_places_provider() -> OsmPlacesService:
+def get_places_provider(
+    provider: Optional[str] = None,
+    *,
+    extract_path: Optional[str] = None,
+    category_osm_tags: Optional[List[List[Dict[str, Any]]]] = None,
+    **kwargs: Any,
+) -> OsmPlacesService:
     """
     Get the OSM places provider for free, open-source discovery.
-    
+
+    Args:
+        provider: "overpass" or "osm_extract" (defaults to DISCOVERY_PROVIDER)
+        extract_path: Extract file for osm_extract (defaults to OSM_EXTRACT_PATH)
+        category_osm_tags: osm_tags of the categories that will be queried; osm_extract
+            only keeps matching elements in memory (ignored by overpass)
+        **kwargs: OsmPlacesService options (max_results, turkish_hints, ...)
+
     Returns:
-        OsmPlacesService - OSM Overpass API service
-        
+        OsmPlacesService (or its local-extract subclass)
+
     Note:
         Google Places API support has been removed to avoid costs.
-        All discovery now uses the free OSM Overpass API.
+        All discovery now uses OSM data.
     """
-    return OsmPlacesService()
+    provider = (provider or DISCOVERY_PROVIDER).strip().lower()
+    if provider not in DISCOVERY_PROVIDERS:
+        raise ValueError(f"DISCOVERY_PROVIDER must be one of {DISCOVERY_PROVIDERS}, got {provider!r}")
+    if provider == "osm_extract":
+        from services.osm_extract_service import OsmExtractPlacesService
+
+        return OsmExtractPlacesService(extract_path, category_osm_tags=category_osm_tags, **kwargs)
+    return OsmPlacesService(**kwargs)
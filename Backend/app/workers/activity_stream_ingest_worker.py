@@ -5,15 +5,19 @@ Activity Stream Ingest Worker
 Processes canonical activity tables (check_ins, location_reactions, location_notes, 
 favorites, poll_responses) and denormalizes them into activity_stream for fast feed queries.
 
-Runs every 1 minute, processes up to 1000 events per run.
+Runs every 1 minute, processes up to 1000 events per source per run.
+In bulk mode (default) each batch is claimed with FOR UPDATE SKIP LOCKED and written
+in one transaction, so several instances can run side by side.
 """
 from __future__ import annotations
 
 import argparse
 import asyncio
 import json
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 from pathlib import Path
 import sys
 
@@ -27,8 +31,16 @@ if str(BACKEND_DIR) not in sys.path:
 
 from app.core.logging import configure_logging, get_logger
 from app.core.request_id import with_run_id
-from services.db_service import init_db_pool, fetch, execute
-from services.cities_config_service import get_city_key_from_coords
+from services.db_service import (
+    init_db_pool,
+    fetch,
+    execute,
+    run_in_transaction,
+    fetch_with_conn,
+    execute_with_conn,
+)
+from services.cities_config_service import get_city_districts_from_coords_batch
+from services.city_geo_index import refresh_city_geo_index
 from services.worker_runs_service import (
     start_worker_run,
     mark_worker_run_running,
@@ -42,10 +54,198 @@ logger = logger.bind(worker="activity_stream_ingest")
 BATCH_SIZE = 1000
 PROCESSING_DELAY_SECONDS = 5  # Only process events older than 5 seconds
 
+# "bulk": claim batches with FOR UPDATE SKIP LOCKED and write each batch in one transaction
+# (safe with several worker instances). "legacy": row-by-row INSERT + UPDATE.
+ACTIVITY_INGEST_MODE = os.getenv("ACTIVITY_INGEST_MODE", "bulk").strip().lower()
+ACTIVITY_INGEST_TX_BATCH = int(os.getenv("ACTIVITY_INGEST_TX_BATCH", "500"))
 
-async def process_check_ins(limit: int) -> int:
-    """Process unprocessed check-ins into activity_stream."""
-    sql = f"""
+# Activity tuple column order, shared by the row-by-row and the bulk insert
+ACTIVITY_COLUMNS = (
+    "actor_type", "actor_id", "client_id", "activity_type", "location_id",
+    "city_key", "category_key", "payload", "created_at",
+)
+
+INSERT_ACTIVITY_SQL = """
+    INSERT INTO activity_stream 
+    (actor_type, actor_id, client_id, activity_type, location_id, city_key, category_key, payload, created_at)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+"""
+
+BULK_INSERT_ACTIVITY_SQL = """
+    INSERT INTO activity_stream 
+    (actor_type, actor_id, client_id, activity_type, location_id, city_key, category_key, payload, created_at)
+    SELECT
+        t.actor_type, t.actor_id, t.client_id, t.activity_type, t.location_id,
+        t.city_key, t.category_key, t.payload::jsonb, t.created_at
+    FROM unnest(
+        $1::text[], $2::uuid[], $3::uuid[], $4::text[], $5::bigint[],
+        $6::text[], $7::text[], $8::text[], $9::timestamptz[]
+    ) AS t(actor_type, actor_id, client_id, activity_type, location_id, city_key, category_key, payload, created_at)
+"""
+
+ActivityRow = Tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class ActivitySource:
+    """One canonical table that feeds activity_stream."""
+
+    name: str  # stats key
+    table: str
+    alias: str
+    select_sql: str  # SELECT ... WHERE unprocessed ... ORDER BY created_at (no LIMIT)
+    build: Callable[[Dict[str, Any], Optional[str]], ActivityRow]
+    city_from_row: Callable[[Dict[str, Any]], Tuple[Optional[str], bool]]
+    error_event: str
+    id_field: str
+
+    def legacy_sql(self) -> str:
+        return f"{self.select_sql}\n        LIMIT $1"
+
+    def claim_sql(self) -> str:
+        # Rows another instance holds are skipped, not waited for; ids that failed
+        # individually in this run ($2) are not re-claimed.
+        exclude = f"  AND NOT ({self.alias}.id = ANY($2::bigint[]))\n        ORDER BY"
+        return (
+            self.select_sql.replace("ORDER BY", exclude, 1)
+            + f"\n        LIMIT $1\n        FOR UPDATE OF {self.alias} SKIP LOCKED"
+        )
+
+    def mark_sql(self) -> str:
+        return f"""
+            UPDATE {self.table}
+            SET processed_in_activity_stream = true
+            WHERE id = ANY($1::bigint[])
+        """
+
+    def claim_one_sql(self) -> str:
+        return f"""
+            SELECT id FROM {self.table}
+            WHERE id = $1 AND processed_in_activity_stream = false
+            FOR UPDATE SKIP LOCKED
+        """
+
+
+def _actor(row: Dict[str, Any]) -> Tuple[str, Any, Any]:
+    actor_type = 'user' if row.get('user_id') else 'client'
+    actor_id = row.get('user_id')
+    client_id = row.get('client_id') or row.get('user_id')  # Fallback for traceability
+    return actor_type, actor_id, client_id
+
+
+def _city_from_coords(row: Dict[str, Any]) -> Tuple[Optional[str], bool]:
+    """(city_key, needs_coords_lookup): location-based sources always derive from lat/lng."""
+    return None, True
+
+
+def _city_from_bulletin(row: Dict[str, Any]) -> Tuple[Optional[str], bool]:
+    # Use bulletin post city directly if available, otherwise derive from linked location
+    if row.get('city'):
+        return row.get('city').lower().replace(' ', '_'), False
+    if row.get('lat') and row.get('lng'):
+        return None, True
+    return None, False
+
+
+def _no_city(row: Dict[str, Any]) -> Tuple[Optional[str], bool]:
+    return None, False
+
+
+def _check_in_activity(row: Dict[str, Any], city_key: Optional[str]) -> ActivityRow:
+    actor_type, actor_id, client_id = _actor(row)
+    return (
+        actor_type, actor_id, client_id, 'check_in', row['location_id'],
+        city_key, row.get('category'),  # Use category column instead of category_key
+        json.dumps({}),  # Empty payload for check-ins
+        row['created_at'],
+    )
+
+
+def _reaction_activity(row: Dict[str, Any], city_key: Optional[str]) -> ActivityRow:
+    actor_type, actor_id, client_id = _actor(row)
+    return (
+        actor_type, actor_id, client_id, 'reaction', row['location_id'],
+        city_key, row.get('category'),
+        json.dumps({"reaction_type": row['reaction_type']}),
+        row['created_at'],
+    )
+
+
+def _note_activity(row: Dict[str, Any], city_key: Optional[str]) -> ActivityRow:
+    actor_type, actor_id, client_id = _actor(row)
+    # Preview first 100 chars
+    note_preview = row['content'][:100] if len(row['content']) > 100 else row['content']
+    return (
+        actor_type, actor_id, client_id, 'note', row['location_id'],
+        city_key, row.get('category'),
+        json.dumps({"note_preview": note_preview}),
+        row['created_at'],
+    )
+
+
+def _favorite_activity(row: Dict[str, Any], city_key: Optional[str]) -> ActivityRow:
+    actor_type, actor_id, client_id = _actor(row)
+    return (
+        actor_type, actor_id, client_id, 'favorite', row['location_id'],
+        city_key, row.get('category'),
+        json.dumps({}),
+        row['created_at'],
+    )
+
+
+def _poll_response_activity(row: Dict[str, Any], city_key: Optional[str]) -> ActivityRow:
+    actor_type, actor_id, client_id = _actor(row)
+    return (
+        actor_type, actor_id, client_id, 'poll_response',
+        None,  # No location_id for polls
+        None,  # No city_key
+        None,  # No category_key
+        json.dumps({"poll_id": row['poll_id']}),
+        row['created_at'],
+    )
+
+
+def _bulletin_post_activity(row: Dict[str, Any], city_key: Optional[str]) -> ActivityRow:
+    # Determine actor info
+    if row.get('creator_type') == 'user' and row.get('created_by_user_id'):
+        actor_type = 'user'
+        actor_id = row.get('created_by_user_id')
+        client_id = row.get('created_by_user_id')  # Fallback for traceability
+    elif row.get('creator_type') == 'business' and row.get('created_by_business_id'):
+        actor_type = 'business'
+        # Convert BIGINT business_id to string for actor_id (UUID column accepts text)
+        # Store as string representation since actor_id is UUID type
+        actor_id = str(row.get('created_by_business_id'))
+        client_id = None  # Businesses don't have client_id
+    else:
+        # Fallback: treat as anonymous/client
+        actor_type = 'client'
+        actor_id = None
+        client_id = None
+
+    # Build payload with bulletin post details
+    payload = json.dumps({
+        "bulletin_post_id": row['id'],
+        "title": row.get('title', '')[:100],  # Truncate for payload
+        "category": row.get('category'),
+        "city": row.get('city'),
+    })
+    return (
+        actor_type, actor_id, client_id, 'bulletin_post',
+        row.get('linked_location_id'),  # Can be NULL
+        city_key,
+        row.get('location_category'),  # Use location category if available, otherwise None
+        payload,
+        row['created_at'],
+    )
+
+
+SOURCES: Dict[str, ActivitySource] = {
+    'check_ins': ActivitySource(
+        name='check_ins',
+        table='check_ins',
+        alias='ci',
+        select_sql=f"""
         SELECT 
             ci.id,
             ci.location_id,
@@ -59,64 +259,17 @@ async def process_check_ins(limit: int) -> int:
         JOIN locations l ON ci.location_id = l.id
         WHERE ci.processed_in_activity_stream = false
           AND ci.created_at <= now() - interval '{PROCESSING_DELAY_SECONDS} seconds'
-        ORDER BY ci.created_at ASC
-        LIMIT $1
-    """
-    
-    rows = await fetch(sql, limit)
-    if not rows:
-        return 0
-    
-    processed = 0
-    for row in rows:
-        actor_type = 'user' if row.get('user_id') else 'client'
-        actor_id = row.get('user_id')
-        client_id = row.get('client_id') or row.get('user_id')  # Fallback for traceability
-        
-        # Derive city_key from coordinates
-        lat = float(row.get('lat')) if row.get('lat') is not None else None
-        lng = float(row.get('lng')) if row.get('lng') is not None else None
-        city_key = get_city_key_from_coords(lat, lng)
-        category_key = row.get('category')  # Use category column instead of category_key
-        
-        # Insert into activity_stream
-        insert_sql = """
-            INSERT INTO activity_stream 
-            (actor_type, actor_id, client_id, activity_type, location_id, city_key, category_key, payload, created_at)
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
-        """
-        
-        try:
-            await execute(
-                insert_sql,
-                actor_type,
-                actor_id,
-                client_id,
-                'check_in',
-                row['location_id'],
-                city_key,
-                category_key,
-                json.dumps({}),  # Empty payload for check-ins
-                row['created_at'],
-            )
-            
-            # Mark as processed
-            mark_sql = """
-                UPDATE check_ins
-                SET processed_in_activity_stream = true
-                WHERE id = $1
-            """
-            await execute(mark_sql, row['id'])
-            processed += 1
-        except Exception as e:
-            logger.error("failed_to_process_check_in", check_in_id=row['id'], error=str(e))
-    
-    return processed
-
-
-async def process_reactions(limit: int) -> int:
-    """Process unprocessed reactions into activity_stream."""
-    sql = f"""
+        ORDER BY ci.created_at ASC""",
+        build=_check_in_activity,
+        city_from_row=_city_from_coords,
+        error_event="failed_to_process_check_in",
+        id_field="check_in_id",
+    ),
+    'reactions': ActivitySource(
+        name='reactions',
+        table='location_reactions',
+        alias='lr',
+        select_sql=f"""
         SELECT 
             lr.id,
             lr.location_id,
@@ -131,64 +284,17 @@ async def process_reactions(limit: int) -> int:
         JOIN locations l ON lr.location_id = l.id
         WHERE lr.processed_in_activity_stream = false
           AND lr.created_at <= now() - interval '{PROCESSING_DELAY_SECONDS} seconds'
-        ORDER BY lr.created_at ASC
-        LIMIT $1
-    """
-    
-    rows = await fetch(sql, limit)
-    if not rows:
-        return 0
-    
-    processed = 0
-    for row in rows:
-        actor_type = 'user' if row.get('user_id') else 'client'
-        actor_id = row.get('user_id')
-        client_id = row.get('client_id') or row.get('user_id')
-        
-        # Derive city_key from coordinates
-        lat = float(row.get('lat')) if row.get('lat') is not None else None
-        lng = float(row.get('lng')) if row.get('lng') is not None else None
-        city_key = get_city_key_from_coords(lat, lng)
-        category_key = row.get('category')  # Use category column instead of category_key
-        
-        payload = json.dumps({"reaction_type": row['reaction_type']})
-        
-        insert_sql = """
-            INSERT INTO activity_stream 
-            (actor_type, actor_id, client_id, activity_type, location_id, city_key, category_key, payload, created_at)
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
-        """
-        
-        try:
-            await execute(
-                insert_sql,
-                actor_type,
-                actor_id,
-                client_id,
-                'reaction',
-                row['location_id'],
-                city_key,
-                category_key,
-                payload,
-                row['created_at'],
-            )
-            
-            mark_sql = """
-                UPDATE location_reactions
-                SET processed_in_activity_stream = true
-                WHERE id = $1
-            """
-            await execute(mark_sql, row['id'])
-            processed += 1
-        except Exception as e:
-            logger.error("failed_to_process_reaction", reaction_id=row['id'], error=str(e))
-    
-    return processed
-
-
-async def process_notes(limit: int) -> int:
-    """Process unprocessed notes into activity_stream."""
-    sql = f"""
+        ORDER BY lr.created_at ASC""",
+        build=_reaction_activity,
+        city_from_row=_city_from_coords,
+        error_event="failed_to_process_reaction",
+        id_field="reaction_id",
+    ),
+    'notes': ActivitySource(
+        name='notes',
+        table='location_notes',
+        alias='ln',
+        select_sql=f"""
         SELECT 
             ln.id,
             ln.location_id,
@@ -203,66 +309,17 @@ async def process_notes(limit: int) -> int:
         JOIN locations l ON ln.location_id = l.id
         WHERE ln.processed_in_activity_stream = false
           AND ln.created_at <= now() - interval '{PROCESSING_DELAY_SECONDS} seconds'
-        ORDER BY ln.created_at ASC
-        LIMIT $1
-    """
-    
-    rows = await fetch(sql, limit)
-    if not rows:
-        return 0
-    
-    processed = 0
-    for row in rows:
-        actor_type = 'user' if row.get('user_id') else 'client'
-        actor_id = row.get('user_id')
-        client_id = row.get('client_id') or row.get('user_id')
-        
-        # Derive city_key from coordinates
-        lat = float(row.get('lat')) if row.get('lat') is not None else None
-        lng = float(row.get('lng')) if row.get('lng') is not None else None
-        city_key = get_city_key_from_coords(lat, lng)
-        category_key = row.get('category')  # Use category column instead of category_key
-        
-        # Preview first 100 chars
-        note_preview = row['content'][:100] if len(row['content']) > 100 else row['content']
-        payload = json.dumps({"note_preview": note_preview})
-        
-        insert_sql = """
-            INSERT INTO activity_stream 
-            (actor_type, actor_id, client_id, activity_type, location_id, city_key, category_key, payload, created_at)
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
-        """
-        
-        try:
-            await execute(
-                insert_sql,
-                actor_type,
-                actor_id,
-                client_id,
-                'note',
-                row['location_id'],
-                city_key,
-                category_key,
-                payload,
-                row['created_at'],
-            )
-            
-            mark_sql = """
-                UPDATE location_notes
-                SET processed_in_activity_stream = true
-                WHERE id = $1
-            """
-            await execute(mark_sql, row['id'])
-            processed += 1
-        except Exception as e:
-            logger.error("failed_to_process_note", note_id=row['id'], error=str(e))
-    
-    return processed
-
-
-async def process_favorites(limit: int) -> int:
-    """Process unprocessed favorites into activity_stream."""
-    sql = f"""
+        ORDER BY ln.created_at ASC""",
+        build=_note_activity,
+        city_from_row=_city_from_coords,
+        error_event="failed_to_process_note",
+        id_field="note_id",
+    ),
+    'favorites': ActivitySource(
+        name='favorites',
+        table='favorites',
+        alias='f',
+        select_sql=f"""
         SELECT 
             f.id,
             f.location_id,
@@ -276,62 +333,17 @@ async def process_favorites(limit: int) -> int:
         JOIN locations l ON f.location_id = l.id
         WHERE f.processed_in_activity_stream = false
           AND f.created_at <= now() - interval '{PROCESSING_DELAY_SECONDS} seconds'
-        ORDER BY f.created_at ASC
-        LIMIT $1
-    """
-    
-    rows = await fetch(sql, limit)
-    if not rows:
-        return 0
-    
-    processed = 0
-    for row in rows:
-        actor_type = 'user' if row.get('user_id') else 'client'
-        actor_id = row.get('user_id')
-        client_id = row.get('client_id') or row.get('user_id')
-        
-        # Derive city_key from coordinates
-        lat = float(row.get('lat')) if row.get('lat') is not None else None
-        lng = float(row.get('lng')) if row.get('lng') is not None else None
-        city_key = get_city_key_from_coords(lat, lng)
-        category_key = row.get('category')  # Use category column instead of category_key
-        
-        insert_sql = """
-            INSERT INTO activity_stream 
-            (actor_type, actor_id, client_id, activity_type, location_id, city_key, category_key, payload, created_at)
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
-        """
-        
-        try:
-            await execute(
-                insert_sql,
-                actor_type,
-                actor_id,
-                client_id,
-                'favorite',
-                row['location_id'],
-                city_key,
-                category_key,
-                json.dumps({}),
-                row['created_at'],
-            )
-            
-            mark_sql = """
-                UPDATE favorites
-                SET processed_in_activity_stream = true
-                WHERE id = $1
-            """
-            await execute(mark_sql, row['id'])
-            processed += 1
-        except Exception as e:
-            logger.error("failed_to_process_favorite", favorite_id=row['id'], error=str(e))
-    
-    return processed
-
-
-async def process_poll_responses(limit: int) -> int:
-    """Process unprocessed poll responses into activity_stream."""
-    sql = f"""
+        ORDER BY f.created_at ASC""",
+        build=_favorite_activity,
+        city_from_row=_city_from_coords,
+        error_event="failed_to_process_favorite",
+        id_field="favorite_id",
+    ),
+    'poll_responses': ActivitySource(
+        name='poll_responses',
+        table='poll_responses',
+        alias='pr',
+        select_sql=f"""
         SELECT 
             pr.id,
             pr.poll_id,
@@ -341,58 +353,17 @@ async def process_poll_responses(limit: int) -> int:
         FROM poll_responses pr
         WHERE pr.processed_in_activity_stream = false
           AND pr.created_at <= now() - interval '{PROCESSING_DELAY_SECONDS} seconds'
-        ORDER BY pr.created_at ASC
-        LIMIT $1
-    """
-    
-    rows = await fetch(sql, limit)
-    if not rows:
-        return 0
-    
-    processed = 0
-    for row in rows:
-        actor_type = 'user' if row.get('user_id') else 'client'
-        actor_id = row.get('user_id')
-        client_id = row.get('client_id') or row.get('user_id')
-        
-        payload = json.dumps({"poll_id": row['poll_id']})
-        
-        insert_sql = """
-            INSERT INTO activity_stream 
-            (actor_type, actor_id, client_id, activity_type, location_id, city_key, category_key, payload, created_at)
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
-        """
-        
-        try:
-            await execute(
-                insert_sql,
-                actor_type,
-                actor_id,
-                client_id,
-                'poll_response',
-                None,  # No location_id for polls
-                None,  # No city_key
-                None,  # No category_key
-                payload,
-                row['created_at'],
-            )
-            
-            mark_sql = """
-                UPDATE poll_responses
-                SET processed_in_activity_stream = true
-                WHERE id = $1
-            """
-            await execute(mark_sql, row['id'])
-            processed += 1
-        except Exception as e:
-            logger.error("failed_to_process_poll_response", response_id=row['id'], error=str(e))
-    
-    return processed
-
-
-async def process_bulletin_posts(limit: int) -> int:
-    """Process unprocessed bulletin posts into activity_stream."""
-    sql = f"""
+        ORDER BY pr.created_at ASC""",
+        build=_poll_response_activity,
+        city_from_row=_no_city,
+        error_event="failed_to_process_poll_response",
+        id_field="response_id",
+    ),
+    'bulletin_posts': ActivitySource(
+        name='bulletin_posts',
+        table='bulletin_posts',
+        alias='bp',
+        select_sql=f"""
         SELECT 
             bp.id,
             bp.created_by_user_id,
@@ -412,90 +383,178 @@ async def process_bulletin_posts(limit: int) -> int:
           AND bp.status = 'active'
           AND bp.moderation_status = 'approved'
           AND bp.created_at <= now() - interval '{PROCESSING_DELAY_SECONDS} seconds'
-        ORDER BY bp.created_at ASC
-        LIMIT $1
-    """
-    
-    rows = await fetch(sql, limit)
+        ORDER BY bp.created_at ASC""",
+        build=_bulletin_post_activity,
+        city_from_row=_city_from_bulletin,
+        error_event="failed_to_process_bulletin_post",
+        id_field="bulletin_post_id",
+    ),
+}
+
+
+def _city_keys(source: ActivitySource, rows: Sequence[Dict[str, Any]]) -> List[Optional[str]]:
+    """city_key per row; coordinate lookups go through the compiled index in one batch."""
+    keys: List[Optional[str]] = []
+    lookup_idx: List[int] = []
+    for i, row in enumerate(rows):
+        key, needs_lookup = source.city_from_row(row)
+        keys.append(key)
+        if needs_lookup:
+            lookup_idx.append(i)
+    if lookup_idx:
+        matches = get_city_districts_from_coords_batch(
+            [rows[i].get('lat') for i in lookup_idx],
+            [rows[i].get('lng') for i in lookup_idx],
+        )
+        for i, match in zip(lookup_idx, matches):
+            keys[i] = match[0]
+    return keys
+
+
+def _build_activities(source: ActivitySource, rows: Sequence[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], ActivityRow]]:
+    built = []
+    for row, city_key in zip(rows, _city_keys(source, rows)):
+        try:
+            built.append((row, source.build(row, city_key)))
+        except Exception as e:
+            logger.error(source.error_event, **{source.id_field: row.get('id')}, error=str(e))
+    return built
+
+
+async def _process_legacy(source: ActivitySource, limit: int) -> int:
+    """Row-by-row: one INSERT plus one UPDATE per event, no shared transaction."""
+    rows = await fetch(source.legacy_sql(), limit)
     if not rows:
         return 0
-    
+
     processed = 0
-    for row in rows:
-        # Determine actor info
-        if row.get('creator_type') == 'user' and row.get('created_by_user_id'):
-            actor_type = 'user'
-            actor_id = row.get('created_by_user_id')
-            client_id = row.get('created_by_user_id')  # Fallback for traceability
-        elif row.get('creator_type') == 'business' and row.get('created_by_business_id'):
-            actor_type = 'business'
-            # Convert BIGINT business_id to string for actor_id (UUID column accepts text)
-            # Store as string representation since actor_id is UUID type
-            actor_id = str(row.get('created_by_business_id'))
-            client_id = None  # Businesses don't have client_id
-        else:
-            # Fallback: treat as anonymous/client
-            actor_type = 'client'
-            actor_id = None
-            client_id = None
-        
-        # Derive city_key from bulletin post city or linked location
-        city_key = None
-        if row.get('city'):
-            # Use bulletin post city directly if available
-            city_key = row.get('city').lower().replace(' ', '_') if row.get('city') else None
-        elif row.get('lat') and row.get('lng'):
-            # Fallback to deriving from coordinates
-            lat = float(row.get('lat')) if row.get('lat') is not None else None
-            lng = float(row.get('lng')) if row.get('lng') is not None else None
-            city_key = get_city_key_from_coords(lat, lng) if lat and lng else None
-        
-        # Use location category if available, otherwise None
-        category_key = row.get('location_category')
-        
-        # Build payload with bulletin post details
-        payload = json.dumps({
-            "bulletin_post_id": row['id'],
-            "title": row.get('title', '')[:100],  # Truncate for payload
-            "category": row.get('category'),
-            "city": row.get('city'),
-        })
-        
-        insert_sql = """
-            INSERT INTO activity_stream 
-            (actor_type, actor_id, client_id, activity_type, location_id, city_key, category_key, payload, created_at)
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
-        """
-        
+    for row, activity in _build_activities(source, rows):
         try:
-            await execute(
-                insert_sql,
-                actor_type,
-                actor_id,
-                client_id,
-                'bulletin_post',
-                row.get('linked_location_id'),  # Can be NULL
-                city_key,
-                category_key,
-                payload,
-                row['created_at'],
-            )
-            
+            await execute(INSERT_ACTIVITY_SQL, *activity)
             # Mark as processed
-            mark_sql = """
-                UPDATE bulletin_posts
-                SET processed_in_activity_stream = true
-                WHERE id = $1
-            """
-            await execute(mark_sql, row['id'])
+            await execute(source.mark_sql(), [row['id']])
             processed += 1
         except Exception as e:
-            logger.error("failed_to_process_bulletin_post", bulletin_post_id=row['id'], error=str(e))
-    
+            logger.error(source.error_event, **{source.id_field: row['id']}, error=str(e))
+
     return processed
 
 
-async def run_once(rebuild: bool = False) -> Dict[str, Any]:
+async def _ingest_one(source: ActivitySource, row_id: int, activity: ActivityRow) -> bool:
+    """Single event in its own transaction; False if it was claimed elsewhere meanwhile."""
+    async with run_in_transaction() as conn:
+        claimed = await fetch_with_conn(conn, source.claim_one_sql(), row_id)
+        if not claimed:
+            return False
+        await execute_with_conn(conn, INSERT_ACTIVITY_SQL, *activity)
+        await execute_with_conn(conn, source.mark_sql(), [row_id])
+    return True
+
+
+async def _ingest_batch(source: ActivitySource, limit: int, failed_ids: List[int]) -> Tuple[int, int]:
+    """
+    Claim up to `limit` rows, insert their activities and mark them processed in one transaction.
+
+    Returns (claimed, processed). If the bulk statement fails the transaction is rolled
+    back and the claimed rows are retried one transaction per row, so a single bad row
+    does not block the batch; rows that still fail are added to `failed_ids`.
+    """
+    batch: List[Tuple[Dict[str, Any], ActivityRow]] = []
+    try:
+        async with run_in_transaction() as conn:
+            rows = await fetch_with_conn(conn, source.claim_sql(), limit, failed_ids)
+            if not rows:
+                return 0, 0
+            rows = [dict(r) for r in rows]
+            batch = _build_activities(source, rows)
+            built_ids = {row['id'] for row, _ in batch}
+            failed_ids.extend(row['id'] for row in rows if row['id'] not in built_ids)
+            if batch:
+                columns = list(zip(*(activity for _, activity in batch)))
+                await execute_with_conn(conn, BULK_INSERT_ACTIVITY_SQL, *[list(c) for c in columns])
+                await execute_with_conn(conn, source.mark_sql(), [row['id'] for row, _ in batch])
+            return len(rows), len(batch)
+    except Exception as e:
+        if not batch:
+            raise
+        logger.warning(
+            "activity_bulk_batch_failed",
+            source=source.name,
+            batch_size=len(batch),
+            error=str(e),
+        )
+
+    processed = 0
+    for row, activity in batch:
+        try:
+            if await _ingest_one(source, row['id'], activity):
+                processed += 1
+        except Exception as e:
+            failed_ids.append(row['id'])
+            logger.error(source.error_event, **{source.id_field: row['id']}, error=str(e))
+    return len(batch), processed
+
+
+async def process_source_bulk(
+    source_name: str,
+    limit: int,
+    *,
+    batch_size: Optional[int] = None,
+) -> int:
+    """Bulk-ingest up to `limit` events of one source, one transaction per claimed batch."""
+    source = SOURCES[source_name]
+    batch_size = max(1, int(batch_size or ACTIVITY_INGEST_TX_BATCH))
+    failed_ids: List[int] = []
+    claimed_total = 0
+    processed = 0
+    while claimed_total < limit:
+        take = min(batch_size, limit - claimed_total)
+        claimed, done = await _ingest_batch(source, take, failed_ids)
+        claimed_total += claimed
+        processed += done
+        if claimed < take:
+            break
+    return processed
+
+
+async def process_check_ins(limit: int) -> int:
+    """Process unprocessed check-ins into activity_stream."""
+    return await _process_legacy(SOURCES['check_ins'], limit)
+
+
+async def process_reactions(limit: int) -> int:
+    """Process unprocessed reactions into activity_stream."""
+    return await _process_legacy(SOURCES['reactions'], limit)
+
+
+async def process_notes(limit: int) -> int:
+    """Process unprocessed notes into activity_stream."""
+    return await _process_legacy(SOURCES['notes'], limit)
+
+
+async def process_favorites(limit: int) -> int:
+    """Process unprocessed favorites into activity_stream."""
+    return await _process_legacy(SOURCES['favorites'], limit)
+
+
+async def process_poll_responses(limit: int) -> int:
+    """Process unprocessed poll responses into activity_stream."""
+    return await _process_legacy(SOURCES['poll_responses'], limit)
+
+
+async def process_bulletin_posts(limit: int) -> int:
+    """Process unprocessed bulletin posts into activity_stream."""
+    return await _process_legacy(SOURCES['bulletin_posts'], limit)
+
+
+async def process_source(source_name: str, limit: int, mode: Optional[str] = None) -> int:
+    """Ingest one source in the configured mode ("bulk" or "legacy")."""
+    if (mode or ACTIVITY_INGEST_MODE) == "legacy":
+        return await _process_legacy(SOURCES[source_name], limit)
+    return await process_source_bulk(source_name, limit)
+
+
+async def run_once(rebuild: bool = False, mode: Optional[str] = None) -> Dict[str, Any]:
     """Run one iteration of the activity stream ingest worker."""
     run_id = None
     try:
@@ -505,47 +564,47 @@ async def run_once(rebuild: bool = False) -> Dict[str, Any]:
         logger.warning("failed_to_start_worker_run", error=str(e))
     
     with with_run_id() as rid:
-        stats = {
-            'check_ins': 0,
-            'reactions': 0,
-            'notes': 0,
-            'favorites': 0,
-            'poll_responses': 0,
-            'bulletin_posts': 0,
-        }
-        
+        # Cheap version check; city/district index only rebuilds when cities config changed
+        await refresh_city_geo_index()
+
+        mode = mode or ACTIVITY_INGEST_MODE
+        # TODO: rebuild should truncate activity_stream and rebuild from all canonical tables
+        # For now, just process all unprocessed events
+        limit = BATCH_SIZE * 10 if rebuild else BATCH_SIZE
         if rebuild:
             logger.info("activity_stream_rebuild_start")
-            # TODO: Truncate activity_stream and rebuild from all canonical tables
-            # For now, just process all unprocessed events
-            stats['check_ins'] = await process_check_ins(BATCH_SIZE * 10)
-            stats['reactions'] = await process_reactions(BATCH_SIZE * 10)
-            stats['notes'] = await process_notes(BATCH_SIZE * 10)
-            stats['favorites'] = await process_favorites(BATCH_SIZE * 10)
-            stats['poll_responses'] = await process_poll_responses(BATCH_SIZE * 10)
-            stats['bulletin_posts'] = await process_bulletin_posts(BATCH_SIZE * 10)
-        else:
-            # Process each canonical table
-            stats['check_ins'] = await process_check_ins(BATCH_SIZE)
-            stats['reactions'] = await process_reactions(BATCH_SIZE)
-            stats['notes'] = await process_notes(BATCH_SIZE)
-            stats['favorites'] = await process_favorites(BATCH_SIZE)
-            stats['poll_responses'] = await process_poll_responses(BATCH_SIZE)
-            stats['bulletin_posts'] = await process_bulletin_posts(BATCH_SIZE)
+
+        stats: Dict[str, int] = {}
+        events_per_sec: Dict[str, float] = {}
+        for name in SOURCES:
+            started = time.perf_counter()
+            stats[name] = await process_source(name, limit, mode=mode)
+            elapsed = time.perf_counter() - started
+            events_per_sec[name] = round(stats[name] / elapsed, 1) if elapsed > 0 else 0.0
         
         total = sum(stats.values())
-        logger.info("activity_stream_ingest_complete", **stats, total=total)
+        logger.info(
+            "activity_stream_ingest_complete",
+            **stats,
+            total=total,
+            mode=mode,
+            events_per_sec=events_per_sec,
+        )
     
     if run_id:
         try:
-            await finish_worker_run(run_id, "completed", {"stats": stats})
+            await finish_worker_run(
+                run_id,
+                "completed",
+                {"stats": stats, "mode": mode, "events_per_sec": events_per_sec},
+            )
         except Exception as e:
             logger.warning("failed_to_finish_worker_run", error=str(e))
     
     return stats
 
 
-async def run_forever(interval_seconds: int = 60) -> None:
+async def run_forever(interval_seconds: int = 60, mode: Optional[str] = None) -> None:
     """Run worker continuously with specified interval."""
     await init_db_pool()
     
@@ -553,7 +612,7 @@ async def run_forever(interval_seconds: int = 60) -> None:
     
     while True:
         try:
-            await run_once()
+            await run_once(mode=mode)
         except Exception as e:
             logger.error("activity_stream_worker_error", error=str(e))
         
@@ -565,12 +624,18 @@ if __name__ == "__main__":
     parser.add_argument("--once", action="store_true", help="Run once and exit")
     parser.add_argument("--rebuild", action="store_true", help="Rebuild entire stream")
     parser.add_argument("--interval", type=int, default=60, help="Interval in seconds")
+    parser.add_argument(
+        "--mode",
+        choices=["bulk", "legacy"],
+        default=None,
+        help="bulk = batched transactions with SKIP LOCKED (default, ACTIVITY_INGEST_MODE); legacy = row by row",
+    )
     
     args = parser.parse_args()
     
     if args.once:
-        asyncio.run(run_once(rebuild=args.rebuild))
+        asyncio.run(run_once(rebuild=args.rebuild, mode=args.mode))
     else:
-        asyncio.run(run_forever(interval_seconds=args.interval))
+        asyncio.run(run_forever(interval_seconds=args.interval, mode=args.mode))
 
 
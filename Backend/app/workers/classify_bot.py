@@ -14,12 +14,14 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import functools
 import json
 import math
 import os
 import sys
 import time
-from typing import Optional, Any, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Any, Awaitable, Callable, Dict, List, Tuple
 from uuid import UUID
 
 # --- Uniform logging voor workers ---
@@ -46,9 +48,12 @@ Use verify_locations.py for the complete verification flow.
 from services.db_service import (
     fetch_candidates_for_classification,
     update_location_classification,
+    update_location_classifications_bulk,
     execute,
 )
 from services.classify_service import ClassifyService
+from services.ai_token_budget import TokenBudget, estimate_tokens, usage_total_tokens
+from services.ai_response_cache import set_ai_cache_bypass
 
 # Unified AI schema entrypoints via services (met structlog)
 from services.ai_validation import validate_classification_payload
@@ -408,9 +413,36 @@ def _bbox(args):
     return center_lat - 0.02, center_lat + 0.02, center_lng - 0.03, center_lng + 0.03
 
 
-def classify_location_with_ai(*, name: str, address: str, existing_category: str, model: Optional[str]) -> Dict[str, Any]:
-    svc = ClassifyService(model=model)
-    raw_payload, _meta = svc.classify(
+def classify_location_with_ai(
+    *,
+    name: str,
+    address: str,
+    existing_category: str,
+    model: Optional[str],
+    svc: Optional[ClassifyService] = None,
+) -> Dict[str, Any]:
+    result, _meta = _classify_with_meta(
+        name=name,
+        address=address,
+        existing_category=existing_category,
+        model=model,
+        svc=svc,
+    )
+    return result
+
+
+def _classify_with_meta(
+    *,
+    name: str,
+    address: str,
+    existing_category: str,
+    model: Optional[str],
+    svc: Optional[ClassifyService] = None,
+) -> Tuple[Dict[str, Any], Any]:
+    """Sync LLM call; also returns the OpenAI meta (usage) for token budgeting."""
+    if svc is None:
+        svc = ClassifyService(model=model)
+    raw_payload, meta = svc.classify(
         name=name,
         address=address,
         typ=existing_category,
@@ -432,7 +464,7 @@ def classify_location_with_ai(*, name: str, address: str, existing_category: str
         category = parsed.category.value if parsed.action.value == "keep" and parsed.category else None
         confidence = float(parsed.confidence_score or 0.0)
         reason = parsed.reason or ""
-        return {"action": action, "category": category, "confidence": confidence, "reason": reason}
+        return {"action": action, "category": category, "confidence": confidence, "reason": reason}, meta
     except Exception:
         # Fallback: extract best-effort fields without enforcing enum
         if isinstance(raw_payload, dict):
@@ -445,7 +477,198 @@ def classify_location_with_ai(*, name: str, address: str, existing_category: str
         category = str(raw_dict.get("category", "other"))
         confidence = float(raw_dict.get("confidence_score") or raw_dict.get("confidence") or 0.0)
         reason = str(raw_dict.get("reason") or "")
-        return {"action": action, "category": category, "confidence": confidence, "reason": reason}
+        return {"action": action, "category": category, "confidence": confidence, "reason": reason}, meta
+
+
+# ---- Pipelined mode ----
+# Concurrent LLM calls in a bounded thread pool (the OpenAI client is sync),
+# a tokens-per-minute budget, and batched write-back of results.
+CLASSIFY_CONCURRENCY = int(os.getenv("CLASSIFY_CONCURRENCY", "1"))
+CLASSIFY_TPM_BUDGET = int(os.getenv("CLASSIFY_TPM_BUDGET", "0"))  # 0 = unlimited
+CLASSIFY_WRITE_BATCH_SIZE = int(os.getenv("CLASSIFY_WRITE_BATCH_SIZE", "25"))
+# Completion tokens reserved per request on top of the prompt estimate
+CLASSIFY_COMPLETION_TOKENS_EST = 150
+
+
+def _final_category(action: str, raw_category: Optional[str]) -> Optional[str]:
+    # For action="ignore", category may be None - preserve existing category
+    # For action="keep", normalize the category or use fallback
+    if action == "keep":
+        return normalize_category(raw_category) if raw_category else "other"
+    return None
+
+
+def _prompt_base_tokens(svc: Any) -> int:
+    schema = getattr(svc, "JSON_SCHEMA", None)
+    return estimate_tokens(
+        getattr(svc, "system_prompt", ""),
+        getattr(svc, "fewshot", ""),
+        json.dumps(schema) if schema else "",
+    )
+
+
+async def classify_rows_pipelined(
+    rows: List[Dict[str, Any]],
+    *,
+    svc: Any,
+    model: Optional[str],
+    min_conf: float,
+    dry_run: bool,
+    concurrency: int = CLASSIFY_CONCURRENCY,
+    tpm_budget: int = CLASSIFY_TPM_BUDGET,
+    write_batch_size: int = CLASSIFY_WRITE_BATCH_SIZE,
+    on_progress: Optional[Callable[[int], Awaitable[None]]] = None,
+    writer: Optional[Callable[[List[Dict[str, Any]]], Awaitable[Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    Classify `rows` with up to `concurrency` LLM calls in flight.
+
+    Same decisions as the sequential loop in run() (auto-promotion, min_conf,
+    category normalization); results are buffered and written with
+    update_location_classifications_bulk every `write_batch_size` rows.
+    On the first error no new rows are started, finished results are still
+    flushed, and the error is re-raised.
+    """
+    concurrency = max(1, int(concurrency))
+    write_batch_size = max(1, int(write_batch_size))
+    writer = writer or update_location_classifications_bulk
+    budget = TokenBudget(tpm_budget)
+    base_tokens = _prompt_base_tokens(svc)
+
+    counters: Dict[str, Any] = {
+        "classified": 0,
+        "keep": 0,
+        "ignore": 0,
+        "skipped_low_conf": 0,
+        "autopromoted": 0,
+    }
+    keep_conf_sum = 0.0
+    pending: List[Dict[str, Any]] = []
+    write_lock = asyncio.Lock()
+    stop = asyncio.Event()
+    errors: List[BaseException] = []
+    queue: asyncio.Queue = asyncio.Queue()
+    for r in rows:
+        queue.put_nowait(r)
+
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="classify")
+
+    async def flush(force: bool = False) -> None:
+        nonlocal pending
+        async with write_lock:
+            if not pending or (not force and len(pending) < write_batch_size):
+                return
+            batch, pending = pending, []
+            if not dry_run:
+                await writer(batch)
+
+    async def record(item: Optional[Dict[str, Any]]) -> None:
+        counters["classified"] += 1
+        if item is not None:
+            pending.append(item)
+            if len(pending) >= write_batch_size:
+                await flush()
+        if on_progress is not None:
+            await on_progress(counters["classified"])
+
+    async def classify_one(r: Dict[str, Any]) -> None:
+        nonlocal keep_conf_sum
+        name = r.get("name") or ""
+        address = r.get("address") or ""
+        existing_cat = r.get("category") or r.get("type") or ""
+
+        # Auto-promotion path before LLM
+        promo = should_force_promote(r)
+        if promo:
+            counters["autopromoted"] += 1
+            print(f"[autopromote] id={r['id']} name='{name}' -> category={promo['category']} conf={promo['confidence']:.2f}")
+            await record({
+                "id": r["id"],
+                "action": "keep",
+                "category": promo["category"],
+                "confidence_score": promo["confidence"],
+                "reason": promo["reason"],
+            })
+            return
+
+        reserved = base_tokens + estimate_tokens(name, address, existing_cat) + CLASSIFY_COMPLETION_TOKENS_EST
+        await budget.acquire(reserved)
+        result, meta = await loop.run_in_executor(
+            executor,
+            functools.partial(
+                _classify_with_meta,
+                name=name,
+                address=address,
+                existing_category=existing_cat,
+                model=model,
+                svc=svc,
+            ),
+        )
+        budget.settle(reserved, usage_total_tokens(meta))
+
+        action = result["action"]
+        final_category = _final_category(action, result.get("category"))
+        conf = float(result["confidence"])
+
+        if conf < min_conf:
+            counters["skipped_low_conf"] += 1
+            print(
+                f"[skip <{min_conf:.2f}] id={r['id']} name={r['name']!r} "
+                f"-> {action}/{final_category or 'preserve'} conf={conf:.2f}"
+            )
+            await record(None)
+            return
+
+        if action == "keep":
+            counters["keep"] += 1
+            keep_conf_sum += conf
+        elif action == "ignore":
+            counters["ignore"] += 1
+
+        print(f"[apply] id={r['id']} -> action={action} category={final_category or 'preserve'} conf={conf:.2f}")
+        await record({
+            "id": r["id"],
+            "action": action,
+            "category": final_category,  # Can be None for action="ignore"
+            "confidence_score": conf,
+            "reason": result.get("reason", ""),
+        })
+
+    async def worker() -> None:
+        while not stop.is_set():
+            try:
+                r = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                await classify_one(r)
+            except Exception as exc:
+                errors.append(exc)
+                stop.set()
+                return
+
+    t0 = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, len(rows)) or 1)))
+        await flush(force=True)
+    finally:
+        executor.shutdown(wait=not errors)
+    if errors:
+        raise errors[0]
+
+    elapsed = time.perf_counter() - t0
+    counters["avg_keep_conf"] = (keep_conf_sum / counters["keep"]) if counters["keep"] else 0.0
+    logger.info(
+        "classify_pipeline_finished",
+        rows=len(rows),
+        concurrency=concurrency,
+        write_batch_size=write_batch_size,
+        elapsed_s=round(elapsed, 3),
+        locations_per_min=round(len(rows) / elapsed * 60, 1) if elapsed > 0 else None,
+        token_budget=budget.stats(),
+    )
+    return counters
 
 
 async def run(
@@ -455,6 +678,10 @@ async def run(
     model: str,
     args,
     worker_run_id: Optional[UUID] = None,
+    *,
+    concurrency: Optional[int] = None,
+    tpm_budget: Optional[int] = None,
+    write_batch_size: Optional[int] = None,
 ) -> Dict[str, Any]:
     """
     Batch-classifier:
@@ -463,7 +690,13 @@ async def run(
       - valideert payload met unified schema (AIClassification)
       - past min_conf toe
       - schrijft resultaat naar DB (tenzij --dry-run)
+
+    Met concurrency > 1 draait de pipelined mode (classify_rows_pipelined):
+    parallelle LLM-calls binnen een token-per-minute budget en gebatchte write-back.
     """
+    concurrency = CLASSIFY_CONCURRENCY if concurrency is None else concurrency
+    tpm_budget = CLASSIFY_TPM_BUDGET if tpm_budget is None else tpm_budget
+    write_batch_size = CLASSIFY_WRITE_BATCH_SIZE if write_batch_size is None else write_batch_size
     svc = ClassifyService(model=model)
     last_progress = -1
     if worker_run_id:
@@ -539,9 +772,37 @@ async def run(
         if not worker_run_id or total_rows <= 0:
             return
         percent = min(99, max(0, int((current_index * 100) / total_rows)))
-        if percent != last_progress:
-            await update_worker_run_progress(worker_run_id, percent)
+        if percent > last_progress:
+            # Set before awaiting so concurrent pipeline workers never report backwards
             last_progress = percent
+            await update_worker_run_progress(worker_run_id, percent)
+
+    if concurrency > 1:
+        try:
+            counters = await classify_rows_pipelined(
+                rows,
+                svc=svc,
+                model=model,
+                min_conf=min_conf,
+                dry_run=dry_run,
+                concurrency=concurrency,
+                tpm_budget=tpm_budget,
+                write_batch_size=write_batch_size,
+                on_progress=report_progress,
+            )
+        except Exception as exc:
+            if worker_run_id:
+                progress_snapshot = last_progress if last_progress >= 0 else 0
+                await finish_worker_run(worker_run_id, "failed", progress_snapshot, None, str(exc))
+            raise
+        print(
+            f"\nSummary: classified={counters['classified']}  keep={counters['keep']}  ignore={counters['ignore']}  "
+            f"skipped_low_conf={counters['skipped_low_conf']} avg_conf(keep)={counters['avg_keep_conf']:.2f}  "
+            f"dry_run={dry_run} concurrency={concurrency}"
+        )
+        if worker_run_id:
+            await finish_worker_run(worker_run_id, "finished", 100, counters, None)
+        return counters
 
     try:
         for idx, r in enumerate(rows, start=1):
@@ -572,18 +833,11 @@ async def run(
                 address=address,
                 existing_category=existing_cat,
                 model=model,
+                svc=svc,
             )
 
             action = result["action"]
-            raw_category = result.get("category")
-            # For action="ignore", category may be None - preserve existing category
-            # For action="keep", normalize the category or use fallback
-            if action == "keep":
-                final_category = normalize_category(raw_category) if raw_category else "other"
-            else:
-                # action="ignore": pass None to preserve existing category
-                final_category = None
-            
+            final_category = _final_category(action, result.get("category"))
             conf = float(result["confidence"])
 
             if conf < min_conf:
@@ -679,6 +933,25 @@ async def main_async():
 
         p.add_argument("--dry-run", action="store_true", help="Don't write to DB")
         p.add_argument("--model", type=str, default=None, help="Override model name")
+        p.add_argument(
+            "--concurrency",
+            type=int,
+            default=CLASSIFY_CONCURRENCY,
+            help="Parallelle LLM-calls; >1 activeert de pipelined mode (env CLASSIFY_CONCURRENCY)",
+        )
+        p.add_argument(
+            "--tpm-budget",
+            type=int,
+            default=CLASSIFY_TPM_BUDGET,
+            help="Token-per-minute budget voor de pipelined mode, 0 = onbeperkt (env CLASSIFY_TPM_BUDGET)",
+        )
+        p.add_argument(
+            "--write-batch-size",
+            type=int,
+            default=CLASSIFY_WRITE_BATCH_SIZE,
+            help="Aantal resultaten per gebatchte DB write-back (env CLASSIFY_WRITE_BATCH_SIZE)",
+        )
+        p.add_argument("--no-ai-cache", action="store_true", help="AI response cache overslaan (altijd OpenAI aanroepen)")
         
         # NEW filters
         p.add_argument("--source", type=str, help="Filter by source (e.g. OSM_OVERPASS, GOOGLE_PLACES)")
@@ -692,6 +965,7 @@ async def main_async():
         p.add_argument("--radius-m", type=float)
         p.add_argument("--worker-run-id", type=_parse_worker_run_id, help="UUID van worker_runs record voor progress rapportage")
         args = p.parse_args()
+        set_ai_cache_bypass(args.no_ai_cache)
 
         worker_run_id: Optional[UUID] = getattr(args, "worker_run_id", None)
         
@@ -708,6 +982,9 @@ async def main_async():
             args.model,
             args,
             worker_run_id,
+            concurrency=args.concurrency,
+            tpm_budget=args.tpm_budget,
+            write_batch_size=args.write_batch_size,
         )
         
         duration_ms = int((time.perf_counter() - t0) * 1000)
@@ -10,6 +10,13 @@ Includes:
 - Personal stats
 
 Runs weekly (typically on Mondays) via scheduled cron job.
+
+Content is built per cohort of users rather than per user: trending locations are
+fetched once per city and recent polls once per run, and each cohort's poll
+responses, activity and XP/streak come from one set-based query per section.
+Emails are rendered with a renderer that resolves the compiled templates once and
+sent per cohort through EmailService.send_batch (pooled provider connections)
+under a send rate cap (DIGEST_SEND_RATE_PER_SEC).
 """
 
 from __future__ import annotations
@@ -17,7 +24,7 @@ from __future__ import annotations
 import argparse
 import asyncio
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, Iterable, List, Optional, Set, Tuple
 from pathlib import Path
 import sys
 from uuid import UUID
@@ -33,7 +40,9 @@ if str(BACKEND_DIR) not in sys.path:
 from app.core.logging import configure_logging, get_logger
 from app.core.request_id import with_run_id
 from services.db_service import init_db_pool, fetch, execute
+from services.email import EmailMessage
 from services.email_service import get_email_service
+from services.email_template_service import get_email_template_service
 from services.worker_runs_service import (
     start_worker_run,
     mark_worker_run_running,
@@ -45,6 +54,22 @@ configure_logging(service_name="worker")
 logger = get_logger()
 logger = logger.bind(worker="digest")
 
+# Users whose per-user sections are loaded in one round of set-based queries
+DIGEST_COHORT_SIZE = int(os.getenv("DIGEST_COHORT_SIZE", "1000"))
+# Upper bound on emails started per second across all senders (0 = unlimited)
+DIGEST_SEND_RATE_PER_SEC = float(os.getenv("DIGEST_SEND_RATE_PER_SEC", "10"))
+
+TRENDING_LIMIT = 5
+POLLS_LIMIT = 5
+
+EMPTY_ACTIVITY: Dict[str, int] = {
+    "check_ins": 0,
+    "reactions": 0,
+    "notes": 0,
+    "favorites": 0,
+    "unique_locations": 0,
+}
+
 
 async def get_digest_opt_in_users() -> List[Dict[str, Any]]:
     """
@@ -177,11 +202,177 @@ async def get_user_xp_and_streak(
     return rows[0] if rows else {}
 
 
+def _user_key(user_id: Any) -> str:
+    return str(user_id)
+
+
+async def get_trending_locations_for_cities(
+    city_keys: Iterable[str],
+    limit: int = TRENDING_LIMIT,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Get the top trending locations for several cities in one query.
+    
+    Same ranking as get_trending_locations_for_city, keyed by city_key.
+    Cities without trending locations map to an empty list.
+    """
+    keys = sorted(set(city_keys))
+    if not keys:
+        return {}
+    sql = """
+        SELECT
+            city_key,
+            location_id,
+            name,
+            category,
+            score,
+            check_ins_count,
+            reactions_count,
+            notes_count
+        FROM (
+            SELECT
+                tl.city_key,
+                tl.location_id,
+                l.name,
+                l.category,
+                tl.score,
+                tl.check_ins_count,
+                tl.reactions_count,
+                tl.notes_count,
+                ROW_NUMBER() OVER (PARTITION BY tl.city_key ORDER BY tl.score DESC) as rank
+            FROM trending_locations tl
+            INNER JOIN locations l ON l.id = tl.location_id
+            WHERE tl.city_key = ANY($1::text[])
+              AND tl.window = '7d'
+              AND l.state = 'VERIFIED'
+        ) ranked
+        WHERE rank <= $2
+        ORDER BY city_key, rank
+    """
+    
+    rows = await fetch(sql, keys, limit)
+    by_city: Dict[str, List[Dict[str, Any]]] = {key: [] for key in keys}
+    for row in rows or []:
+        item = dict(row)
+        by_city[item.pop("city_key")].append(item)
+    return by_city
+
+
+async def get_recent_polls(days: int = 7) -> List[Dict[str, Any]]:
+    """
+    Get active polls created in the last N days, newest first.
+    
+    Shared by every user in a run; get_answered_polls_for_users narrows it per user.
+    """
+    sql = """
+        SELECT 
+            p.id,
+            p.title,
+            p.question,
+            p.poll_type,
+            p.is_sponsored,
+            p.created_at,
+            COUNT(po.id) as option_count
+        FROM polls p
+        INNER JOIN poll_options po ON po.poll_id = p.id
+        WHERE p.starts_at <= now()
+          AND (p.ends_at IS NULL OR p.ends_at >= now())
+          AND p.created_at >= now() - make_interval(days => $1)
+        GROUP BY p.id, p.title, p.question, p.poll_type, p.is_sponsored, p.created_at
+        ORDER BY p.created_at DESC
+    """
+    
+    rows = await fetch(sql, days)
+    return [dict(row) for row in rows or []]
+
+
+async def get_answered_polls_for_users(
+    poll_ids: List[int],
+    user_ids: List[str],
+) -> Dict[str, Set[int]]:
+    """
+    Get which of the given polls each user has responded to.
+    """
+    if not poll_ids or not user_ids:
+        return {}
+    sql = """
+        SELECT DISTINCT pr.user_id::text as user_id, pr.poll_id
+        FROM poll_responses pr
+        WHERE pr.poll_id = ANY($1::bigint[])
+          AND pr.user_id = ANY($2::uuid[])
+    """
+    
+    rows = await fetch(sql, poll_ids, user_ids)
+    answered: Dict[str, Set[int]] = {}
+    for row in rows or []:
+        answered.setdefault(row["user_id"], set()).add(row["poll_id"])
+    return answered
+
+
+async def get_user_activity_summaries(
+    user_ids: List[str],
+    days: int = 7,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Get the activity summary of several users for the last N days.
+    
+    Users without activity are absent; callers fall back to EMPTY_ACTIVITY.
+    """
+    if not user_ids:
+        return {}
+    sql = """
+        SELECT 
+            user_id::text as user_id,
+            COUNT(*) FILTER (WHERE activity_type = 'check_in') as check_ins,
+            COUNT(*) FILTER (WHERE activity_type = 'reaction') as reactions,
+            COUNT(*) FILTER (WHERE activity_type = 'note') as notes,
+            COUNT(*) FILTER (WHERE activity_type = 'favorite') as favorites,
+            COUNT(DISTINCT location_id) as unique_locations
+        FROM activity_stream
+        WHERE user_id = ANY($1::uuid[])
+          AND created_at >= now() - make_interval(days => $2)
+        GROUP BY user_id
+    """
+    
+    rows = await fetch(sql, user_ids, days)
+    summaries: Dict[str, Dict[str, Any]] = {}
+    for row in rows or []:
+        item = dict(row)
+        summaries[item.pop("user_id")] = item
+    return summaries
+
+
+async def get_user_xp_and_streaks(
+    user_ids: List[str],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Get current XP and streak stats of several users.
+    """
+    if not user_ids:
+        return {}
+    sql = """
+        SELECT 
+            user_id::text as user_id,
+            total_xp,
+            current_streak_days,
+            longest_streak_days
+        FROM user_streaks
+        WHERE user_id = ANY($1::uuid[])
+    """
+    
+    rows = await fetch(sql, user_ids)
+    stats: Dict[str, Dict[str, Any]] = {}
+    for row in rows or []:
+        item = dict(row)
+        stats[item.pop("user_id")] = item
+    return stats
+
+
 async def generate_digest_content(user: Dict[str, Any]) -> Dict[str, Any]:
     """
     Generate personalized digest content for a user.
     """
-    user_id = UUID(user["user_id"])
+    user_id = UUID(str(user["user_id"]))
     city_key = user.get("city_key", "rotterdam")
     language = user.get("language_pref", "nl")
     
@@ -207,30 +398,87 @@ async def generate_digest_content(user: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-async def send_digest_email(user: Dict[str, Any], content: Dict[str, Any]) -> bool:
+async def generate_digest_contents(
+    users: List[Dict[str, Any]],
+    trending_by_city: Dict[str, List[Dict[str, Any]]],
+    recent_polls: List[Dict[str, Any]],
+    days: int = 7,
+) -> List[Dict[str, Any]]:
+    """
+    Generate digest content for a cohort of users, in the same order.
+    
+    Per-city trending locations and the recent polls are passed in (loaded once
+    per run); poll responses, activity and XP/streak are loaded with one query
+    each for the whole cohort. Each entry matches generate_digest_content.
+    """
+    user_ids = [_user_key(user["user_id"]) for user in users]
+    answered, activity, gamification = await asyncio.gather(
+        get_answered_polls_for_users([poll["id"] for poll in recent_polls], user_ids),
+        get_user_activity_summaries(user_ids, days=days),
+        get_user_xp_and_streaks(user_ids),
+    )
+    
+    contents: List[Dict[str, Any]] = []
+    for user, user_id in zip(users, user_ids):
+        seen = answered.get(user_id, ())
+        contents.append(
+            {
+                "user": user,
+                "trending_locations": trending_by_city.get(user.get("city_key", "rotterdam"), []),
+                "new_polls": [poll for poll in recent_polls if poll["id"] not in seen][:POLLS_LIMIT],
+                "activity": activity.get(user_id, EMPTY_ACTIVITY),
+                "gamification": gamification.get(user_id, {}),
+                "language": user.get("language_pref", "nl"),
+            }
+        )
+    return contents
+
+
+def _digest_subjects(now: datetime) -> Dict[str, str]:
+    return {
+        "nl": f"Weekoverzicht Turkspot - {now.strftime('%d %B')}",
+        "tr": f"Turkspot Haftalık Özet - {now.strftime('%d %B')}",
+        "en": f"Turkspot Weekly Summary - {now.strftime('%B %d')}",
+    }
+
+
+def get_digest_renderer() -> Callable[[Dict[str, Any]], Tuple[str, str]]:
+    """
+    Render function for the weekly digest with compiled templates and shared context resolved once.
+    """
+    frontend_url = os.getenv("FRONTEND_URL", "https://turkspot.app")
+    render = get_email_template_service().get_renderer("weekly_digest")
+    shared = {
+        "base_url": frontend_url,
+        "unsubscribe_url": f"{frontend_url}/#/account?tab=notificaties",
+    }
+    return lambda content: render({**content, **shared})
+
+
+async def send_digest_email(
+    user: Dict[str, Any],
+    content: Dict[str, Any],
+    renderer: Optional[Callable[[Dict[str, Any]], Tuple[str, str]]] = None,
+    subjects: Optional[Dict[str, str]] = None,
+) -> bool:
     """
     Send weekly digest email to a user.
+    
+    run_digest_once passes one renderer and subject set for the whole run;
+    standalone calls build their own.
     """
     email_service = get_email_service()
     
     # Generate email subject based on language
     language = content.get("language", "nl")
-    subjects = {
-        "nl": f"Weekoverzicht Turkspot - {datetime.now(timezone.utc).strftime('%d %B')}",
-        "tr": f"Turkspot Haftalık Özet - {datetime.now(timezone.utc).strftime('%d %B')}",
-        "en": f"Turkspot Weekly Summary - {datetime.now(timezone.utc).strftime('%B %d')}",
-    }
+    if subjects is None:
+        subjects = _digest_subjects(datetime.now(timezone.utc))
     subject = subjects.get(language, subjects["nl"])
     
-    # Render email template
-    context = {
-        **content,
-        "base_url": os.getenv("FRONTEND_URL", "https://turkspot.app"),
-        "unsubscribe_url": f"{os.getenv('FRONTEND_URL', 'https://turkspot.app')}/#/account?tab=notificaties",
-    }
-    
     try:
-        html_body, text_body = email_service.render_template("weekly_digest", context)
+        if renderer is None:
+            renderer = get_digest_renderer()
+        html_body, text_body = renderer(content)
         
         # Send email
         success = await email_service.send_email(
@@ -266,6 +514,66 @@ async def send_digest_email(user: Dict[str, Any], content: Dict[str, Any]) -> bo
         return False
 
 
+async def _send_cohort(
+    users: List[Dict[str, Any]],
+    contents: List[Dict[str, Any]],
+    renderer: Callable[[Dict[str, Any]], Tuple[str, str]],
+    subjects: Dict[str, str],
+) -> Tuple[int, int]:
+    """
+    Render a cohort's digests and send them as one pooled batch.
+    
+    Returns:
+        (sent, failed)
+    """
+    failed = 0
+    recipients: List[Dict[str, Any]] = []
+    messages: List[EmailMessage] = []
+    for user, content in zip(users, contents):
+        try:
+            html_body, text_body = renderer(content)
+        except Exception as e:
+            logger.error(
+                "digest_email_error",
+                user_id=str(user["user_id"]),
+                email=user["email"],
+                error=str(e),
+                exc_info=True,
+            )
+            failed += 1
+            continue
+        language = content.get("language", "nl")
+        recipients.append(user)
+        messages.append(
+            EmailMessage(
+                to=user["email"],
+                subject=subjects.get(language, subjects["nl"]),
+                html_body=html_body,
+                text_body=text_body,
+            )
+        )
+    
+    results = await get_email_service().send_batch(messages, rate_per_sec=DIGEST_SEND_RATE_PER_SEC)
+    sent = 0
+    for user, result in zip(recipients, results):
+        if result.ok:
+            sent += 1
+            logger.info(
+                "digest_email_sent",
+                user_id=str(user["user_id"]),
+                email=user["email"],
+            )
+        else:
+            failed += 1
+            logger.warning(
+                "digest_email_failed",
+                user_id=str(user["user_id"]),
+                email=user["email"],
+                error=result.error,
+            )
+    return sent, failed
+
+
 async def run_digest_once(
     dry_run: bool = False,
     limit: Optional[int] = None,
@@ -285,7 +593,7 @@ async def run_digest_once(
     }
     
     # Get opt-in users
-    users = await get_digest_opt_in_users()
+    users = [dict(user) for user in await get_digest_opt_in_users()]
     
     if limit:
         users = users[:limit]
@@ -295,16 +603,43 @@ async def run_digest_once(
         total_users=len(users),
         dry_run=dry_run,
         limit=limit,
+        cohort_size=DIGEST_COHORT_SIZE,
+    )
+    
+    if not users:
+        logger.info("digest_worker_completed", **stats)
+        return stats
+    
+    # Shared sections, once per run
+    trending_by_city = await get_trending_locations_for_cities(
+        user.get("city_key", "rotterdam") for user in users
     )
+    recent_polls = await get_recent_polls(days=7)
     
-    for user in users:
+    renderer = None if dry_run else get_digest_renderer()
+    subjects = _digest_subjects(datetime.now(timezone.utc))
+    
+    cohort_size = max(1, DIGEST_COHORT_SIZE)
+    for offset in range(0, len(users), cohort_size):
+        cohort = users[offset:offset + cohort_size]
+        stats["users_processed"] += len(cohort)
+        
         try:
-            stats["users_processed"] += 1
-            
-            # Generate content
-            content = await generate_digest_content(user)
-            
-            if dry_run:
+            contents = await generate_digest_contents(cohort, trending_by_city, recent_polls, days=7)
+        except Exception as e:
+            logger.error(
+                "digest_cohort_error",
+                offset=offset,
+                users=len(cohort),
+                error=str(e),
+                exc_info=True,
+            )
+            stats["emails_failed"] += len(cohort)
+            stats["errors"].append(str(e))
+            continue
+        
+        if dry_run:
+            for user, content in zip(cohort, contents):
                 logger.info(
                     "digest_dry_run",
                     user_id=str(user["user_id"]),
@@ -312,26 +647,12 @@ async def run_digest_once(
                     trending_count=len(content.get("trending_locations", [])),
                     polls_count=len(content.get("new_polls", [])),
                 )
-                stats["emails_sent"] += 1
-            else:
-                # Send email
-                success = await send_digest_email(user, content)
-                
-                if success:
-                    stats["emails_sent"] += 1
-                else:
-                    stats["emails_failed"] += 1
-            
-        except Exception as e:
-            logger.error(
-                "digest_user_error",
-                user_id=str(user.get("user_id")),
-                email=user.get("email"),
-                error=str(e),
-                exc_info=True,
-            )
-            stats["emails_failed"] += 1
-            stats["errors"].append(str(e))
+            stats["emails_sent"] += len(cohort)
+            continue
+        
+        sent, failed = await _send_cohort(cohort, contents, renderer, subjects)
+        stats["emails_sent"] += sent
+        stats["emails_failed"] += failed
     
     logger.info(
         "digest_worker_completed",
@@ -370,6 +691,9 @@ async def main_async() -> None:
             limit=args.limit,
         )
         
+        # Release pooled SMTP connections
+        get_email_service().close_send_pool()
+        
         # Finish worker run
         if run_id:
             await finish_worker_run(run_id, {
@@ -21,7 +21,7 @@ import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Iterable, List, Dict, Any, Set, Tuple, Optional
+from typing import Awaitable, Callable, Iterable, List, Dict, Any, Set, Tuple, Optional
 from uuid import UUID
 
 # --- Uniform logging ---
@@ -49,9 +49,10 @@ if str(BACKEND_DIR) not in sys.path:
 from services.db_service import init_db_pool, fetch, execute
 
 # ---------------------------------------------------------------------------
-# Places provider (OSM only)
+# Places provider (OSM only: Overpass or a local extract)
 # ---------------------------------------------------------------------------
-from services.osm_service import OsmPlacesService
+from app.services.provider_factory import get_places_provider
+from services.overpass_scheduler import OVERPASS_SCHEDULER_MAX_INFLIGHT_CELLS
 
 # ---------------------------------------------------------------------------
 # Worker run tracking
@@ -75,6 +76,17 @@ def load_categories_config() -> Dict[str, Any]:
     """
     Load categories configuration - database first, fallback to YAML.
     
+    Served from the versioned in-memory cache (services.config_cache_service);
+    only reloads when the DB version or the YAML mtime changes.
+    """
+    from services.config_cache_service import get_categories_config
+
+    return get_categories_config()
+
+def _load_categories_config_uncached() -> Dict[str, Any]:
+    """
+    Uncached loader - database first, fallback to YAML.
+    
     Tries to load from database first. If database is empty or fails,
     falls back to YAML file for backwards compatibility.
     """
@@ -137,6 +149,17 @@ def load_cities_config() -> Dict[str, Any]:
     """
     Load cities configuration - database first, fallback to YAML.
     
+    Served from the versioned in-memory cache (services.config_cache_service);
+    only reloads when the DB version or the YAML mtime changes.
+    """
+    from services.config_cache_service import get_cities_config
+
+    return get_cities_config()
+
+def _load_cities_config_uncached() -> Dict[str, Any]:
+    """
+    Uncached loader - database first, fallback to YAML.
+    
     Tries to load from database first. If database is empty or fails,
     falls back to YAML file for backwards compatibility.
     """
@@ -478,6 +501,223 @@ async def insert_candidates(rows: List[Dict[str, Any]]) -> Dict[str, int]:
     
     return counters
 
+# ---------------------------------------------------------------------------
+# Bulk (set-based) candidate ingest
+# ---------------------------------------------------------------------------
+# Set DISCOVERY_BULK_INSERT=0 om terug te vallen op de per-row insert_candidates loop.
+DISCOVERY_BULK_INSERT = os.getenv("DISCOVERY_BULK_INSERT", "1").strip().lower() in ("1", "true", "yes", "y")
+BULK_INSERT_CHUNK_SIZE = int(os.getenv("DISCOVERY_BULK_INSERT_CHUNK_SIZE", "1000"))
+
+# "union": één Overpass union-query per cel voor alle categorieën (client-side
+# opgesplitst per categorie); "per_category": één query per (categorie, cel)
+DISCOVERY_OSM_MODE = os.getenv("DISCOVERY_OSM_MODE", "union").strip().lower()
+
+# One statement per generation: stage the batch via unnest(), resolve place_id and
+# fuzzy (normalized name + rounded coords) matches set-based, update fuzzy matches
+# and insert the rest. Semantics mirror insert_candidates().
+BULK_INGEST_SQL = """
+WITH incoming AS (
+    SELECT *
+    FROM unnest(
+        $1::int[], $2::text[], $3::text[], $4::text[], $5::text[],
+        $6::float8[], $7::float8[], $8::text[], $9::text[], $10::float8[],
+        $11::int[], $12::boolean[], $13::timestamptz[], $14::float8[],
+        $15::text[], $16::text[]
+    ) AS t(
+        idx, place_id, source, name, address,
+        lat, lng, category, business_status, rating,
+        user_ratings_total, is_probable_not_open_yet, next_check_at, freshness_score,
+        evidence_urls_json, notes
+    )
+),
+place_hits AS (
+    SELECT i.idx
+    FROM incoming i
+    WHERE COALESCE(i.place_id, '') <> ''
+      AND EXISTS (SELECT 1 FROM locations l WHERE l.place_id = i.place_id)
+),
+fuzzy_hits AS (
+    SELECT DISTINCT ON (i.idx) i.idx, l.id AS existing_id
+    FROM incoming i
+    JOIN locations l
+      ON LOWER(TRIM(l.name)) = LOWER(TRIM(i.name))
+     AND ROUND(CAST(l.lat AS numeric), 4) = ROUND(CAST(i.lat AS numeric), 4)
+     AND ROUND(CAST(l.lng AS numeric), 4) = ROUND(CAST(i.lng AS numeric), 4)
+    WHERE COALESCE(i.name, '') <> ''
+      AND i.lat IS NOT NULL
+      AND i.lng IS NOT NULL
+      AND i.idx NOT IN (SELECT idx FROM place_hits)
+    ORDER BY i.idx, l.id
+),
+updated AS (
+    UPDATE locations l
+    SET
+        last_seen_at = NOW(),
+        category = COALESCE(i.category, l.category),
+        source = COALESCE(i.source, l.source),
+        address = COALESCE(i.address, l.address),
+        rating = COALESCE(CAST(i.rating AS numeric), l.rating),
+        user_ratings_total = COALESCE(i.user_ratings_total, l.user_ratings_total)
+    FROM fuzzy_hits f
+    JOIN incoming i ON i.idx = f.idx
+    WHERE l.id = f.existing_id
+    RETURNING l.id
+),
+inserted AS (
+    INSERT INTO locations (
+        place_id, source, name, address, lat, lng, category,
+        business_status, rating, user_ratings_total, state,
+        confidence_score, is_probable_not_open_yet,
+        first_seen_at, last_seen_at, last_verified_at,
+        next_check_at, freshness_score, evidence_urls, notes, is_retired
+    )
+    SELECT
+        i.place_id, i.source, i.name, i.address, i.lat, i.lng, i.category,
+        i.business_status, i.rating, i.user_ratings_total, 'CANDIDATE',
+        NULL, i.is_probable_not_open_yet,
+        NOW(), NOW(), NULL,
+        i.next_check_at, i.freshness_score,
+        CASE
+            WHEN i.evidence_urls_json IS NULL THEN NULL
+            ELSE ARRAY(SELECT jsonb_array_elements_text(CAST(i.evidence_urls_json AS jsonb)))
+        END,
+        i.notes, FALSE
+    FROM incoming i
+    WHERE i.idx NOT IN (SELECT idx FROM place_hits)
+      AND i.idx NOT IN (SELECT idx FROM fuzzy_hits)
+    ORDER BY i.idx
+    ON CONFLICT (place_id) DO NOTHING
+    RETURNING id
+)
+SELECT
+    (SELECT COUNT(*) FROM place_hits) AS place_hits,
+    (SELECT COUNT(*) FROM fuzzy_hits) AS fuzzy_hits,
+    (SELECT COUNT(*) FROM inserted) AS inserted,
+    (SELECT COUNT(*) FROM updated) AS updated
+"""
+
+
+def _fuzzy_key(row: Dict[str, Any]) -> Optional[Tuple[str, float, float]]:
+    """Python-side spiegel van de fuzzy match key (normalized name + 4-decimal coords)."""
+    name = row.get("name")
+    lat = row.get("lat")
+    lng = row.get("lng")
+    if not name or lat is None or lng is None:
+        return None
+    try:
+        return (str(name).strip().lower(), round(float(lat), 4), round(float(lng), 4))
+    except (TypeError, ValueError):
+        return None
+
+
+def split_bulk_generations(rows: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """
+    Split rows into generations so no generation contains two rows sharing a
+    place_id or fuzzy key. Later generations then see the effects of earlier ones,
+    exactly like the sequential loop where row N can dedupe against row N-1.
+    """
+    generations: List[List[Dict[str, Any]]] = []
+    last_gen: Dict[Any, int] = {}
+    for row in rows:
+        keys: List[Any] = []
+        place_id = row.get("place_id")
+        if place_id:
+            keys.append(("place_id", place_id))
+        fkey = _fuzzy_key(row)
+        if fkey is not None:
+            keys.append(("fuzzy", fkey))
+        gen = max((last_gen[k] + 1 for k in keys if k in last_gen), default=0)
+        for k in keys:
+            last_gen[k] = gen
+        while len(generations) <= gen:
+            generations.append([])
+        generations[gen].append(row)
+    return generations
+
+
+def _bulk_args(rows: List[Dict[str, Any]]) -> List[List[Any]]:
+    def _float(v: Any) -> Optional[float]:
+        return float(v) if v is not None else None
+
+    def _int(v: Any) -> Optional[int]:
+        return int(v) if v is not None else None
+
+    return [
+        list(range(len(rows))),
+        [r.get("place_id") for r in rows],
+        [r.get("source") for r in rows],
+        [r.get("name") for r in rows],
+        [r.get("address") for r in rows],
+        [_float(r.get("lat")) for r in rows],
+        [_float(r.get("lng")) for r in rows],
+        [r.get("category") or "other" for r in rows],
+        [r.get("business_status") for r in rows],
+        [_float(r.get("rating")) for r in rows],
+        [_int(r.get("user_ratings_total")) for r in rows],
+        [r.get("is_probable_not_open_yet") for r in rows],
+        [r.get("next_check_at") for r in rows],
+        [_float(r.get("freshness_score")) for r in rows],
+        [json.dumps(list(r["evidence_urls"])) if r.get("evidence_urls") is not None else None for r in rows],
+        [r.get("notes") for r in rows],
+    ]
+
+
+async def insert_candidates_bulk(rows: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Set-based variant of insert_candidates(): one round-trip per chunk/generation
+    instead of up to three per row. Returns the same counters dict.
+
+    Per-row failure isolation: if a set-based statement fails (e.g. one row with
+    an invalid value), that chunk is retried through the per-row loop so only
+    the offending rows end up in `failed`.
+    """
+    counters = {
+        "discovered": len(rows),
+        "inserted": 0,
+        "deduped_place_id": 0,
+        "deduped_fuzzy": 0,
+        "updated_existing": 0,
+        "failed": 0,
+    }
+    if not rows:
+        return counters
+
+    await init_db_pool()
+
+    for start in range(0, len(rows), max(1, BULK_INSERT_CHUNK_SIZE)):
+        chunk = rows[start:start + max(1, BULK_INSERT_CHUNK_SIZE)]
+        for generation in split_bulk_generations(chunk):
+            try:
+                result = await fetch(BULK_INGEST_SQL, *_bulk_args(generation))
+                rec = dict(result[0]) if result else {}
+                place_hits = int(rec.get("place_hits") or 0)
+                fuzzy_hits = int(rec.get("fuzzy_hits") or 0)
+                inserted = int(rec.get("inserted") or 0)
+                to_insert = len(generation) - place_hits - fuzzy_hits
+                counters["inserted"] += inserted
+                # ON CONFLICT (race met andere worker) telt net als in de loop als place_id dedupe
+                counters["deduped_place_id"] += place_hits + max(0, to_insert - inserted)
+                counters["deduped_fuzzy"] += fuzzy_hits
+                counters["updated_existing"] += fuzzy_hits
+            except Exception as e:
+                logger.warning(
+                    "insert_candidates_bulk_failed_falling_back_to_per_row",
+                    batch_size=len(generation),
+                    error=str(e),
+                )
+                fallback = await insert_candidates(generation)
+                for key in ("inserted", "deduped_place_id", "deduped_fuzzy", "updated_existing", "failed"):
+                    counters[key] += fallback.get(key, 0)
+
+    return counters
+
+
+async def ingest_candidates(rows: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Entry point voor discovery: bulk path tenzij DISCOVERY_BULK_INSERT=0."""
+    if DISCOVERY_BULK_INSERT:
+        return await insert_candidates_bulk(rows)
+    return await insert_candidates(rows)
+
 # ---------------------------------------------------------------------------
 # Type sanitization / self-heal
 # ---------------------------------------------------------------------------
@@ -527,6 +767,26 @@ class DiscoveryConfig:
     chunk_index: int
     language: Optional[str]
     district: Optional[str] = None
+    osm_mode: str = DISCOVERY_OSM_MODE
+    osm_extract: Optional[str] = None
+
+@dataclass
+class _OsmRunState:
+    """Counters and circuit breaker state shared by the passes of one OSM discovery run."""
+    counters: Dict[str, Any]
+    start_time: float
+    total_inserted: int
+    total_units: int
+    max_consecutive_failures: int
+    max_error_ratio: float
+    safety_timeout_s: float = 25 * 60  # 25 minutes safety timeout
+    completed_units: int = 0
+    overpass_calls_total: int = 0
+    overpass_calls_failed: int = 0
+    consecutive_failures: int = 0
+    circuit_breaker_triggered: bool = False
+    stopped: bool = False  # safety timeout or max_total_inserts reached
+
 
 class DiscoveryBot:
     def __init__(self, cfg: DiscoveryConfig, cfg_yaml: Dict[str, Any]):
@@ -535,8 +795,17 @@ class DiscoveryBot:
         self.worker_run_id: Optional[UUID] = None
         self._worker_last_progress: int = -1
         
-        # Initialize OSM service for enhanced discovery
-        self.osm_service = OsmPlacesService(
+        # Initialize OSM service for enhanced discovery (Overpass, or a local extract
+        # that only keeps elements matching the categories of this run)
+        categories_map = cfg_yaml.get("categories") or {}
+        self.osm_service = get_places_provider(
+            "osm_extract" if cfg.osm_extract else None,
+            extract_path=cfg.osm_extract,
+            category_osm_tags=[
+                [categories_map[cat]["osm_tags"]]
+                for cat in cfg.categories
+                if (categories_map.get(cat) or {}).get("osm_tags")
+            ],
             max_results=cfg.max_per_cell_per_category,
             turkish_hints=os.getenv("OSM_TURKISH_HINTS", "1").lower() == "true"
         )
@@ -570,29 +839,6 @@ class DiscoveryBot:
         Includes circuit breaker to abort Overpass calls if error rate is too high.
         Returns aggregated counters dictionary.
         """
-        # Circuit breaker configuration (protects Overpass from overload)
-        # These thresholds detect "error storms" where Overpass is clearly struggling
-        DISCOVERY_MAX_CONSECUTIVE_OVERPASS_FAILURES = int(os.getenv("DISCOVERY_MAX_CONSECUTIVE_OVERPASS_FAILURES", "10"))
-        DISCOVERY_MAX_OVERPASS_ERROR_RATIO = float(os.getenv("DISCOVERY_MAX_OVERPASS_ERROR_RATIO", "0.8"))
-        
-        start_time = time.time()
-        safety_timeout_s = 25 * 60  # 25 minutes safety timeout
-        
-        # Circuit breaker state tracking
-        overpass_calls_total = 0
-        overpass_calls_failed = 0
-        consecutive_failures = 0
-        circuit_breaker_triggered = False
-        
-        # Initialize aggregated counters
-        aggregated_counters = {
-            "discovered": 0,
-            "inserted": 0,
-            "deduped_place_id": 0,
-            "deduped_fuzzy": 0,
-            "updated_existing": 0,
-            "failed": 0,
-        }
         categories_map = self.yaml.get("categories") or {}
         valid_categories = [
             cat
@@ -602,7 +848,40 @@ class DiscoveryBot:
         total_units = len(points) * len(valid_categories)
         if total_units == 0 and points:
             total_units = len(points)
-        completed_units = 0
+
+        # Circuit breaker configuration (protects Overpass from overload)
+        # These thresholds detect "error storms" where Overpass is clearly struggling
+        state = _OsmRunState(
+            counters={
+                "discovered": 0,
+                "inserted": 0,
+                "deduped_place_id": 0,
+                "deduped_fuzzy": 0,
+                "updated_existing": 0,
+                "failed": 0,
+            },
+            start_time=time.time(),
+            total_inserted=total_inserted,
+            total_units=total_units,
+            max_consecutive_failures=int(os.getenv("DISCOVERY_MAX_CONSECUTIVE_OVERPASS_FAILURES", "10")),
+            max_error_ratio=float(os.getenv("DISCOVERY_MAX_OVERPASS_ERROR_RATIO", "0.8")),
+        )
+        aggregated_counters = state.counters
+
+        # Union mode: all regular categories share one Overpass query per cell.
+        # Catch-all categories keep their own fallback query.
+        union_tags: Dict[str, List[Dict[str, Any]]] = {}
+        if self.cfg.osm_mode == "union":
+            for cat_key in self.cfg.categories:
+                cat_def = categories_map.get(cat_key) or {}
+                discovery_cfg = cat_def.get("discovery", {})
+                if (
+                    cat_def.get("osm_tags")
+                    and discovery_cfg.get("enabled", True)
+                    and discovery_cfg.get("strategy") != "catch_all"
+                ):
+                    union_tags.setdefault(cat_key, [cat_def["osm_tags"]])
+        union_done = False
 
         for cat_key in self.cfg.categories:
             cat_def = categories_map.get(cat_key)
@@ -630,126 +909,71 @@ class DiscoveryBot:
                     max_per_cell = 10
 
                 print(f"\n[DiscoveryBot] === {cat_key} (catch-all) ===  (max_per_cell={max_per_cell})")
-                processed_cells = 0
 
-                for i, (lat, lng) in enumerate(points, start=1):
-                    # Check circuit breaker - stop making Overpass calls if error storm detected
-                    if circuit_breaker_triggered:
-                        print(f"[DiscoveryBot] Circuit breaker active: skipping remaining Overpass calls. Processing already-found results.")
-                        break
-                    
-                    # Check safety timeout
-                    elapsed_time = time.time() - start_time
-                    if elapsed_time > safety_timeout_s:
-                        print(f"[DiscoveryBot] Safety timeout bereikt ({elapsed_time:.1f}s). Stoppen om GitHub Actions timeout te voorkomen.")
-                        return aggregated_counters
-                    
-                    if self.cfg.max_cells_per_category > 0 and processed_cells >= self.cfg.max_cells_per_category:
-                        print(f"[DiscoveryBot] Max cellen voor {cat_key} bereikt: {processed_cells}")
-                        break
+                def catch_all_search(cell_lat: float, cell_lng: float, max_per_cell: int = max_per_cell):
+                    return self._discover_catch_all_for_cell(lat=cell_lat, lng=cell_lng, max_results=max_per_cell)
+
+                await self._run_osm_pass(
+                    state, points, seen, catch_all_search,
+                    label=f"{cat_key} (catch-all)", insert_label="Catch-all Insert", units=1,
+                )
+                if state.stopped:
+                    return aggregated_counters
 
-                    # Track Overpass call attempt
-                    overpass_calls_total += 1
-                    overpass_call_failed = False
-                    
-                    try:
-                        # Use catch-all helper for this cell
-                        catch_all_candidates = await self._discover_catch_all_for_cell(
-                            lat=lat,
-                            lng=lng,
-                            max_results=max_per_cell,
-                        )
-                    except Exception as e:
-                        import traceback
-                        tb = traceback.format_exc(limit=5)
-                        print(f"[DiscoveryBot] {cat_key} @({lat:.5f},{lng:.5f}) catch-all error: {type(e).__name__}: {e}")
-                        print(f"[DiscoveryBot] Traceback: {tb}")
-                        catch_all_candidates = []
-                        overpass_call_failed = True
-                    
-                    # Track failures for circuit breaker
-                    if overpass_call_failed:
-                        overpass_calls_failed += 1
-                        consecutive_failures += 1
-                    else:
-                        consecutive_failures = 0  # Reset on success
-                    
-                    # Check circuit breaker thresholds
-                    if overpass_calls_total > 0:
-                        error_ratio = overpass_calls_failed / overpass_calls_total
-                        
-                        if consecutive_failures >= DISCOVERY_MAX_CONSECUTIVE_OVERPASS_FAILURES:
-                            circuit_breaker_triggered = True
-                            logger.warning(
-                                "discovery_circuit_breaker_triggered",
-                                reason="consecutive_failures",
-                                consecutive_failures=consecutive_failures,
-                                threshold=DISCOVERY_MAX_CONSECUTIVE_OVERPASS_FAILURES,
-                                total_calls=overpass_calls_total,
-                                failed_calls=overpass_calls_failed
-                            )
-                            print(f"[DiscoveryBot] CIRCUIT BREAKER TRIGGERED: {consecutive_failures} consecutive Overpass failures (threshold: {DISCOVERY_MAX_CONSECUTIVE_OVERPASS_FAILURES})")
-                            print(f"[DiscoveryBot] Stopping Overpass calls to avoid overloading public servers. Processing already-found results.")
-                        elif error_ratio >= DISCOVERY_MAX_OVERPASS_ERROR_RATIO:
-                            circuit_breaker_triggered = True
-                            logger.warning(
-                                "discovery_circuit_breaker_triggered",
-                                reason="error_ratio",
-                                error_ratio=error_ratio,
-                                threshold=DISCOVERY_MAX_OVERPASS_ERROR_RATIO,
-                                total_calls=overpass_calls_total,
-                                failed_calls=overpass_calls_failed
-                            )
-                            print(f"[DiscoveryBot] CIRCUIT BREAKER TRIGGERED: Overpass error ratio {error_ratio:.1%} exceeds threshold {DISCOVERY_MAX_OVERPASS_ERROR_RATIO:.1%}")
-                            print(f"[DiscoveryBot] Stopping Overpass calls to avoid overloading public servers. Processing already-found results.")
-
-                    # Filter out duplicates using seen set (same as regular categories)
-                    batch: List[Dict[str, Any]] = []
-                    for p in catch_all_candidates or []:
-                        pid = p.get("place_id")
-                        if not pid or pid in seen:
-                            continue
-                        seen.add(pid)
-                        batch.append(p)
-
-                    if batch:
-                        try:
-                            counters = await insert_candidates(batch)
-                            # Aggregate counters
-                            for key in aggregated_counters:
-                                aggregated_counters[key] += counters.get(key, 0)
-                            total_inserted += counters.get("inserted", 0)
-                            if counters.get("inserted", 0) > 0:
-                                print(f"[DiscoveryBot] Catch-all Insert: batch={len(batch)} inserted={counters.get('inserted', 0)} total={total_inserted}")
-                        except Exception as e:
-                            print(f"[DiscoveryBot] Catch-all Insert fout (batch={len(batch)}): {e}")
-                            aggregated_counters["failed"] += len(batch)
-
-                    processed_cells += 1
-
-                    # Progress reporting every 10 cells (more frequent)
-                    if i % 10 == 0:
-                        elapsed_time = time.time() - start_time
-                        print(f"[DiscoveryBot] {cat_key} (catch-all): {i}/{len(points)} cellen, totaal ingevoegd={total_inserted}, elapsed={elapsed_time:.1f}s")
-
-                    if total_units > 0:
-                        completed_units += 1
-                        await self._report_progress(completed_units, total_units)
-
-                    if self.cfg.max_total_inserts > 0 and total_inserted >= self.cfg.max_total_inserts:
-                        print(f"[DiscoveryBot] Max totaal inserts bereikt: {total_inserted}. Stoppen.")
-                        return aggregated_counters
-
-                    if self.cfg.inter_call_sleep_s:
-                        await asyncio.sleep(self.cfg.inter_call_sleep_s)
-                
                 # If circuit breaker triggered, break from outer category loop too
-                if circuit_breaker_triggered:
+                if state.circuit_breaker_triggered:
                     break
-                
+
                 # Skip normal osm_tags processing for catch-all categories
                 continue
 
+            if cat_key in union_tags:
+                # All union categories are handled in one pass, at the position of the first one
+                if union_done:
+                    continue
+                union_done = True
+
+                print(f"\n[DiscoveryBot] === union: {', '.join(union_tags)} ===  ({len(union_tags)} categorieën per Overpass query)")
+                union_overpass_calls = 0
+
+                async def union_search(cell_lat: float, cell_lng: float) -> List[Dict[str, Any]]:
+                    nonlocal union_overpass_calls
+                    places_by_category, cell_calls = await self.osm_service.search_nearby_multi_category(
+                        lat=cell_lat,
+                        lng=cell_lng,
+                        radius=self.cfg.nearby_radius_m,
+                        category_osm_tags=union_tags,
+                        max_results=self.cfg.max_per_cell_per_category,
+                        language=self.cfg.language,
+                    )
+                    union_overpass_calls += cell_calls
+                    # Categories in config order, so the first category that matched keeps the place
+                    return [
+                        map_place_to_row(p, union_cat)
+                        for union_cat, places in places_by_category.items()
+                        for p in places or []
+                    ]
+
+                processed_cells = await self._run_osm_pass(
+                    state, points, seen, union_search,
+                    label="union", insert_label="OSM Insert", units=len(union_tags),
+                )
+                if state.stopped:
+                    return aggregated_counters
+
+                logger.info(
+                    "discovery_union_pass_complete",
+                    categories=list(union_tags),
+                    cells=processed_cells,
+                    overpass_calls=union_overpass_calls,
+                    mirrors=self.osm_service.scheduler.stats() if self.osm_service.scheduler is not None else None,
+                )
+
+                # If circuit breaker triggered, break from outer category loop too
+                if state.circuit_breaker_triggered:
+                    break
+                continue
+
             # Get OSM tags for this category
             osm_tags_raw = cat_def.get("osm_tags")
             if not osm_tags_raw:
@@ -763,137 +987,206 @@ class DiscoveryBot:
             osm_tags = [osm_tags_raw]
 
             print(f"\n[DiscoveryBot] === {cat_key} ===  (osm_tags={osm_tags})")
-            processed_cells = 0
 
+            async def category_search(
+                cell_lat: float, cell_lng: float, cat_key: str = cat_key, osm_tags: List[Dict[str, Any]] = osm_tags
+            ) -> List[Dict[str, Any]]:
+                # Use OSM service with subdivision
+                places = await self.osm_service.search_nearby_with_subdivision(
+                    lat=cell_lat,
+                    lng=cell_lng,
+                    radius=self.cfg.nearby_radius_m,
+                    included_types=[cat_key],
+                    max_results=self.cfg.max_per_cell_per_category,
+                    language=self.cfg.language,
+                    category_osm_tags=[osm_tags]
+                )
+                return [map_place_to_row(p, cat_key) for p in places or []]
+
+            await self._run_osm_pass(
+                state, points, seen, category_search,
+                label=cat_key, insert_label="OSM Insert", units=1,
+            )
+            if state.stopped:
+                return aggregated_counters
+
+            # If circuit breaker triggered, break from outer category loop too
+            if state.circuit_breaker_triggered:
+                break
+
+        # Mark run as degraded if circuit breaker was triggered
+        if state.circuit_breaker_triggered:
+            aggregated_counters["degraded"] = True
+            aggregated_counters["overpass_failures"] = state.overpass_calls_failed
+            aggregated_counters["overpass_total_calls"] = state.overpass_calls_total
+            error_ratio = state.overpass_calls_failed / max(state.overpass_calls_total, 1)
+            print(f"[DiscoveryBot] Run completed in DEGRADED mode: {state.overpass_calls_failed}/{state.overpass_calls_total} Overpass calls failed ({error_ratio:.1%})")
+
+        return aggregated_counters
+
+    async def _run_osm_pass(
+        self,
+        state: _OsmRunState,
+        points: List[Tuple[float, float]],
+        seen: Set[str],
+        search: Callable[[float, float], Awaitable[List[Dict[str, Any]]]],
+        *,
+        label: str,
+        insert_label: str,
+        units: int,
+    ) -> int:
+        """
+        Query every cell of one OSM pass (a category, the union of categories or a
+        catch-all category) and ingest the new candidates; returns the number of
+        cells processed. Sets state.stopped on the safety timeout or max_total_inserts.
+
+        With the mirror scheduler the next cells are already in flight while one is
+        ingested; results are still consumed in grid order, so deduplication against
+        `seen` gives the same rows as a serial run.
+        """
+        lookahead = max(0, OVERPASS_SCHEDULER_MAX_INFLIGHT_CELLS - 1) if self.osm_service.scheduler is not None else 0
+        prefetched: Dict[int, asyncio.Task] = {}
+        processed_cells = 0
+
+        try:
             for i, (lat, lng) in enumerate(points, start=1):
                 # Check circuit breaker - stop making Overpass calls if error storm detected
-                if circuit_breaker_triggered:
+                if state.circuit_breaker_triggered:
                     print(f"[DiscoveryBot] Circuit breaker active: skipping remaining Overpass calls. Processing already-found results.")
-                    # Break from inner loop but continue outer loop to process remaining categories if needed
-                    # Actually, we should break from both loops since we're done with Overpass
                     break
-                
+
                 # Check safety timeout
-                elapsed_time = time.time() - start_time
-                if elapsed_time > safety_timeout_s:
+                elapsed_time = time.time() - state.start_time
+                if elapsed_time > state.safety_timeout_s:
                     print(f"[DiscoveryBot] Safety timeout bereikt ({elapsed_time:.1f}s). Stoppen om GitHub Actions timeout te voorkomen.")
-                    return aggregated_counters
-                
+                    state.stopped = True
+                    break
+
                 if self.cfg.max_cells_per_category > 0 and processed_cells >= self.cfg.max_cells_per_category:
-                    print(f"[DiscoveryBot] Max cellen voor {cat_key} bereikt: {processed_cells}")
+                    print(f"[DiscoveryBot] Max cellen voor {label} bereikt: {processed_cells}")
                     break
 
-                # Track Overpass call attempt
-                overpass_calls_total += 1
+                # Keep the next cells in flight
+                for j in range(i + 1, min(i + lookahead, len(points)) + 1):
+                    if j not in prefetched:
+                        prefetched[j] = asyncio.create_task(search(*points[j - 1]))
+
                 overpass_call_failed = False
-                
                 try:
-                    # Use OSM service with subdivision
-                    places = await self.osm_service.search_nearby_with_subdivision(
-                        lat=lat,
-                        lng=lng,
-                        radius=self.cfg.nearby_radius_m,
-                        included_types=[cat_key],
-                        max_results=self.cfg.max_per_cell_per_category,
-                        language=self.cfg.language,
-                        category_osm_tags=[osm_tags]
-                    )
+                    task = prefetched.pop(i, None)
+                    rows = await (task if task is not None else search(lat, lng))
                 except Exception as e:
                     import traceback
                     tb = traceback.format_exc(limit=5)
-                    print(f"[DiscoveryBot] {cat_key} @({lat:.5f},{lng:.5f}) OSM error: {type(e).__name__}: {e}")
+                    print(f"[DiscoveryBot] {label} @({lat:.5f},{lng:.5f}) OSM error: {type(e).__name__}: {e}")
                     print(f"[DiscoveryBot] Traceback: {tb}")
-                    places = []
+                    rows = []
                     overpass_call_failed = True
-                
-                # Track failures for circuit breaker
-                if overpass_call_failed:
-                    overpass_calls_failed += 1
-                    consecutive_failures += 1
-                else:
-                    consecutive_failures = 0  # Reset on success
-                
-                # Check circuit breaker thresholds
-                if overpass_calls_total > 0:
-                    error_ratio = overpass_calls_failed / overpass_calls_total
-                    
-                    if consecutive_failures >= DISCOVERY_MAX_CONSECUTIVE_OVERPASS_FAILURES:
-                        circuit_breaker_triggered = True
-                        logger.warning(
-                            "discovery_circuit_breaker_triggered",
-                            reason="consecutive_failures",
-                            consecutive_failures=consecutive_failures,
-                            threshold=DISCOVERY_MAX_CONSECUTIVE_OVERPASS_FAILURES,
-                            total_calls=overpass_calls_total,
-                            failed_calls=overpass_calls_failed
-                        )
-                        print(f"[DiscoveryBot] CIRCUIT BREAKER TRIGGERED: {consecutive_failures} consecutive Overpass failures (threshold: {DISCOVERY_MAX_CONSECUTIVE_OVERPASS_FAILURES})")
-                        print(f"[DiscoveryBot] Stopping Overpass calls to avoid overloading public servers. Processing already-found results.")
-                    elif error_ratio >= DISCOVERY_MAX_OVERPASS_ERROR_RATIO:
-                        circuit_breaker_triggered = True
-                        logger.warning(
-                            "discovery_circuit_breaker_triggered",
-                            reason="error_ratio",
-                            error_ratio=error_ratio,
-                            threshold=DISCOVERY_MAX_OVERPASS_ERROR_RATIO,
-                            total_calls=overpass_calls_total,
-                            failed_calls=overpass_calls_failed
-                        )
-                        print(f"[DiscoveryBot] CIRCUIT BREAKER TRIGGERED: Overpass error ratio {error_ratio:.1%} exceeds threshold {DISCOVERY_MAX_OVERPASS_ERROR_RATIO:.1%}")
-                        print(f"[DiscoveryBot] Stopping Overpass calls to avoid overloading public servers. Processing already-found results.")
 
                 batch: List[Dict[str, Any]] = []
-                for p in places or []:
-                    pid = p.get("id")
+                for row in rows:
+                    pid = row.get("place_id")
                     if not pid or pid in seen:
                         continue
                     seen.add(pid)
-                    batch.append(map_place_to_row(p, cat_key))
-
-                if batch:
-                    try:
-                        counters = await insert_candidates(batch)
-                        # Aggregate counters
-                        for key in aggregated_counters:
-                            aggregated_counters[key] += counters.get(key, 0)
-                        total_inserted += counters.get("inserted", 0)
-                        if counters.get("inserted", 0) > 0:
-                            print(f"[DiscoveryBot] OSM Insert: batch={len(batch)} inserted={counters.get('inserted', 0)} total={total_inserted}")
-                    except Exception as e:
-                        print(f"[DiscoveryBot] OSM Insert fout (batch={len(batch)}): {e}")
-                        aggregated_counters["failed"] += len(batch)
+                    batch.append(row)
 
                 processed_cells += 1
+                if await self._finish_cell(
+                    state, batch, failed=overpass_call_failed, label=label,
+                    insert_label=insert_label, cell=i, cells=len(points), units=units,
+                ):
+                    state.stopped = True
+                    break
+        finally:
+            for task in prefetched.values():
+                task.cancel()
+            await asyncio.gather(*prefetched.values(), return_exceptions=True)
 
-                # Progress reporting every 10 cells (more frequent)
-                if i % 10 == 0:
-                    elapsed_time = time.time() - start_time
-                    print(f"[DiscoveryBot] {cat_key}: {i}/{len(points)} cellen, totaal ingevoegd={total_inserted}, elapsed={elapsed_time:.1f}s")
+        return processed_cells
 
-                if total_units > 0:
-                    completed_units += 1
-                    await self._report_progress(completed_units, total_units)
+    async def _finish_cell(
+        self,
+        state: _OsmRunState,
+        batch: List[Dict[str, Any]],
+        *,
+        failed: bool,
+        label: str,
+        insert_label: str,
+        cell: int,
+        cells: int,
+        units: int,
+    ) -> bool:
+        """
+        Book-keeping after the Overpass query of one cell, shared by all OSM passes:
+        failure accounting and circuit breaker check, ingest of the new candidates,
+        progress reporting and the inter-call sleep.
+        Returns True when max_total_inserts is reached and the run should stop.
+        """
+        # Track failures for circuit breaker
+        state.overpass_calls_total += 1
+        if failed:
+            state.overpass_calls_failed += 1
+            state.consecutive_failures += 1
+        else:
+            state.consecutive_failures = 0  # Reset on success
+
+        # Check circuit breaker thresholds
+        error_ratio = state.overpass_calls_failed / state.overpass_calls_total
+        if state.consecutive_failures >= state.max_consecutive_failures:
+            state.circuit_breaker_triggered = True
+            logger.warning(
+                "discovery_circuit_breaker_triggered",
+                reason="consecutive_failures",
+                consecutive_failures=state.consecutive_failures,
+                threshold=state.max_consecutive_failures,
+                total_calls=state.overpass_calls_total,
+                failed_calls=state.overpass_calls_failed
+            )
+            print(f"[DiscoveryBot] CIRCUIT BREAKER TRIGGERED: {state.consecutive_failures} consecutive Overpass failures (threshold: {state.max_consecutive_failures})")
+            print(f"[DiscoveryBot] Stopping Overpass calls to avoid overloading public servers. Processing already-found results.")
+        elif error_ratio >= state.max_error_ratio:
+            state.circuit_breaker_triggered = True
+            logger.warning(
+                "discovery_circuit_breaker_triggered",
+                reason="error_ratio",
+                error_ratio=error_ratio,
+                threshold=state.max_error_ratio,
+                total_calls=state.overpass_calls_total,
+                failed_calls=state.overpass_calls_failed
+            )
+            print(f"[DiscoveryBot] CIRCUIT BREAKER TRIGGERED: Overpass error ratio {error_ratio:.1%} exceeds threshold {state.max_error_ratio:.1%}")
+            print(f"[DiscoveryBot] Stopping Overpass calls to avoid overloading public servers. Processing already-found results.")
 
-                if self.cfg.max_total_inserts > 0 and total_inserted >= self.cfg.max_total_inserts:
-                    print(f"[DiscoveryBot] Max totaal inserts bereikt: {total_inserted}. Stoppen.")
-                    return aggregated_counters
+        if batch:
+            try:
+                counters = await ingest_candidates(batch)
+                # Aggregate counters
+                for key in state.counters:
+                    state.counters[key] += counters.get(key, 0)
+                state.total_inserted += counters.get("inserted", 0)
+                if counters.get("inserted", 0) > 0:
+                    print(f"[DiscoveryBot] {insert_label}: batch={len(batch)} inserted={counters.get('inserted', 0)} total={state.total_inserted}")
+            except Exception as e:
+                print(f"[DiscoveryBot] {insert_label} fout (batch={len(batch)}): {e}")
+                state.counters["failed"] += len(batch)
 
-                if self.cfg.inter_call_sleep_s:
-                    await asyncio.sleep(self.cfg.inter_call_sleep_s)
-            
-            # If circuit breaker triggered, break from outer category loop too
-            if circuit_breaker_triggered:
-                break
+        # Progress reporting every 10 cells (more frequent)
+        if cell % 10 == 0:
+            elapsed_time = time.time() - state.start_time
+            print(f"[DiscoveryBot] {label}: {cell}/{cells} cellen, totaal ingevoegd={state.total_inserted}, elapsed={elapsed_time:.1f}s")
 
-        # Mark run as degraded if circuit breaker was triggered
-        if circuit_breaker_triggered:
-            aggregated_counters["degraded"] = True
-            aggregated_counters["overpass_failures"] = overpass_calls_failed
-            aggregated_counters["overpass_total_calls"] = overpass_calls_total
-            error_ratio = overpass_calls_failed / max(overpass_calls_total, 1)
-            print(f"[DiscoveryBot] Run completed in DEGRADED mode: {overpass_calls_failed}/{overpass_calls_total} Overpass calls failed ({error_ratio:.1%})")
-        
-        return aggregated_counters
+        if state.total_units > 0:
+            state.completed_units += units
+            await self._report_progress(min(state.completed_units, state.total_units), state.total_units)
+
+        if self.cfg.max_total_inserts > 0 and state.total_inserted >= self.cfg.max_total_inserts:
+            print(f"[DiscoveryBot] Max totaal inserts bereikt: {state.total_inserted}. Stoppen.")
+            return True
+
+        if self.cfg.inter_call_sleep_s:
+            await asyncio.sleep(self.cfg.inter_call_sleep_s)
+        return False
 
     async def _report_progress(self, completed: int, total: int) -> None:
         if not self.worker_run_id or total <= 0:
@@ -977,6 +1270,8 @@ def parse_args() -> argparse.Namespace:
     ap.add_argument("--chunk-index", type=int, default=0, help="Welke chunk index (0-based)")
     ap.add_argument("--language", help="API-taal, bv. nl")
     ap.add_argument("--worker-run-id", type=_parse_worker_run_id, help="UUID van worker_runs record voor progress rapportage")
+    ap.add_argument("--osm-mode", choices=["union", "per_category"], help="Overpass queries: één union per cel of één per categorie per cel (default: DISCOVERY_OSM_MODE)")
+    ap.add_argument("--osm-extract", help="Lokaal OSM extract (.osm.pbf, .json of .jsonl[.gz]) i.p.v. Overpass (default: DISCOVERY_PROVIDER/OSM_EXTRACT_PATH)")
     return ap.parse_args()
 
 def build_config(ns: argparse.Namespace, yml: Dict[str, Any]) -> DiscoveryConfig:
@@ -1056,13 +1351,16 @@ def build_config(ns: argparse.Namespace, yml: Dict[str, Any]) -> DiscoveryConfig
         "nearby_radius_m": ns.nearby_radius_m if ns.nearby_radius_m is not None else int(disc_def.get("nearby_radius_m", 1000)),
         "grid_span_km": ns.grid_span_km if ns.grid_span_km is not None else float(disc_def.get("grid_span_km", auto_span_km)),
         "max_per_cell_per_category": ns.max_per_cell_per_category if ns.max_per_cell_per_category is not None else int(disc_def.get("max_per_cell_per_category", 20)),
-        "inter_call_sleep_s": ns.inter_call_sleep_s if ns.inter_call_sleep_s is not None else 0.15,
+        # No politeness sleep needed when reading a local extract
+        "inter_call_sleep_s": ns.inter_call_sleep_s if ns.inter_call_sleep_s is not None else (0.0 if getattr(ns, "osm_extract", None) else 0.15),
         "max_total_inserts": ns.max_total_inserts or 0,
         "max_cells_per_category": ns.max_cells_per_category or 0,
         "chunks": ns.chunks or 1,
         "chunk_index": ns.chunk_index or 0,
         "language": ns.language or yaml_lang or None,
         "district": district,
+        "osm_mode": getattr(ns, "osm_mode", None) or DISCOVERY_OSM_MODE,
+        "osm_extract": getattr(ns, "osm_extract", None),
     }
     return DiscoveryConfig(**cfg)
 
@@ -15,13 +15,16 @@ from app.models.event_sources import EventSource
 from app.models.event_extraction import ExtractedEvent, ExtractedEventsPayload
 from app.models.event_raw import EventRawCreate
 from app.workers.event_scraper_bot import EventScraperService
+from services.ai_response_cache import set_ai_cache_bypass
 from services.event_extraction_service import EventExtractionService
 from services.event_pages_raw_service import (
     fetch_pending_event_pages,
     update_event_page_processing_state,
+    update_event_page_reduced_body,
 )
 from services.event_raw_service import insert_event_raw, update_event_raw_from_detail_page
 from services.event_sources_service import get_event_source
+from services.html_reduction_service import REDUCER_VERSION, chunk_reduced_text, reduce_html
 from services.db_service import fetchrow
 from services.worker_runs_service import (
     finish_worker_run,
@@ -71,7 +74,12 @@ def parse_args() -> argparse.Namespace:
         "--chunk-size",
         type=int,
         default=DEFAULT_CHUNK_SIZE,
-        help="Max characters per HTML chunk sent to OpenAI (default: 16000).",
+        help="Max characters per chunk sent to OpenAI (default: 16000).",
+    )
+    parser.add_argument(
+        "--raw-html",
+        action="store_true",
+        help="Send raw HTML chunks instead of the reduced page text.",
     )
     parser.add_argument(
         "--model",
@@ -85,6 +93,11 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Existing worker_runs UUID (optional).",
     )
+    parser.add_argument(
+        "--no-ai-cache",
+        action="store_true",
+        help="Bypass the AI response cache (always call OpenAI, don't store results).",
+    )
     return parser.parse_args()
 
 
@@ -97,6 +110,30 @@ def _chunk_html(body: str, chunk_size: int) -> List[str]:
     return [text[i : i + chunk_size] for i in range(0, len(text), chunk_size)]
 
 
+async def _page_chunks(page: EventPageRaw, chunk_size: int, raw_html: bool) -> Tuple[List[str], str]:
+    """
+    Chunks to send for a page and their content format ('reduced' or 'html').
+
+    The reduced text is cached on the page row; pages without a cached copy of the
+    current REDUCER_VERSION are reduced here and stored.
+    """
+    if raw_html:
+        return _chunk_html(page.response_body, chunk_size), "html"
+    reduced = page.reduced_body if page.reduced_version == REDUCER_VERSION else None
+    if reduced is None:
+        reduced = reduce_html(page.response_body, page_url=page.page_url)
+        try:
+            await update_event_page_reduced_body(page.id, reduced, REDUCER_VERSION)
+        except Exception as exc:
+            logger.warning("event_ai_extractor_reduced_cache_failed", page_id=page.id, error=str(exc))
+    chunks = chunk_reduced_text(reduced, chunk_size)
+    if not chunks:
+        # No page content survived reduction (reduce_html returns "" even when a title,
+        # meta or JSON-LD is left, e.g. a JS-rendered shell): send the raw HTML
+        return _chunk_html(page.response_body, chunk_size), "html"
+    return chunks, "reduced"
+
+
 async def _get_source_cached(
     source_id: int,
     cache: Dict[int, EventSource],
@@ -216,6 +253,7 @@ async def _fetch_and_extract_detail_page(
     extraction_service: EventExtractionService,
     source: EventSource,
     event_raw_id: Optional[int] = None,
+    raw_html: bool = False,
 ) -> Optional[ExtractedEvent]:
     """
     Fetch a detail page and extract event data from it.
@@ -249,6 +287,11 @@ async def _fetch_and_extract_detail_page(
             response = await client.get(absolute_url)
             response.raise_for_status()
             html = response.text
+            content_format = "html"
+            if not raw_html:
+                reduced = reduce_html(html, page_url=str(response.url))
+                if reduced:
+                    html, content_format = reduced, "reduced"
 
             # Extract event data from detail page
             payload, _meta = extraction_service.extract_events_from_html(
@@ -256,6 +299,7 @@ async def _fetch_and_extract_detail_page(
                 source_key=source.key,
                 page_url=absolute_url,
                 event_source_id=source.id,
+                content_format=content_format,
             )
 
             # Take the first event (detail pages usually have one event)
@@ -280,6 +324,7 @@ async def _enrich_events_with_detail_pages(
     source: EventSource,
     counters: Dict[str, int],
     event_raw_ids: Dict[Tuple[str, str], int],  # Maps (title_lower, event_url_lower) -> event_raw_id
+    raw_html: bool = False,
 ) -> None:
     """
     For events that have event_url, fetch detail pages if:
@@ -310,6 +355,7 @@ async def _enrich_events_with_detail_pages(
             event.event_url,
             extraction_service=extraction_service,
             source=source,
+            raw_html=raw_html,
         )
 
         if not detail_event:
@@ -394,6 +440,7 @@ async def _process_page(
     extraction_service: EventExtractionService,
     source_cache: Dict[int, EventSource],
     counters: Dict[str, int],
+    raw_html: bool = False,
 ) -> None:
     source = await _get_source_cached(page.event_source_id, source_cache)
     if source is None:
@@ -410,7 +457,7 @@ async def _process_page(
         )
         return
 
-    chunks = _chunk_html(page.response_body, chunk_size)
+    chunks, content_format = await _page_chunks(page, chunk_size, raw_html)
     if not chunks:
         await update_event_page_processing_state(
             page.id,
@@ -428,6 +475,7 @@ async def _process_page(
                 source_key=source.key,
                 page_url=page.page_url,
                 event_source_id=page.event_source_id,
+                content_format=content_format,
             )
         except Exception as exc:
             await update_event_page_processing_state(
@@ -443,6 +491,7 @@ async def _process_page(
                 error=str(exc),
             )
             return
+        counters["chunks_sent"] += 1
         extracted_events.extend(payload.events)
 
     deduped = _dedupe_events(extracted_events)
@@ -464,6 +513,7 @@ async def _process_page(
             "source_page_id": page.id,
             "source_page_url": page.page_url,
             "chunk_count": len(chunks),
+            "content_format": content_format,
             "extracted_event": event.model_dump(mode="json"),
         }
         raw = EventRawCreate(
@@ -519,6 +569,7 @@ async def _process_page(
         source=source,
         counters=counters,
         event_raw_ids=event_raw_ids,
+        raw_html=raw_html,
     )
 
     await update_event_page_processing_state(page.id, state="extracted", errors=None)
@@ -537,6 +588,7 @@ async def run_extractor(
     chunk_size: int,
     model: Optional[str],
     worker_run_id: Optional[UUID],
+    raw_html: bool = False,
 ) -> int:
     run_id = worker_run_id or await start_worker_run(bot="event_ai_extractor", city=None, category=None)
     await mark_worker_run_running(run_id)
@@ -547,6 +599,7 @@ async def run_extractor(
         "pages_fetched": 0,
         "pages_processed": 0,
         "pages_failed": 0,
+        "chunks_sent": 0,
         "events_extracted_total": 0,
         "events_created_new": 0,
         "events_skipped_existing": 0,
@@ -578,6 +631,7 @@ async def run_extractor(
                 extraction_service=extraction_service,
                 source_cache=source_cache,
                 counters=counters,
+                raw_html=raw_html,
             )
 
         await finish_worker_run(run_id, "finished", 100, counters, None)
@@ -590,12 +644,14 @@ async def run_extractor(
 
 async def main_async() -> int:
     args = parse_args()
+    set_ai_cache_bypass(args.no_ai_cache)
     with with_run_id():
         return await run_extractor(
             limit=args.limit,
             chunk_size=max(1, args.chunk_size),
             model=args.model,
             worker_run_id=args.worker_run_id,
+            raw_html=args.raw_html,
         )
 
 
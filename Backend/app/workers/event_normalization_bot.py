@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import argparse
 import asyncio
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 from app.core.logging import configure_logging, get_logger
@@ -10,7 +10,7 @@ from app.core.request_id import with_run_id
 from app.models.event_raw import EventRaw
 from app.models.event_sources import EventSource
 from services.event_candidate_service import insert_event_candidate
-from services.event_dedupe_service import run_dedupe
+from services.event_dedupe_service import run_dedupe_batch
 from services.event_normalization_service import (
     EventNormalizationError,
     normalize_event,
@@ -73,6 +73,7 @@ async def _process_raw_event(
     raw: EventRaw,
     source_cache: Dict[int, EventSource],
     counters: Dict[str, int],
+    new_candidate_ids: List[int],
 ) -> None:
     source = await _get_source_cached(raw.event_source_id, source_cache)
     if source is None:
@@ -123,21 +124,7 @@ async def _process_raw_event(
     counters["normalized"] += 1
     if new_candidate_id is not None:
         counters["dedupe_checked"] += 1
-        try:
-            result = await run_dedupe(new_candidate_id)
-        except Exception as exc:  # pragma: no cover - defensive logging
-            counters["dedupe_errors"] += 1
-            logger.error(
-                "event_dedupe_failed",
-                event_raw_id=raw.id,
-                candidate_id=new_candidate_id,
-                error=str(exc),
-            )
-        else:
-            if result.duplicate_of_id:
-                counters["dedupe_marked_duplicate"] += 1
-            else:
-                counters["dedupe_canonical"] += 1
+        new_candidate_ids.append(new_candidate_id)
     logger.info(
         "event_normalized",
         event_raw_id=raw.id,
@@ -146,6 +133,27 @@ async def _process_raw_event(
     )
 
 
+async def _dedupe_new_candidates(candidate_ids: List[int], counters: Dict[str, int]) -> None:
+    """Dedupe this run's inserted candidates in one batch (one pass, one write)."""
+    if not candidate_ids:
+        return
+    try:
+        results = await run_dedupe_batch(candidate_ids)
+    except Exception as exc:  # pragma: no cover - defensive logging
+        counters["dedupe_errors"] += len(candidate_ids)
+        logger.error(
+            "event_dedupe_failed",
+            candidate_count=len(candidate_ids),
+            error=str(exc),
+        )
+        return
+    for result in results:
+        if result.duplicate_of_id:
+            counters["dedupe_marked_duplicate"] += 1
+        else:
+            counters["dedupe_canonical"] += 1
+
+
 async def run_normalization(limit: int, worker_run_id: Optional[UUID]) -> int:
     run_id = worker_run_id or await start_worker_run(bot="event_normalization", city=None, category=None)
     await mark_worker_run_running(run_id)
@@ -173,10 +181,15 @@ async def run_normalization(limit: int, worker_run_id: Optional[UUID]) -> int:
             return 0
 
         source_cache: Dict[int, EventSource] = {}
-        for idx, raw in enumerate(pending, start=1):
-            progress = 5 + int(idx * 95 / max(total, 1))
-            await update_worker_run_progress(run_id, min(progress, 99))
-            await _process_raw_event(raw, source_cache, counters)
+        new_candidate_ids: List[int] = []
+        try:
+            for idx, raw in enumerate(pending, start=1):
+                progress = 5 + int(idx * 95 / max(total, 1))
+                await update_worker_run_progress(run_id, min(progress, 99))
+                await _process_raw_event(raw, source_cache, counters, new_candidate_ids)
+        finally:
+            # Candidates inserted before a failure are deduped as well
+            await _dedupe_new_candidates(new_candidate_ids, counters)
 
         await finish_worker_run(run_id, "finished", 100, counters, None)
         logger.info(
@@ -4,7 +4,7 @@ import argparse
 import asyncio
 import hashlib
 import json
-from typing import Dict, List, Optional, Sequence
+from typing import Dict, List, Optional, Sequence, Tuple
 from uuid import UUID
 
 from app.core.logging import configure_logging, get_logger
@@ -12,11 +12,14 @@ from app.core.request_id import with_run_id
 from app.models.news_extraction import ExtractedNewsItem
 from app.models.news_pages_raw import NewsPageRaw
 from app.models.news_sources import NewsSource, get_all_news_sources
+from services.ai_response_cache import set_ai_cache_bypass
 from services.db_service import execute
+from services.html_reduction_service import REDUCER_VERSION, chunk_reduced_text, reduce_html
 from services.news_extraction_service import NewsExtractionService
 from services.news_pages_raw_service import (
     fetch_pending_news_pages,
     update_news_page_processing_state,
+    update_news_page_reduced_body,
 )
 from services.worker_runs_service import (
     finish_worker_run,
@@ -53,7 +56,12 @@ def parse_args() -> argparse.Namespace:
         "--chunk-size",
         type=int,
         default=DEFAULT_CHUNK_SIZE,
-        help="Max characters per HTML chunk sent to OpenAI (default: 16000).",
+        help="Max characters per chunk sent to OpenAI (default: 16000).",
+    )
+    parser.add_argument(
+        "--raw-html",
+        action="store_true",
+        help="Send raw HTML chunks instead of the reduced page text.",
     )
     parser.add_argument(
         "--model",
@@ -67,6 +75,11 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Existing worker_runs UUID (optional).",
     )
+    parser.add_argument(
+        "--no-ai-cache",
+        action="store_true",
+        help="Bypass the AI response cache (always call OpenAI, don't store results).",
+    )
     return parser.parse_args()
 
 
@@ -80,6 +93,30 @@ def _chunk_html(body: str, chunk_size: int) -> List[str]:
     return [text[i : i + chunk_size] for i in range(0, len(text), chunk_size)]
 
 
+async def _page_chunks(page: NewsPageRaw, chunk_size: int, raw_html: bool) -> Tuple[List[str], str]:
+    """
+    Chunks to send for a page and their content format ('reduced' or 'html').
+
+    Uses the reduced text cached on the page row, reducing and storing it when
+    missing or produced by an older REDUCER_VERSION.
+    """
+    if raw_html:
+        return _chunk_html(page.response_body, chunk_size), "html"
+    reduced = page.reduced_body if page.reduced_version == REDUCER_VERSION else None
+    if reduced is None:
+        reduced = reduce_html(page.response_body, page_url=page.page_url)
+        try:
+            await update_news_page_reduced_body(page.id, reduced, REDUCER_VERSION)
+        except Exception as exc:
+            logger.warning("news_ai_extractor_reduced_cache_failed", page_id=page.id, error=str(exc))
+    chunks = chunk_reduced_text(reduced, chunk_size)
+    if not chunks:
+        # No page content survived reduction (reduce_html returns "" even when a title,
+        # meta or JSON-LD is left, e.g. a JS-rendered shell): send the raw HTML
+        return _chunk_html(page.response_body, chunk_size), "html"
+    return chunks, "reduced"
+
+
 def _get_source_by_key_cached(
     source_key: str,
     cache: Dict[str, NewsSource],
@@ -207,6 +244,7 @@ async def _process_page(
     extraction_service: NewsExtractionService,
     source_cache: Dict[str, NewsSource],
     counters: Dict[str, int],
+    raw_html: bool = False,
 ) -> None:
     """Process a single news page for AI extraction."""
     source = _get_source_by_key_cached(page.news_source_key, source_cache)
@@ -224,7 +262,7 @@ async def _process_page(
         )
         return
 
-    chunks = _chunk_html(page.response_body, chunk_size)
+    chunks, content_format = await _page_chunks(page, chunk_size, raw_html)
     if not chunks:
         await update_news_page_processing_state(
             page.id,
@@ -243,6 +281,7 @@ async def _process_page(
                 source_key=source.key,
                 page_url=page.page_url,
                 scrape_timestamp=page.fetched_at,
+                content_format=content_format,
             )
         except Exception as exc:
             await update_news_page_processing_state(
@@ -258,6 +297,7 @@ async def _process_page(
                 error=str(exc),
             )
             return
+        counters["chunks_sent"] += 1
         
         # Validate and fix dates for each extracted article
         validated_articles = []
@@ -328,6 +368,7 @@ async def run_extractor(
     chunk_size: int,
     model: Optional[str],
     worker_run_id: Optional[UUID],
+    raw_html: bool = False,
 ) -> int:
     """Run the news AI extractor bot."""
     run_id = worker_run_id or await start_worker_run(
@@ -341,6 +382,7 @@ async def run_extractor(
         "pages_fetched": 0,
         "pages_processed": 0,
         "pages_failed": 0,
+        "chunks_sent": 0,
         "articles_extracted_total": 0,
         "articles_created_new": 0,
         "articles_skipped_existing": 0,
@@ -365,6 +407,7 @@ async def run_extractor(
                 extraction_service=extraction_service,
                 source_cache=source_cache,
                 counters=counters,
+                raw_html=raw_html,
             )
 
         await finish_worker_run(run_id, "finished", 100, counters, None)
@@ -377,12 +420,14 @@ async def run_extractor(
 
 async def main_async() -> int:
     args = parse_args()
+    set_ai_cache_bypass(args.no_ai_cache)
     with with_run_id():
         return await run_extractor(
             limit=args.limit,
             chunk_size=max(1, args.chunk_size),
             model=args.model,
             worker_run_id=args.worker_run_id,
+            raw_html=args.raw_html,
         )
 
 
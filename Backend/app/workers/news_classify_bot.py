@@ -8,6 +8,7 @@ from uuid import UUID
 
 from app.core.logging import configure_logging, get_logger
 from app.core.request_id import with_run_id
+from services.ai_response_cache import set_ai_cache_bypass
 from services.db_service import execute, fetch
 from services.news_classification_service import NewsClassificationResult, NewsClassificationService
 from services.news_location_tagging import derive_location_tag
@@ -42,6 +43,11 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Existing worker_runs UUID (optional).",
     )
+    parser.add_argument(
+        "--no-ai-cache",
+        action="store_true",
+        help="Bypass the AI response cache (always call OpenAI, don't store results).",
+    )
     return parser.parse_args()
 
 
@@ -292,6 +298,7 @@ async def run_classify(limit: int, model: Optional[str], worker_run_id: Optional
 
 async def main_async() -> int:
     args = parse_args()
+    set_ai_cache_bypass(args.no_ai_cache)
     with with_run_id():
         return await run_classify(limit=args.limit, model=args.model, worker_run_id=args.worker_run_id)
 
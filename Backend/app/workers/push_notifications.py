@@ -25,7 +25,7 @@ if str(BACKEND_DIR) not in sys.path:
 from app.core.logging import configure_logging, get_logger
 from app.core.request_id import with_run_id
 from services.db_service import init_db_pool, fetch
-from services.push_service import get_push_service
+from services.push_service import PushMessage, get_push_service
 from services.worker_runs_service import (
     start_worker_run,
     mark_worker_run_running,
@@ -61,22 +61,20 @@ async def send_poll_notifications() -> Dict[str, Any]:
     """
     users = await fetch(users_sql)
     
-    push_service = get_push_service()
-    total_sent = 0
-    total_failed = 0
-    
-    for poll in polls:
-        for user_row in users:
-            user_id = user_row["user_id"]
-            result = await push_service.send_notification(
-                user_id=str(user_id),
-                notification_type="poll",
-                title="New Poll Available",
-                body=poll["question"][:100],  # Truncate if too long
-                data={"poll_id": poll["id"], "type": "poll"},
-            )
-            total_sent += result.get("sent", 0)
-            total_failed += result.get("failed", 0)
+    messages = [
+        PushMessage(
+            user_id=str(user_row["user_id"]),
+            notification_type="poll",
+            title="New Poll Available",
+            body=poll["question"][:100],  # Truncate if too long
+            data={"poll_id": poll["id"], "type": "poll"},
+        )
+        for poll in polls
+        for user_row in users
+    ]
+    result = await get_push_service().send_notifications(messages)
+    total_sent = result["sent"]
+    total_failed = result["failed"]
     
     return {"sent": total_sent, "failed": total_failed, "polls": len(polls)}
 
@@ -110,22 +108,19 @@ async def send_trending_notifications() -> Dict[str, Any]:
     """
     users = await fetch(users_sql, trending_location_ids)
     
-    push_service = get_push_service()
-    total_sent = 0
-    total_failed = 0
-    
-    for user_row in users:
-        user_id = user_row["user_id"]
-        location_name = user_row["location_name"]
-        result = await push_service.send_notification(
-            user_id=str(user_id),
+    messages = [
+        PushMessage(
+            user_id=str(user_row["user_id"]),
             notification_type="trending",
             title="Location is Trending!",
-            body=f"{location_name} is now trending",
+            body=f"{user_row['location_name']} is now trending",
             data={"location_id": user_row["location_id"], "type": "trending"},
         )
-        total_sent += result.get("sent", 0)
-        total_failed += result.get("failed", 0)
+        for user_row in users
+    ]
+    result = await get_push_service().send_notifications(messages)
+    total_sent = result["sent"]
+    total_failed = result["failed"]
     
     return {"sent": total_sent, "failed": total_failed, "users_notified": len(users)}
 
@@ -153,29 +148,23 @@ async def send_activity_notifications() -> Dict[str, Any]:
     if not activities:
         return {"sent": 0, "failed": 0, "skipped": 1, "reason": "no_recent_activity"}
     
-    push_service = get_push_service()
-    total_sent = 0
-    total_failed = 0
-    
-    for activity in activities:
-        user_id = activity["user_id"]
-        activity_type = activity["activity_type"]
-        location_name = activity["location_name"]
-        
-        title_map = {
-            "reaction": "New Reaction",
-            "note": "New Note",
-        }
-        
-        result = await push_service.send_notification(
-            user_id=str(user_id),
+    title_map = {
+        "reaction": "New Reaction",
+        "note": "New Note",
+    }
+    messages = [
+        PushMessage(
+            user_id=str(activity["user_id"]),
             notification_type="activity",
-            title=title_map.get(activity_type, "New Activity"),
-            body=f"Activity on {location_name}",
-            data={"activity_type": activity_type, "location_name": location_name},
+            title=title_map.get(activity["activity_type"], "New Activity"),
+            body=f"Activity on {activity['location_name']}",
+            data={"activity_type": activity["activity_type"], "location_name": activity["location_name"]},
         )
-        total_sent += result.get("sent", 0)
-        total_failed += result.get("failed", 0)
+        for activity in activities
+    ]
+    result = await get_push_service().send_notifications(messages)
+    total_sent = result["sent"]
+    total_failed = result["failed"]
     
     return {"sent": total_sent, "failed": total_failed, "activities": len(activities)}
 
@@ -0,0 +1,122 @@
+# Backend/app/workers/reaction_counters_reconcile_worker.py
+"""
+Reaction Counters Reconcile Worker
+
+Rebuilds reaction_counters from news_reactions, event_reactions, activity_reactions
+and shared_link_reactions. The toggle endpoints keep the counters in step; this
+corrects drift from reaction rows written or deleted elsewhere (seed scripts,
+cascaded deletes, manual fixes).
+Runs daily via scheduled cron job.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from pathlib import Path
+import sys
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+# Path setup
+THIS_FILE = Path(__file__).resolve()
+APP_DIR = THIS_FILE.parent.parent
+BACKEND_DIR = APP_DIR.parent
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.core.logging import configure_logging, get_logger
+from app.core.request_id import with_run_id
+from services.db_service import init_db_pool
+from services.reaction_counter_service import REACTION_SOURCES, reconcile_reaction_counters
+from services.worker_runs_service import (
+    start_worker_run,
+    mark_worker_run_running,
+    finish_worker_run,
+)
+
+configure_logging(service_name="worker")
+logger = get_logger()
+logger = logger.bind(worker="reaction_counters_reconcile")
+
+
+async def run_reconcile_worker(
+    worker_run_id: Optional[UUID] = None,
+    entity_types: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Main worker function to reconcile reaction counters.
+    """
+    if worker_run_id:
+        await mark_worker_run_running(worker_run_id)
+
+    await init_db_pool()
+
+    result = await reconcile_reaction_counters(entity_types)
+
+    logger.info(
+        "reaction_counters_reconcile_completed",
+        corrected=sum(stats["corrected"] for stats in result.values()),
+        removed=sum(stats["removed"] for stats in result.values()),
+        by_entity=result,
+    )
+
+    if worker_run_id:
+        await finish_worker_run(
+            worker_run_id,
+            is_success=True,
+            result=result,
+        )
+
+    return result
+
+
+async def main(worker_run_id: Optional[UUID] = None) -> None:
+    """
+    CLI entry point for reaction counters reconcile worker.
+    """
+    with with_run_id():
+        parser = argparse.ArgumentParser(description="Reaction Counters Reconcile Worker")
+        parser.add_argument(
+            "--worker-run-id",
+            type=str,
+            help="Optional worker run ID for tracking",
+        )
+        parser.add_argument(
+            "--entity-type",
+            action="append",
+            choices=sorted(REACTION_SOURCES),
+            help="Only reconcile this entity type (repeatable; default: all)",
+        )
+        args = parser.parse_args()
+
+        run_id = worker_run_id or (UUID(args.worker_run_id) if args.worker_run_id else None)
+
+        if not run_id:
+            run_id = await start_worker_run(
+                bot="reaction_counters_reconcile",
+                city=None,
+                category=None,
+            )
+
+        try:
+            result = await run_reconcile_worker(worker_run_id=run_id, entity_types=args.entity_type)
+            logger.info("reaction_counters_reconcile_worker_finished", result=result)
+        except Exception as exc:
+            logger.error(
+                "reaction_counters_reconcile_worker_failed",
+                error=str(exc),
+                exc_info=True,
+            )
+            if run_id:
+                await finish_worker_run(
+                    run_id,
+                    is_success=False,
+                    error_message=str(exc),
+                )
+            raise
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -50,6 +50,7 @@ logger = logger.bind(worker="reclassify_other")
 # ---------------------------------------------------------------------------
 # DB (asyncpg helpers)
 # ---------------------------------------------------------------------------
+from services.ai_response_cache import set_ai_cache_bypass
 from services.db_service import (
     init_db_pool,
     fetch,
@@ -376,6 +377,7 @@ def parse_args() -> argparse.Namespace:
     ap.add_argument("--source", help="Filter by source (e.g., OSM_OVERPASS, GOOGLE_PLACES)")
     ap.add_argument("--state", help="Filter by state (e.g., CANDIDATE, PENDING_VERIFICATION, VERIFIED)")
     ap.add_argument("--worker-run-id", type=_parse_worker_run_id, help="UUID van worker_runs record voor progress rapportage")
+    ap.add_argument("--no-ai-cache", action="store_true", help="AI response cache overslaan (altijd OpenAI aanroepen)")
     return ap.parse_args()
 
 
@@ -384,6 +386,7 @@ async def main_async():
     with with_run_id() as rid:
         logger.info("worker_started")
         args = parse_args()
+        set_ai_cache_bypass(args.no_ai_cache)
         worker_run_id: Optional[UUID] = getattr(args, "worker_run_id", None)
         
         print(f"\n[ReclassifyOtherBot] Configuration:")
@@ -12,9 +12,8 @@ from __future__ import annotations
 import argparse
 import asyncio
 import math
-import json
-from datetime import datetime, timedelta
-from typing import Dict, Any, List
+import time
+from typing import Dict, Any, List, Sequence, Tuple
 from pathlib import Path
 import sys
 
@@ -28,8 +27,9 @@ if str(BACKEND_DIR) not in sys.path:
 
 from app.core.logging import configure_logging, get_logger
 from app.core.request_id import with_run_id
-from services.db_service import init_db_pool, fetch, execute
-from services.cities_config_service import get_city_key_from_coords
+from services.db_service import init_db_pool, fetch, run_in_transaction, execute_with_conn
+from services.cities_config_service import get_city_districts_from_coords_batch
+from services.city_geo_index import refresh_city_geo_index
 from services.worker_runs_service import (
     start_worker_run,
     mark_worker_run_running,
@@ -71,181 +71,291 @@ def calculate_trending_score(
     return base_score * decay_factor
 
 
-async def calculate_trending_for_window(
-    city_key: str,
+WINDOW_HOURS: Dict[str, float] = {
+    '5m': 5/60,
+    '1h': 1.0,
+    '24h': 24.0,
+    '7d': 168.0,
+}
+
+# One pass over the activity tables for every requested window.
+# Each source table is pre-aggregated per (location, window) before joining, which
+# avoids the check_ins x reactions x notes cross product of the old per-window query.
+# oldest_at = COALESCE(min check-in, min reaction, min note) keeps the old semantics of
+# MIN(COALESCE(ci.created_at, lr.created_at, ln.created_at)) over the joined rows.
+ACTIVITY_ALL_WINDOWS_SQL = """
+    WITH w AS (
+        SELECT idx::int AS idx, now() - make_interval(secs => h * 3600) AS since
+        FROM unnest($2::float8[]) WITH ORDINALITY AS t(h, idx)
+    ),
+    ci AS (
+        SELECT c.location_id, w.idx, COUNT(*) AS n, MIN(c.created_at) AS oldest_at
+        FROM check_ins c
+        JOIN w ON c.created_at >= w.since
+        WHERE c.created_at >= (SELECT MIN(since) FROM w)
+        GROUP BY c.location_id, w.idx
+    ),
+    lr AS (
+        SELECT r.location_id, w.idx, COUNT(*) AS n, MIN(r.created_at) AS oldest_at
+        FROM location_reactions r
+        JOIN w ON r.created_at >= w.since
+        WHERE r.created_at >= (SELECT MIN(since) FROM w)
+        GROUP BY r.location_id, w.idx
+    ),
+    ln AS (
+        SELECT n.location_id, w.idx, COUNT(*) AS n, MIN(n.created_at) AS oldest_at
+        FROM location_notes n
+        JOIN w ON n.created_at >= w.since
+        WHERE n.created_at >= (SELECT MIN(since) FROM w)
+        GROUP BY n.location_id, w.idx
+    ),
+    act AS (
+        SELECT location_id, idx FROM ci
+        UNION
+        SELECT location_id, idx FROM lr
+        UNION
+        SELECT location_id, idx FROM ln
+    )
+    SELECT
+        act.idx AS window_idx,
+        l.id AS location_id,
+        l.lat,
+        l.lng,
+        l.category,
+        COALESCE(ci.n, 0) AS check_ins_count,
+        COALESCE(lr.n, 0) AS reactions_count,
+        COALESCE(ln.n, 0) AS notes_count,
+        EXTRACT(EPOCH FROM (now() - COALESCE(ci.oldest_at, lr.oldest_at, ln.oldest_at))) / 3600.0 AS oldest_age_hours
+    FROM act
+    JOIN locations l ON l.id = act.location_id
+    LEFT JOIN ci ON ci.location_id = act.location_id AND ci.idx = act.idx
+    LEFT JOIN lr ON lr.location_id = act.location_id AND lr.idx = act.idx
+    LEFT JOIN ln ON ln.location_id = act.location_id AND ln.idx = act.idx
+    WHERE l.state = 'VERIFIED'
+      AND ($1::text IS NULL OR l.category = $1)
+"""
+
+# Single set-based upsert per window; raw_counts is built server-side.
+BULK_UPSERT_TRENDING_SQL = """
+    INSERT INTO trending_locations
+    (location_id, city_key, category_key, "window", score, rank, check_ins_count, reactions_count, notes_count, raw_counts, updated_at)
+    SELECT
+        t.location_id, t.city_key, t.category_key, $1, t.score, t.rank,
+        t.check_ins_count, t.reactions_count, t.notes_count,
+        jsonb_build_object('check_ins', t.check_ins_count, 'reactions', t.reactions_count, 'notes', t.notes_count),
+        now()
+    FROM unnest(
+        $2::bigint[], $3::text[], $4::text[], $5::float8[], $6::int[], $7::int[], $8::int[], $9::int[]
+    ) AS t(location_id, city_key, category_key, score, rank, check_ins_count, reactions_count, notes_count)
+    ON CONFLICT (location_id, city_key, category_key, "window")
+    DO UPDATE SET
+        score = EXCLUDED.score,
+        rank = EXCLUDED.rank,
+        check_ins_count = EXCLUDED.check_ins_count,
+        reactions_count = EXCLUDED.reactions_count,
+        notes_count = EXCLUDED.notes_count,
+        raw_counts = EXCLUDED.raw_counts,
+        updated_at = now()
+"""
+
+# Rows of the replaced leaderboards that were not part of this run. now() is the
+# transaction start, so everything the upsert above just touched is kept.
+DELETE_STALE_TRENDING_SQL = """
+    DELETE FROM trending_locations
+    WHERE "window" = $1
+      AND city_key = ANY($2::text[])
+      AND ($3::text IS NULL OR category_key = $3)
+      AND updated_at < now()
+"""
+
+
+async def _calculate_trending_for_hours(
+    window_hours: Sequence[float],
     category_key: str | None,
-    window_hours: float,
-) -> List[Dict[str, Any]]:
-    """Calculate trending scores for a specific city/category/window."""
-    # Get activity counts per location in the time window
-    # Note: We fetch all VERIFIED locations and filter by city_key in Python
-    # since locations table doesn't have city_key column
-    sql = f"""
-        SELECT 
-            l.id as location_id,
-            l.lat,
-            l.lng,
-            l.category,
-            COUNT(DISTINCT ci.id) as check_ins_count,
-            COUNT(DISTINCT lr.id) as reactions_count,
-            COUNT(DISTINCT ln.id) as notes_count,
-            EXTRACT(EPOCH FROM (now() - MIN(COALESCE(ci.created_at, lr.created_at, ln.created_at)))) / 3600.0 as oldest_age_hours
-        FROM locations l
-        LEFT JOIN check_ins ci ON ci.location_id = l.id 
-            AND ci.created_at >= now() - interval '{window_hours} hours'
-        LEFT JOIN location_reactions lr ON lr.location_id = l.id
-            AND lr.created_at >= now() - interval '{window_hours} hours'
-        LEFT JOIN location_notes ln ON ln.location_id = l.id
-            AND ln.created_at >= now() - interval '{window_hours} hours'
-        WHERE l.state = 'VERIFIED'
-          AND ($1::text IS NULL OR l.category = $1)
-        GROUP BY l.id, l.lat, l.lng, l.category
-        HAVING COUNT(DISTINCT ci.id) > 0 
-            OR COUNT(DISTINCT lr.id) > 0 
-            OR COUNT(DISTINCT ln.id) > 0
-        ORDER BY 
-            (COUNT(DISTINCT ci.id) + COUNT(DISTINCT lr.id) + COUNT(DISTINCT ln.id)) DESC
-    """
-    
-    rows = await fetch(sql, category_key)
-    
-    results = []
+    city_key: str | None,
+) -> List[List[Dict[str, Any]]]:
+    """One activity query for all `window_hours`; returns results per window, ranked per city."""
+    rows = await fetch(ACTIVITY_ALL_WINDOWS_SQL, category_key, [float(h) for h in window_hours])
+
+    # City per location, not per (location, window) row
+    coords: Dict[int, Tuple[Any, Any]] = {}
     for row in rows:
-        # Derive city_key from coordinates
-        lat = float(row.get('lat')) if row.get('lat') is not None else None
-        lng = float(row.get('lng')) if row.get('lng') is not None else None
-        location_city_key = get_city_key_from_coords(lat, lng)
-        
-        # Filter by requested city_key
-        if city_key and location_city_key != city_key:
+        coords.setdefault(row['location_id'], (row.get('lat'), row.get('lng')))
+    location_ids = list(coords.keys())
+    matches = get_city_districts_from_coords_batch(
+        [coords[i][0] for i in location_ids],
+        [coords[i][1] for i in location_ids],
+    )
+    city_by_location = {loc_id: match[0] for loc_id, match in zip(location_ids, matches)}
+
+    results: List[List[Dict[str, Any]]] = [[] for _ in window_hours]
+    for row in rows:
+        location_city_key = city_by_location.get(row['location_id'])
+        if location_city_key is None or (city_key and location_city_key != city_key):
             continue
-        
+        check_ins = row.get('check_ins_count', 0) or 0
+        reactions = row.get('reactions_count', 0) or 0
+        notes = row.get('notes_count', 0) or 0
         score = calculate_trending_score(
-            check_ins=row.get('check_ins_count', 0) or 0,
-            reactions=row.get('reactions_count', 0) or 0,
-            notes=row.get('notes_count', 0) or 0,
+            check_ins=check_ins,
+            reactions=reactions,
+            notes=notes,
             age_hours=float(row.get('oldest_age_hours', 0) or 0),
         )
-        
-        results.append({
+        results[row['window_idx'] - 1].append({
             'location_id': row['location_id'],
-            'city_key': location_city_key or 'unknown',  # Use derived city_key
+            'city_key': location_city_key,
             'category_key': row.get('category'),  # Use category column
             'score': score,
-            'check_ins_count': row.get('check_ins_count', 0) or 0,
-            'reactions_count': row.get('reactions_count', 0) or 0,
-            'notes_count': row.get('notes_count', 0) or 0,
+            'check_ins_count': check_ins,
+            'reactions_count': reactions,
+            'notes_count': notes,
         })
-    
-    # Sort by score and assign ranks
+
+    # Sort by score and assign ranks per city
+    for window_results in results:
+        window_results.sort(key=lambda x: (x['city_key'], -x['score']))
+        rank = 0
+        prev_city = None
+        for result in window_results:
+            rank = rank + 1 if result['city_key'] == prev_city else 1
+            prev_city = result['city_key']
+            result['rank'] = rank
+
+    return results
+
+
+async def calculate_trending_all_windows(
+    windows: Sequence[str],
+    category_key: str | None = None,
+    city_key: str | None = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Calculate trending results for several windows with one activity query.
+
+    Returns {window: results}; results are ranked per city (rank 1 = highest score)
+    and only contain locations that fall inside a configured city (or `city_key`).
+    """
+    windows = list(windows)
+    if not windows:
+        return {}
+    hours = [WINDOW_HOURS.get(w, 24.0) for w in windows]
+    results = await _calculate_trending_for_hours(hours, category_key, city_key)
+    return dict(zip(windows, results))
+
+
+async def calculate_trending_for_window(
+    city_key: str,
+    category_key: str | None,
+    window_hours: float,
+) -> List[Dict[str, Any]]:
+    """Calculate trending scores for a specific city/category/window."""
+    results = (await _calculate_trending_for_hours([window_hours], category_key, city_key))[0]
     results.sort(key=lambda x: x['score'], reverse=True)
-    for i, result in enumerate(results, start=1):
-        result['rank'] = i
-    
     return results
 
 
 async def update_trending_table(
     window: str,
-    city_key: str,
+    city_key: str | list[str] | None,
     category_key: str | None,
     results: List[Dict[str, Any]],
 ) -> int:
-    """Update trending_locations table with new scores."""
-    if not results:
-        return 0
-    
-    # Upsert into trending_locations
-    upsert_sql = """
-        INSERT INTO trending_locations 
-        (location_id, city_key, category_key, "window", score, rank, check_ins_count, reactions_count, notes_count, raw_counts, updated_at)
-        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10::jsonb, now())
-        ON CONFLICT (location_id, city_key, category_key, "window")
-        DO UPDATE SET
-            score = EXCLUDED.score,
-            rank = EXCLUDED.rank,
-            check_ins_count = EXCLUDED.check_ins_count,
-            reactions_count = EXCLUDED.reactions_count,
-            notes_count = EXCLUDED.notes_count,
-            raw_counts = EXCLUDED.raw_counts,
-            updated_at = now()
     """
-    
-    updated = 0
-    for result in results:
-        raw_counts = {
-            'check_ins': result['check_ins_count'],
-            'reactions': result['reactions_count'],
-            'notes': result['notes_count'],
-        }
-        
-        await execute(
-            upsert_sql,
-            result['location_id'],
-            result['city_key'],
-            result['category_key'],
-            window,
-            result['score'],
-            result['rank'],
-            result['check_ins_count'],
-            result['reactions_count'],
-            result['notes_count'],
-            json.dumps(raw_counts),
-        )
-        updated += 1
-    
-    return updated
+    Replace the trending_locations leaderboard(s) for `window` with `results`.
 
+    One unnest upsert plus a delete of rows that dropped out, in one transaction,
+    so readers never see a half-updated ranking. `city_key` (a key or a list of
+    keys) selects which city leaderboards are replaced; None means the cities
+    present in `results`.
+    """
+    if city_key is None:
+        cities = sorted({r['city_key'] for r in results})
+    elif isinstance(city_key, str):
+        cities = [city_key]
+    else:
+        cities = list(city_key)
+    if not results and not cities:
+        return 0
 
-async def run_trending_calculation(
-    window: str = "24h",
+    async with run_in_transaction() as conn:
+        if results:
+            await execute_with_conn(
+                conn,
+                BULK_UPSERT_TRENDING_SQL,
+                window,
+                [r['location_id'] for r in results],
+                [r['city_key'] for r in results],
+                [r['category_key'] for r in results],
+                [float(r['score']) for r in results],
+                [int(r['rank']) for r in results],
+                [int(r['check_ins_count']) for r in results],
+                [int(r['reactions_count']) for r in results],
+                [int(r['notes_count']) for r in results],
+            )
+        await execute_with_conn(conn, DELETE_STALE_TRENDING_SQL, window, cities, category_key)
+
+    return len(results)
+
+
+async def run_trending_recalculation(
+    windows: Sequence[str],
     city_key: str | None = None,
     category_key: str | None = None,
-) -> Dict[str, Any]:
-    """Run trending calculation for specified parameters."""
-    window_hours_map = {
-        '5m': 5/60,
-        '1h': 1.0,
-        '24h': 24.0,
-        '7d': 168.0,
-    }
-    
-    window_hours = window_hours_map.get(window, 24.0)
-    
-    # Get all cities if not specified
-    # Since locations table doesn't have city_key, we'll process all VERIFIED locations
-    # and derive city_key in calculate_trending_for_window
+) -> List[Dict[str, Any]]:
+    """Recalculate several windows: one activity query, one bulk write per window."""
+    # Since locations table doesn't have city_key, we process all VERIFIED locations
+    # and derive city_key from coordinates in bulk
     if city_key:
         cities = [city_key]
     else:
         # Load cities from database (async)
-        # In future, we could query activity_stream for distinct city_key values
         from services.cities_db_service import load_cities_config_from_db
         config = await load_cities_config_from_db()
         cities = list(config.get("cities", {}).keys())
-    
-    stats = {
-        'window': window,
-        'cities_processed': 0,
-        'locations_updated': 0,
-    }
-    
-    for city in cities:
-        results = await calculate_trending_for_window(city, category_key, window_hours)
-        updated = await update_trending_table(window, city, category_key, results)
-        
-        stats['cities_processed'] += 1
-        stats['locations_updated'] += updated
-        
+
+    started = time.perf_counter()
+    results = await calculate_trending_all_windows(windows, category_key, city_key=city_key)
+    compute_s = time.perf_counter() - started
+
+    all_stats = []
+    for window in windows:
+        window_results = [r for r in results.get(window, []) if r['city_key'] in cities]
+        updated = await update_trending_table(window, cities, category_key, window_results)
+        all_stats.append({
+            'window': window,
+            'cities_processed': len(cities),
+            'locations_updated': updated,
+        })
+
         logger.info(
             "trending_calculation_complete",
-            city_key=city,
+            city_key=city_key,
             category_key=category_key,
             window=window,
+            cities_processed=len(cities),
             locations_updated=updated,
         )
-    
-    return stats
+
+    logger.info(
+        "trending_recalculation_timing",
+        windows=list(windows),
+        compute_s=round(compute_s, 3),
+        total_s=round(time.perf_counter() - started, 3),
+    )
+    return all_stats
+
+
+async def run_trending_calculation(
+    window: str = "24h",
+    city_key: str | None = None,
+    category_key: str | None = None,
+) -> Dict[str, Any]:
+    """Run trending calculation for specified parameters."""
+    if window not in WINDOW_HOURS:
+        window = '24h'
+    all_stats = await run_trending_recalculation([window], city_key=city_key, category_key=category_key)
+    return all_stats[0]
 
 
 async def run_once(full_recalc: bool = False) -> Dict[str, Any]:
@@ -258,6 +368,9 @@ async def run_once(full_recalc: bool = False) -> Dict[str, Any]:
         logger.warning("failed_to_start_worker_run", error=str(e))
     
     with with_run_id() as rid:
+        # Cheap version check; city/district index only rebuilds when cities config changed
+        await refresh_city_geo_index()
+
         if full_recalc:
             # Full recalculation for all windows
             windows = ['5m', '1h', '24h', '7d']
@@ -265,10 +378,7 @@ async def run_once(full_recalc: bool = False) -> Dict[str, Any]:
             # Near-real-time update (5m window only)
             windows = ['5m']
         
-        all_stats = []
-        for window in windows:
-            stats = await run_trending_calculation(window=window)
-            all_stats.append(stats)
+        all_stats = await run_trending_recalculation(windows)
         
         result = {'windows': all_stats}
     
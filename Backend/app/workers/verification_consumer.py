@@ -2,8 +2,12 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Mapping, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional
 from uuid import UUID
 
 # ---------------------------------------------------------------------------
@@ -23,9 +27,8 @@ from services.db_service import (
     init_db_pool,
     run_in_transaction,
     fetch_with_conn,
-    fetchrow_with_conn,
     execute_with_conn,
-    update_location_classification,
+    update_location_classifications_bulk,
 )
 
 # ---------------------------------------------------------------------------
@@ -52,6 +55,14 @@ from services.audit_service import audit_service
 from app.models.ai import Category
 
 
+# ---------------------------------------------------------------------------
+# Pipelined processing: classification in a bounded thread pool (the OpenAI
+# client is sync), outcomes committed in grouped transactions.
+# ---------------------------------------------------------------------------
+VERIFICATION_CONSUMER_CONCURRENCY = int(os.getenv("VERIFICATION_CONSUMER_CONCURRENCY", "4"))
+VERIFICATION_CONSUMER_WRITE_BATCH_SIZE = int(os.getenv("VERIFICATION_CONSUMER_WRITE_BATCH_SIZE", "25"))
+
+
 # ---------------------------------------------------------------------------
 # SQL helpers
 # ---------------------------------------------------------------------------
@@ -109,65 +120,356 @@ async def claim_verification_tasks(
         )
 
 
-async def _fetch_location_by_id_txn(conn, location_id: int) -> Optional[Dict[str, Any]]:
-    row = await fetchrow_with_conn(
+async def _fetch_locations_by_ids_txn(conn, location_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    if not location_ids:
+        return {}
+    rows = await fetch_with_conn(
         conn,
-        f"SELECT {_LOCATION_SELECT_COLS} FROM locations WHERE id = $1",
-        int(location_id),
+        f"SELECT {_LOCATION_SELECT_COLS} FROM locations WHERE id = ANY($1::bigint[])",
+        [int(i) for i in location_ids],
     )
-    return dict(row) if row else None
+    return {int(r["id"]): dict(r) for r in rows or []}
 
 
-async def _update_task_complete_txn(conn, task_id: int) -> None:
+async def _update_tasks_complete_txn(conn, task_ids: List[int]) -> None:
     await execute_with_conn(
         conn,
         """
         UPDATE tasks
         SET status = 'COMPLETED', is_success = true, error_message = NULL
-        WHERE id = $1
+        WHERE id = ANY($1::bigint[])
         """,
-        int(task_id),
+        [int(i) for i in task_ids],
     )
 
 
-async def _update_task_fail_txn(conn, task_id: int, message: str) -> None:
+async def _update_tasks_fail_txn(conn, task_ids: List[int], messages: List[str]) -> None:
     await execute_with_conn(
         conn,
         """
-        UPDATE tasks
-        SET status = 'FAILED', is_success = false, error_message = $2
-        WHERE id = $1
+        UPDATE tasks AS t
+        SET status = 'FAILED', is_success = false, error_message = u.message
+        FROM unnest($1::bigint[], $2::text[]) AS u(id, message)
+        WHERE t.id = u.id
         """,
-        int(task_id),
-        message[:500],
+        [int(i) for i in task_ids],
+        [m[:500] for m in messages],
     )
 
 
-async def _reset_task_to_pending_txn(conn, task_id: int) -> None:
+async def _reset_tasks_to_pending_txn(conn, task_ids: List[int]) -> None:
     await execute_with_conn(
         conn,
         """
         UPDATE tasks
         SET status = 'PENDING'
-        WHERE id = $1
+        WHERE id = ANY($1::bigint[])
         """,
-        int(task_id),
+        [int(i) for i in task_ids],
     )
 
 
-async def _set_next_check_at_txn(conn, location_id: int, next_check_at: datetime) -> None:
+async def _set_next_check_at_bulk_txn(conn, location_ids: List[int], next_checks: List[datetime]) -> None:
     await execute_with_conn(
         conn,
         """
-        UPDATE locations
-        SET next_check_at = $1
-        WHERE id = $2
+        UPDATE locations AS l
+        SET next_check_at = u.next_check_at
+        FROM unnest($1::bigint[], $2::timestamptz[]) AS u(id, next_check_at)
+        WHERE l.id = u.id
         """,
-        next_check_at,
-        int(location_id),
+        [int(i) for i in location_ids],
+        next_checks,
     )
 
 
+# ---------------------------------------------------------------------------
+# Task outcomes
+# ---------------------------------------------------------------------------
+# Every claimed task ends as one outcome dict:
+#   kind="complete": classified; carries action/category/confidence/reason
+#   kind="fail":     no usable location; FAILED right away with `message`
+#   kind="error":    processing raised; FAILED once attempts >= max_attempts,
+#                    otherwise back to PENDING for a retry
+
+
+def _error_message(exc: BaseException) -> str:
+    return f"{type(exc).__name__}: {str(exc)[:300]}"
+
+
+def _classify_task(
+    classify_service: ClassifyService,
+    task: Mapping[str, Any],
+    location_row: Mapping[str, Any],
+) -> Dict[str, Any]:
+    """Sync LLM call plus validation; runs in the consumer's thread pool."""
+    location_id = int(task["location_id"])
+    classification_result, _meta = classify_service.classify(
+        name=location_row.get("name"),
+        address=location_row.get("address"),
+        typ=location_row.get("category"),
+        location_id=location_id,
+    )
+    validated = validate_classification_payload(classification_result.model_dump())
+    action = validated.action.value
+    new_category = validated.category.value if validated.category else None
+    # Normalize category into allowed enum prior to persisting (only if category is provided)
+    normalized_category_value = None
+    if new_category is not None:
+        normalized_category_value = map_llm_category_to_enum(new_category).value
+    return {
+        "action": action,
+        "category": new_category,
+        "normalized_category": normalized_category_value,
+        "confidence_score": float(validated.confidence_score),
+        "reason": validated.reason,
+    }
+
+
+async def _write_outcomes_txn(
+    conn,
+    outcomes: List[Dict[str, Any]],
+    *,
+    max_attempts: int,
+    monitor_cfg: MonitorSettings,
+) -> None:
+    """Persist a group of outcomes: classifications, audit rows, next_check_at and task states."""
+    completes = [o for o in outcomes if o["kind"] == "complete"]
+    if completes:
+        # Apply classification to the location rows (updates state/confidence/last_verified_at)
+        await update_location_classifications_bulk(
+            [
+                {
+                    "id": o["location_id"],
+                    "action": o["action"],
+                    "category": o["normalized_category"],
+                    "confidence_score": o["confidence_score"],
+                    "reason": o["reason"] or "verification_consumer: applied",
+                }
+                for o in completes
+            ],
+            conn=conn,
+        )
+        for o in completes:
+            await audit_service.log(
+                action_type="verification_consumer.classified",
+                actor="verification_consumer",
+                location_id=o["location_id"],
+                before=None,
+                after={
+                    "action": o["action"],
+                    "category": o["normalized_category"],
+                    "confidence_score": o["confidence_score"],
+                },
+                is_success=True,
+                meta={"task_id": o["task_id"]},
+                conn=conn,
+            )
+        # Freshness from the updated rows
+        updated_rows = await _fetch_locations_by_ids_txn(conn, [o["location_id"] for o in completes])
+        if updated_rows:
+            location_ids = list(updated_rows)
+            await _set_next_check_at_bulk_txn(
+                conn,
+                location_ids,
+                [compute_next_check_at(updated_rows[i], monitor_cfg) for i in location_ids],
+            )
+        await _update_tasks_complete_txn(conn, [o["task_id"] for o in completes])
+
+    failed = [
+        o for o in outcomes
+        if o["kind"] == "fail" or (o["kind"] == "error" and o["attempts"] >= int(max_attempts))
+    ]
+    if failed:
+        await _update_tasks_fail_txn(conn, [o["task_id"] for o in failed], [o["message"] for o in failed])
+    retry = [o for o in outcomes if o["kind"] == "error" and o["attempts"] < int(max_attempts)]
+    if retry:
+        # Reset to PENDING for retry (documented choice for this story)
+        await _reset_tasks_to_pending_txn(conn, [o["task_id"] for o in retry])
+
+
+async def _persist_outcomes(
+    outcomes: List[Dict[str, Any]],
+    *,
+    max_attempts: int,
+    monitor_cfg: MonitorSettings,
+) -> None:
+    """
+    One transaction for the whole group. If it fails, every outcome is retried in its
+    own transaction, and a completion that still fails is handled like a processing
+    error of that task (retry or FAILED depending on attempts).
+    """
+    try:
+        async with run_in_transaction() as conn:
+            await _write_outcomes_txn(conn, outcomes, max_attempts=max_attempts, monitor_cfg=monitor_cfg)
+        return
+    except Exception as exc:
+        logger.warning("outcome_batch_write_failed", tasks=len(outcomes), error=str(exc))
+
+    for outcome in outcomes:
+        try:
+            async with run_in_transaction() as conn:
+                await _write_outcomes_txn(conn, [outcome], max_attempts=max_attempts, monitor_cfg=monitor_cfg)
+            continue
+        except Exception as exc:
+            if outcome["kind"] != "complete":
+                logger.exception("task_outcome_write_failed", task_id=outcome["task_id"])
+                continue
+            logger.exception(
+                "task_processing_failed",
+                task_id=outcome["task_id"],
+                location_id=outcome["location_id"],
+                attempts=outcome["attempts"],
+            )
+            outcome.update(kind="error", message=_error_message(exc))
+        try:
+            async with run_in_transaction() as conn:
+                await _write_outcomes_txn(conn, [outcome], max_attempts=max_attempts, monitor_cfg=monitor_cfg)
+        except Exception:
+            logger.exception("task_outcome_write_failed", task_id=outcome["task_id"])
+
+
+def _count_outcome(counters: Dict[str, Any], outcome: Mapping[str, Any], *, max_attempts: int, dry_run: bool) -> None:
+    counters["processed"] += 1
+    if outcome["kind"] == "complete":
+        counters["completed"] += 1
+        # Closed detection (terminal states) based on validated action mapping
+        # We rely on update_location_classification rules (ignore -> RETIRED)
+        if outcome["action"] == "ignore":
+            counters["closed_detected"] += 1
+        return
+    counters["failed"] += 1
+    if outcome.get("missing_location_id"):
+        counters["skipped_no_location"] += 1
+    if outcome["kind"] == "error" and not dry_run and outcome["attempts"] >= int(max_attempts):
+        counters["max_attempts_exceeded"] += 1
+
+
+async def process_claimed_tasks(
+    claimed: List[Mapping[str, Any]],
+    *,
+    classify_service: Any,
+    counters: Dict[str, Any],
+    max_attempts: int,
+    dry_run: bool,
+    concurrency: int = VERIFICATION_CONSUMER_CONCURRENCY,
+    write_batch_size: int = VERIFICATION_CONSUMER_WRITE_BATCH_SIZE,
+    on_progress: Optional[Callable[[int], Awaitable[None]]] = None,
+) -> Dict[str, Any]:
+    """
+    Process claimed tasks as a pipeline:
+      - all claimed locations are fetched in one query
+      - up to `concurrency` classifications run at once
+      - outcomes are committed every `write_batch_size` tasks in one transaction
+        (task states, location classification, audit rows, next_check_at)
+    Counters are updated when outcomes are written; `on_progress` gets the number
+    of processed tasks after each write.
+    """
+    concurrency = max(1, int(concurrency))
+    write_batch_size = max(1, int(write_batch_size))
+    monitor_cfg = MonitorSettings()
+
+    location_ids = sorted({int(t["location_id"]) for t in claimed if t.get("location_id") is not None})
+    async with run_in_transaction(readonly=True) as conn:
+        locations = await _fetch_locations_by_ids_txn(conn, location_ids)
+
+    pending: List[Dict[str, Any]] = []
+    write_lock = asyncio.Lock()
+    queue: asyncio.Queue = asyncio.Queue()
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="verification")
+
+    async def flush(force: bool = False) -> None:
+        nonlocal pending
+        async with write_lock:
+            if not pending or (not force and len(pending) < write_batch_size):
+                return
+            batch, pending = pending, []
+            if not dry_run:
+                await _persist_outcomes(batch, max_attempts=max_attempts, monitor_cfg=monitor_cfg)
+            for outcome in batch:
+                _count_outcome(counters, outcome, max_attempts=max_attempts, dry_run=dry_run)
+            if on_progress is not None:
+                await on_progress(counters["processed"])
+
+    async def record(outcome: Dict[str, Any]) -> None:
+        pending.append(outcome)
+        if len(pending) >= write_batch_size:
+            await flush()
+
+    async def process_one(task: Mapping[str, Any]) -> None:
+        task_id = int(task["id"])
+        attempts_after_increment = int(task.get("attempts") or 0)
+        base = {"task_id": task_id, "location_id": task.get("location_id"), "attempts": attempts_after_increment}
+        location_id = task.get("location_id")
+
+        if location_id is None:
+            logger.warning("task_missing_location_id", task_id=task_id)
+            await record({**base, "kind": "fail", "message": "Missing location_id", "missing_location_id": True})
+            return
+
+        location_row = locations.get(int(location_id))
+        if not location_row:
+            logger.warning("location_not_found_for_task", task_id=task_id, location_id=location_id)
+            await record({**base, "kind": "fail", "message": "Location not found"})
+            return
+
+        # Verification / reclassification pipeline (reuse verify_locations approach)
+        # Note: In dry_run mode, do not perform DB writes; only log intended actions.
+        try:
+            decision = await loop.run_in_executor(
+                executor, functools.partial(_classify_task, classify_service, task, location_row)
+            )
+        except Exception as exc:
+            logger.exception(
+                "task_processing_failed",
+                task_id=task_id,
+                location_id=int(location_id),
+                attempts=attempts_after_increment,
+            )
+            await record({**base, "kind": "error", "message": _error_message(exc)})
+            return
+
+        logger.info(
+            "classification_decision",
+            task_id=task_id,
+            location_id=int(location_id),
+            action=decision["action"],
+            category=decision["category"],
+            confidence=decision["confidence_score"],
+        )
+        await record({**base, "location_id": int(location_id), "kind": "complete", **decision})
+
+    async def worker() -> None:
+        while True:
+            try:
+                task = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await process_one(task)
+
+    for task in claimed:
+        queue.put_nowait(task)
+
+    t0 = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, len(claimed)) or 1)))
+        await flush(force=True)
+    finally:
+        executor.shutdown(wait=True)
+
+    elapsed = time.perf_counter() - t0
+    logger.info(
+        "verification_pipeline_finished",
+        tasks=len(claimed),
+        concurrency=concurrency,
+        write_batch_size=write_batch_size,
+        elapsed_s=round(elapsed, 3),
+        tasks_per_min=round(len(claimed) / elapsed * 60, 1) if elapsed > 0 else None,
+    )
+    return counters
+
+
 async def run_verification_consumer(
     *,
     limit: int,
@@ -175,6 +477,8 @@ async def run_verification_consumer(
     dry_run: bool,
     worker_run_id: Optional[UUID],
     city: Optional[str],
+    concurrency: Optional[int] = None,
+    write_batch_size: Optional[int] = None,
 ) -> Dict[str, Any]:
     """
     Core processing loop for the verification consumer worker.
@@ -204,157 +508,28 @@ async def run_verification_consumer(
             await update_worker_run_progress(worker_run_id, 100)
         return counters
 
-    monitor_cfg = MonitorSettings()
     classify_service = ClassifyService()
     last_progress = -1
 
-    for idx, task in enumerate(claimed, start=1):
-        task_id = int(task["id"])
-        attempts_after_increment = int(task.get("attempts") or 0)
-        location_id = task.get("location_id")
-
-        if location_id is None:
-            counters["skipped_no_location"] += 1
-            counters["failed"] += 1
-            logger.warning("task_missing_location_id", task_id=task_id)
-            if not dry_run:
-                async with run_in_transaction() as conn:
-                    await _update_task_fail_txn(conn, task_id, "Missing location_id")
-            # progress update
-            counters["processed"] += 1
-            if worker_run_id:
-                progress = min(99, max(0, int((counters["processed"] * 100) / total_claimed)))
-                if progress != last_progress:
-                    await update_worker_run_progress(worker_run_id, progress)
-                    last_progress = progress
-            continue
-
-        # Fetch location row
-        location_row: Optional[Dict[str, Any]] = None
-        async with run_in_transaction(readonly=True) as conn:
-            location_row = await _fetch_location_by_id_txn(conn, int(location_id))
-
-        if not location_row:
-            counters["failed"] += 1
-            logger.warning("location_not_found_for_task", task_id=task_id, location_id=location_id)
-            if not dry_run:
-                async with run_in_transaction() as conn:
-                    await _update_task_fail_txn(conn, task_id, "Location not found")
-            counters["processed"] += 1
-            if worker_run_id:
-                progress = min(99, max(0, int((counters["processed"] * 100) / total_claimed)))
-                if progress != last_progress:
-                    await update_worker_run_progress(worker_run_id, progress)
-                    last_progress = progress
-            continue
-
-        # Verification / reclassification pipeline (reuse verify_locations approach)
-        # Note: In dry_run mode, do not perform DB writes; only log intended actions.
-        try:
-            name = location_row.get("name")
-            address = location_row.get("address")
-            category = location_row.get("category")
-
-            classification_result, meta = classify_service.classify(
-                name=name,
-                address=address,
-                typ=category,
-                location_id=int(location_id),
-            )
-
-            validated = validate_classification_payload(classification_result.model_dump())
-            action = validated.action.value
-            new_category = validated.category.value if validated.category else None
-            new_confidence = float(validated.confidence_score)
-            reason = validated.reason
-
-            logger.info(
-                "classification_decision",
-                task_id=task_id,
-                location_id=int(location_id),
-                action=action,
-                category=new_category,
-                confidence=new_confidence,
-            )
-
-            if not dry_run:
-                # Normalize category into allowed enum prior to persisting (only if category is provided)
-                normalized_category_value = None
-                if new_category is not None:
-                    enum_category = map_llm_category_to_enum(new_category)
-                    normalized_category_value = enum_category.value
-
-                # Apply classification to the location row (updates state/confidence/last_verified_at)
-                await update_location_classification(
-                    id=int(location_id),
-                    action=action,
-                    category=normalized_category_value,
-                    confidence_score=new_confidence,
-                    reason=reason or "verification_consumer: applied",
-                )
-
-                # Audit log
-                await audit_service.log(
-                    action_type="verification_consumer.classified",
-                    actor="verification_consumer",
-                    location_id=int(location_id),
-                    before=None,
-                    after={
-                        "action": action,
-                        "category": normalized_category_value,
-                        "confidence_score": new_confidence,
-                    },
-                    is_success=True,
-                    meta={"task_id": int(task_id)},
-                )
-
-                # Fetch updated row for freshness computation
-                async with run_in_transaction(readonly=True) as conn:
-                    updated_row = await _fetch_location_by_id_txn(conn, int(location_id))
-                if updated_row:
-                    nca = compute_next_check_at(updated_row, monitor_cfg)
-                    async with run_in_transaction() as conn:
-                        await _set_next_check_at_txn(conn, int(location_id), nca)
-
-                # Update task outcome
-                async with run_in_transaction() as conn:
-                    await _update_task_complete_txn(conn, int(task_id))
-
-            # Counters
-            counters["completed"] += 1
-            counters["processed"] += 1
-            # Closed detection (terminal states) based on validated action mapping
-            # We rely on update_location_classification rules (ignore -> RETIRED)
-            if action == "ignore":
-                counters["closed_detected"] += 1
-
-        except Exception as exc:
-            logger.exception(
-                "task_processing_failed",
-                task_id=int(task_id),
-                location_id=int(location_id),
-                attempts=attempts_after_increment,
-            )
-
-            counters["failed"] += 1
-            counters["processed"] += 1
-
-            if not dry_run:
-                async with run_in_transaction() as conn:
-                    if attempts_after_increment >= int(max_attempts):
-                        counters["max_attempts_exceeded"] += 1
-                        await _update_task_fail_txn(conn, int(task_id), f"{type(exc).__name__}: {str(exc)[:300]}")
-                    else:
-                        # Reset to PENDING for retry (documented choice for this story)
-                        await _reset_task_to_pending_txn(conn, int(task_id))
-
-        # Progress update
+    async def on_progress(processed: int) -> None:
+        nonlocal last_progress
         if worker_run_id:
-            progress = min(99, max(0, int((counters["processed"] * 100) / total_claimed)))
+            progress = min(99, max(0, int((processed * 100) / total_claimed)))
             if progress != last_progress:
                 await update_worker_run_progress(worker_run_id, progress)
                 last_progress = progress
 
+    await process_claimed_tasks(
+        claimed,
+        classify_service=classify_service,
+        counters=counters,
+        max_attempts=int(max_attempts),
+        dry_run=bool(dry_run),
+        concurrency=VERIFICATION_CONSUMER_CONCURRENCY if concurrency is None else concurrency,
+        write_batch_size=VERIFICATION_CONSUMER_WRITE_BATCH_SIZE if write_batch_size is None else write_batch_size,
+        on_progress=on_progress,
+    )
+
     # Final progress to 100 will be handled by the caller via finish_worker_run
     return counters
 
@@ -366,6 +541,18 @@ def _parse_args() -> argparse.Namespace:
     p.add_argument("--dry-run", action="store_true", help="Do not write to DB; log actions only")
     p.add_argument("--max-attempts", type=int, default=3, help="Max attempts per task before failing")
     p.add_argument("--worker-run-id", type=str, default=None, help="Existing worker_run UUID to reuse")
+    p.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help=f"Concurrent classifications (default VERIFICATION_CONSUMER_CONCURRENCY={VERIFICATION_CONSUMER_CONCURRENCY})",
+    )
+    p.add_argument(
+        "--write-batch-size",
+        type=int,
+        default=None,
+        help=f"Task outcomes per transaction (default VERIFICATION_CONSUMER_WRITE_BATCH_SIZE={VERIFICATION_CONSUMER_WRITE_BATCH_SIZE})",
+    )
     return p.parse_args()
 
 
@@ -376,6 +563,8 @@ async def main_async(
     dry_run: bool = False,
     max_attempts: int = 3,
     worker_run_id: Optional[UUID] = None,
+    concurrency: Optional[int] = None,
+    write_batch_size: Optional[int] = None,
 ) -> None:
     """
     Main entrypoint (can be used by orchestrator).
@@ -405,6 +594,8 @@ async def main_async(
                 dry_run=bool(dry_run),
                 worker_run_id=run_id,
                 city=city,
+                concurrency=concurrency,
+                write_batch_size=write_batch_size,
             )
     except Exception as exc:
         status = "failed"
@@ -434,6 +625,8 @@ def main() -> None:
             dry_run=bool(args.dry_run),
             max_attempts=int(args.max_attempts),
             worker_run_id=UUID(args.worker_run_id) if args.worker_run_id else None,
+            concurrency=args.concurrency,
+            write_batch_size=args.write_batch_size,
         )
     )
 
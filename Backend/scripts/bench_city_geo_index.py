@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_city_geo_index.py
+Microbenchmark for coordinate -> (city_key, district_key) lookups.
+
+Compares:
+- legacy:        YAML parse + linear bbox scan per call (old async-context behaviour)
+- linear:        linear bbox scan over an already-parsed config
+- index:         CityGeoIndex.lookup per point
+- index_batch:   CityGeoIndex.lookup_many over the whole array
+
+No database needed; reads Infra/config/cities.yml.
+
+Usage:
+  cd Backend
+  python scripts/bench_city_geo_index.py --points 10000 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+
+BACKEND_DIR = Path(__file__).parent.parent
+REPO_ROOT = BACKEND_DIR.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from services.city_geo_index import CityGeoIndex  # noqa: E402
+
+CITIES_YML = REPO_ROOT / "Infra" / "config" / "cities.yml"
+BBOX_KEYS = ("lat_min", "lat_max", "lng_min", "lng_max")
+
+# The legacy path re-parses YAML per call; cap how many calls we actually time.
+LEGACY_SAMPLE = 200
+
+
+def linear_lookup(config: Dict[str, Any], lat: float, lng: float) -> Optional[str]:
+    cities = config.get("cities", {})
+    for city_key, city_data in cities.items():
+        for district_data in (city_data.get("districts") or {}).values():
+            if all(k in district_data for k in BBOX_KEYS):
+                if (float(district_data["lat_min"]) <= lat <= float(district_data["lat_max"])
+                        and float(district_data["lng_min"]) <= lng <= float(district_data["lng_max"])):
+                    return city_key
+    for city_key, city_data in cities.items():
+        if all(k in city_data for k in BBOX_KEYS):
+            if (float(city_data["lat_min"]) <= lat <= float(city_data["lat_max"])
+                    and float(city_data["lng_min"]) <= lng <= float(city_data["lng_max"])):
+                return city_key
+    return None
+
+
+def make_points(n: int, seed: int) -> Tuple[List[float], List[float]]:
+    # Netherlands-ish bbox so a realistic share of points hits a district
+    rng = random.Random(seed)
+    lats = [50.75 + rng.random() * 2.8 for _ in range(n)]
+    lngs = [3.35 + rng.random() * 3.9 for _ in range(n)]
+    return lats, lngs
+
+
+def timed(fn) -> Tuple[float, Any]:
+    t0 = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - t0, out
+
+
+def report(label: str, n: int, seconds: float) -> None:
+    per_us = seconds / n * 1e6 if n else 0.0
+    print(f"  {label:<12} n={n:<9} total={seconds:8.3f}s  per_lookup={per_us:9.3f}µs")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="City/district lookup microbenchmark")
+    ap.add_argument("--points", type=int, nargs="+", default=[10_000, 1_000_000])
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    raw = CITIES_YML.read_text(encoding="utf-8")
+    config = yaml.safe_load(raw)
+    build_s, index = timed(lambda: CityGeoIndex.from_config(config, version="bench"))
+    print(f"index build: {build_s * 1000:.2f}ms for {index.box_count} boxes")
+
+    for n in args.points:
+        lats, lngs = make_points(n, args.seed)
+        print(f"\n== {n} points ==")
+
+        sample = min(n, LEGACY_SAMPLE)
+        legacy_s, _ = timed(lambda: [
+            linear_lookup(yaml.safe_load(raw), lats[i], lngs[i]) for i in range(sample)
+        ])
+        report("legacy*", sample, legacy_s)
+
+        linear_s, linear_out = timed(lambda: [linear_lookup(config, la, ln) for la, ln in zip(lats, lngs)])
+        report("linear", n, linear_s)
+
+        index_s, index_out = timed(lambda: [index.lookup(la, ln)[0] for la, ln in zip(lats, lngs)])
+        report("index", n, index_s)
+
+        batch_s, batch_out = timed(lambda: index.lookup_many(lats, lngs))
+        report("index_batch", n, batch_s)
+
+        if linear_out != index_out or index_out != [c for c, _ in batch_out]:
+            print("  ⚠️  index results differ from linear scan")
+            sys.exit(1)
+        hits = sum(1 for c in index_out if c)
+        print(f"  hits={hits} speedup(linear→batch)={linear_s / max(batch_s, 1e-9):.1f}x")
+
+    print(f"\n* legacy timed on {LEGACY_SAMPLE} calls (YAML parse per call)")
+
+
+if __name__ == "__main__":
+    main()
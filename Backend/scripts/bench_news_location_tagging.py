@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_news_location_tagging.py
+Per-article location tagging time: per-alias scan vs the compiled alias matcher.
+
+Compares:
+- legacy:   per-character tokenizer, get_aliases() per call, every alias against
+            every token plus a substring search (the old _extract_text_matches)
+- compiled: derive_location_tag per article (AliasMatcher, cached per config)
+- batch:    derive_location_tags over the whole corpus
+
+Output must be identical for every article; the script exits 1 otherwise.
+
+Corpus is a JSON list or JSONL file of recorded articles with title/summary/content
+(e.g. an export of raw_ingested_news); defaults to tests/fixtures/news_location_samples.json.
+No database needed.
+
+Usage:
+  cd Backend
+  python scripts/bench_news_location_tagging.py
+  python scripts/bench_news_location_tagging.py --corpus /tmp/raw_ingested_news.jsonl --config ../configs/news_city_tags.yml
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.models.news_city_tags import get_aliases  # noqa: E402
+from services import news_location_tagging as tagging  # noqa: E402
+
+DEFAULT_CORPUS = BACKEND_DIR / "tests" / "fixtures" / "news_location_samples.json"
+
+
+def load_corpus(path: Path) -> List[Dict[str, Any]]:
+    text = path.read_text(encoding="utf-8")
+    if path.suffix == ".jsonl":
+        items: Any = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else:
+        items = json.loads(text)
+    if isinstance(items, dict):
+        items = list(items.values())
+    return [
+        {key: item.get(key) for key in ("title", "summary", "content")}
+        for item in items
+        if isinstance(item, dict)
+    ]
+
+
+def legacy_tokens(value: Optional[str]) -> List[str]:
+    if not value:
+        return []
+    text = unicodedata.normalize("NFKD", value)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = text.casefold()
+    sanitized = "".join(ch if ch.isalnum() else " " for ch in text)
+    return [token for token in sanitized.split() if token]
+
+
+def legacy_text_matches(text: str, config_path: Optional[Path]) -> List[Dict[str, Any]]:
+    tokens = legacy_tokens(text)
+    if not tokens:
+        return []
+    normalized_text = f" {' '.join(tokens)} "
+    matches: List[Dict[str, Any]] = []
+    for country in (tagging.LOCAL_COUNTRY, tagging.ORIGIN_COUNTRY):
+        alias_map = get_aliases(country, path=config_path)
+        confidence = 0.8 if country == tagging.LOCAL_COUNTRY else 0.7
+        for alias, tag in alias_map.items():
+            if not alias:
+                continue
+            found = False
+            for token in tokens:
+                if token == alias or token.startswith(alias):
+                    found = True
+                    matched_token = token
+                    break
+            if not found and f" {alias} " in normalized_text:
+                found = True
+                matched_token = alias
+            if found:
+                matches.append(
+                    {
+                        "city_key": tag.city_key,
+                        "country": tag.country,
+                        "confidence": confidence,
+                        "source": "text",
+                        "alias": alias,
+                        "token": matched_token,
+                    }
+                )
+    return matches
+
+
+def legacy_derive(article: Dict[str, Any], config_path: Optional[Path]) -> Tuple[str, Dict[str, Any]]:
+    text = tagging._coerce_article_text((article["title"], article["summary"], article["content"]))
+    matches = tagging._dedupe_matches(legacy_text_matches(text, config_path))
+    return tagging._compute_tag(matches), {"matches": matches}
+
+
+def timed(fn) -> Tuple[float, Any]:
+    t0 = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - t0, out
+
+
+def report(label: str, n: int, seconds: float) -> None:
+    per_us = seconds / n * 1e6 if n else 0.0
+    print(f"  {label:<9} n={n:<8} total={seconds:8.3f}s  per_article={per_us:9.2f}µs")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="News location tagging benchmark: alias scan vs compiled matcher")
+    ap.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    ap.add_argument("--config", type=Path, default=None, help="news_city_tags.yml override")
+    ap.add_argument("--repeat", type=int, default=1000, help="Times the corpus is tagged")
+    args = ap.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        print(f"no articles in {args.corpus}")
+        sys.exit(2)
+    articles = corpus * args.repeat
+
+    build_s, matcher = timed(lambda: tagging.get_alias_matcher(args.config))
+    print(
+        f"corpus={len(corpus)} articles x {args.repeat}; "
+        f"matcher build {build_s * 1000:.2f}ms for {matcher.alias_count} aliases"
+    )
+
+    legacy_s, legacy_out = timed(lambda: [legacy_derive(a, args.config) for a in articles])
+    report("legacy", len(articles), legacy_s)
+
+    compiled_s, compiled_out = timed(lambda: [
+        tagging.derive_location_tag(
+            title=a["title"], summary=a["summary"], content=a["content"], ai_mentions=None, config_path=args.config
+        )
+        for a in articles
+    ])
+    report("compiled", len(articles), compiled_s)
+
+    batch_s, batch_out = timed(lambda: tagging.derive_location_tags(articles, config_path=args.config))
+    report("batch", len(articles), batch_s)
+
+    if legacy_out != compiled_out or compiled_out != batch_out:
+        print("  ⚠️  compiled results differ from the alias scan")
+        sys.exit(1)
+    tagged = sum(1 for tag, _ in batch_out[: len(corpus)] if tag != tagging.TAG_NONE)
+    print(f"  identical output; tagged={tagged}/{len(corpus)} speedup(legacy→batch)={legacy_s / max(batch_s, 1e-9):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_reaction_counters.py
+List latency with per-row correlated reaction aggregates vs the reaction_counters join.
+
+Needs a scratch Postgres (DATABASE_URL). Everything lives in a throwaway schema
+(--schema, dropped at the end unless --keep):
+- items(id, published_at) with --items rows
+- news_reactions with --reactions-per-item rows per item over 6 reaction types
+  (same columns/indexes as migration 059)
+- reaction_counters built from it (migration 103)
+
+Then times --repeat runs of a --page-size page (ORDER BY published_at DESC) with:
+- legacy:   COALESCE((SELECT json_object_agg(...) FROM (SELECT ... GROUP BY ...)), '{}')
+            per row, as news_service used to do
+- counters: reactions_join_sql("news", "items.id")
+
+Usage:
+  cd Backend
+  DATABASE_URL=postgresql://... python scripts/bench_reaction_counters.py
+  python scripts/bench_reaction_counters.py --items 200 --reactions-per-item 10000 --page-size 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+REACTION_TYPES = ["fire", "heart", "thumbs_up", "smile", "star", "flag"]
+
+LEGACY_SQL = """
+    SELECT
+        items.id,
+        COALESCE(
+            (
+                SELECT json_object_agg(reaction_type, count)
+                FROM (
+                    SELECT reaction_type, COUNT(*)::int as count
+                    FROM news_reactions
+                    WHERE news_id = items.id
+                    GROUP BY reaction_type
+                ) reaction_counts
+            ),
+            '{}'::json
+        ) as reactions
+    FROM items
+    ORDER BY published_at DESC
+    LIMIT $1
+"""
+
+
+async def seed(conn, args: argparse.Namespace) -> None:
+    await conn.execute(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE")
+    await conn.execute(f"CREATE SCHEMA {args.schema}")
+    await conn.execute(f"SET search_path TO {args.schema}")
+    await conn.execute(
+        """
+        CREATE TABLE items (id bigint PRIMARY KEY, published_at timestamptz NOT NULL);
+        CREATE TABLE news_reactions (
+            id bigserial PRIMARY KEY,
+            news_id bigint NOT NULL REFERENCES items(id) ON DELETE CASCADE,
+            reaction_type text NOT NULL,
+            client_id text,
+            user_id uuid,
+            identity_key text GENERATED ALWAYS AS (COALESCE(user_id::text, client_id)) STORED,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            UNIQUE (news_id, identity_key, reaction_type)
+        );
+        CREATE TABLE reaction_counters (
+            entity_type text NOT NULL,
+            entity_id bigint NOT NULL,
+            reaction_type text NOT NULL,
+            count integer NOT NULL DEFAULT 0 CHECK (count >= 0),
+            updated_at timestamptz NOT NULL DEFAULT now(),
+            PRIMARY KEY (entity_type, entity_id, reaction_type)
+        );
+        """
+    )
+    await conn.execute(
+        "INSERT INTO items SELECT g, now() - g * interval '1 minute' FROM generate_series(1, $1) g",
+        args.items,
+    )
+    await conn.execute(
+        """
+        INSERT INTO news_reactions (news_id, reaction_type, client_id)
+        SELECT i, ($3::text[])[1 + (r % array_length($3::text[], 1))], 'c' || r
+        FROM generate_series(1, $1) i, generate_series(1, $2) r
+        """,
+        args.items,
+        args.reactions_per_item,
+        REACTION_TYPES,
+    )
+    await conn.execute("CREATE INDEX ON news_reactions(news_id)")
+    await conn.execute(
+        """
+        INSERT INTO reaction_counters (entity_type, entity_id, reaction_type, count)
+        SELECT 'news', news_id, reaction_type, COUNT(*)::int FROM news_reactions GROUP BY 1, 2, 3
+        """
+    )
+    await conn.execute("ANALYZE")
+
+
+async def time_query(conn, sql: str, page_size: int, repeat: int) -> list[float]:
+    await conn.fetch(sql, page_size)  # warm-up
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        await conn.fetch(sql, page_size)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    import asyncpg
+    from services.db_service import normalize_database_url
+    from services.reaction_counter_service import reactions_join_sql
+
+    dsn = os.getenv("DATABASE_URL")
+    if not dsn:
+        print("DATABASE_URL is required (scratch database)")
+        return 2
+    conn = await asyncpg.connect(normalize_database_url(dsn))
+    try:
+        t0 = time.perf_counter()
+        await seed(conn, args)
+        print(
+            f"seeded items={args.items} reactions/item={args.reactions_per_item} "
+            f"in {time.perf_counter() - t0:.1f}s (schema {args.schema})"
+        )
+        counters_sql = f"""
+            SELECT items.id, COALESCE(rc.reactions, '{{}}'::jsonb) as reactions
+            FROM items
+            {reactions_join_sql("news", "items.id")}
+            ORDER BY published_at DESC
+            LIMIT $1
+        """
+        legacy_rows = await conn.fetch(LEGACY_SQL, args.page_size)
+        counter_rows = await conn.fetch(counters_sql, args.page_size)
+        assert [r["id"] for r in legacy_rows] == [r["id"] for r in counter_rows]
+
+        for name, sql in (("legacy", LEGACY_SQL), ("counters", counters_sql)):
+            samples = await time_query(conn, sql, args.page_size, args.repeat)
+            print(
+                f"  {name:<9} page={args.page_size:<4} p50={statistics.median(samples):8.2f}ms "
+                f"max={max(samples):8.2f}ms"
+            )
+    finally:
+        if not args.keep:
+            await conn.execute(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE")
+        await conn.close()
+    return 0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark reaction list queries: correlated aggregates vs counters")
+    ap.add_argument("--items", type=int, default=100)
+    ap.add_argument("--reactions-per-item", type=int, default=10_000)
+    ap.add_argument("--page-size", type=int, default=50)
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--schema", default="bench_reaction_counters")
+    ap.add_argument("--keep", action="store_true", help="Keep the bench schema")
+    args = ap.parse_args()
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
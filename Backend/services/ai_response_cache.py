@@ -0,0 +1,426 @@
+"""
+AI Response Cache - content-hash memoization for OpenAIService.generate_json.
+
+Identical inputs (re-runs, reclassify_other sweeps, duplicate OSM/RSS entries)
+no longer pay for a second LLM call. Entries are keyed by
+
+    (model, prompt template version, normalized input hash)
+
+- prompt template version: sha256 of system prompt + response schema (plus the
+  optional global AI_CACHE_PROMPT_VERSION), so editing a prompt file or schema
+  naturally misses the old entries.
+- normalized input hash: sha256 of the user prompt after NFC + whitespace collapse.
+
+Two tiers:
+- L1: in-process LRU (AI_CACHE_LRU_SIZE entries)
+- L2: Postgres table ai_response_cache (Infra/supabase/099_ai_response_cache.sql)
+
+generate_json is synchronous and may run on the main event loop thread, so L2
+uses its own small event-loop thread with a dedicated asyncpg connection
+instead of the shared pool. Lookups are bounded by AI_CACHE_DB_TIMEOUT_S;
+writes are fire-and-forget. After a connection error L2 is skipped for
+AI_CACHE_DB_RETRY_S.
+
+Controls:
+- AI_CACHE_ENABLED=0 disables the cache process-wide
+- set_ai_cache_bypass(True) / --no-ai-cache on workers: skip reads and writes
+- AI_CACHE_TTL_S: entry lifetime; expired rows are purged opportunistically
+- AI_CACHE_ACTION_TYPES: action types cached by default (others must opt in)
+
+Hits are logged to ai_logs with cache_hit=true; see GET /admin/ai/cache/stats.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.logging import get_logger
+
+logger = get_logger()
+
+AI_CACHE_ENABLED = os.getenv("AI_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+AI_CACHE_DB_ENABLED = os.getenv("AI_CACHE_DB", "1").lower() not in ("0", "false", "no")
+AI_CACHE_TTL_S = int(os.getenv("AI_CACHE_TTL_S", str(30 * 24 * 3600)))
+AI_CACHE_LRU_SIZE = int(os.getenv("AI_CACHE_LRU_SIZE", "2048"))
+AI_CACHE_DB_TIMEOUT_S = float(os.getenv("AI_CACHE_DB_TIMEOUT_S", "2.0"))
+AI_CACHE_DB_RETRY_S = float(os.getenv("AI_CACHE_DB_RETRY_S", "60"))
+AI_CACHE_PROMPT_VERSION = os.getenv("AI_CACHE_PROMPT_VERSION", "")
+AI_CACHE_ACTION_TYPES = frozenset(
+    t.strip()
+    for t in os.getenv(
+        "AI_CACHE_ACTION_TYPES",
+        "classify,news.classify,events.classify,events.extract_from_html,news.extract_from_html",
+    ).split(",")
+    if t.strip()
+)
+# Purge expired rows after this many L2 writes
+AI_CACHE_PURGE_EVERY = int(os.getenv("AI_CACHE_PURGE_EVERY", "500"))
+AI_CACHE_PURGE_BATCH = 5000
+
+_bypass = False
+
+
+@dataclass
+class AICacheStats:
+    lookups: int = 0
+    hits_lru: int = 0
+    hits_db: int = 0
+    misses: int = 0
+    stores: int = 0
+    db_errors: int = 0
+    evictions: int = 0
+    expired: int = 0
+    bypassed: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = dict(self.__dict__)
+        hits = self.hits_lru + self.hits_db
+        data["hit_rate"] = round(hits / self.lookups, 4) if self.lookups else 0.0
+        return data
+
+
+_stats = AICacheStats()
+
+
+@dataclass(frozen=True)
+class CacheKey:
+    model: str
+    prompt_version: str
+    input_hash: str
+
+    @property
+    def key(self) -> str:
+        return f"{self.model}:{self.prompt_version}:{self.input_hash}"
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def normalize_input(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+def prompt_template_version(system_prompt: str, schema: Optional[Dict[str, Any]] = None) -> str:
+    material = (system_prompt or "") + "\x00" + json.dumps(schema or {}, sort_keys=True, ensure_ascii=False)
+    digest = _sha256(material)[:16]
+    return f"{AI_CACHE_PROMPT_VERSION}:{digest}" if AI_CACHE_PROMPT_VERSION else digest
+
+
+def make_cache_key(
+    *,
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    schema: Optional[Dict[str, Any]] = None,
+    prompt_version: Optional[str] = None,
+) -> CacheKey:
+    return CacheKey(
+        model=model,
+        prompt_version=prompt_version or prompt_template_version(system_prompt, schema),
+        input_hash=_sha256(normalize_input(user_prompt)),
+    )
+
+
+def set_ai_cache_bypass(bypass: bool) -> None:
+    """Per-worker switch (--no-ai-cache): skip cache reads and writes in this process."""
+    global _bypass
+    _bypass = bool(bypass)
+
+
+def is_cache_active(action_type: str, cache: Optional[bool] = None) -> bool:
+    """Whether a generate_json call should use the cache."""
+    if not AI_CACHE_ENABLED:
+        return False
+    if _bypass:
+        _stats.bypassed += 1
+        return False
+    if cache is not None:
+        return bool(cache)
+    return action_type in AI_CACHE_ACTION_TYPES
+
+
+# ---------------------------------------------------------------------------
+# L1: in-process LRU
+# ---------------------------------------------------------------------------
+class _LRU:
+    def __init__(self, max_size: int):
+        self.max_size = max(0, int(max_size))
+        self._data: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at <= time.time():
+                del self._data[key]
+                _stats.expired += 1
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Dict[str, Any], expires_at: float) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                _stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_lru = _LRU(AI_CACHE_LRU_SIZE)
+
+
+# ---------------------------------------------------------------------------
+# L2: Postgres via a dedicated loop thread
+# ---------------------------------------------------------------------------
+GET_SQL = """
+    UPDATE ai_response_cache
+    SET hit_count = hit_count + 1, last_hit_at = NOW()
+    WHERE cache_key = $1 AND expires_at > NOW()
+    RETURNING response, usage, EXTRACT(EPOCH FROM expires_at) AS expires_epoch
+"""
+
+PUT_SQL = """
+    INSERT INTO ai_response_cache (
+        cache_key, model, prompt_version, input_hash, action_type, response, usage, expires_at
+    ) VALUES ($1, $2, $3, $4, $5, CAST($6 AS JSONB), CAST($7 AS JSONB), NOW() + make_interval(secs => $8))
+    ON CONFLICT (cache_key) DO UPDATE SET
+        response = EXCLUDED.response,
+        usage = EXCLUDED.usage,
+        action_type = EXCLUDED.action_type,
+        created_at = NOW(),
+        expires_at = EXCLUDED.expires_at
+"""
+
+PURGE_SQL = """
+    DELETE FROM ai_response_cache
+    WHERE cache_key IN (
+        SELECT cache_key FROM ai_response_cache
+        WHERE expires_at <= NOW()
+        LIMIT $1
+    )
+"""
+
+
+class _DbBridge:
+    """Own event loop + asyncpg connection so sync callers can reach Postgres from any thread."""
+
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._conn: Any = None
+        self._conn_lock: Optional[asyncio.Lock] = None
+        self._thread_lock = threading.Lock()
+        self._down_until = 0.0
+        self._writes = 0
+
+    @property
+    def available(self) -> bool:
+        return AI_CACHE_DB_ENABLED and time.monotonic() >= self._down_until
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._thread_lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="ai-cache-db", daemon=True).start()
+                self._loop = loop
+                self._conn = None
+                self._conn_lock = None
+            return self._loop
+
+    async def _connection(self) -> Any:
+        import asyncpg
+        from services.db_service import (
+            APPLICATION_NAME,
+            STATEMENT_TIMEOUT_MS,
+            normalize_database_url,
+        )
+
+        if self._conn is not None and not self._conn.is_closed():
+            return self._conn
+        self._conn = await asyncpg.connect(
+            dsn=normalize_database_url(os.getenv("DATABASE_URL", "")),
+            timeout=AI_CACHE_DB_TIMEOUT_S,
+            statement_cache_size=0,
+            server_settings={
+                "application_name": f"{APPLICATION_NAME}-ai-cache",
+                "statement_timeout": str(STATEMENT_TIMEOUT_MS),
+            },
+        )
+        return self._conn
+
+    async def _run(self, fn: Callable[[Any], Awaitable[Any]]) -> Any:
+        if self._conn_lock is None:
+            self._conn_lock = asyncio.Lock()
+        async with self._conn_lock:
+            try:
+                conn = await self._connection()
+                return await fn(conn)
+            except Exception:
+                _stats.db_errors += 1
+                self._down_until = time.monotonic() + AI_CACHE_DB_RETRY_S
+                if self._conn is not None:
+                    try:
+                        await self._conn.close()
+                    except Exception:
+                        pass
+                    self._conn = None
+                raise
+
+    def call(self, fn: Callable[[Any], Awaitable[Any]], timeout: float) -> Any:
+        fut = asyncio.run_coroutine_threadsafe(self._run(fn), self._ensure_loop())
+        return fut.result(timeout=timeout)
+
+    def submit(self, fn: Callable[[Any], Awaitable[Any]]) -> None:
+        fut = asyncio.run_coroutine_threadsafe(self._run(fn), self._ensure_loop())
+        fut.add_done_callback(_log_write_failure)
+
+
+def _log_write_failure(fut: Any) -> None:
+    try:
+        fut.result()
+    except Exception as e:
+        logger.warning("ai_cache_db_write_failed", error=str(e))
+
+
+_bridge = _DbBridge()
+
+
+def _db_get(key: CacheKey) -> Optional[Tuple[Dict[str, Any], float]]:
+    async def _get(conn: Any) -> Any:
+        return await conn.fetchrow(GET_SQL, key.key)
+
+    row = _bridge.call(_get, timeout=AI_CACHE_DB_TIMEOUT_S)
+    if not row:
+        return None
+    response = row["response"]
+    if isinstance(response, str):
+        response = json.loads(response)
+    usage = row["usage"]
+    if isinstance(usage, str):
+        usage = json.loads(usage)
+    return {"data": response, "usage": usage}, float(row["expires_epoch"])
+
+
+def _db_put(key: CacheKey, action_type: str, entry: Dict[str, Any]) -> None:
+    response_json = json.dumps(entry["data"], ensure_ascii=False)
+    usage_json = json.dumps(entry.get("usage"), ensure_ascii=False) if entry.get("usage") is not None else None
+    _bridge._writes += 1
+    purge = AI_CACHE_PURGE_EVERY > 0 and _bridge._writes % AI_CACHE_PURGE_EVERY == 0
+
+    async def _put(conn: Any) -> None:
+        await conn.execute(
+            PUT_SQL,
+            key.key,
+            key.model,
+            key.prompt_version,
+            key.input_hash,
+            action_type,
+            response_json,
+            usage_json,
+            float(AI_CACHE_TTL_S),
+        )
+        if purge:
+            await conn.execute(PURGE_SQL, AI_CACHE_PURGE_BATCH)
+
+    _bridge.submit(_put)
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+def lookup(key: CacheKey) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Returns ({"data": <validated_output dict>, "usage": ...}, source) or (None, None).
+    source is "lru" or "db". DB errors/timeouts count as misses.
+    """
+    _stats.lookups += 1
+    entry = _lru.get(key.key)
+    if entry is not None:
+        _stats.hits_lru += 1
+        return entry, "lru"
+
+    if _bridge.available:
+        try:
+            found = _db_get(key)
+        except Exception as e:
+            logger.warning("ai_cache_db_lookup_failed", error=str(e) or type(e).__name__)
+            found = None
+        if found is not None:
+            entry, expires_at = found
+            _lru.put(key.key, entry, expires_at)
+            _stats.hits_db += 1
+            return entry, "db"
+
+    _stats.misses += 1
+    return None, None
+
+
+def store(key: CacheKey, action_type: str, data: Dict[str, Any], usage: Any = None) -> None:
+    """Remember a validated response in L1 and (async) L2."""
+    entry = {"data": data, "usage": usage}
+    _lru.put(key.key, entry, time.time() + AI_CACHE_TTL_S)
+    _stats.stores += 1
+    if _bridge.available:
+        try:
+            _db_put(key, action_type, entry)
+        except Exception as e:
+            logger.warning("ai_cache_db_write_failed", error=str(e))
+
+
+def forget(key: CacheKey) -> None:
+    """Drop an entry from L1 (e.g. when a cached payload no longer validates)."""
+    with _lru._lock:
+        _lru._data.pop(key.key, None)
+
+
+async def purge_expired_ai_cache(limit: int = AI_CACHE_PURGE_BATCH) -> int:
+    """Delete expired L2 rows (up to `limit`) via the shared pool; returns the count."""
+    from services.db_service import execute
+
+    status = await execute(PURGE_SQL, int(limit))
+    try:
+        return int(str(status).split()[-1])
+    except (ValueError, IndexError):
+        return 0
+
+
+def get_ai_cache_stats() -> Dict[str, Any]:
+    return {
+        **_stats.as_dict(),
+        "enabled": AI_CACHE_ENABLED,
+        "bypass": _bypass,
+        "db_enabled": AI_CACHE_DB_ENABLED,
+        "db_available": _bridge.available,
+        "lru_size": len(_lru),
+        "lru_max_size": _lru.max_size,
+        "ttl_s": AI_CACHE_TTL_S,
+    }
+
+
+def reset_ai_cache(stats_only: bool = False) -> None:
+    """Clear L1 and/or counters (tests, admin)."""
+    global _stats
+    _stats = AICacheStats()
+    if not stats_only:
+        _lru.clear()
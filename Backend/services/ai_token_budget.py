@@ -0,0 +1,126 @@
+"""
+AI Token Budget - async tokens-per-minute limiter for concurrent LLM calls.
+
+A token bucket that refills continuously at `tokens_per_minute / 60` per second,
+with a burst capacity of one minute's worth of tokens. Callers reserve an
+estimated token count before a request and settle the difference with the
+actual usage reported by the API afterwards:
+
+    budget = TokenBudget(200_000)
+    reserved = estimate_tokens(prompt) + completion_allowance
+    await budget.acquire(reserved)
+    parsed, meta = svc.classify(...)
+    budget.settle(reserved, usage_total_tokens(meta))
+
+A budget of 0 (or less) disables limiting; acquire() then returns immediately.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, Optional
+
+# Rough chars-per-token ratio for the prompts we send (NL/TR/EN mix)
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(*texts: Optional[str]) -> int:
+    """Cheap upper-ish estimate of prompt tokens; no tokenizer dependency."""
+    chars = sum(len(t) for t in texts if t)
+    return chars // CHARS_PER_TOKEN + 1
+
+
+def usage_total_tokens(meta: Any) -> Optional[int]:
+    """Extract total_tokens from an OpenAIService meta dict, if present."""
+    if not isinstance(meta, dict):
+        return None
+    if meta.get("cache_hit"):
+        return 0  # served from services.ai_response_cache, no API tokens spent
+    usage = meta.get("usage")
+    if not isinstance(usage, dict):
+        return None
+    total = usage.get("total_tokens")
+    if total is None:
+        prompt = usage.get("prompt_tokens")
+        completion = usage.get("completion_tokens")
+        if prompt is None and completion is None:
+            return None
+        total = int(prompt or 0) + int(completion or 0)
+    try:
+        return int(total)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBudget:
+    """Async token bucket; acquire() waits until the reservation fits the per-minute budget."""
+
+    def __init__(
+        self,
+        tokens_per_minute: int,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.tokens_per_minute = int(tokens_per_minute or 0)
+        self.capacity = float(max(self.tokens_per_minute, 0))
+        self.rate_per_s = self.capacity / 60.0
+        self._clock = clock
+        self._available = self.capacity
+        self._updated_at = clock()
+        self._lock = asyncio.Lock()
+        self.reserved_total = 0
+        self.used_total = 0
+        self.waited_s = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.tokens_per_minute > 0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = max(0.0, now - self._updated_at)
+        self._updated_at = now
+        self._available = min(self.capacity, self._available + elapsed * self.rate_per_s)
+
+    async def acquire(self, tokens: int) -> float:
+        """Reserve `tokens`; returns seconds spent waiting."""
+        tokens = max(0, int(tokens))
+        self.reserved_total += tokens
+        if not self.enabled or tokens == 0:
+            return 0.0
+        # A single request larger than the whole budget would never fit; cap it
+        # so it waits for a full bucket instead of blocking forever.
+        need = min(float(tokens), self.capacity)
+        waited = 0.0
+        # The lock keeps waiters FIFO: the head waits for its refill, the rest queue behind it.
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._available >= need:
+                    self._available -= need
+                    break
+                delay = (need - self._available) / self.rate_per_s
+                await asyncio.sleep(delay)
+                waited += delay
+        self.waited_s += waited
+        return waited
+
+    def settle(self, reserved: int, actual: Optional[int]) -> None:
+        """Correct a reservation with the actual usage (refund or debt)."""
+        if actual is None:
+            self.used_total += max(0, int(reserved))
+            return
+        self.used_total += max(0, int(actual))
+        if not self.enabled:
+            return
+        self._refill()
+        # Debt may push the balance negative; later acquires then wait longer.
+        self._available = min(self.capacity, self._available + (int(reserved) - int(actual)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tokens_per_minute": self.tokens_per_minute,
+            "reserved_total": self.reserved_total,
+            "used_total": self.used_total,
+            "waited_s": round(self.waited_s, 3),
+        }
@@ -14,6 +14,7 @@ from pathlib import Path
 
 from services.db_service import fetch, fetchrow, execute, init_db_pool
 from app.core.logging import get_logger
+from services.config_cache_service import mark_config_stale
 from app.workers.discovery_bot import CATEGORIES_YML
 
 logger = get_logger()
@@ -320,6 +321,7 @@ async def save_category_to_db(category_key: str, category_data: Dict[str, Any])
     )
     
     logger.info("category_saved_to_database", category_key=category_key, label=label)
+    mark_config_stale("categories")
 
 
 async def delete_category_from_db(category_key: str) -> None:
@@ -339,4 +341,5 @@ async def delete_category_from_db(category_key: str) -> None:
     await execute(sql, category_key)
     
     logger.info("category_deleted_from_database", category_key=category_key)
+    mark_config_stale("categories")
 
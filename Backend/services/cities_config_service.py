@@ -9,7 +9,7 @@ from __future__ import annotations
 import shutil
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import yaml
 
@@ -213,6 +213,8 @@ def get_city_key_from_coords(lat: Optional[float], lng: Optional[float]) -> Opti
     """
     Derive city_key from coordinates by checking which city's bbox contains the point.
     
+    Uses the process-wide compiled CityGeoIndex (rebuilt only on config version change).
+    
     Args:
         lat: Latitude
         lng: Longitude
@@ -220,43 +222,42 @@ def get_city_key_from_coords(lat: Optional[float], lng: Optional[float]) -> Opti
     Returns:
         city_key (e.g., 'rotterdam') if coordinates fall within a city's districts, None otherwise
     """
+    return get_city_district_from_coords(lat, lng)[0]
+
+
+def get_city_district_from_coords(lat: Optional[float], lng: Optional[float]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Derive (city_key, district_key) from coordinates.
+    
+    district_key is None when only a city-level bbox matched.
+    """
     if lat is None or lng is None:
-        return None
+        return None, None
     
     try:
-        config = load_cities_config()
-        cities = config.get("cities", {})
-        
-        # Check each city's districts
-        for city_key, city_data in cities.items():
-            districts = city_data.get("districts", {})
-            
-            # Check if point is within any district's bbox
-            for district_key, district_data in districts.items():
-                if all(k in district_data for k in ["lat_min", "lat_max", "lng_min", "lng_max"]):
-                    lat_min = float(district_data["lat_min"])
-                    lat_max = float(district_data["lat_max"])
-                    lng_min = float(district_data["lng_min"])
-                    lng_max = float(district_data["lng_max"])
-                    
-                    if lat_min <= lat <= lat_max and lng_min <= lng <= lng_max:
-                        return city_key
-        
-        # If no district match, check city-level bbox if it exists
-        for city_key, city_data in cities.items():
-            if all(k in city_data for k in ["lat_min", "lat_max", "lng_min", "lng_max"]):
-                lat_min = float(city_data["lat_min"])
-                lat_max = float(city_data["lat_max"])
-                lng_min = float(city_data["lng_min"])
-                lng_max = float(city_data["lng_max"])
-                
-                if lat_min <= lat <= lat_max and lng_min <= lng <= lng_max:
-                    return city_key
-        
-        return None
+        from services.city_geo_index import get_city_geo_index
+        return get_city_geo_index().lookup(float(lat), float(lng))
     except Exception as e:
         logger.warning("failed_to_get_city_key_from_coords", lat=lat, lng=lng, error=str(e))
-        return None
+        return None, None
+
+
+def get_city_districts_from_coords_batch(
+    lats: Sequence[Optional[float]],
+    lngs: Sequence[Optional[float]],
+) -> List[Tuple[Optional[str], Optional[str]]]:
+    """
+    Vectorized variant of get_city_district_from_coords for parallel lat/lng arrays.
+    """
+    try:
+        from services.city_geo_index import get_city_geo_index
+        return get_city_geo_index().lookup_many(
+            [float(v) if v is not None else None for v in lats],
+            [float(v) if v is not None else None for v in lngs],
+        )
+    except Exception as e:
+        logger.warning("failed_to_get_city_keys_from_coords_batch", count=len(lats), error=str(e))
+        return [(None, None)] * len(lats)
 
 
 def get_defaults_anchor_ref(config: Dict[str, Any]) -> str:
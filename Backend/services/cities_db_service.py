@@ -15,6 +15,7 @@ from pathlib import Path
 
 from services.db_service import fetch, fetchrow, execute, init_db_pool
 from app.core.logging import get_logger
+from services.config_cache_service import mark_config_stale
 from app.workers.discovery_bot import CITIES_YML
 
 logger = get_logger()
@@ -349,6 +350,7 @@ async def save_city_to_db(city_key: str, city_data: Dict[str, Any]) -> None:
     )
     
     logger.info("city_saved_to_database", city_key=city_key, city_name=city_name)
+    mark_config_stale("cities")
     
     # Sync districts if provided
     districts = city_data.get("districts", {})
@@ -413,6 +415,7 @@ async def save_district_to_db(city_key: str, district_key: str, district_data: D
     )
     
     logger.info("district_saved_to_database", city_key=city_key, district_key=district_key)
+    mark_config_stale("cities")
 
 
 async def delete_city_from_db(city_key: str) -> None:
@@ -432,6 +435,7 @@ async def delete_city_from_db(city_key: str) -> None:
     await execute(sql, city_key)
     
     logger.info("city_deleted_from_database", city_key=city_key)
+    mark_config_stale("cities")
 
 
 async def delete_district_from_db(city_key: str, district_key: str) -> None:
@@ -452,4 +456,5 @@ async def delete_district_from_db(city_key: str, district_key: str) -> None:
     await execute(sql, city_key, district_key)
     
     logger.info("district_deleted_from_database", city_key=city_key, district_key=district_key)
+    mark_config_stale("cities")
 
@@ -0,0 +1,221 @@
+"""
+City Geo Index - process-wide compiled lookup from coordinates to (city_key, district_key).
+
+Replaces the linear scan over every district bbox in
+cities_config_service.get_city_key_from_coords with a uniform grid over the
+bboxes, compiled once per cities config version.
+
+Lookup semantics are identical to the original scan:
+- District bboxes are checked in config order (cities, then districts); first hit wins.
+- If no district matches, city-level bboxes (lat_min/lat_max/lng_min/lng_max on
+  the city itself) are checked in config order.
+
+The index is rebuilt only when the cities config version changes, as tracked
+by services.config_cache_service (DB COUNT/MAX(updated_at) or cities.yml mtime).
+Workers call `await refresh_city_geo_index()` once per run for a DB version check.
+"""
+from __future__ import annotations
+
+import heapq
+import math
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.logging import get_logger
+
+logger = get_logger()
+
+# Grid cell size in degrees (~2.2km lat). District bboxes are ~0.02-0.03 deg,
+# so a point typically has 1-4 candidate boxes in its cell.
+GRID_CELL_DEG = 0.02
+
+# Boxes covering more cells than this are kept in a separate "wide" list
+# instead of being rasterized into the grid (e.g. a country-wide city bbox).
+MAX_CELLS_PER_BOX = 10_000
+
+BBOX_KEYS = ("lat_min", "lat_max", "lng_min", "lng_max")
+
+CityDistrict = Tuple[Optional[str], Optional[str]]
+
+
+@dataclass(frozen=True)
+class _Box:
+    priority: int
+    lat_min: float
+    lat_max: float
+    lng_min: float
+    lng_max: float
+    city_key: str
+    district_key: Optional[str]
+
+    def contains(self, lat: float, lng: float) -> bool:
+        return self.lat_min <= lat <= self.lat_max and self.lng_min <= lng <= self.lng_max
+
+
+def _cell(value: float) -> int:
+    return int(math.floor(value / GRID_CELL_DEG))
+
+
+def _boxes_from_config(config: Dict[str, Any]) -> List[_Box]:
+    """Flatten the cities config into boxes, ordered by lookup priority."""
+    cities = (config or {}).get("cities") or {}
+    boxes: List[_Box] = []
+
+    # District bboxes first (same order as the original nested loop)
+    for city_key, city_data in cities.items():
+        districts = (city_data or {}).get("districts") or {}
+        for district_key, district_data in districts.items():
+            if not isinstance(district_data, dict) or not all(k in district_data for k in BBOX_KEYS):
+                continue
+            try:
+                boxes.append(_Box(
+                    priority=len(boxes),
+                    lat_min=float(district_data["lat_min"]),
+                    lat_max=float(district_data["lat_max"]),
+                    lng_min=float(district_data["lng_min"]),
+                    lng_max=float(district_data["lng_max"]),
+                    city_key=city_key,
+                    district_key=district_key,
+                ))
+            except (TypeError, ValueError):
+                logger.warning("city_geo_index_invalid_district_bbox", city=city_key, district=district_key)
+
+    # City-level bboxes as fallback
+    for city_key, city_data in cities.items():
+        if not isinstance(city_data, dict) or not all(k in city_data for k in BBOX_KEYS):
+            continue
+        try:
+            boxes.append(_Box(
+                priority=len(boxes),
+                lat_min=float(city_data["lat_min"]),
+                lat_max=float(city_data["lat_max"]),
+                lng_min=float(city_data["lng_min"]),
+                lng_max=float(city_data["lng_max"]),
+                city_key=city_key,
+                district_key=None,
+            ))
+        except (TypeError, ValueError):
+            logger.warning("city_geo_index_invalid_city_bbox", city=city_key)
+
+    return boxes
+
+
+class CityGeoIndex:
+    """Immutable compiled grid over city/district bboxes."""
+
+    def __init__(self, boxes: List[_Box], version: Optional[str] = None):
+        self.version = version
+        self.box_count = len(boxes)
+        grid: Dict[Tuple[int, int], List[_Box]] = {}
+        wide: List[_Box] = []
+        for box in boxes:
+            r0, r1 = _cell(box.lat_min), _cell(box.lat_max)
+            c0, c1 = _cell(box.lng_min), _cell(box.lng_max)
+            if (r1 - r0 + 1) * (c1 - c0 + 1) > MAX_CELLS_PER_BOX:
+                wide.append(box)
+                continue
+            for r in range(r0, r1 + 1):
+                for c in range(c0, c1 + 1):
+                    grid.setdefault((r, c), []).append(box)
+        # Boxes are appended in priority order, so each cell list is already sorted
+        self._grid: Dict[Tuple[int, int], Tuple[_Box, ...]] = {k: tuple(v) for k, v in grid.items()}
+        self._wide: Tuple[_Box, ...] = tuple(wide)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], version: Optional[str] = None) -> "CityGeoIndex":
+        return cls(_boxes_from_config(config), version=version)
+
+    def lookup(self, lat: Optional[float], lng: Optional[float]) -> CityDistrict:
+        """Return (city_key, district_key) for a point; district_key is None for city-level hits."""
+        if lat is None or lng is None:
+            return None, None
+        candidates: Iterable[_Box] = self._grid.get((_cell(lat), _cell(lng)), ())
+        if self._wide:
+            candidates = heapq.merge(candidates, self._wide, key=lambda b: b.priority)
+        for box in candidates:
+            if box.contains(lat, lng):
+                return box.city_key, box.district_key
+        return None, None
+
+    def lookup_many(
+        self,
+        lats: Sequence[Optional[float]],
+        lngs: Sequence[Optional[float]],
+    ) -> List[CityDistrict]:
+        """Batch lookup for parallel lat/lng arrays."""
+        if len(lats) != len(lngs):
+            raise ValueError("lats and lngs must have the same length")
+        grid_get = self._grid.get
+        wide = self._wide
+        floor = math.floor
+        cell = GRID_CELL_DEG
+        out: List[CityDistrict] = []
+        append = out.append
+        for lat, lng in zip(lats, lngs):
+            if lat is None or lng is None:
+                append((None, None))
+                continue
+            candidates: Iterable[_Box] = grid_get((int(floor(lat / cell)), int(floor(lng / cell))), ())
+            if wide:
+                candidates = heapq.merge(candidates, wide, key=lambda b: b.priority)
+            hit: CityDistrict = (None, None)
+            for box in candidates:
+                if box.lat_min <= lat <= box.lat_max and box.lng_min <= lng <= box.lng_max:
+                    hit = (box.city_key, box.district_key)
+                    break
+            append(hit)
+        return out
+
+
+# ---------------------------------------------------------------------------
+# Process-wide instance
+# ---------------------------------------------------------------------------
+_index: Optional[CityGeoIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_city_geo_index() -> CityGeoIndex:
+    """
+    Return the compiled index for the current cities config version.
+
+    The config itself comes from the versioned config cache, so this is a dict
+    lookup plus a version compare on the hot path; the grid is only recompiled
+    when the cache reports a new version.
+    """
+    global _index
+    from services.config_cache_service import get_cities_config, get_config_version
+
+    config = get_cities_config()
+    version = get_config_version("cities")
+    index = _index
+    if index is not None and index.version == version:
+        return index
+
+    with _index_lock:
+        if _index is not None and _index.version == version:
+            return _index
+        _index = CityGeoIndex.from_config(config, version=version)
+        logger.info("city_geo_index_built", version=version, boxes=_index.box_count)
+        return _index
+
+
+async def refresh_city_geo_index(force: bool = False) -> CityGeoIndex:
+    """
+    Cheap version check on the cities config (DB-first); the index is rebuilt
+    on next access only if the version changed.
+    """
+    from services.config_cache_service import refresh_config
+
+    try:
+        await refresh_config("cities", force=force)
+    except Exception as e:
+        logger.warning("city_geo_index_refresh_failed", error=str(e))
+    return get_city_geo_index()
+
+
+def reset_city_geo_index() -> None:
+    """Drop the cached index (tests)."""
+    global _index
+    with _index_lock:
+        _index = None
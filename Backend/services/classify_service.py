@@ -146,9 +146,16 @@ def _build_user_prompt(name: str, address: Optional[str], typ: Optional[str]) ->
     parts.append("Geef enkel JSON output conform schema.")
     return "\n".join(parts)
 
-def _maybe_schedule(func: Callable, *args, **kwargs) -> None:
+def _maybe_schedule(
+    func: Callable,
+    *args,
+    owner_loop: Optional[asyncio.AbstractEventLoop] = None,
+    **kwargs,
+) -> None:
     """
     ai_log kan sync of async zijn. Deze helper roept 'm veilig aan.
+    Vanuit een worker-thread (geen running loop) gaat de coroutine terug naar
+    `owner_loop`, de loop die de DB-pool bezit.
     """
     try:
         if asyncio.iscoroutinefunction(func):
@@ -159,6 +166,8 @@ def _maybe_schedule(func: Callable, *args, **kwargs) -> None:
                 loop = None
             if loop and loop.is_running():
                 asyncio.create_task(func(*args, **kwargs))
+            elif owner_loop is not None and owner_loop.is_running():
+                asyncio.run_coroutine_threadsafe(func(*args, **kwargs), owner_loop)
             else:
                 asyncio.run(func(*args, **kwargs))  # fallback
         else:
@@ -168,8 +177,10 @@ def _maybe_schedule(func: Callable, *args, **kwargs) -> None:
         pass
 
 class ClassifyService:
-    def __init__(self, model: Optional[str] = None):
+    def __init__(self, model: Optional[str] = None, use_cache: bool = True):
         self.model = model or "gpt-4.1-mini"
+        # Memoize identical (prompt, input) pairs; --no-ai-cache bypasses process-wide
+        self.use_cache = use_cache
         self.system_prompt = SYSTEM_PATH.read_text(encoding="utf-8")
         self.fewshot = FEWSHOT_PATH.read_text(encoding="utf-8")
         self.JSON_SCHEMA = JSON_SCHEMA
@@ -211,12 +222,13 @@ class ClassifyService:
         """
         errors = []
 
-        # Variant A: met response_model via kwargs
+        # Variant A: met response_model via kwargs (memoized via ai_response_cache)
         try:
             parsed, meta = self.ai.generate_json(
                 system_prompt=system_prompt,
                 user_prompt=user_prompt,
                 response_model=ClassificationResult,
+                cache=self.use_cache,
             )
             return parsed, meta
         except TypeError as e:
@@ -308,6 +320,7 @@ class ClassifyService:
         # log non-blocking
         _maybe_schedule(
             ai_log,
+            owner_loop=getattr(self.ai, "_owner_loop", None),
             location_id=location_id,
             action_type="classify",
             prompt={"system": self.system_prompt, "fewshot": self.fewshot, "user": user_prompt},
@@ -316,6 +329,7 @@ class ClassifyService:
             model_used=self.model,
             is_success=True,
             error_message=None,
+            cache_hit=bool(meta.get("cache_hit")) if isinstance(meta, dict) else False,
         )
         return parsed, meta
 
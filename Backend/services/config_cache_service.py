@@ -0,0 +1,353 @@
+"""
+Config Cache Service - versioned in-memory cache for cities/categories configuration.
+
+load_cities_config() and load_categories_config() used to re-parse the YAML on
+every call made from inside a running event loop (every API request and async
+worker), because the DB-first path needs run_until_complete. This module keeps
+the parsed dicts in memory and only reloads when a cheap version check says the
+source changed:
+
+- DB:   COUNT(*) + MAX(updated_at) on cities_config/districts_config or categories_config
+- YAML: file mtime (used when the DB is unavailable/empty)
+
+Usage:
+- Sync callers: get_cities_config() / get_categories_config() (via the discovery_bot
+  wrappers). Inside an event loop a stale entry schedules a background version
+  check instead of blocking.
+- Async callers / startup: await refresh_config_cache() loads DB-first.
+- Admin writes: mark_config_stale("cities") triggers a version check on next access.
+
+Returned dicts are shared; treat them as read-only.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import yaml
+
+from app.core.logging import get_logger
+
+logger = get_logger()
+
+# Minimum seconds between version checks per config (0 = check on every access)
+CONFIG_CACHE_CHECK_INTERVAL_S = float(os.getenv("CONFIG_CACHE_CHECK_INTERVAL_S", "30"))
+
+CITIES_VERSION_SQL = """
+    SELECT
+        (SELECT COUNT(*) FROM cities_config) AS row_count,
+        (SELECT MAX(updated_at) FROM cities_config) AS updated_at,
+        (SELECT COUNT(*) FROM districts_config) AS child_count,
+        (SELECT MAX(updated_at) FROM districts_config) AS child_updated_at
+"""
+
+CATEGORIES_VERSION_SQL = """
+    SELECT
+        (SELECT COUNT(*) FROM categories_config) AS row_count,
+        (SELECT MAX(updated_at) FROM categories_config) AS updated_at,
+        0 AS child_count,
+        NULL::timestamptz AS child_updated_at
+"""
+
+
+@dataclass
+class ConfigCacheStats:
+    hits: int = 0
+    misses: int = 0
+    reloads: int = 0
+    yaml_parses: int = 0
+    db_loads: int = 0
+    version_checks: int = 0
+    errors: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(self.__dict__)
+
+
+@dataclass
+class _Entry:
+    name: str
+    root_key: str
+    yaml_path_fn: Callable[[], Path]
+    db_loader_fn: Callable[[], Callable[[], Awaitable[Dict[str, Any]]]]
+    sync_loader_fn: Callable[[], Callable[[], Dict[str, Any]]]
+    version_sql: str
+    data: Optional[Dict[str, Any]] = None
+    source: Optional[str] = None  # "db" | "yaml" | "sync"
+    version: Optional[str] = None
+    loaded_at: Optional[float] = None
+    checked_at: float = 0.0
+    refresh_task: Optional[asyncio.Task] = None
+    stats: ConfigCacheStats = field(default_factory=ConfigCacheStats)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def _cities_yaml_path() -> Path:
+    from app.workers.discovery_bot import CITIES_YML
+    return CITIES_YML
+
+
+def _categories_yaml_path() -> Path:
+    from app.workers.discovery_bot import CATEGORIES_YML
+    return CATEGORIES_YML
+
+
+def _cities_db_loader():
+    from services.cities_db_service import load_cities_config_from_db
+    return load_cities_config_from_db
+
+
+def _categories_db_loader():
+    from services.categories_db_service import load_categories_config_from_db
+    return load_categories_config_from_db
+
+
+def _cities_sync_loader():
+    from app.workers.discovery_bot import _load_cities_config_uncached
+    return _load_cities_config_uncached
+
+
+def _categories_sync_loader():
+    from app.workers.discovery_bot import _load_categories_config_uncached
+    return _load_categories_config_uncached
+
+
+_ENTRIES: Dict[str, _Entry] = {
+    "cities": _Entry(
+        name="cities",
+        root_key="cities",
+        yaml_path_fn=_cities_yaml_path,
+        db_loader_fn=_cities_db_loader,
+        sync_loader_fn=_cities_sync_loader,
+        version_sql=CITIES_VERSION_SQL,
+    ),
+    "categories": _Entry(
+        name="categories",
+        root_key="categories",
+        yaml_path_fn=_categories_yaml_path,
+        db_loader_fn=_categories_db_loader,
+        sync_loader_fn=_categories_sync_loader,
+        version_sql=CATEGORIES_VERSION_SQL,
+    ),
+}
+
+
+def _file_version(path: Path) -> str:
+    try:
+        return f"file:{path.stat().st_mtime_ns}"
+    except OSError:
+        return "file:missing"
+
+
+def _parse_yaml(entry: _Entry) -> Dict[str, Any]:
+    path = entry.yaml_path_fn()
+    if not path.exists():
+        raise FileNotFoundError(f"Config niet gevonden: {path}")
+    data = yaml.safe_load(path.read_text(encoding="utf-8"))
+    if not isinstance(data, dict) or entry.root_key not in data:
+        raise ValueError(f"{path.name} is ongeldig: mist '{entry.root_key}' root-key.")
+    entry.stats.yaml_parses += 1
+    return data
+
+
+def _store(entry: _Entry, data: Dict[str, Any], source: str, version: str) -> Dict[str, Any]:
+    with entry.lock:
+        if entry.data is not None:
+            entry.stats.reloads += 1
+        entry.data = data
+        entry.source = source
+        entry.version = version
+        entry.loaded_at = time.time()
+        entry.checked_at = time.monotonic()
+    logger.info("config_cache_loaded", config=entry.name, source=source, version=version)
+    return data
+
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+def _get(entry: _Entry) -> Dict[str, Any]:
+    data = entry.data
+    if data is not None:
+        entry.stats.hits += 1
+        if time.monotonic() - entry.checked_at >= CONFIG_CACHE_CHECK_INTERVAL_S:
+            _schedule_version_check(entry)
+        return data
+
+    entry.stats.misses += 1
+    if _in_event_loop():
+        # Can't await the DB here; serve YAML now and let a background refresh
+        # swap in the DB config (if any) without blocking this request.
+        data = _store(entry, _parse_yaml(entry), "yaml", _file_version(entry.yaml_path_fn()))
+        _schedule_version_check(entry, force=True)
+        return data
+
+    # No running loop: the legacy loader can do its DB-first run_until_complete
+    data = entry.sync_loader_fn()()
+    return _store(entry, data, "sync", _file_version(entry.yaml_path_fn()))
+
+
+def _schedule_version_check(entry: _Entry, force: bool = False) -> None:
+    if not _in_event_loop():
+        # Sync context: only the (cheap) mtime check is possible
+        entry.checked_at = time.monotonic()
+        if entry.source in ("yaml", "sync"):
+            entry.stats.version_checks += 1
+            version = _file_version(entry.yaml_path_fn())
+            if version != entry.version:
+                if entry.source == "yaml":
+                    _store(entry, _parse_yaml(entry), "yaml", version)
+                else:
+                    _store(entry, entry.sync_loader_fn()(), "sync", version)
+        return
+
+    task = entry.refresh_task
+    if task is not None and not task.done() and not task.get_loop().is_closed():
+        return
+    entry.checked_at = time.monotonic()
+    loop = asyncio.get_running_loop()
+    entry.refresh_task = loop.create_task(_background_refresh(entry, force))
+
+
+async def _db_version(entry: _Entry) -> Optional[str]:
+    from services.db_service import fetchrow
+
+    row = await fetchrow(entry.version_sql)
+    rec = dict(row) if row else {}
+    if not rec.get("row_count"):
+        return None
+    return "db:{row_count}:{updated_at}:{child_count}:{child_updated_at}".format(**{
+        k: rec.get(k) for k in ("row_count", "updated_at", "child_count", "child_updated_at")
+    })
+
+
+async def _refresh_entry(entry: _Entry, force: bool = False) -> Dict[str, Any]:
+    entry.stats.version_checks += 1
+    entry.checked_at = time.monotonic()
+    try:
+        version = await _db_version(entry)
+        if version is not None:
+            if not force and entry.data is not None and entry.version == version:
+                return entry.data
+            data = await entry.db_loader_fn()()
+            if data.get(entry.root_key):
+                entry.stats.db_loads += 1
+                return _store(entry, data, "db", version)
+            logger.warning("config_cache_db_empty_falling_back_to_yaml", config=entry.name)
+    except Exception as e:
+        entry.stats.errors += 1
+        logger.warning("config_cache_db_refresh_failed", config=entry.name, error=str(e))
+
+    # YAML fallback: only re-parse when the file actually changed
+    version = _file_version(entry.yaml_path_fn())
+    if entry.data is not None:
+        if entry.source == "db":
+            # DB was reachable before; keep serving it rather than flapping to YAML
+            return entry.data
+        if entry.version == version:
+            return entry.data
+    return _store(entry, _parse_yaml(entry), "yaml", version)
+
+
+async def _background_refresh(entry: _Entry, force: bool) -> None:
+    try:
+        await _refresh_entry(entry, force=force)
+    except Exception as e:
+        entry.stats.errors += 1
+        logger.warning("config_cache_background_refresh_failed", config=entry.name, error=str(e))
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+def get_cities_config() -> Dict[str, Any]:
+    """Cached cities config (DB-first once refreshed, YAML otherwise)."""
+    return _get(_ENTRIES["cities"])
+
+
+def get_categories_config() -> Dict[str, Any]:
+    """Cached categories config (DB-first once refreshed, YAML otherwise)."""
+    return _get(_ENTRIES["categories"])
+
+
+async def _aget(entry: _Entry) -> Dict[str, Any]:
+    if entry.data is None:
+        entry.stats.misses += 1
+        return await _refresh_entry(entry, force=True)
+    return _get(entry)
+
+
+async def aget_cities_config() -> Dict[str, Any]:
+    """Async accessor: DB-first load on the first call, cached afterwards."""
+    return await _aget(_ENTRIES["cities"])
+
+
+async def aget_categories_config() -> Dict[str, Any]:
+    """Async accessor: DB-first load on the first call, cached afterwards."""
+    return await _aget(_ENTRIES["categories"])
+
+
+async def refresh_config(name: str, force: bool = False) -> Dict[str, Any]:
+    """Version-check one config ("cities" | "categories") and reload it if needed."""
+    entry = _ENTRIES[name]
+    return await _refresh_entry(entry, force=force or entry.data is None)
+
+
+async def refresh_config_cache(force: bool = False) -> None:
+    """Version-check (and reload if needed) all cached configs. Call at startup / per worker run."""
+    for entry in _ENTRIES.values():
+        await _refresh_entry(entry, force=force or entry.data is None)
+
+
+def get_config_version(name: str) -> Optional[str]:
+    entry = _ENTRIES[name]
+    return entry.version
+
+
+def mark_config_stale(name: str) -> None:
+    """
+    Force a version check on the next access without dropping the cached data
+    (used after admin writes, so readers never fall back to a YAML parse).
+    """
+    _ENTRIES[name].checked_at = 0.0
+
+
+def invalidate_config_cache(name: Optional[str] = None) -> None:
+    """Drop cached data so the next access reloads (admin writes, tests)."""
+    for key, entry in _ENTRIES.items():
+        if name is not None and key != name:
+            continue
+        with entry.lock:
+            entry.data = None
+            entry.source = None
+            entry.version = None
+            entry.loaded_at = None
+            entry.checked_at = 0.0
+
+
+def reset_config_cache_stats() -> None:
+    for entry in _ENTRIES.values():
+        entry.stats = ConfigCacheStats()
+
+
+def get_config_cache_stats() -> Dict[str, Any]:
+    """Hit/miss/reload counters per config; yaml_parses should stay flat in steady state."""
+    return {
+        name: {
+            **entry.stats.as_dict(),
+            "source": entry.source,
+            "version": entry.version,
+            "loaded_at": entry.loaded_at,
+        }
+        for name, entry in _ENTRIES.items()
+    }
@@ -0,0 +1,297 @@
+# services/db_query_stats.py
+"""
+Per-query-fingerprint statistics for services.db_service.
+
+Every statement that goes through db_service._execute_with_timing is normalized to
+a fingerprint (literals -> ?, IN/VALUES lists folded, whitespace collapsed; the
+pg_stat_statements idea, done in-process) and recorded in a log-linear latency
+histogram together with calls, errors, rows returned/affected and the time spent
+waiting for a pool connection. The statements inside run_in_transaction() are
+recorded individually; the transaction itself (pool wait + time the connection was
+held) is one extra entry, "(run_in_transaction)".
+
+- DB_QUERY_STATS_ENABLED=false (default) costs one attribute check per query
+- DB_QUERY_STATS_SAMPLE_RATE records only that fraction of calls (counts are
+  reported as sampled; multiply by 1/sample_rate for an estimate)
+- At most DB_QUERY_STATS_MAX_FINGERPRINTS are kept; later ones land in "other"
+
+Stats are per process (API server or worker). Exposed via
+GET /api/v1/admin/metrics/db_queries and, when DB_QUERY_STATS_PROMETHEUS_TOKEN is
+set, GET /api/v1/admin/metrics/db_queries/prometheus (Prometheus text format).
+"""
+from __future__ import annotations
+
+import bisect
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+DB_QUERY_STATS_ENABLED = os.getenv("DB_QUERY_STATS_ENABLED", "false").lower() == "true"
+DB_QUERY_STATS_SAMPLE_RATE = float(os.getenv("DB_QUERY_STATS_SAMPLE_RATE", "1.0"))
+DB_QUERY_STATS_MAX_FINGERPRINTS = int(os.getenv("DB_QUERY_STATS_MAX_FINGERPRINTS", "500"))
+DB_QUERY_STATS_PROMETHEUS_TOKEN = os.getenv("DB_QUERY_STATS_PROMETHEUS_TOKEN", "").strip()
+
+OTHER_FINGERPRINT = "other"
+TRANSACTION_QUERY = "(run_in_transaction)"
+_FINGERPRINT_CACHE_MAX = 4096
+
+# Bucket upper bounds in ms: 10 steps per decade (1, 1.2, 1.5, 2, 2.5, 3, 4, 5, 6, 8)
+# from 0.01ms to 100s, i.e. at most ~25% relative error on percentiles.
+_MANTISSAS = (1.0, 1.2, 1.5, 2.0, 2.5, 3.0, 4.0, 5.0, 6.0, 8.0)
+BUCKET_BOUNDS_MS: Tuple[float, ...] = tuple(
+    round(m * 10.0 ** exp, 6) for exp in range(-2, 5) for m in _MANTISSAS
+) + (100_000.0,)
+# Subset exported as Prometheus `le` buckets (all of them are exact bucket bounds)
+PROMETHEUS_BOUNDS_MS: Tuple[float, ...] = (
+    1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0, 5000.0, 10000.0, 30000.0,
+)
+
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w$.])-?\d+(?:\.\d+)?(?![\w.])")
+_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUES_RE = re.compile(r"(VALUES\s*\(\?(?:,\s*\?)*\))(?:\s*,\s*\(\?(?:,\s*\?)*\))+", re.I)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Query text with comments removed, literals replaced by ? and lists folded."""
+    text = _COMMENT_RE.sub(" ", query)
+    text = _STRING_RE.sub("?", text)
+    text = _NUMBER_RE.sub("?", text)
+    text = _SPACE_RE.sub(" ", text).strip()
+    text = _LIST_RE.sub("(?, ...)", text)
+    text = _VALUES_RE.sub(r"\1, ...", text)
+    return text
+
+
+_fingerprint_cache: Dict[str, Tuple[str, str]] = {}
+
+
+def fingerprint(query: str) -> Tuple[str, str]:
+    """(fingerprint id, normalized text); memoized per query string."""
+    hit = _fingerprint_cache.get(query)
+    if hit is not None:
+        return hit
+    normalized = normalize_query(query)
+    fid = hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12]
+    if len(_fingerprint_cache) >= _FINGERPRINT_CACHE_MAX:
+        _fingerprint_cache.clear()
+    _fingerprint_cache[query] = (fid, normalized)
+    return fid, normalized
+
+
+class LatencyHistogram:
+    """Fixed log-linear buckets (see BUCKET_BOUNDS_MS) plus exact count/sum/max."""
+
+    __slots__ = ("counts", "count", "sum_ms", "max_ms")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)  # last slot: above 100s
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.sum_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Upper bound of the bucket holding the nearest-rank percentile (capped at max)."""
+        if not self.count:
+            return None
+        rank = max(1, int(pct / 100.0 * self.count + 0.999999))
+        seen = 0
+        for idx, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                bound = BUCKET_BOUNDS_MS[idx] if idx < len(BUCKET_BOUNDS_MS) else self.max_ms
+                return round(min(bound, self.max_ms), 3)
+        return round(self.max_ms, 3)
+
+    def cumulative(self, bounds_ms: Tuple[float, ...]) -> List[int]:
+        """Cumulative counts at each bound (bounds must be bucket bounds)."""
+        out: List[int] = []
+        seen = 0
+        idx = 0
+        for bound in bounds_ms:
+            stop = BUCKET_BOUNDS_MS.index(bound) + 1
+            seen += sum(self.counts[idx:stop])
+            idx = stop
+            out.append(seen)
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.sum_ms / self.count, 3) if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(self.max_ms, 3) if self.count else None,
+        }
+
+
+class QueryStats:
+    __slots__ = ("fingerprint", "query", "methods", "calls", "errors", "rows", "latency", "acquire")
+
+    def __init__(self, fid: str, query: str) -> None:
+        self.fingerprint = fid
+        self.query = query
+        self.methods: Dict[str, int] = {}
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.latency = LatencyHistogram()
+        self.acquire = LatencyHistogram()
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "fingerprint": self.fingerprint,
+            "query": self.query[:500],
+            "methods": dict(self.methods),
+            "calls": self.calls,
+            "errors": self.errors,
+            "rows": self.rows,
+            "total_ms": round(self.latency.sum_ms, 3),
+            "latency": self.latency.stats(),
+            "pool_wait": self.acquire.stats(),
+        }
+
+
+_lock = threading.Lock()
+_stats: Dict[str, QueryStats] = {}
+_since = time.time()
+
+
+def should_sample() -> bool:
+    """True when this call should be recorded (enabled and within the sample rate)."""
+    if not DB_QUERY_STATS_ENABLED:
+        return False
+    return DB_QUERY_STATS_SAMPLE_RATE >= 1.0 or random.random() < DB_QUERY_STATS_SAMPLE_RATE
+
+
+def _rows_from_result(method: str, result: Any) -> int:
+    if method == "fetch":
+        return len(result) if result is not None else 0
+    if method in ("fetchrow", "fetchval"):
+        return 0 if result is None else 1
+    if method == "execute" and isinstance(result, str):
+        # Command tag: "UPDATE 3", "INSERT 0 5", "DELETE 0"
+        tail = result.rsplit(" ", 1)[-1]
+        return int(tail) if tail.isdigit() else 0
+    return 0
+
+
+def record_query(
+    query: str,
+    method: str,
+    duration_ms: float,
+    *,
+    result: Any = None,
+    error: bool = False,
+    acquire_ms: Optional[float] = None,
+) -> None:
+    """Add one (sampled) call; acquire_ms is only known for the pooled helpers."""
+    fid, normalized = fingerprint(query)
+    entry = _stats.get(fid)
+    if entry is None:
+        with _lock:
+            entry = _stats.get(fid)
+            if entry is None:
+                if len(_stats) >= DB_QUERY_STATS_MAX_FINGERPRINTS:
+                    entry = _stats.get(OTHER_FINGERPRINT)
+                    if entry is None:
+                        entry = _stats[OTHER_FINGERPRINT] = QueryStats(OTHER_FINGERPRINT, "(fingerprint limit reached)")
+                else:
+                    entry = _stats[fid] = QueryStats(fid, normalized)
+    entry.calls += 1
+    entry.methods[method] = entry.methods.get(method, 0) + 1
+    if error:
+        entry.errors += 1
+    else:
+        entry.rows += _rows_from_result(method, result)
+    entry.latency.record(duration_ms)
+    if acquire_ms is not None:
+        entry.acquire.record(acquire_ms)
+
+
+def record_transaction(duration_ms: float, acquire_ms: Optional[float], *, error: bool = False) -> None:
+    """run_in_transaction() as one entry: pool wait plus time the connection was held."""
+    record_query(TRANSACTION_QUERY, "transaction", duration_ms, error=error, acquire_ms=acquire_ms)
+
+
+def get_query_stats(limit: int = 50, sort: str = "total_ms") -> Dict[str, Any]:
+    """Top fingerprints by total_ms (default), calls, p99_ms or pool_wait_ms."""
+    keys = {
+        "total_ms": lambda s: s.latency.sum_ms,
+        "calls": lambda s: s.calls,
+        "p99_ms": lambda s: s.latency.percentile(99) or 0.0,
+        "pool_wait_ms": lambda s: s.acquire.sum_ms,
+    }
+    key = keys.get(sort, keys["total_ms"])
+    entries = sorted(list(_stats.values()), key=key, reverse=True)
+    total_ms = sum(s.latency.sum_ms for s in entries)
+    return {
+        "enabled": DB_QUERY_STATS_ENABLED,
+        "sample_rate": DB_QUERY_STATS_SAMPLE_RATE,
+        "since": _since,
+        "fingerprints_tracked": len(entries),
+        "sampled_calls": sum(s.calls for s in entries),
+        "sampled_total_ms": round(total_ms, 3),
+        "queries": [
+            {**s.as_dict(), "share_of_total": round(s.latency.sum_ms / total_ms, 4) if total_ms else 0.0}
+            for s in entries[: max(0, limit)]
+        ],
+    }
+
+
+def _prom_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", " ").replace('"', '\\"')
+
+
+def render_prometheus() -> str:
+    """All fingerprints in Prometheus text exposition format (seconds, sampled counts)."""
+    lines = [
+        "# HELP tda_db_query_duration_seconds Query latency per fingerprint (sampled).",
+        "# TYPE tda_db_query_duration_seconds histogram",
+    ]
+    entries = list(_stats.values())
+    for s in entries:
+        labels = f'fingerprint="{s.fingerprint}"'
+        for bound, cum in zip(PROMETHEUS_BOUNDS_MS, s.latency.cumulative(PROMETHEUS_BOUNDS_MS)):
+            lines.append(f'tda_db_query_duration_seconds_bucket{{{labels},le="{bound / 1000:g}"}} {cum}')
+        lines.append(f'tda_db_query_duration_seconds_bucket{{{labels},le="+Inf"}} {s.latency.count}')
+        lines.append(f"tda_db_query_duration_seconds_sum{{{labels}}} {s.latency.sum_ms / 1000:.6f}")
+        lines.append(f"tda_db_query_duration_seconds_count{{{labels}}} {s.latency.count}")
+    for name, help_text, value_of in (
+        ("tda_db_query_errors_total", "Failed queries per fingerprint (sampled).", lambda s: s.errors),
+        ("tda_db_query_rows_total", "Rows returned or affected per fingerprint (sampled).", lambda s: s.rows),
+        ("tda_db_pool_wait_seconds_total", "Time waiting for a pool connection per fingerprint (sampled).",
+         lambda s: f"{s.acquire.sum_ms / 1000:.6f}"),
+    ):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for s in entries:
+            lines.append(f'{name}{{fingerprint="{s.fingerprint}"}} {value_of(s)}')
+    lines.append("# HELP tda_db_query_info Normalized query text per fingerprint.")
+    lines.append("# TYPE tda_db_query_info gauge")
+    for s in entries:
+        lines.append(f'tda_db_query_info{{fingerprint="{s.fingerprint}",query="{_prom_escape(s.query[:200])}"}} 1')
+    return "\n".join(lines) + "\n"
+
+
+def reset_query_stats() -> None:
+    """Drop all fingerprints (tests/benchmarks, or to start a fresh measurement window)."""
+    global _since
+    with _lock:
+        _stats.clear()
+        _fingerprint_cache.clear()
+        _since = time.time()
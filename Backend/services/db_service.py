@@ -13,6 +13,8 @@ from dotenv import load_dotenv
 import logging
 import asyncpg
 
+from services import db_query_stats
+
 # --------------------------------------------------------------------
 # DB config
 # --------------------------------------------------------------------
@@ -147,6 +149,7 @@ async def _execute_with_timing(
     query: str,
     *args: Any,
     timeout: Optional[float] = None,
+    acquire_ms: Optional[float] = None,
 ) -> Any:
     if not isinstance(conn, asyncpg.Connection):
         raise TypeError("conn must be an asyncpg.Connection instance")
@@ -156,14 +159,22 @@ async def _execute_with_timing(
         raise TypeError("query must be a string")
 
     start_ms = monotonic() * 1000
+    result: Any = None
+    failed = True
     try:
         func = getattr(conn, method)
         effective_timeout = (
             timeout if timeout is not None else DEFAULT_QUERY_TIMEOUT_MS / 1000
         )
-        return await func(query, *args, timeout=effective_timeout)
+        result = await func(query, *args, timeout=effective_timeout)
+        failed = False
+        return result
     finally:
         duration_ms = (monotonic() * 1000) - start_ms
+        if db_query_stats.DB_QUERY_STATS_ENABLED and db_query_stats.should_sample():
+            db_query_stats.record_query(
+                query, method, duration_ms, result=result, error=failed, acquire_ms=acquire_ms
+            )
         if duration_ms >= SLOW_QUERY_THRESHOLD_MS:
             logger.warning(
                 "db_slow_query",
@@ -181,35 +192,50 @@ async def connection() -> AsyncIterator[asyncpg.Connection]:
     async with pool.acquire() as conn:
         yield conn
 
+@asynccontextmanager
+async def _timed_connection() -> AsyncIterator[tuple[asyncpg.Connection, Optional[float]]]:
+    """connection() plus the pool wait in ms (None unless DB_QUERY_STATS_ENABLED)."""
+    if not db_query_stats.DB_QUERY_STATS_ENABLED:
+        async with connection() as conn:
+            yield conn, None
+        return
+    start_ms = monotonic() * 1000
+    async with connection() as conn:
+        yield conn, (monotonic() * 1000) - start_ms
+
 async def fetch(
     query: str,
     *args: Any,
     timeout: Optional[float] = None,
 ) -> List[asyncpg.Record]:
-    async with connection() as conn:
-        return await _execute_with_timing(conn, "fetch", query, *args, timeout=timeout)
+    async with _timed_connection() as (conn, acquire_ms):
+        return await _execute_with_timing(
+            conn, "fetch", query, *args, timeout=timeout, acquire_ms=acquire_ms
+        )
 
 async def fetchrow(
     query: str,
     *args: Any,
     timeout: Optional[float] = None,
 ) -> Optional[asyncpg.Record]:
-    async with connection() as conn:
+    async with _timed_connection() as (conn, acquire_ms):
         return await _execute_with_timing(
-            conn, "fetchrow", query, *args, timeout=timeout
+            conn, "fetchrow", query, *args, timeout=timeout, acquire_ms=acquire_ms
         )
 
 async def fetchval(query: str, *args: Any) -> Any:
-    async with connection() as conn:
-        return await _execute_with_timing(conn, "fetchval", query, *args)
+    async with _timed_connection() as (conn, acquire_ms):
+        return await _execute_with_timing(conn, "fetchval", query, *args, acquire_ms=acquire_ms)
 
 async def execute(
     query: str,
     *args: Any,
     timeout: Optional[float] = None,
 ) -> str:
-    async with connection() as conn:
-        return await _execute_with_timing(conn, "execute", query, *args, timeout=timeout)
+    async with _timed_connection() as (conn, acquire_ms):
+        return await _execute_with_timing(
+            conn, "execute", query, *args, timeout=timeout, acquire_ms=acquire_ms
+        )
 
 @asynccontextmanager
 async def run_in_transaction(
@@ -218,16 +244,23 @@ async def run_in_transaction(
     readonly: bool = False,
 ) -> AsyncIterator[asyncpg.Connection]:
     pool = await ensure_pool()
+    sampled = db_query_stats.DB_QUERY_STATS_ENABLED and db_query_stats.should_sample()
+    start_ms = monotonic() * 1000 if sampled else 0.0
     async with pool.acquire() as conn:
+        acquire_ms = (monotonic() * 1000) - start_ms if sampled else None
         tx = conn.transaction(isolation=isolation, readonly=readonly)
         await tx.start()
         try:
             yield conn
         except Exception:
             await tx.rollback()
+            if sampled:
+                db_query_stats.record_transaction((monotonic() * 1000) - start_ms, acquire_ms, error=True)
             raise
         else:
             await tx.commit()
+            if sampled:
+                db_query_stats.record_transaction((monotonic() * 1000) - start_ms, acquire_ms)
 
 async def fetch_with_conn(
     conn: asyncpg.Connection,
@@ -294,59 +327,47 @@ async def ai_log(
     model_used: Optional[str],
     is_success: bool,
     error_message: Optional[str],
+    cache_hit: bool = False,
 ) -> None:
     """
     Schrijf een auditlog-rij naar ai_logs.
     prompt/raw_response/validated_output worden als JSONB opgeslagen.
+    cache_hit markeert antwoorden uit services.ai_response_cache (geen API-call).
     """
     try:
-        sql = (
-            """
-            INSERT INTO ai_logs (
-                location_id,
-                news_id,
-                event_raw_id,
-                action_type,
-                prompt,
-                raw_response,
-                validated_output,
-                model_used,
-                is_success,
-                error_message
-            ) VALUES (
-                $1,
-                $2,
-                $3,
-                $4,
-                CAST($5 AS JSONB),
-                CAST($6 AS JSONB),
-                CAST($7 AS JSONB),
-                $8,
-                $9,
-                $10
-            )
-            """
-        )
-
         # Sanitize all data before JSON serialization to prevent null byte errors
         sanitized_prompt = _sanitize_for_db(prompt) if prompt is not None else None
         sanitized_raw_response = _sanitize_for_db(raw_response) if raw_response is not None else None
         sanitized_validated_output = _sanitize_for_db(validated_output) if validated_output is not None else None
         sanitized_error_message = _sanitize_null_bytes(error_message) if error_message is not None else None
 
-        await execute(
-            sql,
-            location_id,
-            news_id,
-            event_raw_id,
-            action_type,
-            json.dumps(sanitized_prompt, ensure_ascii=False) if sanitized_prompt is not None else None,
-            json.dumps(sanitized_raw_response, ensure_ascii=False) if sanitized_raw_response is not None else None,
-            json.dumps(sanitized_validated_output, ensure_ascii=False) if sanitized_validated_output is not None else None,
-            model_used,
-            is_success,
-            sanitized_error_message,
+        values: Dict[str, Any] = {
+            "location_id": location_id,
+            "news_id": news_id,
+            "event_raw_id": event_raw_id,
+            "action_type": action_type,
+            "prompt": json.dumps(sanitized_prompt, ensure_ascii=False) if sanitized_prompt is not None else None,
+            "raw_response": json.dumps(sanitized_raw_response, ensure_ascii=False) if sanitized_raw_response is not None else None,
+            "validated_output": json.dumps(sanitized_validated_output, ensure_ascii=False) if sanitized_validated_output is not None else None,
+            "model_used": model_used,
+            "is_success": is_success,
+            "error_message": sanitized_error_message,
+        }
+        # cache_hit (migration 099) is only written for cache hits; it defaults to
+        # false, and API-call logs keep working on databases without the column
+        if cache_hit:
+            values["cache_hit"] = True
+
+        jsonb_columns = {"prompt", "raw_response", "validated_output"}
+        placeholders = [
+            f"CAST(${i} AS JSONB)" if column in jsonb_columns else f"${i}"
+            for i, column in enumerate(values, start=1)
+        ]
+        sql = (
+            f"INSERT INTO ai_logs ({', '.join(values)}) "
+            f"VALUES ({', '.join(placeholders)})"
         )
+        await execute(sql, *values.values())
     except Exception as e:
         logger.warning("ai_log failed", exc_info=e)
         return
@@ -374,6 +395,73 @@ async def fetch_candidates_for_classification(limit: int = 100) -> List[Dict[str
 # --------------------------------------------------------------------
 # Update classification result on a location (idempotent + no-downgrade)
 # --------------------------------------------------------------------
+def _plan_classification_update(
+    *,
+    current_state: Optional[str],
+    is_retired: bool,
+    current_category: Optional[str],
+    current_confidence: Optional[float],
+    action: str,
+    category: Optional[str],
+    confidence_score: float,
+    reason: Optional[str],
+    allow_resurrection: bool,
+) -> Dict[str, Any]:
+    """
+    Pure state-derivation for update_location_classification and its bulk variant.
+
+    Returns {"state", "reason", "clear_retired", "noop"}; "noop" marks a
+    VERIFIED→VERIFIED re-verify that only touches last_verified_at/notes.
+    """
+    # Derive desired target state from action + confidence
+    action_l = (action or "").strip().lower()
+    if action_l == "ignore":
+        desired_state = "RETIRED"
+    elif action_l == "keep":
+        if float(confidence_score) >= 0.90:
+            desired_state = "VERIFIED"
+        elif float(confidence_score) >= 0.80:
+            desired_state = "PENDING_VERIFICATION"
+        else:
+            desired_state = "CANDIDATE"
+    else:
+        desired_state = "CANDIDATE"
+
+    # Enforce no-downgrade/no-resurrection
+    final_state = desired_state
+    if current_state == "VERIFIED":
+        final_state = "VERIFIED"  # never demote VERIFIED
+    elif not allow_resurrection and (current_state == "RETIRED" or is_retired):
+        final_state = "RETIRED"   # never resurrect RETIRED unless explicitly allowed
+
+    should_clear_retired = (
+        allow_resurrection
+        and (current_state == "RETIRED" or is_retired)
+        and final_state != "RETIRED"
+    )
+
+    # Only when: state stays VERIFIED, no resurrection, confidence already high
+    is_noop_reverify = (
+        current_state == "VERIFIED"
+        and final_state == "VERIFIED"
+        and not should_clear_retired
+        and float(confidence_score) >= 0.90
+        and (current_confidence is None or float(current_confidence) >= 0.90)
+    )
+    if is_noop_reverify:
+        # Check if category or confidence actually need to change
+        category_changes = category is not None and category != current_category
+        confidence_changes = abs(float(confidence_score) - (float(current_confidence) if current_confidence is not None else 0.0)) > 0.001
+        is_noop_reverify = not category_changes and not confidence_changes
+
+    return {
+        "state": final_state,
+        "reason": reason or "",
+        "clear_retired": should_clear_retired,
+        "noop": is_noop_reverify,
+    }
+
+
 async def update_location_classification(
     *,
     id: int,
@@ -444,79 +532,52 @@ async def update_location_classification(
         current_category = rec.get("category")
         current_confidence = rec.get("confidence_score")
 
-    # Derive desired target state from action + confidence
-    action_l = (action or "").strip().lower()
-    if action_l == "ignore":
-        desired_state = "RETIRED"
-    elif action_l == "keep":
-        if float(confidence_score) >= 0.90:
-            desired_state = "VERIFIED"
-        elif float(confidence_score) >= 0.80:
-            desired_state = "PENDING_VERIFICATION"
-        else:
-            desired_state = "CANDIDATE"
-    else:
-        desired_state = "CANDIDATE"
-
-    # Enforce no-downgrade/no-resurrection
-    final_state = desired_state
-    if current_state == "VERIFIED":
-        final_state = "VERIFIED"  # never demote VERIFIED
-    elif not allow_resurrection and (current_state == "RETIRED" or is_retired):
-        final_state = "RETIRED"   # never resurrect RETIRED unless explicitly allowed
-
-    reason_text = reason or ""
-    should_clear_retired = (
-        allow_resurrection
-        and (current_state == "RETIRED" or is_retired)
-        and final_state != "RETIRED"
-    )
-
-    # Optimize: Use lightweight UPDATE for VERIFIED→VERIFIED no-op cases
-    # Only when: state stays VERIFIED, no resurrection, confidence already high
-    is_noop_reverify = (
-        current_state == "VERIFIED"
-        and final_state == "VERIFIED"
-        and not should_clear_retired
-        and float(confidence_score) >= 0.90
-        and (current_confidence is None or float(current_confidence) >= 0.90)
+    plan = _plan_classification_update(
+        current_state=current_state,
+        is_retired=is_retired,
+        current_category=current_category,
+        current_confidence=current_confidence,
+        action=action,
+        category=category,
+        confidence_score=confidence_score,
+        reason=reason,
+        allow_resurrection=allow_resurrection,
     )
-
-    if is_noop_reverify:
-        # Check if category or confidence actually need to change
-        category_changes = category is not None and category != current_category
-        confidence_changes = abs(float(confidence_score) - (float(current_confidence) if current_confidence is not None else 0.0)) > 0.001
-        
-        if not category_changes and not confidence_changes:
-            # True no-op: only update last_verified_at and notes (if reason provided)
-            if reason_text:
-                sql_lightweight = """
-                    UPDATE locations
-                    SET last_verified_at = NOW(),
-                        notes = CASE
-                                  WHEN $1::text = '' THEN notes
-                                  ELSE COALESCE(notes, '')
-                                       || CASE WHEN notes IS NULL OR notes = '' THEN '' ELSE E'\\n' END
-                                       || $1::text
-                                END
-                    WHERE id = $2::bigint
-                """
-                if conn is not None:
-                    await execute_with_conn(conn, sql_lightweight, reason_text, int(id))
-                else:
-                    await execute(sql_lightweight, reason_text, int(id))
+    final_state = plan["state"]
+    reason_text = plan["reason"]
+    should_clear_retired = plan["clear_retired"]
+
+    # Optimize: lightweight UPDATE for VERIFIED→VERIFIED no-op cases
+    if plan["noop"]:
+        # True no-op: only update last_verified_at and notes (if reason provided)
+        if reason_text:
+            sql_lightweight = """
+                UPDATE locations
+                SET last_verified_at = NOW(),
+                    notes = CASE
+                              WHEN $1::text = '' THEN notes
+                              ELSE COALESCE(notes, '')
+                                   || CASE WHEN notes IS NULL OR notes = '' THEN '' ELSE E'\\n' END
+                                   || $1::text
+                            END
+                WHERE id = $2::bigint
+            """
+            if conn is not None:
+                await execute_with_conn(conn, sql_lightweight, reason_text, int(id))
             else:
-                # Even lighter: just update last_verified_at
-                sql_minimal = """
-                    UPDATE locations
-                    SET last_verified_at = NOW()
-                    WHERE id = $1::bigint
-                """
-                if conn is not None:
-                    await execute_with_conn(conn, sql_minimal, int(id))
-                else:
-                    await execute(sql_minimal, int(id))
-            return  # Early exit for true no-op
+                await execute(sql_lightweight, reason_text, int(id))
+        else:
+            # Even lighter: just update last_verified_at
+            sql_minimal = """
+                UPDATE locations
+                SET last_verified_at = NOW()
+                WHERE id = $1::bigint
+            """
+            if conn is not None:
+                await execute_with_conn(conn, sql_minimal, int(id))
+            else:
+                await execute(sql_minimal, int(id))
+        return  # Early exit for true no-op
 
     # Full UPDATE for all other cases
     # Preserve existing category when new category is None (for action="ignore" cases)
@@ -558,6 +619,128 @@ async def update_location_classification(
         await execute(sql, *exec_args)
 
 
+BULK_CLASSIFICATION_UPDATE_SQL = """
+    UPDATE locations AS l
+    SET
+        category = COALESCE(u.category, l.category),
+        confidence_score = COALESCE(u.confidence_score, l.confidence_score),
+        state = COALESCE(u.state::location_state, l.state),
+        notes = CASE
+                  WHEN u.reason = '' THEN l.notes
+                  ELSE COALESCE(l.notes, '')
+                       || CASE WHEN l.notes IS NULL OR l.notes = '' THEN '' ELSE E'\\n' END
+                       || u.reason
+                END,
+        last_verified_at = NOW(),
+        is_retired = CASE WHEN u.clear_retired THEN false ELSE l.is_retired END
+    FROM unnest(
+        $1::bigint[], $2::text[], $3::numeric[], $4::text[], $5::text[], $6::boolean[]
+    ) AS u(id, category, confidence_score, state, reason, clear_retired)
+    WHERE l.id = u.id
+"""
+
+
+async def update_location_classifications_bulk(
+    items: List[Dict[str, Any]],
+    *,
+    conn: Optional[asyncpg.Connection] = None,
+    allow_resurrection: bool = False,
+) -> int:
+    """
+    Batched variant of update_location_classification.
+
+    `items` are dicts with the same keys as the keyword arguments of
+    update_location_classification (id, action, category, confidence_score, reason).
+    Current state is read once (SELECT ... FOR UPDATE), the same
+    _plan_classification_update rules are applied per row, and all rows are
+    written with a single UPDATE ... FROM unnest(...). No-op re-verifies keep
+    their category/confidence/state and only touch last_verified_at/notes.
+
+    Runs in its own transaction unless `conn` is given. Duplicate ids are applied
+    in order across successive statements. Returns the number of items applied.
+    """
+    if not items:
+        return 0
+    if conn is None:
+        async with run_in_transaction() as tx_conn:
+            return await update_location_classifications_bulk(
+                items, conn=tx_conn, allow_resurrection=allow_resurrection
+            )
+
+    # Split into generations with unique ids so later writes see earlier ones
+    generations: List[List[Dict[str, Any]]] = []
+    occurrences: Dict[int, int] = {}
+    for item in items:
+        item_id = int(item["id"])
+        gen_idx = occurrences.get(item_id, 0)
+        occurrences[item_id] = gen_idx + 1
+        if gen_idx == len(generations):
+            generations.append([])
+        generations[gen_idx].append(item)
+
+    applied = 0
+    for gen in generations:
+        ids = [int(item["id"]) for item in gen]
+        rows = await fetch_with_conn(
+            conn,
+            """
+            SELECT id, state, COALESCE(is_retired, false) AS is_retired, category, confidence_score
+            FROM locations
+            WHERE id = ANY($1::bigint[])
+            ORDER BY id
+            FOR UPDATE
+            """,
+            ids,
+        )
+        current = {int(r["id"]): dict(r) for r in rows}
+
+        arr_ids: List[int] = []
+        arr_category: List[Optional[str]] = []
+        arr_confidence: List[Optional[float]] = []
+        arr_state: List[Optional[str]] = []
+        arr_reason: List[str] = []
+        arr_clear: List[bool] = []
+        for item in gen:
+            item_id = int(item["id"])
+            rec = current.get(item_id) or {}
+            plan = _plan_classification_update(
+                current_state=(rec.get("state") or "").upper() or None,
+                is_retired=bool(rec.get("is_retired")),
+                current_category=rec.get("category"),
+                current_confidence=rec.get("confidence_score"),
+                action=item.get("action") or "",
+                category=item.get("category"),
+                confidence_score=float(item.get("confidence_score") or 0.0),
+                reason=item.get("reason"),
+                allow_resurrection=allow_resurrection,
+            )
+            arr_ids.append(item_id)
+            arr_reason.append(plan["reason"])
+            arr_clear.append(bool(plan["clear_retired"]))
+            if plan["noop"]:
+                # NULLs preserve category/confidence/state (lightweight path)
+                arr_category.append(None)
+                arr_confidence.append(None)
+                arr_state.append(None)
+            else:
+                arr_category.append(item.get("category"))
+                arr_confidence.append(float(item.get("confidence_score") or 0.0))
+                arr_state.append(plan["state"])
+
+        await execute_with_conn(
+            conn,
+            BULK_CLASSIFICATION_UPDATE_SQL,
+            arr_ids,
+            arr_category,
+            arr_confidence,
+            arr_state,
+            arr_reason,
+            arr_clear,
+        )
+        applied += len(gen)
+    return applied
+
+
 async def unretire_and_verify(
     *,
     id: int,
@@ -8,11 +8,15 @@ from .base import EmailProvider
 from .smtp_provider import SMTPEmailProvider
 from .ses_provider import SESEmailProvider
 from .brevo_provider import BrevoEmailProvider
+from .send_pool import EmailMessage, EmailSendPool, EmailSendResult
 
 __all__ = [
     "EmailProvider",
     "SMTPEmailProvider",
     "SESEmailProvider",
     "BrevoEmailProvider",
+    "EmailMessage",
+    "EmailSendPool",
+    "EmailSendResult",
 ]
 
@@ -0,0 +1,267 @@
+"""
+Batch email sending over persistent provider connections.
+
+EmailSendPool sends a list of messages concurrently and returns one result per
+message, in order:
+- SMTP: one authenticated connection per worker thread, opened on first use and
+  reused for every later message (reconnects once if the server closed it)
+- SES/Brevo: the provider's own client (already shared and thread-safe), with
+  the same concurrency bound
+A token bucket caps the send rate (EMAIL_SEND_RATE_PER_SEC) and, when a budget
+is given (e.g. the remaining outreach daily quota), stops handing out tokens
+once it is spent, so callers check the limit once per batch instead of per email.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from app.core.logging import get_logger
+from .base import EmailProvider
+from .smtp_provider import SMTPEmailProvider
+
+logger = get_logger()
+
+# Persistent SMTP connections (= sender threads) per pool; also the default batch concurrency
+EMAIL_POOL_CONNECTIONS = int(os.getenv("EMAIL_POOL_CONNECTIONS", "4"))
+# Messages started per second across the pool (0 = no cap); SES production default is 14/s
+EMAIL_SEND_RATE_PER_SEC = float(os.getenv("EMAIL_SEND_RATE_PER_SEC", "14"))
+
+RATE_LIMITED = "RateLimited"
+
+
+@dataclass
+class EmailMessage:
+    to: str
+    subject: str
+    html_body: str
+    text_body: Optional[str] = None
+
+
+@dataclass
+class EmailSendResult:
+    to: str
+    message_id: Optional[str] = None
+    error: Optional[str] = None
+    error_type: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class SendTokenBucket:
+    """
+    Token bucket for sends, optionally with a hard budget of total tokens.
+
+    rate_per_sec <= 0 disables the rate cap. capacity is the burst size. Once
+    budget tokens were taken (minus refunds), acquire returns False.
+    """
+
+    def __init__(self, rate_per_sec: float, capacity: Optional[float] = None, budget: Optional[int] = None):
+        self.rate_per_sec = rate_per_sec
+        self.capacity = capacity if capacity is not None else max(1.0, rate_per_sec)
+        self.tokens = self.capacity
+        self.budget = budget
+        self.last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> bool:
+        async with self._lock:
+            if self.budget is not None:
+                if self.budget <= 0:
+                    return False
+                self.budget -= 1
+            if self.rate_per_sec <= 0:
+                return True
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate_per_sec)
+            self.last_refill = now
+            if self.tokens < 1.0:
+                # Waiters queue on the lock, so tokens are handed out in arrival order
+                await asyncio.sleep((1.0 - self.tokens) / self.rate_per_sec)
+                self.tokens = 1.0
+                self.last_refill = time.monotonic()
+            self.tokens -= 1.0
+            return True
+
+    def refund(self) -> None:
+        """Give back a budget token for a message that was not sent."""
+        if self.budget is not None:
+            self.budget += 1
+
+
+class EmailSendPool:
+    """
+    Concurrent sender with persistent connections for one EmailProvider.
+    """
+
+    def __init__(
+        self,
+        provider: EmailProvider,
+        connections: Optional[int] = None,
+        rate_per_sec: Optional[float] = None,
+    ):
+        self.provider = provider
+        self.connections = max(1, connections or EMAIL_POOL_CONNECTIONS)
+        self.rate_per_sec = EMAIL_SEND_RATE_PER_SEC if rate_per_sec is None else rate_per_sec
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._local = threading.local()
+        self._open: List[smtplib.SMTP] = []
+        self._open_lock = threading.Lock()
+        self.stats = {"connections_opened": 0, "reconnects": 0}
+
+    async def send_batch(
+        self,
+        messages: Sequence[EmailMessage],
+        *,
+        budget: Optional[int] = None,
+        rate_per_sec: Optional[float] = None,
+        concurrency: Optional[int] = None,
+    ) -> List[EmailSendResult]:
+        """
+        Send messages concurrently; one result per message, in input order.
+
+        Args:
+            messages: Messages to send
+            budget: Maximum number of messages to send (e.g. remaining daily quota);
+                the rest get error_type RateLimited without being attempted
+            rate_per_sec: Override the pool's send rate for this batch (0 = no cap)
+            concurrency: Messages in flight at once (capped at the pool's connections)
+        """
+        if not messages:
+            return []
+        if not self.provider.is_configured():
+            return [
+                EmailSendResult(m.to, error="email provider is not configured", error_type="ValueError")
+                for m in messages
+            ]
+
+        bucket = SendTokenBucket(self.rate_per_sec if rate_per_sec is None else rate_per_sec, budget=budget)
+        semaphore = asyncio.Semaphore(min(concurrency or self.connections, self.connections))
+
+        async def _one(message: EmailMessage) -> EmailSendResult:
+            async with semaphore:
+                if not await bucket.acquire():
+                    return EmailSendResult(message.to, error="send budget exhausted", error_type=RATE_LIMITED)
+                try:
+                    message_id = await self._send(message)
+                except Exception as e:
+                    bucket.refund()
+                    logger.warning(
+                        "email_batch_message_failed",
+                        to_email=message.to,
+                        subject=message.subject,
+                        error=str(e),
+                        error_type=type(e).__name__,
+                    )
+                    return EmailSendResult(message.to, error=str(e), error_type=type(e).__name__)
+                return EmailSendResult(message.to, message_id=message_id)
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(_one(m) for m in messages))
+        elapsed = time.perf_counter() - started
+        sent = sum(1 for r in results if r.ok)
+        logger.info(
+            "email_batch_sent",
+            total=len(messages),
+            sent=sent,
+            failed=sum(1 for r in results if not r.ok and r.error_type != RATE_LIMITED),
+            rate_limited=sum(1 for r in results if r.error_type == RATE_LIMITED),
+            seconds=round(elapsed, 3),
+            messages_per_sec=round(sent / elapsed, 1) if elapsed > 0 else None,
+        )
+        return list(results)
+
+    async def _send(self, message: EmailMessage) -> str:
+        if isinstance(self.provider, SMTPEmailProvider):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), self._send_smtp, message)
+        return await self.provider.send_email(
+            to=message.to,
+            subject=message.subject,
+            html_body=message.html_body,
+            text_body=message.text_body,
+        )
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.connections, thread_name_prefix="email-pool")
+        return self._executor
+
+    def _connection(self) -> smtplib.SMTP:
+        server = getattr(self._local, "server", None)
+        if server is None:
+            server = self.provider.open_connection()
+            self._local.server = server
+            with self._open_lock:
+                self._open.append(server)
+                self.stats["connections_opened"] += 1
+        return server
+
+    def _drop_connection(self) -> None:
+        server = getattr(self._local, "server", None)
+        self._local.server = None
+        if server is None:
+            return
+        with self._open_lock:
+            if server in self._open:
+                self._open.remove(server)
+        try:
+            server.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _is_connection_lost(error: Exception) -> bool:
+        if isinstance(error, (smtplib.SMTPServerDisconnected, ConnectionError)):
+            return True
+        # 421: service closing transmission channel (e.g. per-connection message cap)
+        return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code == 421
+
+    def _deliver(self, msg) -> str:
+        server = self._connection()
+        try:
+            server.send_message(msg)
+        except Exception as e:
+            if self._is_connection_lost(e):
+                self._drop_connection()
+            raise
+        return msg["Message-ID"]
+
+    def _send_smtp(self, message: EmailMessage) -> str:
+        provider: SMTPEmailProvider = self.provider  # type: ignore[assignment]
+        msg = provider.build_message(message.to, message.subject, message.html_body, message.text_body)
+        try:
+            return self._deliver(msg)
+        except Exception as e:
+            if not self._is_connection_lost(e):
+                raise
+            # Connection closed by the server (idle timeout, message cap): reconnect once
+            with self._open_lock:
+                self.stats["reconnects"] += 1
+            return self._deliver(msg)
+
+    def close(self) -> None:
+        """QUIT every open SMTP connection and stop the sender threads."""
+        with self._open_lock:
+            servers, self._open = self._open, []
+        for server in servers:
+            try:
+                server.quit()
+            except Exception:
+                try:
+                    server.close()
+                except Exception:
+                    pass
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self._local = threading.local()
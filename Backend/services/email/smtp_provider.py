@@ -7,11 +7,12 @@ Supports SendGrid, Mailgun, Gmail, and other SMTP providers.
 from __future__ import annotations
 
 from typing import Optional
+import asyncio
 import os
 import smtplib
-from datetime import datetime
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from email.utils import make_msgid
 
 from app.core.logging import get_logger
 from .base import EmailProvider
@@ -55,6 +56,7 @@ class SMTPEmailProvider(EmailProvider):
         self.smtp_user = smtp_user or os.getenv("SMTP_USER")
         self.smtp_password = smtp_password or os.getenv("SMTP_PASSWORD")
         self.smtp_use_tls = smtp_use_tls
+        self.smtp_timeout = float(os.getenv("SMTP_TIMEOUT_SECONDS", "30"))
         
         if not self.from_email:
             self.from_email = os.getenv("SMTP_FROM_EMAIL", "noreply@turkspot.nl")
@@ -68,6 +70,52 @@ class SMTPEmailProvider(EmailProvider):
         """
         return bool(self.smtp_host and self.smtp_user and self.smtp_password)
     
+    def build_message(
+        self,
+        to: str,
+        subject: str,
+        html_body: str,
+        text_body: Optional[str] = None,
+    ) -> MIMEMultipart:
+        """
+        Build the MIME message, with a Message-ID header that send_email returns.
+        """
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = subject
+        msg["From"] = f"{self.from_name} <{self.from_email}>"
+        msg["To"] = to
+        msg["Message-ID"] = make_msgid(domain=(self.from_email or "").rpartition("@")[2] or None)
+        
+        # Add text part if provided
+        if text_body:
+            text_part = MIMEText(text_body, "plain", "utf-8")
+            msg.attach(text_part)
+        
+        # Add HTML part
+        html_part = MIMEText(html_body, "html", "utf-8")
+        msg.attach(html_part)
+        return msg
+    
+    def open_connection(self) -> smtplib.SMTP:
+        """
+        Open an SMTP connection, upgraded to TLS and logged in. Blocking.
+        
+        The caller owns the connection (EmailSendPool keeps one per worker thread).
+        """
+        server = smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=self.smtp_timeout)
+        try:
+            if self.smtp_use_tls:
+                server.starttls()
+            server.login(self.smtp_user, self.smtp_password)
+        except Exception:
+            server.close()
+            raise
+        return server
+    
+    def _send_once(self, msg: MIMEMultipart) -> None:
+        with self.open_connection() as server:
+            server.send_message(msg)
+    
     async def send_email(
         self,
         to: str,
@@ -76,7 +124,10 @@ class SMTPEmailProvider(EmailProvider):
         text_body: Optional[str] = None,
     ) -> str:
         """
-        Send an email via SMTP.
+        Send an email via SMTP on a fresh connection.
+        
+        Runs in a worker thread so TLS and login do not block the event loop.
+        For many messages use EmailService.send_batch, which reuses connections.
         
         Args:
             to: Recipient email address
@@ -85,7 +136,7 @@ class SMTPEmailProvider(EmailProvider):
             text_body: Optional plain text fallback
             
         Returns:
-            Message ID (format: "smtp-{timestamp}")
+            Message ID (the Message-ID header of the sent message)
             
         Raises:
             Exception: If email sending fails
@@ -99,29 +150,13 @@ class SMTPEmailProvider(EmailProvider):
             raise ValueError("SMTP email provider is not configured")
         
         try:
-            msg = MIMEMultipart("alternative")
-            msg["Subject"] = subject
-            msg["From"] = f"{self.from_name} <{self.from_email}>"
-            msg["To"] = to
-            
-            # Add text part if provided
-            if text_body:
-                text_part = MIMEText(text_body, "plain", "utf-8")
-                msg.attach(text_part)
-            
-            # Add HTML part
-            html_part = MIMEText(html_body, "html", "utf-8")
-            msg.attach(html_part)
+            msg = self.build_message(to, subject, html_body, text_body)
             
             # Send via SMTP
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                if self.smtp_use_tls:
-                    server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
+            await asyncio.to_thread(self._send_once, msg)
             
-            # Generate message ID for tracking
-            message_id = f"smtp-{datetime.now().timestamp()}"
+            # Message-ID header doubles as tracking ID
+            message_id = msg["Message-ID"]
             
             logger.info(
                 "email_sent",
@@ -141,4 +176,3 @@ class SMTPEmailProvider(EmailProvider):
                 exc_info=True,
             )
             raise
-
@@ -7,13 +7,21 @@ Uses provider pattern to support multiple email providers (SMTP, SES, etc.).
 
 from __future__ import annotations
 
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Sequence
 from pathlib import Path
 import os
 from jinja2 import Template
 
 from app.core.logging import get_logger
-from services.email import EmailProvider, SMTPEmailProvider, SESEmailProvider, BrevoEmailProvider
+from services.email import (
+    EmailProvider,
+    SMTPEmailProvider,
+    SESEmailProvider,
+    BrevoEmailProvider,
+    EmailMessage,
+    EmailSendPool,
+    EmailSendResult,
+)
 from services.email_template_service import get_email_template_service
 
 logger = get_logger()
@@ -44,6 +52,7 @@ class EmailService:
         self.from_email = from_email or os.getenv("EMAIL_FROM")
         self.from_name = from_name if from_name != "Turkspot" else os.getenv("EMAIL_FROM_NAME", "Turkspot")
         self._provider: Optional[EmailProvider] = None
+        self._pool: Optional[EmailSendPool] = None
         self._provider_name = provider or os.getenv("EMAIL_PROVIDER", "smtp").lower()
     
     def _get_provider(self) -> EmailProvider:
@@ -226,6 +235,57 @@ class EmailService:
             )
             return None
     
+    def get_send_pool(self) -> EmailSendPool:
+        """
+        Get or create the sending pool for this service's provider.
+        
+        The pool keeps its SMTP connections open between batches; close_send_pool
+        releases them.
+        """
+        if self._pool is None:
+            self._pool = EmailSendPool(self._get_provider())
+        return self._pool
+    
+    def close_send_pool(self) -> None:
+        """Close pooled provider connections (no-op if the pool was never used)."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+    
+    async def send_batch(
+        self,
+        messages: Sequence[EmailMessage],
+        *,
+        budget: Optional[int] = None,
+        rate_per_sec: Optional[float] = None,
+        concurrency: Optional[int] = None,
+    ) -> List[EmailSendResult]:
+        """
+        Send many emails over the pooled provider connections.
+        
+        Args:
+            messages: Messages to send
+            budget: Maximum number to send (e.g. remaining daily quota); the rest
+                come back with error_type "RateLimited" without being attempted
+            rate_per_sec: Send rate cap for this batch (defaults to EMAIL_SEND_RATE_PER_SEC)
+            concurrency: Messages in flight at once (defaults to EMAIL_POOL_CONNECTIONS)
+            
+        Returns:
+            One EmailSendResult per message, in the same order
+        """
+        if messages and not self._get_provider().is_configured():
+            logger.warning(
+                "email_not_configured",
+                batch_size=len(messages),
+                provider=self._provider_name,
+            )
+        return await self.get_send_pool().send_batch(
+            messages,
+            budget=budget,
+            rate_per_sec=rate_per_sec,
+            concurrency=concurrency,
+        )
+    
     def render_template(
         self,
         template_name: str,
@@ -7,12 +7,12 @@ Uses Jinja2 template inheritance to provide consistent branding and structure.
 
 from __future__ import annotations
 
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional
 from pathlib import Path
 import os
 import base64
 from datetime import datetime
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
 
 from app.core.logging import get_logger
 
@@ -287,6 +287,65 @@ class EmailTemplateService:
             text_body = html_body
         
         return (html_body, text_body)
+    
+    def _load_template(self, filename: str) -> Optional[Template]:
+        """Compiled template for filename, or None if the file does not exist."""
+        if not (self.templates_dir / filename).exists():
+            return None
+        return self.env.get_template(filename)
+    
+    def get_renderer(
+        self,
+        template_name: str,
+        language: str = "nl",
+    ) -> Callable[[Optional[Dict[str, Any]]], tuple[str, str]]:
+        """
+        Resolve a template pair once and return a render function for bulk sends.
+        
+        Same output as render_template (no per-recipient unsubscribe token), but the
+        compiled templates and the default context are looked up once instead of per
+        call, which matters when the same template is rendered for thousands of users.
+        
+        Args:
+            template_name: Name of template file (without extension)
+            language: Language code for the default context (context may override it)
+            
+        Returns:
+            Function taking the per-recipient context and returning (html_body, text_body)
+        """
+        html_template = self._load_template(f"{template_name}.html.j2")
+        text_template = self._load_template(f"{template_name}.txt.j2")
+        defaults = self._get_default_context(language)
+        
+        def render(context: Optional[Dict[str, Any]] = None) -> tuple[str, str]:
+            final_context = {**defaults, **(context or {})}
+            html_body = ""
+            if html_template is not None:
+                try:
+                    html_body = html_template.render(final_context)
+                except Exception as e:
+                    logger.error(
+                        "template_render_failed",
+                        template=template_name,
+                        error=str(e),
+                        exc_info=True,
+                    )
+                    raise
+            if text_template is None:
+                return (html_body, html_body)
+            try:
+                text_body = text_template.render(final_context)
+            except Exception as e:
+                logger.error(
+                    "text_template_render_failed",
+                    template=template_name,
+                    error=str(e),
+                    exc_info=True,
+                )
+                text_body = html_body
+            return (html_body, text_body)
+        
+        return render
 
 
 # Global instance (lazy initialization)
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import math
 import os
+import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from difflib import SequenceMatcher
-from typing import Any, List, Optional, Sequence, Tuple
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
 
 from app.core.logging import get_logger
 from pydantic import BaseModel, Field
@@ -25,6 +27,9 @@ AI_WEIGHT = float(os.getenv("EVENT_DEDUPE_AI_WEIGHT", "0.25"))
 DUPLICATE_SCORE_THRESHOLD = float(os.getenv("EVENT_DEDUPE_SCORE_THRESHOLD", "0.82"))
 AI_TRIGGER_THRESHOLD = float(os.getenv("EVENT_DEDUPE_AI_TRIGGER", "0.7"))
 ENABLE_AI = os.getenv("EVENT_DEDUPE_AI_ENABLED", "0").lower() in ("1", "true", "yes")
+# Batch dedupe: only pairs whose title 3-gram sets reach this Dice coefficient are scored
+BLOCK_MIN_DICE = float(os.getenv("EVENT_DEDUPE_BLOCK_MIN_DICE", "0.3"))
+SHINGLE_SIZE = 3
 
 
 @dataclass
@@ -60,6 +65,15 @@ def _string_similarity(a: Optional[str], b: Optional[str]) -> float:
     return SequenceMatcher(None, a_norm, b_norm).ratio()
 
 
+def _similarity_upper_bound(a: Optional[str], b: Optional[str]) -> float:
+    """Cheap upper bound on _string_similarity (character multiset overlap)."""
+    a_norm = _normalize_text(a)
+    b_norm = _normalize_text(b)
+    if not a_norm or not b_norm:
+        return 0.0
+    return SequenceMatcher(None, a_norm, b_norm).quick_ratio()
+
+
 def _time_similarity(a: datetime, b: datetime) -> float:
     delta_seconds = abs((a - b).total_seconds())
     window_seconds = TIME_WINDOW_HOURS * 3600
@@ -71,27 +85,20 @@ def _time_similarity(a: datetime, b: datetime) -> float:
     return max(0.0, 1.0 - (delta_seconds / window_seconds))
 
 
-async def _fetch_candidate_context(candidate_id: int) -> Optional[CandidateContext]:
-    row = await fetchrow(
-        """
-        SELECT
-            ec.id,
-            ec.event_source_id,
-            ec.source_key,
-            ec.title,
-            ec.description,
-            ec.location_text,
-            ec.start_time_utc,
-            ec.end_time_utc,
-            es.city_key
-        FROM events_candidate ec
-        LEFT JOIN event_sources es ON es.id = ec.event_source_id
-        WHERE ec.id = $1
-        """,
-        candidate_id,
-    )
-    if not row:
-        return None
+_CONTEXT_COLUMNS = """
+    ec.id,
+    ec.event_source_id,
+    ec.source_key,
+    ec.title,
+    ec.description,
+    ec.location_text,
+    ec.start_time_utc,
+    ec.end_time_utc,
+    es.city_key
+"""
+
+
+def _row_to_context(row: Any) -> CandidateContext:
     return CandidateContext(
         id=row["id"],
         event_source_id=row["event_source_id"],
@@ -105,20 +112,26 @@ async def _fetch_candidate_context(candidate_id: int) -> Optional[CandidateConte
     )
 
 
+async def _fetch_candidate_context(candidate_id: int) -> Optional[CandidateContext]:
+    row = await fetchrow(
+        f"""
+        SELECT {_CONTEXT_COLUMNS}
+        FROM events_candidate ec
+        LEFT JOIN event_sources es ON es.id = ec.event_source_id
+        WHERE ec.id = $1
+        """,
+        candidate_id,
+    )
+    if not row:
+        return None
+    return _row_to_context(row)
+
+
 async def _fetch_potential_duplicates(ctx: CandidateContext) -> List[CandidateContext]:
     window_seconds = TIME_WINDOW_HOURS * 3600
     rows = await fetch(
-        """
-        SELECT
-            ec.id,
-            ec.event_source_id,
-            ec.source_key,
-            ec.title,
-            ec.description,
-            ec.location_text,
-            ec.start_time_utc,
-            ec.end_time_utc,
-            es.city_key
+        f"""
+        SELECT {_CONTEXT_COLUMNS}
         FROM events_candidate ec
         LEFT JOIN event_sources es ON es.id = ec.event_source_id
         WHERE ec.id <> $1
@@ -133,22 +146,49 @@ async def _fetch_potential_duplicates(ctx: CandidateContext) -> List[CandidateCo
         ctx.start_time_utc,
         window_seconds,
     )
-    contexts: List[CandidateContext] = []
-    for row in rows or []:
-        contexts.append(
-            CandidateContext(
-                id=row["id"],
-                event_source_id=row["event_source_id"],
-                source_key=row["source_key"],
-                city_key=row.get("city_key"),
-                title=row["title"],
-                description=row.get("description"),
-                location_text=row.get("location_text"),
-                start_time_utc=row["start_time_utc"],
-                end_time_utc=row.get("end_time_utc"),
-            )
-        )
-    return contexts
+    return [_row_to_context(row) for row in rows or []]
+
+
+async def _fetch_candidate_contexts(candidate_ids: Sequence[int]) -> List[CandidateContext]:
+    rows = await fetch(
+        f"""
+        SELECT {_CONTEXT_COLUMNS}
+        FROM events_candidate ec
+        LEFT JOIN event_sources es ON es.id = ec.event_source_id
+        WHERE ec.id = ANY($1::bigint[])
+        ORDER BY ec.id
+        """,
+        list(candidate_ids),
+    )
+    return [_row_to_context(row) for row in rows or []]
+
+
+async def _fetch_dedupe_pool(contexts: Sequence[CandidateContext]) -> List[CandidateContext]:
+    """Canonical in-scope candidates in the batch's cities, within the window of any batch start time."""
+    cities = sorted({ctx.city_key for ctx in contexts if ctx.city_key})
+    if not cities:
+        return []
+    starts = [ctx.start_time_utc for ctx in contexts if ctx.city_key]
+    window_seconds = TIME_WINDOW_HOURS * 3600
+    rows = await fetch(
+        f"""
+        SELECT {_CONTEXT_COLUMNS}
+        FROM events_candidate ec
+        JOIN event_sources es ON es.id = ec.event_source_id
+        WHERE ec.duplicate_of_id IS NULL
+          AND ec.state = ANY($1::text[])
+          AND es.city_key = ANY($2::text[])
+          AND ec.start_time_utc >= $3 - make_interval(secs => $5)
+          AND ec.start_time_utc <= $4 + make_interval(secs => $5)
+        ORDER BY ec.id
+        """,
+        list(STATE_SCOPE),
+        cities,
+        min(starts),
+        max(starts),
+        window_seconds,
+    )
+    return [_row_to_context(row) for row in rows or []]
 
 
 def _aggregate_score(
@@ -187,26 +227,26 @@ async def _ai_similarity(ctx: CandidateContext, other: CandidateContext) -> Opti
     return None
 
 
-async def run_dedupe(candidate_id: int) -> DedupeResult:
-    ctx = await _fetch_candidate_context(candidate_id)
-    if ctx is None:
-        return DedupeResult(candidate_id=candidate_id, duplicate_of_id=None, score=None, reason="missing_candidate")
-
-    if ctx.city_key is None:
-        return DedupeResult(candidate_id=candidate_id, duplicate_of_id=None, score=None, reason="missing_city")
-
-    potential = await _fetch_potential_duplicates(ctx)
-    if not potential:
-        await _mark_canonical(candidate_id)
-        return DedupeResult(candidate_id=candidate_id, duplicate_of_id=None, score=None, reason="no_candidates")
-
+def _best_match(
+    ctx: CandidateContext,
+    potential: Sequence[CandidateContext],
+) -> Tuple[float, Optional[CandidateContext], Tuple[float, float, float]]:
     best_score = 0.0
     best_match: Optional[CandidateContext] = None
     best_components: Tuple[float, float, float] = (0.0, 0.0, 0.0)
 
     for other in potential:
-        if other.id == candidate_id:
+        if other.id == ctx.id:
             continue
+        if best_match is not None:
+            # Skip the full ratio() when even the upper bound cannot beat the best so far
+            bound = (
+                TITLE_WEIGHT * _similarity_upper_bound(ctx.title, other.title)
+                + LOCATION_WEIGHT * _similarity_upper_bound(ctx.location_text, other.location_text)
+                + TIME_WEIGHT * _time_similarity(ctx.start_time_utc, other.start_time_utc)
+            )
+            if bound <= best_score:
+                continue
         title_score, location_score, time_score = _aggregate_score(ctx, other)
         composite = (
             TITLE_WEIGHT * title_score
@@ -217,6 +257,15 @@ async def run_dedupe(candidate_id: int) -> DedupeResult:
             best_score = composite
             best_match = other
             best_components = (title_score, location_score, time_score)
+    return best_score, best_match, best_components
+
+
+async def _decide(
+    ctx: CandidateContext,
+    potential: Sequence[CandidateContext],
+) -> Tuple[DedupeResult, Tuple[float, float, float], Optional[float]]:
+    """Score ctx against potential duplicates (AI blend for borderline matches); no writes."""
+    best_score, best_match, best_components = _best_match(ctx, potential)
 
     ai_score = None
     if (
@@ -229,31 +278,211 @@ async def run_dedupe(candidate_id: int) -> DedupeResult:
             best_score = min(1.0, (best_score * (1 - AI_WEIGHT)) + (ai_score * AI_WEIGHT))
 
     if best_match and best_score >= DUPLICATE_SCORE_THRESHOLD:
-        await _mark_duplicate(candidate_id, best_match.id, best_score)
+        result = DedupeResult(
+            candidate_id=ctx.id,
+            duplicate_of_id=best_match.id,
+            score=best_score,
+            reason="duplicate",
+        )
+    else:
+        result = DedupeResult(candidate_id=ctx.id, duplicate_of_id=None, score=best_score, reason="canonical")
+    return result, best_components, ai_score
+
+
+async def run_dedupe(candidate_id: int) -> DedupeResult:
+    ctx = await _fetch_candidate_context(candidate_id)
+    if ctx is None:
+        return DedupeResult(candidate_id=candidate_id, duplicate_of_id=None, score=None, reason="missing_candidate")
+
+    if ctx.city_key is None:
+        return DedupeResult(candidate_id=candidate_id, duplicate_of_id=None, score=None, reason="missing_city")
+
+    potential = await _fetch_potential_duplicates(ctx)
+    if not potential:
+        await _mark_canonical(candidate_id)
+        return DedupeResult(candidate_id=candidate_id, duplicate_of_id=None, score=None, reason="no_candidates")
+
+    result, best_components, ai_score = await _decide(ctx, potential)
+
+    if result.duplicate_of_id is not None:
+        await _mark_duplicate(candidate_id, result.duplicate_of_id, result.score)
         logger.info(
             "event_dedupe_marked_duplicate",
             candidate_id=candidate_id,
-            duplicate_of=best_match.id,
-            score=best_score,
+            duplicate_of=result.duplicate_of_id,
+            score=result.score,
             components=best_components,
             ai_score=ai_score,
         )
-        return DedupeResult(
-            candidate_id=candidate_id,
-            duplicate_of_id=best_match.id,
-            score=best_score,
-            reason="duplicate",
-        )
+        return result
 
     await _mark_canonical(candidate_id)
     logger.info(
         "event_dedupe_kept_canonical",
         candidate_id=candidate_id,
-        score=best_score,
+        score=result.score,
         components=best_components,
         ai_score=ai_score,
     )
-    return DedupeResult(candidate_id=candidate_id, duplicate_of_id=None, score=best_score, reason="canonical")
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Batch dedupe
+# ---------------------------------------------------------------------------
+def _title_shingles(title: Optional[str]) -> FrozenSet[str]:
+    norm = _normalize_text(title)
+    if not norm:
+        return frozenset()
+    padded = f" {norm} "
+    return frozenset(padded[i:i + SHINGLE_SIZE] for i in range(max(len(padded) - SHINGLE_SIZE + 1, 1)))
+
+
+class _BlockingIndex:
+    """
+    Canonical candidates blocked by (city_key, start-time bucket, title shingle).
+
+    Buckets are TIME_WINDOW_HOURS wide, so a lookup probes its own bucket and both
+    neighbours. Shared shingles are counted per indexed candidate; only candidates
+    inside the time window whose Dice coefficient on title shingles reaches
+    BLOCK_MIN_DICE are returned for full scoring.
+    """
+
+    def __init__(self, window_seconds: float, min_dice: Optional[float] = None):
+        self._window = window_seconds
+        self._bucket_seconds = max(window_seconds, 1.0)
+        self._min_dice = BLOCK_MIN_DICE if min_dice is None else min_dice
+        self._postings: Dict[Tuple[str, int, str], List[int]] = {}
+        self._items: List[Tuple[CandidateContext, float, int]] = []
+
+    def _bucket(self, ts: float) -> int:
+        return int(math.floor(ts / self._bucket_seconds))
+
+    def add(self, ctx: CandidateContext) -> None:
+        if ctx.city_key is None:
+            return
+        shingles = _title_shingles(ctx.title)
+        ts = ctx.start_time_utc.timestamp()
+        idx = len(self._items)
+        self._items.append((ctx, ts, len(shingles)))
+        bucket = self._bucket(ts)
+        for shingle in shingles:
+            self._postings.setdefault((ctx.city_key, bucket, shingle), []).append(idx)
+
+    def candidates(self, ctx: CandidateContext) -> List[CandidateContext]:
+        shingles = _title_shingles(ctx.title)
+        if ctx.city_key is None or not shingles:
+            return []
+        ts = ctx.start_time_utc.timestamp()
+        bucket = self._bucket(ts)
+        postings = self._postings
+        shared: Dict[int, int] = {}
+        for b in (bucket - 1, bucket, bucket + 1):
+            for shingle in shingles:
+                for idx in postings.get((ctx.city_key, b, shingle), ()):
+                    shared[idx] = shared.get(idx, 0) + 1
+
+        size = len(shingles)
+        out: List[CandidateContext] = []
+        for idx in sorted(shared):
+            other, other_ts, other_size = self._items[idx]
+            if abs(other_ts - ts) > self._window:
+                continue
+            if 2 * shared[idx] < self._min_dice * (size + other_size):
+                continue
+            out.append(other)
+        return out
+
+
+async def resolve_duplicates(
+    batch: Sequence[CandidateContext],
+    pool: Sequence[CandidateContext] = (),
+) -> Tuple[List[DedupeResult], Dict[str, int]]:
+    """
+    Dedupe a batch of candidates in one pass, without writes.
+
+    pool holds the existing canonical candidates (batch members in it are ignored).
+    Batch members are resolved in id order, as run_dedupe would see them when called
+    per insert: each is scored against the pool plus the batch members before it that
+    stayed canonical, and a canonical one is added to the index for the rest. A
+    duplicate always points at a canonical row, so clusters need no further merging.
+
+    Returns (results in batch order, stats with pairs_compared).
+    """
+    index = _BlockingIndex(TIME_WINDOW_HOURS * 3600)
+    batch_ids = {ctx.id for ctx in batch}
+    for ctx in pool:
+        if ctx.id not in batch_ids:
+            index.add(ctx)
+
+    stats = {"candidates": len(batch), "pool": len(pool), "pairs_compared": 0, "duplicates": 0}
+    by_id: Dict[int, DedupeResult] = {}
+    for ctx in sorted(batch, key=lambda c: c.id):
+        if ctx.city_key is None:
+            by_id[ctx.id] = DedupeResult(candidate_id=ctx.id, duplicate_of_id=None, score=None, reason="missing_city")
+            continue
+        potential = index.candidates(ctx)
+        if not potential:
+            by_id[ctx.id] = DedupeResult(candidate_id=ctx.id, duplicate_of_id=None, score=None, reason="no_candidates")
+            index.add(ctx)
+            continue
+        stats["pairs_compared"] += len(potential)
+        result, _components, _ai_score = await _decide(ctx, potential)
+        by_id[ctx.id] = result
+        if result.duplicate_of_id is None:
+            index.add(ctx)
+        else:
+            stats["duplicates"] += 1
+    return [by_id[ctx.id] for ctx in batch], stats
+
+
+async def run_dedupe_batch(candidate_ids: Sequence[int]) -> List[DedupeResult]:
+    """
+    Batch variant of run_dedupe for a run's freshly inserted candidates.
+
+    Two reads (the batch, then the canonical pool around it), resolve_duplicates,
+    and one UPDATE for all duplicate/canonical marks. Results follow candidate_ids.
+    """
+    if not candidate_ids:
+        return []
+    started = time.perf_counter()
+    contexts = await _fetch_candidate_contexts(candidate_ids)
+    pool = await _fetch_dedupe_pool(contexts)
+    results, stats = await resolve_duplicates(contexts, pool)
+    await _mark_results(results)
+
+    by_id = {result.candidate_id: result for result in results}
+    logger.info(
+        "event_dedupe_batch_completed",
+        duration_ms=int((time.perf_counter() - started) * 1000),
+        **stats,
+    )
+    return [
+        by_id.get(candidate_id)
+        or DedupeResult(candidate_id=candidate_id, duplicate_of_id=None, score=None, reason="missing_candidate")
+        for candidate_id in candidate_ids
+    ]
+
+
+async def _mark_results(results: Sequence[DedupeResult]) -> None:
+    marked = [result for result in results if result.reason in ("duplicate", "canonical", "no_candidates")]
+    if not marked:
+        return
+    await execute(
+        """
+        UPDATE events_candidate ec
+        SET duplicate_of_id = r.duplicate_of_id,
+            duplicate_score = r.duplicate_score,
+            updated_at = $4
+        FROM unnest($1::bigint[], $2::bigint[], $3::double precision[])
+            AS r(id, duplicate_of_id, duplicate_score)
+        WHERE ec.id = r.id
+        """,
+        [result.candidate_id for result in marked],
+        [result.duplicate_of_id for result in marked],
+        [result.score if result.duplicate_of_id is not None else None for result in marked],
+        datetime.now(timezone.utc),
+    )
 
 
 async def _mark_duplicate(candidate_id: int, canonical_id: int, score: float) -> None:
@@ -58,6 +58,12 @@ def _build_system_prompt() -> str:
     )
 
 
+CONTENT_LABELS = {
+    "html": "HTML snippet:",
+    "reduced": "Page text (reduced from HTML: # headings, [text](url) links, JSON-LD kept):",
+}
+
+
 class EventExtractionService:
     def __init__(
         self,
@@ -74,11 +80,12 @@ class EventExtractionService:
         html: str,
         source_key: str,
         page_url: str,
+        content_format: str = "html",
     ) -> str:
         return (
             f"Source key: {source_key}\n"
             f"Page URL: {page_url}\n"
-            "HTML snippet:\n"
+            f"{CONTENT_LABELS[content_format]}\n"
             f"{html.strip()}\n"
         )
 
@@ -89,6 +96,7 @@ class EventExtractionService:
         source_key: str,
         page_url: str,
         event_source_id: int,
+        content_format: str = "html",
     ) -> Tuple[ExtractedEventsPayload, Dict[str, Any]]:
         if not html or not html.strip():
             raise ValueError("html cannot be empty")
@@ -97,6 +105,7 @@ class EventExtractionService:
             html=html,
             source_key=source_key,
             page_url=page_url,
+            content_format=content_format,
         )
         parsed, meta = self._openai.generate_json(
             system_prompt=self._system_prompt,
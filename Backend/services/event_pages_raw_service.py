@@ -29,6 +29,8 @@ class EventPageRawRecord:
     processing_errors: Optional[Dict[str, Any]]
     fetched_at: datetime
     created_at: datetime
+    reduced_body: Optional[str] = None
+    reduced_version: Optional[int] = None
 
     @classmethod
     def from_row(cls, row: Dict[str, Any]) -> "EventPageRawRecord":
@@ -56,6 +58,8 @@ class EventPageRawRecord:
             processing_errors=errors if isinstance(errors, dict) else None,
             fetched_at=row["fetched_at"],
             created_at=row["created_at"],
+            reduced_body=row.get("reduced_body"),
+            reduced_version=row.get("reduced_version"),
         )
 
     def to_model(self) -> EventPageRaw:
@@ -71,6 +75,8 @@ class EventPageRawRecord:
             processing_errors=self.processing_errors,
             fetched_at=self.fetched_at,
             created_at=self.created_at,
+            reduced_body=self.reduced_body,
+            reduced_version=self.reduced_version,
         )
 
 
@@ -144,7 +150,9 @@ async def fetch_pending_event_pages(*, limit: int = 50) -> List[EventPageRaw]:
             processing_state,
             processing_errors,
             fetched_at,
-            created_at
+            created_at,
+            reduced_body,
+            reduced_version
         FROM event_pages_raw
         WHERE processing_state = 'pending'
         ORDER BY fetched_at ASC
@@ -182,3 +190,20 @@ async def update_event_page_processing_state(
     )
 
 
+
+
+async def update_event_page_reduced_body(page_id: int, reduced_body: str, version: int) -> None:
+    """
+    Cache the reduced text of a page (see html_reduction_service).
+    """
+    await execute(
+        """
+        UPDATE event_pages_raw
+        SET reduced_body = $2,
+            reduced_version = $3
+        WHERE id = $1
+        """,
+        page_id,
+        reduced_body,
+        version,
+    )
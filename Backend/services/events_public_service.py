@@ -6,6 +6,9 @@ from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from app.models.events_public import EventItem
 from services.db_service import fetch, fetchrow
+from services.reaction_counter_service import reactions_join_sql
+
+_EVENT_REACTIONS_JOIN = reactions_join_sql("event", "ep.id")
 
 
 def _date_start(dt: date) -> datetime:
@@ -116,20 +119,10 @@ async def list_public_events(
             updated_at,
             lat,
             lng,
-            COALESCE(
-                (
-                    SELECT json_object_agg(reaction_type, count)
-                    FROM (
-                        SELECT reaction_type, COUNT(*)::int as count
-                        FROM event_reactions
-                        WHERE event_id = ep.id
-                        GROUP BY reaction_type
-                    ) reaction_counts
-                ),
-                '{{}}'::json
-            ) as reactions,
+            COALESCE(rc.reactions, '{{}}'::jsonb) as reactions,
             NULL as user_reaction
         FROM events_public ep
+        {_EVENT_REACTIONS_JOIN}
         WHERE {where_clause}
         ORDER BY start_time_utc ASC, id ASC
         LIMIT ${limit_idx} OFFSET ${offset_idx}
@@ -0,0 +1,348 @@
+"""
+HTML-to-text reduction for the AI event/news extractors.
+
+reduce_html turns a scraped page into compact structured text before it is
+sent to OpenAI:
+- scripts, styles, svg, form controls, navigation, site header/footer and
+  cookie banners are dropped
+- page title, meta description/image/published time and JSON-LD blocks are
+  kept at the top (JSON-LD re-serialized compactly, one item per line)
+- headings become "#" lines, links "[text](url)", images "![alt](url)" and
+  <time> elements "text (datetime)"; URLs are made absolute
+- list items become "- " lines and table rows "cell | cell"
+
+chunk_reduced_text splits the result at heading boundaries instead of at a
+fixed character offset, so an event or article is not cut in half.
+
+The reduced text is cached per page in event_pages_raw/news_pages_raw
+(reduced_body, reduced_version); bump REDUCER_VERSION when the output format
+changes so cached rows are reduced again.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import re
+from typing import Any, Iterable, List, Optional
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, Comment, Doctype, NavigableString, Tag
+
+REDUCER_VERSION = 2
+
+# Never content: removed with everything inside them. Not <form>: ASP.NET WebForms
+# and some CMSs wrap the whole page in one. <head> is read for meta/JSON-LD first.
+DROP_TAGS = (
+    "head", "title", "script", "style", "noscript", "svg", "iframe", "template", "nav",
+    "footer", "button", "select", "input", "textarea", "canvas", "link", "meta",
+    "object", "embed", "map", "dialog",
+)
+DROP_ROLES = {"navigation", "banner", "contentinfo", "search", "dialog", "alertdialog", "menu", "menubar"}
+BOILERPLATE_RE = re.compile(r"cookie|consent|gdpr|newsletter-popup|skip-link", re.I)
+# Page containers, and wrappers around them, are never dropped on class/id alone
+# (e.g. <body class="cookies-not-set">, <div class="page cookie-bar-visible"><main>)
+CONTAINER_TAGS = {"html", "body", "main", "article"}
+# JSON-LD types that only describe the website itself
+JSON_LD_SKIP_TYPES = {"BreadcrumbList", "WebSite", "SearchAction", "SiteNavigationElement", "WPHeader", "WPFooter"}
+
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "aside", "header", "ul", "ol", "dl", "dt", "dd",
+    "table", "thead", "tbody", "tfoot", "blockquote", "figure", "figcaption", "address", "pre",
+    "hr", "body", "html", "details", "summary", "center",
+}
+META_FIELDS = (
+    ("Description", ("description", "og:description")),
+    ("Image", ("og:image", "twitter:image")),
+    ("Published", ("article:published_time", "og:published_time", "date")),
+    ("Site", ("og:site_name",)),
+)
+
+_WS_RE = re.compile(r"\s+")
+_SPACE_BEFORE_PUNCT_RE = re.compile(r" ([,.;:?)\]])")
+
+
+def _clean(text: str) -> str:
+    return _SPACE_BEFORE_PUNCT_RE.sub(r"\1", _WS_RE.sub(" ", text)).strip()
+
+
+def _absolute(url: Optional[str], base_url: Optional[str]) -> Optional[str]:
+    url = (url or "").strip()
+    if not url or url.startswith(("#", "javascript:", "data:", "tel:")):
+        return None
+    return urljoin(base_url, url) if base_url else url
+
+
+def _json_ld_items(data: Any) -> Iterable[Any]:
+    if isinstance(data, list):
+        for item in data:
+            yield from _json_ld_items(item)
+    elif isinstance(data, dict) and isinstance(data.get("@graph"), list):
+        for item in data["@graph"]:
+            yield from _json_ld_items(item)
+    elif isinstance(data, dict):
+        types = data.get("@type")
+        types = set(types) if isinstance(types, list) else {types}
+        if not types & JSON_LD_SKIP_TYPES:
+            yield data
+
+
+def _json_ld_lines(soup: BeautifulSoup) -> List[str]:
+    lines: List[str] = []
+    for script in soup.find_all("script", attrs={"type": re.compile(r"ld\+json", re.I)}):
+        raw = script.string or script.get_text()
+        if not raw or not raw.strip():
+            continue
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            lines.append(_clean(raw))
+            continue
+        for item in _json_ld_items(data):
+            lines.append(json.dumps(item, ensure_ascii=False, separators=(",", ":")))
+    return lines
+
+
+def _meta_lines(soup: BeautifulSoup, base_url: Optional[str]) -> List[str]:
+    lines: List[str] = []
+    title = soup.title.get_text(" ", strip=True) if soup.title else ""
+    og_title = soup.find("meta", attrs={"property": "og:title"})
+    title = title or (og_title.get("content", "") if og_title else "")
+    if title:
+        lines.append(f"Title: {_clean(title)}")
+    for label, names in META_FIELDS:
+        for name in names:
+            tag = soup.find("meta", attrs={"property": name}) or soup.find("meta", attrs={"name": name})
+            value = (tag.get("content") or "").strip() if tag else ""
+            if value:
+                if label == "Image":
+                    value = _absolute(value, base_url) or ""
+                if value:
+                    lines.append(f"{label}: {_clean(value)}")
+                break
+    return lines
+
+
+def _is_boilerplate(tag: Tag) -> bool:
+    if tag.name in DROP_TAGS:
+        return True
+    attrs = tag.attrs or {}
+    if (attrs.get("role") or "").lower() in DROP_ROLES:
+        return True
+    if attrs.get("aria-hidden") == "true" or "hidden" in attrs:
+        return True
+    marker = " ".join([attrs.get("id") or "", " ".join(attrs.get("class") or [])])
+    if (
+        tag.name not in CONTAINER_TAGS
+        and marker.strip()
+        and BOILERPLATE_RE.search(marker)
+        and tag.find(sorted(CONTAINER_TAGS | HEADING_TAGS)) is None
+    ):
+        return True
+    # Site header (logo, menu); headers inside an article/main carry the title and date
+    if tag.name == "header" and tag.find_parent(("article", "main")) is None:
+        return True
+    return False
+
+
+class _TextBuilder:
+    def __init__(self, base_url: Optional[str]) -> None:
+        self.base_url = base_url
+        self.lines: List[str] = []
+        self.parts: List[str] = []
+
+    def flush(self) -> None:
+        line = _clean(" ".join(self.parts))
+        self.parts = []
+        # bare list/heading markers left over from empty elements
+        if line and line not in ("-", "|") and not re.fullmatch(r"#+", line):
+            if not self.lines or self.lines[-1] != line:
+                self.lines.append(line)
+
+    def walk(self, node: Tag) -> None:
+        for child in node.children:
+            if isinstance(child, (Comment, Doctype)):
+                continue
+            if isinstance(child, NavigableString):
+                if child.strip():
+                    self.parts.append(str(child))
+                continue
+            if isinstance(child, Tag):
+                self.element(child)
+
+    def element(self, tag: Tag) -> None:
+        name = tag.name
+        if name in HEADING_TAGS:
+            self.flush()
+            self.parts.append("#" * int(name[1]))
+            self.walk(tag)
+            self.flush()
+        elif name == "a":
+            self.link(tag)
+        elif name in ("img", "picture"):
+            self.image(tag if name == "img" else tag.find("img"))
+        elif name == "time":
+            text = _clean(tag.get_text(" "))
+            stamp = (tag.get("datetime") or "").strip()
+            self.parts.append(f"{text} ({stamp})" if stamp and stamp != text else text or stamp)
+        elif name == "li":
+            self.flush()
+            self.parts.append("-")
+            self.walk(tag)
+            self.flush()
+        elif name == "tr":
+            self.flush()
+            for idx, cell in enumerate(tag.find_all(("td", "th"), recursive=False)):
+                if idx:
+                    self.parts.append("|")
+                self.walk(cell)
+            self.flush()
+        elif name == "br":
+            self.flush()
+        elif name in BLOCK_TAGS:
+            self.flush()
+            self.walk(tag)
+            self.flush()
+        else:
+            self.walk(tag)
+
+    def link(self, tag: Tag) -> None:
+        url = _absolute(tag.get("href"), self.base_url)
+        if url is None:
+            self.walk(tag)
+            return
+        if tag.find(sorted(BLOCK_TAGS | HEADING_TAGS | {"li"})):
+            # Card wrapped in a link: keep its structure, then the target
+            self.flush()
+            self.walk(tag)
+            self.flush()
+            self.parts.append(f"[link]({url})")
+            self.flush()
+            return
+        text = _clean(tag.get_text(" ")) or _clean(tag.get("title") or tag.get("aria-label") or "")
+        if not text:
+            self.walk(tag)  # image-only link
+        self.parts.append(f"[{text}]({url})" if text else f"[link]({url})")
+
+    def image(self, tag: Optional[Tag]) -> None:
+        if tag is None:
+            return
+        src = tag.get("data-src") or tag.get("data-lazy-src") or tag.get("src")
+        if not src and tag.get("srcset"):
+            src = tag["srcset"].split(",")[0].split()[0]
+        url = _absolute(src, self.base_url)
+        if url is None or tag.get("width") in ("0", "1"):
+            return
+        self.parts.append(f"![{_clean(tag.get('alt') or '')}]({url})")
+
+
+def reduce_html(html: str, page_url: Optional[str] = None) -> str:
+    """
+    Reduce an HTML page to compact structured text for LLM extraction.
+
+    Args:
+        html: Raw HTML as stored in response_body
+        page_url: URL the page was fetched from, used to make links absolute
+
+    Returns:
+        Reduced text; empty string if no page content is left after removing
+        boilerplate (title, meta and JSON-LD alone do not count), so callers
+        can fall back to the raw HTML
+    """
+    if not html or not html.strip():
+        return ""
+    soup = BeautifulSoup(html, "html.parser")
+    base = soup.find("base", href=True)
+    base_url = urljoin(page_url, base["href"]) if base and page_url else page_url
+
+    head = _meta_lines(soup, base_url)
+    json_ld = _json_ld_lines(soup)
+
+    for tag in soup.find_all(True):
+        if tag.decomposed:
+            continue
+        if _is_boilerplate(tag):
+            tag.decompose()
+
+    builder = _TextBuilder(base_url)
+    builder.walk(soup.body or soup)
+    builder.flush()
+
+    if not builder.lines:
+        return ""
+    sections: List[str] = []
+    if head:
+        sections.append("\n".join(head))
+    if json_ld:
+        sections.append("JSON-LD:\n" + "\n".join(json_ld))
+    sections.append("\n".join(builder.lines))
+    return "\n\n".join(sections)
+
+
+def _split_oversized(block: str, chunk_size: int) -> List[str]:
+    pieces: List[str] = []
+    current = ""
+    for line in block.split("\n"):
+        while len(line) > chunk_size:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(line[:chunk_size])
+            line = line[chunk_size:]
+        if current and len(current) + 1 + len(line) > chunk_size:
+            pieces.append(current)
+            current = line
+        else:
+            current = f"{current}\n{line}" if current else line
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_reduced_text(text: str, chunk_size: int) -> List[str]:
+    """
+    Split reduced text into chunks of at most chunk_size characters.
+
+    Blocks start at a heading or section break and are packed greedily; a block
+    larger than chunk_size is split between lines (a single oversized line,
+    e.g. a long JSON-LD item, is cut at chunk_size).
+    """
+    text = text.strip()
+    if not text:
+        return []
+    if chunk_size <= 0 or len(text) <= chunk_size:
+        return [text]
+
+    blocks: List[str] = []
+    current: List[str] = []
+    for line in text.split("\n"):
+        if (not line or line.startswith("#")) and current:
+            blocks.append("\n".join(current))
+            current = []
+        if line:
+            current.append(line)
+    if current:
+        blocks.append("\n".join(current))
+
+    chunks: List[str] = []
+    buffer = ""
+    for block in blocks:
+        if len(block) > chunk_size:
+            if buffer:
+                chunks.append(buffer)
+                buffer = ""
+            chunks.extend(_split_oversized(block, chunk_size))
+        elif buffer and len(buffer) + 2 + len(block) > chunk_size:
+            chunks.append(buffer)
+            buffer = block
+        else:
+            buffer = f"{buffer}\n\n{block}" if buffer else block
+    if buffer:
+        chunks.append(buffer)
+    return chunks
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for reporting."""
+    return math.ceil(len(text) / 4) if text else 0
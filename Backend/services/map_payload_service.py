@@ -0,0 +1,376 @@
+"""
+Map Payload Service - compact, pre-serialized, tile-cached payload for the public map.
+
+GET /locations returns one dict per row through FastAPI's generic JSON encoder and
+re-runs normalize_category per row on every map pan. The map fast path instead:
+
+- snaps the requested bbox to a grid of MAP_TILE_DEG tiles,
+- builds each tile once as columnar arrays (ids, lat/lng, category/state indices, ...)
+  serialized with orjson, and keeps the bytes in an LRU,
+- answers a request by concatenating cached tile bytes (missing tiles are loaded
+  with a single query for their union bbox),
+- derives the ETag from (data version, tiles, category table size) so unchanged
+  viewports are answered with 304 without touching the tiles.
+
+Invalidation: the data version is the value of public.map_payload_version_seq, which a
+deferred trigger on locations/business_location_claims bumps on every relevant
+write (migration 100). It is read at most every MAP_CACHE_CHECK_INTERVAL_S. Without the
+migration the version falls back to a MAP_CACHE_TTL_S time bucket. Every tile also
+expires after MAP_CACHE_TTL_S as a safety net.
+
+Category indices point into an append-only per-process table, so an index never
+changes meaning for the lifetime of the process; the full table is in every response.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import math
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import orjson
+
+from app.core.location_filters import get_public_map_filter_sql
+from app.core.logging import get_logger
+from app.services.category_map import normalize_category
+from services.db_service import fetch, fetchval
+
+logger = get_logger()
+
+MAP_TILE_DEG = float(os.getenv("MAP_TILE_DEG", "0.25"))
+MAP_MAX_TILES = int(os.getenv("MAP_MAX_TILES", "256"))
+MAP_CACHE_MAX_TILES = int(os.getenv("MAP_CACHE_MAX_TILES", "4096"))
+MAP_CACHE_TTL_S = float(os.getenv("MAP_CACHE_TTL_S", "300"))
+MAP_CACHE_CHECK_INTERVAL_S = float(os.getenv("MAP_CACHE_CHECK_INTERVAL_S", "5"))
+
+PAYLOAD_FORMAT = 1
+STATES: Tuple[str, ...] = ("VERIFIED", "PENDING_VERIFICATION", "CANDIDATE")
+_STATE_INDEX = {s: i for i, s in enumerate(STATES)}
+
+# Whole-world tile used when no bbox is given
+WORLD_TILE = "all"
+
+MAP_VERSION_SQL = "SELECT last_value FROM public.map_payload_version_seq"
+
+TileKey = Tuple[int, int]  # (floor(lat / deg), floor(lng / deg))
+
+
+class MapBBoxTooLarge(ValueError):
+    """The requested bbox covers more than MAP_MAX_TILES tiles."""
+
+
+@dataclass
+class MapPayloadStats:
+    requests: int = 0
+    not_modified: int = 0
+    tile_hits: int = 0
+    tile_misses: int = 0
+    db_queries: int = 0
+    version_checks: int = 0
+    invalidations: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+class _CategoryTable:
+    """Append-only raw category -> index table; normalize_category runs once per raw value."""
+
+    def __init__(self) -> None:
+        self._index: Dict[str, int] = {}
+        self.entries: List[List[Optional[str]]] = []  # [raw, key, label]
+
+    def index_of(self, raw: Optional[str]) -> int:
+        raw = str(raw or "")
+        idx = self._index.get(raw)
+        if idx is not None:
+            return idx
+        try:
+            info = normalize_category(raw)
+            entry = [info.get("category_raw"), info.get("category_key"), info.get("category_label")]
+        except Exception:
+            entry = [raw, raw.strip().lower().replace("/", "_").replace(" ", "_") or "other", "Overig"]
+        idx = len(self.entries)
+        self.entries.append(entry)
+        self._index[raw] = idx
+        return idx
+
+
+class _TileLRU:
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max(1, int(max_size))
+        self._data: "OrderedDict[Tuple[str, Any], Tuple[float, bytes]]" = OrderedDict()
+
+    def get(self, key: Tuple[str, Any], now: float) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, body = item
+        if expires_at <= now:
+            self._data.pop(key, None)
+            return None
+        self._data.move_to_end(key)
+        return body
+
+    def put(self, key: Tuple[str, Any], body: bytes, expires_at: float) -> None:
+        self._data[key] = (expires_at, body)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_tiles = _TileLRU(MAP_CACHE_MAX_TILES)
+_categories = _CategoryTable()
+_stats = MapPayloadStats()
+_version: Optional[str] = None
+_version_checked_at = 0.0
+_local_epoch = 0  # bumped by invalidate_map_cache()
+_version_lock: Optional[asyncio.Lock] = None
+
+
+def snap_bbox_to_tiles(
+    bbox: Optional[Tuple[float, float, float, float]],
+    tile_deg: float = MAP_TILE_DEG,
+) -> List[Any]:
+    """Tiles covering (lat_min, lat_max, lng_min, lng_max); [WORLD_TILE] when bbox is None."""
+    if bbox is None:
+        return [WORLD_TILE]
+    lat_min, lat_max, lng_min, lng_max = bbox
+    y0, y1 = math.floor(lat_min / tile_deg), math.floor(lat_max / tile_deg)
+    x0, x1 = math.floor(lng_min / tile_deg), math.floor(lng_max / tile_deg)
+    count = (y1 - y0 + 1) * (x1 - x0 + 1)
+    if count > MAP_MAX_TILES:
+        raise MapBBoxTooLarge(f"bbox covers {count} tiles (max {MAP_MAX_TILES})")
+    return [(y, x) for y in range(y0, y1 + 1) for x in range(x0, x1 + 1)]
+
+
+def _tile_name(tile: Any) -> str:
+    return tile if isinstance(tile, str) else f"{tile[0]}:{tile[1]}"
+
+
+def invalidate_map_cache() -> None:
+    """Drop all cached tiles (e.g. after a write this process knows about)."""
+    global _local_epoch, _version_checked_at
+    _local_epoch += 1
+    _version_checked_at = 0.0
+    _tiles.clear()
+    _stats.invalidations += 1
+
+
+async def get_map_version() -> str:
+    """Current data version, checked against the DB at most every MAP_CACHE_CHECK_INTERVAL_S."""
+    global _version, _version_checked_at, _version_lock
+    now = time.monotonic()
+    if _version is not None and now - _version_checked_at < MAP_CACHE_CHECK_INTERVAL_S:
+        return f"{_version}.{_local_epoch}"
+    if _version_lock is None:
+        _version_lock = asyncio.Lock()
+    async with _version_lock:
+        if _version is not None and time.monotonic() - _version_checked_at < MAP_CACHE_CHECK_INTERVAL_S:
+            return f"{_version}.{_local_epoch}"
+        _stats.version_checks += 1
+        try:
+            value = await fetchval(MAP_VERSION_SQL)
+            new_version = f"s{value}"
+        except Exception as e:
+            # Migration 100 not applied (or DB hiccup): expire by time instead
+            new_version = f"t{int(time.time() // max(MAP_CACHE_TTL_S, 1))}"
+            logger.debug("map_version_check_failed", error=str(e))
+        if new_version != _version:
+            if _version is not None:
+                _tiles.clear()
+                _stats.invalidations += 1
+            _version = new_version
+        _version_checked_at = time.monotonic()
+        return f"{_version}.{_local_epoch}"
+
+
+def make_etag(version: str, tiles: Sequence[Any]) -> str:
+    digest = hashlib.sha1()
+    digest.update(f"{PAYLOAD_FORMAT}|{version}|{len(_categories.entries)}|".encode())
+    digest.update(",".join(_tile_name(t) for t in tiles).encode())
+    return f'W/"{digest.hexdigest()[:20]}"'
+
+
+def _float_or_none(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def build_tile(tile: Any, rows: Iterable[Dict[str, Any]]) -> bytes:
+    """Serialize one tile's rows as columnar arrays."""
+    ids: List[int] = []
+    lats: List[Optional[float]] = []
+    lngs: List[Optional[float]] = []
+    cats: List[int] = []
+    states: List[int] = []
+    confs: List[Optional[float]] = []
+    ratings: List[Optional[float]] = []
+    names: List[Optional[str]] = []
+    addresses: List[Optional[str]] = []
+    badges: List[int] = []
+    for r in rows:
+        ids.append(int(r["id"]))
+        lats.append(_float_or_none(r.get("lat")))
+        lngs.append(_float_or_none(r.get("lng")))
+        cats.append(_categories.index_of(r.get("category")))
+        states.append(_STATE_INDEX.get(r.get("state"), len(STATES) - 1))
+        conf = _float_or_none(r.get("confidence_score"))
+        confs.append(round(conf, 3) if conf is not None else None)
+        ratings.append(_float_or_none(r.get("rating")))
+        names.append(r.get("name"))
+        addresses.append(r.get("address"))
+        badges.append(1 if r.get("claim_status") == "approved" else 0)
+    return orjson.dumps({
+        "tile": _tile_name(tile),
+        "id": ids,
+        "lat": lats,
+        "lng": lngs,
+        "cat": cats,
+        "state": states,
+        "conf": confs,
+        "rating": ratings,
+        "name": names,
+        "address": addresses,
+        "badge": badges,
+    })
+
+
+def _tiles_bbox(tiles: Sequence[TileKey], tile_deg: float) -> Tuple[float, float, float, float]:
+    ys = [t[0] for t in tiles]
+    xs = [t[1] for t in tiles]
+    return (min(ys) * tile_deg, (max(ys) + 1) * tile_deg, min(xs) * tile_deg, (max(xs) + 1) * tile_deg)
+
+
+async def _load_tiles(tiles: Sequence[Any], tile_deg: float) -> Dict[Any, List[Dict[str, Any]]]:
+    """One query for the union bbox of the missing tiles, bucketed per tile."""
+    bbox = None if WORLD_TILE in tiles else _tiles_bbox(tiles, tile_deg)
+    filter_sql, params = get_public_map_filter_sql(bbox=bbox, alias="l")
+    sql = f"""
+        SELECT
+            l.id,
+            l.name,
+            l.address,
+            l.lat,
+            l.lng,
+            l.category,
+            l.rating,
+            l.state,
+            l.confidence_score,
+            blc.status::text AS claim_status
+        FROM locations l
+        LEFT JOIN business_location_claims blc ON l.id = blc.location_id
+        WHERE {filter_sql}
+        ORDER BY l.id DESC
+    """
+    _stats.db_queries += 1
+    rows = await fetch(sql, *params)
+
+    buckets: Dict[Any, List[Dict[str, Any]]] = {t: [] for t in tiles}
+    if bbox is None:
+        buckets[WORLD_TILE] = [dict(r) for r in rows]
+        return buckets
+    for r in rows:
+        lat = _float_or_none(r["lat"])
+        lng = _float_or_none(r["lng"])
+        if lat is None or lng is None:
+            continue
+        key = (math.floor(lat / tile_deg), math.floor(lng / tile_deg))
+        bucket = buckets.get(key)
+        if bucket is not None:
+            bucket.append(dict(r))
+    return buckets
+
+
+async def get_map_payload(
+    bbox: Optional[Tuple[float, float, float, float]],
+    if_none_match: Optional[str] = None,
+) -> Tuple[Optional[bytes], str]:
+    """
+    Returns (body, etag); body is None when `if_none_match` matches (304).
+
+    Raises MapBBoxTooLarge when the bbox spans more than MAP_MAX_TILES tiles.
+    """
+    _stats.requests += 1
+    tile_deg = MAP_TILE_DEG
+    tiles = snap_bbox_to_tiles(bbox, tile_deg)
+    version = await get_map_version()
+
+    now = time.monotonic()
+    bodies: Dict[Any, bytes] = {}
+    missing: List[Any] = []
+    for tile in tiles:
+        body = _tiles.get((version, tile), now)
+        if body is None:
+            missing.append(tile)
+        else:
+            bodies[tile] = body
+    if not missing:
+        etag = make_etag(version, tiles)
+        if if_none_match and etag in {t.strip() for t in if_none_match.split(",")}:
+            _stats.not_modified += 1
+            return None, etag
+
+    _stats.tile_hits += len(tiles) - len(missing)
+    _stats.tile_misses += len(missing)
+    if missing:
+        loaded = await _load_tiles(missing, tile_deg)
+        expires_at = time.monotonic() + MAP_CACHE_TTL_S
+        for tile in missing:
+            body = build_tile(tile, loaded.get(tile, []))
+            _tiles.put((version, tile), body, expires_at)
+            bodies[tile] = body
+
+    # ETag after building: new tiles may have extended the category table
+    etag = make_etag(version, tiles)
+    if missing and if_none_match and etag in {t.strip() for t in if_none_match.split(",")}:
+        _stats.not_modified += 1
+        return None, etag
+
+    head = orjson.dumps({
+        "format": PAYLOAD_FORMAT,
+        "version": version,
+        "tile_deg": tile_deg,
+        "categories": _categories.entries,
+        "states": STATES,
+    })
+    # Splice pre-serialized tiles into the envelope without re-encoding them
+    body = head[:-1] + b',"tiles":[' + b",".join(bodies[t] for t in tiles) + b"]}"
+    return body, etag
+
+
+def get_map_payload_stats() -> Dict[str, Any]:
+    stats = _stats.as_dict()
+    stats.update({
+        "cached_tiles": len(_tiles),
+        "categories": len(_categories.entries),
+        "version": _version,
+        "tile_deg": MAP_TILE_DEG,
+    })
+    return stats
+
+
+def reset_map_payload_cache() -> None:
+    """Drop tiles, category table, version and counters (tests/benchmarks)."""
+    global _categories, _stats, _version, _version_checked_at, _local_epoch, _version_lock
+    _tiles.clear()
+    _categories = _CategoryTable()
+    _stats = MapPayloadStats()
+    _version = None
+    _version_checked_at = 0.0
+    _local_epoch = 0
+    _version_lock = None
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import math
 from datetime import datetime, timedelta, timezone
@@ -70,6 +71,8 @@ MONITOR_STALE_HOURS = 6
 ALERT_ERR_RATE_THRESHOLD = 0.10
 ALERT_GOOGLE_THRESHOLD = 5
 NEWS_TRENDING_SAMPLE_LIMIT = 3
+# Snapshot sections that may hold a pool connection at the same time (pool: DB_POOL_MAX_SIZE)
+METRICS_SNAPSHOT_CONCURRENCY = int(os.getenv("METRICS_SNAPSHOT_CONCURRENCY", "3"))
 EVENT_CANDIDATE_ACTIVE_STATES: Tuple[str, ...] = ("candidate", "verified", "published")
 
 # Category Health thresholds for Turkish-first strategy
@@ -278,33 +281,26 @@ async def _conversion_rate_14d() -> float:
     return float(ver) / float(total)
 
 
-async def _stale_candidates_metrics(days: int = 7) -> Dict[str, Any]:
+async def _stale_candidates_metrics(
+    days: int = 7,
+    by_city: Optional[Dict[str, int]] = None,
+) -> Dict[str, Any]:
     """
     Count stale CANDIDATE records (older than N days), grouped by source.
     
     Returns dict with:
     - total_stale: Total count of stale CANDIDATE records
     - by_source: Dict mapping source -> count
-    - by_city: Dict mapping city_key -> count (computed via bbox)
+    - by_city: Dict mapping city_key -> count (computed via bbox); pass `by_city`
+      when the counts are already known from _city_location_counts
     """
-    sql_total = (
-        """
-        SELECT COUNT(*)::int AS total_stale
-        FROM locations
-        WHERE state = 'CANDIDATE'
-          AND first_seen_at < NOW() - (($1::int || ' days')::interval)
-        """
-    )
-    rows_total = await fetch(sql_total, int(days))
-    total_stale = int(rows_total[0]["total_stale"]) if rows_total else 0
-    
     sql_by_source = (
         """
-        SELECT source, COUNT(*)::int AS count
+        SELECT COALESCE(source, 'unknown') AS source, COUNT(*)::int AS count
         FROM locations
         WHERE state = 'CANDIDATE'
           AND first_seen_at < NOW() - (($1::int || ' days')::interval)
-        GROUP BY source
+        GROUP BY 1
         ORDER BY count DESC
         """
     )
@@ -314,45 +310,16 @@ async def _stale_candidates_metrics(days: int = 7) -> Dict[str, Any]:
         rec = dict(row)
         source = str(rec.get("source") or "unknown")
         count = int(rec.get("count") or 0)
-        by_source[source] = count
+        by_source[source] = by_source.get(source, 0) + count
+    total_stale = sum(by_source.values())
     
-    # Compute by city (using bbox from database, fallback to YAML)
-    by_city: Dict[str, int] = {}
-    try:
-        # load_cities_config() is already database-first (updated in Step 3)
-        cities_config = load_cities_config()
-        cities = cities_config.get("cities", {})
-        
-        for city_key, city_def in cities.items():
-            if not isinstance(city_def, dict):
-                continue
-            
-            districts = city_def.get("districts", {})
-            if not districts:
-                continue
-            
-            bbox = _compute_city_bbox(city_key)
-            if not bbox:
-                continue
-            
-            lat_min, lat_max, lng_min, lng_max = bbox
-            sql_city = (
-                """
-                SELECT COUNT(*)::int AS count
-                FROM locations
-                WHERE state = 'CANDIDATE'
-                  AND first_seen_at < NOW() - (($1::int || ' days')::interval)
-                  AND lat BETWEEN $2 AND $3
-                  AND lng BETWEEN $4 AND $5
-                """
-            )
-            rows_city = await fetch(sql_city, int(days), float(lat_min), float(lat_max), float(lng_min), float(lng_max))
-            if rows_city:
-                count = int(dict(rows_city[0]).get("count") or 0)
-                if count > 0:
-                    by_city[city_key] = count
-    except Exception as e:
-        logger.warning("failed_to_compute_stale_by_city", error=str(e), exc_info=e)
+    if by_city is None:
+        by_city = {}
+        try:
+            counts = await _city_location_counts(_city_bboxes(), stale_days=days)
+            by_city = {key: c["stale_count"] for key, c in counts.items() if c["stale_count"] > 0}
+        except Exception as e:
+            logger.warning("failed_to_compute_stale_by_city", error=str(e), exc_info=e)
     
     return {
         "total_stale": total_stale,
@@ -574,9 +541,6 @@ async def _city_progress(city_key: str) -> Optional[CityProgressData]:
     )
     rows_candidates = await fetch(sql_candidates, float(lat_min), float(lat_max), float(lng_min), float(lng_max))
     candidates = int(dict(rows_candidates[0]).get("candidate_count", 0)) if rows_candidates else 0
-    
-    denom = verified + candidates
-    coverage = (float(verified) / float(denom)) if denom > 0 else 0.0
 
     # Weekly growth: compare VERIFIED in current week vs prior week based on last_verified_at
     # Apply same shared filter to weekly growth query
@@ -598,6 +562,12 @@ async def _city_progress(city_key: str) -> Optional[CityProgressData]:
     # Explicit None checks before int() conversion
     cur = int(cur_raw) if cur_raw is not None else 0
     prev = int(prev_raw) if prev_raw is not None else 0
+    return _progress_from_counts(verified, candidates, cur, prev)
+
+
+def _progress_from_counts(verified: int, candidates: int, cur: int, prev: int) -> CityProgressData:
+    denom = verified + candidates
+    coverage = (float(verified) / float(denom)) if denom > 0 else 0.0
     growth = 0.0
     if prev > 0:
         growth = (float(cur - prev) / float(prev)) * 100.0
@@ -612,6 +582,96 @@ async def _city_progress(city_key: str) -> Optional[CityProgressData]:
     )
 
 
+def _city_bboxes(city_keys: Optional[List[str]] = None) -> Dict[str, Tuple[float, float, float, float]]:
+    """Bbox per city with districts (all configured cities unless `city_keys` is given)."""
+    if city_keys is None:
+        cities = load_cities_config().get("cities", {})
+        city_keys = [
+            key for key, city_def in cities.items()
+            if isinstance(city_def, dict) and city_def.get("districts")
+        ]
+    bboxes: Dict[str, Tuple[float, float, float, float]] = {}
+    for city_key in city_keys:
+        bbox = _compute_city_bbox(city_key)
+        if bbox:
+            bboxes[city_key] = bbox
+    return bboxes
+
+
+async def _city_location_counts(
+    city_bboxes: Dict[str, Tuple[float, float, float, float]],
+    stale_days: int = 7,
+) -> Dict[str, Dict[str, int]]:
+    """
+    One grouped query for all cities: verified/candidate counts, verified this and
+    last week (for growth) and stale candidates per city bbox.
+
+    The verified condition is get_verified_filter_sql() (same as _city_progress and
+    the public API); the bbox join is the same lat/lng BETWEEN as get_bbox_filter_sql.
+    """
+    if not city_bboxes:
+        return {}
+    verified_filter_sql, verified_params = get_verified_filter_sql(alias="l")
+    n = len(verified_params)
+    keys = list(city_bboxes)
+    sql = f"""
+        WITH cities AS (
+            SELECT *
+            FROM unnest(${n + 1}::text[], ${n + 2}::float8[], ${n + 3}::float8[], ${n + 4}::float8[], ${n + 5}::float8[])
+                AS c(city_key, lat_min, lat_max, lng_min, lng_max)
+        )
+        SELECT
+            c.city_key,
+            COUNT(*) FILTER (WHERE {verified_filter_sql})::int AS verified_count,
+            COUNT(*) FILTER (WHERE l.state = 'CANDIDATE')::int AS candidate_count,
+            COUNT(*) FILTER (
+                WHERE {verified_filter_sql}
+                  AND l.last_verified_at >= date_trunc('week', NOW())
+            )::int AS cur,
+            COUNT(*) FILTER (
+                WHERE {verified_filter_sql}
+                  AND l.last_verified_at < date_trunc('week', NOW())
+                  AND l.last_verified_at >= date_trunc('week', NOW()) - INTERVAL '7 days'
+            )::int AS prev,
+            COUNT(*) FILTER (
+                WHERE l.state = 'CANDIDATE'
+                  AND l.first_seen_at < NOW() - ((${n + 6}::int || ' days')::interval)
+            )::int AS stale_count
+        FROM cities c
+        LEFT JOIN locations l
+          ON l.lat BETWEEN c.lat_min AND c.lat_max
+         AND l.lng BETWEEN c.lng_min AND c.lng_max
+        GROUP BY c.city_key
+        """
+    rows = await fetch(
+        sql,
+        *verified_params,
+        keys,
+        [float(city_bboxes[k][0]) for k in keys],
+        [float(city_bboxes[k][1]) for k in keys],
+        [float(city_bboxes[k][2]) for k in keys],
+        [float(city_bboxes[k][3]) for k in keys],
+        int(stale_days),
+    )
+    counts: Dict[str, Dict[str, int]] = {}
+    for row in rows or []:
+        rec = dict(row)
+        counts[str(rec["city_key"])] = {
+            field: int(rec.get(field) or 0)
+            for field in ("verified_count", "candidate_count", "cur", "prev", "stale_count")
+        }
+    return counts
+
+
+async def _all_city_progress(city_keys: Optional[List[str]] = None) -> Dict[str, CityProgressData]:
+    """_city_progress for many cities in one query (cities without a bbox are left out)."""
+    counts = await _city_location_counts(_city_bboxes(city_keys))
+    return {
+        key: _progress_from_counts(c["verified_count"], c["candidate_count"], c["cur"], c["prev"])
+        for key, c in counts.items()
+    }
+
+
 async def _rotterdam_progress() -> CityProgressRotterdam:
     """
     Calculate Rotterdam progress metrics using shared verified filter definition.
@@ -1639,61 +1699,83 @@ async def _alert_bot_status(err_rate: float, g429: int) -> WorkerStatus:
     )
 
 
-async def _worker_statuses(err_rate: float, g429: int) -> List[WorkerStatus]:
-    statuses: List[WorkerStatus] = []
+async def _safe_worker_status(
+    worker_id: str, label: str, fn: Callable[[], Awaitable[WorkerStatus]]
+) -> WorkerStatus:
+    try:
+        ws = await fn()
+    except asyncpg.exceptions.UndefinedTableError as exc:
+        logger.warning(
+            "worker_status_table_missing_unexpected",
+            worker_id=worker_id,
+            error=str(exc),
+        )
+        metrics = {"notes": "METRICS_DATA_MISSING"}
+        diagnosis_code = _compute_diagnosis_code(worker_id, "unknown", None, metrics)
+        ws = WorkerStatus(
+            id=worker_id,
+            label=label,
+            last_run=None,
+            duration_seconds=None,
+            processed_count=None,
+            error_count=None,
+            status="unknown",
+            window_label=None,
+            quota_info=None,
+            notes="Table missing; run migrations to enable worker metrics.",
+            diagnosis_code=diagnosis_code,
+        )
+    except Exception:
+        logger.exception("worker_status_failed", worker_id=worker_id)
+        metrics = {}
+        diagnosis_code = _compute_diagnosis_code(worker_id, "error", None, metrics)
+        ws = WorkerStatus(
+            id=worker_id,
+            label=label,
+            last_run=None,
+            duration_seconds=None,
+            processed_count=None,
+            error_count=None,
+            status="error",
+            window_label=None,
+            quota_info=None,
+            notes="Failed to compute worker status; see logs.",
+            diagnosis_code=diagnosis_code,
+        )
+    return ws
+
+
+# Worker status probes that query the database (AlertBot is derived from quality metrics)
+_WORKER_STATUS_PROBES: Tuple[Tuple[str, str, Callable[[], Awaitable[WorkerStatus]]], ...] = (
+    ("discovery_bot", "DiscoveryBot", _discovery_worker_status),
+    ("discovery_train_bot", "Discovery Train", _discovery_train_bot_status),
+    ("verify_locations_bot", "VerifyLocationsBot", _verify_locations_status),
+    ("task_verifier_bot", "Self-Verify Bot", _task_verifier_status),
+    ("monitor_bot", "MonitorBot", _monitor_bot_status),
+    ("verification_consumer", "Tasks Consumer", _verification_consumer_status),
+    ("contact_discovery_bot", "Contact Discovery Bot", _contact_discovery_bot_status),
+)
 
-    async def safe_call(worker_id: str, label: str, fn: Callable[[], Awaitable[WorkerStatus]]) -> None:
-        try:
-            ws = await fn()
-        except asyncpg.exceptions.UndefinedTableError as exc:
-            logger.warning(
-                "worker_status_table_missing_unexpected",
-                worker_id=worker_id,
-                error=str(exc),
-            )
-            metrics = {"notes": "METRICS_DATA_MISSING"}
-            diagnosis_code = _compute_diagnosis_code(worker_id, "unknown", None, metrics)
-            ws = WorkerStatus(
-                id=worker_id,
-                label=label,
-                last_run=None,
-                duration_seconds=None,
-                processed_count=None,
-                error_count=None,
-                status="unknown",
-                window_label=None,
-                quota_info=None,
-                notes="Table missing; run migrations to enable worker metrics.",
-                diagnosis_code=diagnosis_code,
-            )
-        except Exception:
-            logger.exception("worker_status_failed", worker_id=worker_id)
-            metrics = {}
-            diagnosis_code = _compute_diagnosis_code(worker_id, "error", None, metrics)
-            ws = WorkerStatus(
-                id=worker_id,
-                label=label,
-                last_run=None,
-                duration_seconds=None,
-                processed_count=None,
-                error_count=None,
-                status="error",
-                window_label=None,
-                quota_info=None,
-                notes="Failed to compute worker status; see logs.",
-                diagnosis_code=diagnosis_code,
-            )
-        statuses.append(ws)
 
-    await safe_call("discovery_bot", "DiscoveryBot", _discovery_worker_status)
-    await safe_call("discovery_train_bot", "Discovery Train", _discovery_train_bot_status)
-    await safe_call("verify_locations_bot", "VerifyLocationsBot", _verify_locations_status)
-    await safe_call("task_verifier_bot", "Self-Verify Bot", _task_verifier_status)
-    await safe_call("monitor_bot", "MonitorBot", _monitor_bot_status)
-    await safe_call("verification_consumer", "Tasks Consumer", _verification_consumer_status)
-    await safe_call("contact_discovery_bot", "Contact Discovery Bot", _contact_discovery_bot_status)
-    await safe_call("alert_bot", "AlertBot", lambda: _alert_bot_status(err_rate, g429))
+async def _gather_bounded(limit: int, *aws: Awaitable[Any]) -> List[Any]:
+    """asyncio.gather that keeps at most `limit` awaitables (pool connections) busy."""
+    sem = asyncio.Semaphore(max(1, limit))
 
+    async def run(aw: Awaitable[Any]) -> Any:
+        async with sem:
+            return await aw
+
+    return list(await asyncio.gather(*(run(aw) for aw in aws)))
+
+
+async def _worker_statuses(err_rate: float, g429: int) -> List[WorkerStatus]:
+    statuses = await _gather_bounded(
+        METRICS_SNAPSHOT_CONCURRENCY,
+        *(_safe_worker_status(worker_id, label, fn) for worker_id, label, fn in _WORKER_STATUS_PROBES),
+    )
+    statuses.append(
+        await _safe_worker_status("alert_bot", "AlertBot", lambda: _alert_bot_status(err_rate, g429))
+    )
     return statuses
 
 
@@ -1727,41 +1809,68 @@ async def _active_worker_runs(limit: int = 10) -> List[WorkerRunStatus]:
     return runs
 
 
-async def generate_metrics_snapshot() -> MetricsSnapshot:
-    # Quality
-    conv_14d = await _conversion_rate_14d()
-    err_rate = await _task_error_rate(60)
-    g429 = await _google429_bursts(60)
+async def _snapshot_city_counts() -> Optional[Dict[str, Dict[str, int]]]:
+    """Grouped per-city counts for the snapshot; None when cities cannot be loaded."""
+    try:
+        # load_cities_config() is already database-first (updated in Step 3)
+        return await _city_location_counts(_city_bboxes(), stale_days=7)
+    except Exception as e:
+        logger.warning("failed_to_load_cities_for_metrics", error=str(e), exc_info=e)
+        return None
 
-    # Latency
-    p50, avg, mx = await _latency_stats(60)
 
-    # Discovery
-    weekly = await _weekly_candidates_series(8)
+async def generate_metrics_snapshot() -> MetricsSnapshot:
+    """
+    Compute the admin metrics snapshot.
+
+    Sections are independent and run concurrently (at most METRICS_SNAPSHOT_CONCURRENCY
+    queries at a time); city progress and stale-by-city come from one grouped query
+    for all cities. Served to the dashboard via services.metrics_snapshot_service.
+    """
+    (
+        conv_14d,
+        err_rate,
+        g429,
+        (p50, avg, mx),
+        weekly,
+        city_counts,
+        news_trending_metrics,
+        current_runs,
+        stale_by_source,
+        *db_workers,
+    ) = await _gather_bounded(
+        METRICS_SNAPSHOT_CONCURRENCY,
+        # Quality
+        _conversion_rate_14d(),
+        _task_error_rate(60),
+        _google429_bursts(60),
+        # Latency
+        _latency_stats(60),
+        # Discovery
+        _weekly_candidates_series(8),
+        # City progress + stale candidates per city
+        _snapshot_city_counts(),
+        _news_trending_metrics(),
+        _active_worker_runs(),
+        _stale_candidates_metrics(days=7, by_city={}),  # by_city comes from the grouped city counts
+        *(_safe_worker_status(worker_id, label, fn) for worker_id, label, fn in _WORKER_STATUS_PROBES),
+    )
     latest_count = weekly[-1].count if weekly else 0
+    workers = list(db_workers)
+    workers.append(
+        await _safe_worker_status("alert_bot", "AlertBot", lambda: _alert_bot_status(err_rate, g429))
+    )
 
-    # City progress - load all cities from database (fallback to YAML)
     city_progress_dict: Dict[str, CityProgressData] = {}
-    try:
-        # load_cities_config() is already database-first (updated in Step 3)
-        cities_config = load_cities_config()
-        cities = cities_config.get("cities", {})
-        
-        for city_key, city_def in cities.items():
-            if not isinstance(city_def, dict):
-                continue
-            
-            # Only compute progress for cities with districts (bbox can be computed)
-            districts = city_def.get("districts", {})
-            if not districts:
-                # Skip cities without districts (can't compute bbox)
-                continue
-            
-            progress = await _city_progress(city_key)
-            if progress:
-                city_progress_dict[city_key] = progress
-    except Exception as e:
-        logger.warning("failed_to_load_cities_for_metrics", error=str(e), exc_info=e)
+    stale_by_city: Dict[str, int] = {}
+    if city_counts is not None:
+        for city_key, c in city_counts.items():
+            city_progress_dict[city_key] = _progress_from_counts(
+                c["verified_count"], c["candidate_count"], c["cur"], c["prev"]
+            )
+            if c["stale_count"] > 0:
+                stale_by_city[city_key] = c["stale_count"]
+    else:
         # Fallback: at least include Rotterdam
         rot = await _rotterdam_progress()
         if rot:
@@ -1772,18 +1881,11 @@ async def generate_metrics_snapshot() -> MetricsSnapshot:
                 growth_weekly=rot.growth_weekly,
             )
 
-    news_trending_metrics = await _news_trending_metrics()
-
-    workers = await _worker_statuses(err_rate, g429)
-    current_runs = await _active_worker_runs()
-    
-    # Stale candidates metrics
-    stale_metrics = await _stale_candidates_metrics(days=7)
     stale_candidates = StaleCandidates(
-        total_stale=stale_metrics["total_stale"],
-        by_source=stale_metrics["by_source"],
-        by_city=stale_metrics["by_city"],
-        days_threshold=stale_metrics["days_threshold"],
+        total_stale=stale_by_source["total_stale"],
+        by_source=stale_by_source["by_source"],
+        by_city=stale_by_city,
+        days_threshold=stale_by_source["days_threshold"],
     )
 
     return MetricsSnapshot(
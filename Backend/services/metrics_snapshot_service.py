@@ -0,0 +1,150 @@
+"""
+Metrics Snapshot Service - materialized admin metrics snapshot.
+
+generate_metrics_snapshot() runs a dozen aggregate queries. Instead of running them on
+every dashboard load, the API process keeps the last snapshot in memory:
+
+- a background task (started on app startup) regenerates it every
+  METRICS_SNAPSHOT_REFRESH_S seconds,
+- GET /admin/metrics/snapshot serves the stored snapshot; ?refresh=true regenerates it
+  on demand first,
+- concurrent refreshes share one generation run,
+- when no refresher is running (scripts, tests) an expired snapshot is still served
+  while a refresh runs in the background,
+- every response carries generated_at, age_seconds and stale
+  (age > METRICS_SNAPSHOT_STALE_AFTER_S, e.g. when refreshes keep failing).
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from app.core.logging import get_logger
+from app.models.metrics import MetricsSnapshot
+from services.metrics_service import generate_metrics_snapshot
+
+logger = get_logger()
+
+METRICS_SNAPSHOT_REFRESH_S = float(os.getenv("METRICS_SNAPSHOT_REFRESH_S", "60"))
+METRICS_SNAPSHOT_STALE_AFTER_S = float(os.getenv("METRICS_SNAPSHOT_STALE_AFTER_S", "300"))
+
+_snapshot: Optional[MetricsSnapshot] = None
+_generated_at: Optional[datetime] = None
+_generated_mono: float = 0.0
+_refresh_task: Optional[asyncio.Task] = None
+_loop_task: Optional[asyncio.Task] = None
+_background_task: Optional[asyncio.Task] = None
+_stats: Dict[str, Any] = {"refreshes": 0, "failures": 0, "last_duration_ms": None, "last_error": None}
+
+
+async def _generate() -> MetricsSnapshot:
+    global _snapshot, _generated_at, _generated_mono
+    started = time.perf_counter()
+    try:
+        snapshot = await generate_metrics_snapshot()
+    except Exception as e:
+        _stats["failures"] += 1
+        _stats["last_error"] = str(e)
+        raise
+    _snapshot = snapshot
+    _generated_at = datetime.now(timezone.utc)
+    _generated_mono = time.monotonic()
+    _stats["refreshes"] += 1
+    _stats["last_duration_ms"] = int((time.perf_counter() - started) * 1000)
+    _stats["last_error"] = None
+    logger.info("metrics_snapshot_refreshed", duration_ms=_stats["last_duration_ms"])
+    return snapshot
+
+
+async def refresh_metrics_snapshot() -> MetricsSnapshot:
+    """Regenerate the snapshot; callers arriving during a refresh wait for that run."""
+    global _refresh_task
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.get_running_loop().create_task(_generate())
+    return await asyncio.shield(_refresh_task)
+
+
+def _with_staleness(snapshot: MetricsSnapshot) -> MetricsSnapshot:
+    age = time.monotonic() - _generated_mono
+    return snapshot.model_copy(
+        update={
+            "generated_at": _generated_at,
+            "age_seconds": round(age, 1),
+            "stale": age > METRICS_SNAPSHOT_STALE_AFTER_S,
+        }
+    )
+
+
+async def get_metrics_snapshot(refresh: bool = False) -> MetricsSnapshot:
+    """Stored snapshot (generated on first use or when `refresh` is set)."""
+    global _background_task
+    if _snapshot is None or refresh:
+        await refresh_metrics_snapshot()
+    elif _loop_task is None and time.monotonic() - _generated_mono > METRICS_SNAPSHOT_REFRESH_S:
+        if (_refresh_task is None or _refresh_task.done()) and (
+            _background_task is None or _background_task.done()
+        ):
+            _background_task = asyncio.get_running_loop().create_task(_refresh_in_background())
+    assert _snapshot is not None
+    return _with_staleness(_snapshot)
+
+
+async def _refresh_in_background() -> None:
+    try:
+        await refresh_metrics_snapshot()
+    except Exception as e:
+        logger.warning("metrics_snapshot_refresh_failed", error=str(e))
+
+
+async def _refresh_loop() -> None:
+    while True:
+        await _refresh_in_background()
+        await asyncio.sleep(METRICS_SNAPSHOT_REFRESH_S)
+
+
+def start_metrics_snapshot_refresher() -> None:
+    """Start periodic regeneration in the running loop (app startup); no-op when disabled."""
+    global _loop_task
+    if METRICS_SNAPSHOT_REFRESH_S <= 0:
+        return
+    if _loop_task is not None and not _loop_task.done():
+        return
+    _loop_task = asyncio.get_running_loop().create_task(_refresh_loop())
+
+
+async def stop_metrics_snapshot_refresher() -> None:
+    """Cancel the refresh loop (app shutdown)."""
+    global _loop_task
+    task, _loop_task = _loop_task, None
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+
+
+def get_metrics_snapshot_stats() -> Dict[str, Any]:
+    """Refresh counters and the age of the stored snapshot."""
+    return {
+        **_stats,
+        "refresh_interval_s": METRICS_SNAPSHOT_REFRESH_S,
+        "generated_at": _generated_at.isoformat() if _generated_at else None,
+        "age_seconds": round(time.monotonic() - _generated_mono, 1) if _snapshot is not None else None,
+        "refresher_running": _loop_task is not None and not _loop_task.done(),
+    }
+
+
+def reset_metrics_snapshot_state() -> None:
+    """Drop the stored snapshot and task references (tests/benchmarks)."""
+    global _snapshot, _generated_at, _generated_mono, _refresh_task, _loop_task, _background_task
+    _snapshot = None
+    _generated_at = None
+    _generated_mono = 0.0
+    _refresh_task = None
+    _loop_task = None
+    _background_task = None
+    _stats.update({"refreshes": 0, "failures": 0, "last_duration_ms": None, "last_error": None})
@@ -50,6 +50,12 @@ def _build_system_prompt(scrape_timestamp: Optional[datetime] = None) -> str:
     )
 
 
+CONTENT_LABELS = {
+    "html": "HTML snippet:",
+    "reduced": "Page text (reduced from HTML: # headings, [text](url) links, JSON-LD kept):",
+}
+
+
 class NewsExtractionService:
     """Service for extracting news articles from HTML using AI."""
 
@@ -74,6 +80,7 @@ class NewsExtractionService:
         html: str,
         source_key: str,
         page_url: str,
+        content_format: str = "html",
     ) -> str:
         """
         Build user prompt for AI extraction.
@@ -82,6 +89,7 @@ class NewsExtractionService:
             html: HTML content to extract from
             source_key: Source identifier (e.g., 'scrape_turksemedia_nl')
             page_url: URL of the page being processed
+            content_format: 'html' for raw HTML, 'reduced' for reduce_html output
             
         Returns:
             Formatted user prompt string
@@ -89,7 +97,7 @@ class NewsExtractionService:
         return (
             f"Source key: {source_key}\n"
             f"Page URL: {page_url}\n"
-            "HTML snippet:\n"
+            f"{CONTENT_LABELS[content_format]}\n"
             f"{html.strip()}\n"
         )
 
@@ -100,6 +108,7 @@ class NewsExtractionService:
         source_key: str,
         page_url: str,
         scrape_timestamp: Optional[datetime] = None,
+        content_format: str = "html",
     ) -> Tuple[ExtractedNewsPayload, Dict[str, Any]]:
         """
         Extract news articles from HTML using AI.
@@ -109,6 +118,7 @@ class NewsExtractionService:
             source_key: Source identifier (e.g., 'scrape_turksemedia_nl')
             page_url: URL of the page being processed
             scrape_timestamp: Optional timestamp when the page was scraped (for date validation)
+            content_format: 'html' for raw HTML, 'reduced' for reduce_html output
             
         Returns:
             Tuple of (ExtractedNewsPayload, metadata dict)
@@ -124,6 +134,7 @@ class NewsExtractionService:
             html=html,
             source_key=source_key,
             page_url=page_url,
+            content_format=content_format,
         )
         parsed, meta = self._openai.generate_json(
             system_prompt=system_prompt,
@@ -4,8 +4,9 @@ import asyncio
 import hashlib
 import json
 import os
+import time
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
 import feedparser
@@ -14,7 +15,7 @@ import httpx
 from app.core.logging import get_logger
 from app.models.news_normalized import NormalizedNewsItem
 from app.models.news_sources import NewsSource, get_all_news_sources
-from services.db_service import execute, fetchrow
+from services.db_service import execute, fetch, fetchrow
 from services.rss_normalization import normalize_feed_entries
 from services.news_legal_sanitizer import SanitizedNewsItem, sanitize_ingested_entry
 
@@ -25,6 +26,10 @@ DEFAULT_NEWS_INGEST_MAX_CONCURRENCY = int(os.getenv("NEWS_INGEST_MAX_CONCURRENCY
 _BLOCKING_X_ROBOTS_TOKENS = {"noai", "noindex", "none", "nosnippet", "noarchive"}
 
 
+class FeedNotModified(Exception):
+    """The feed answered 304 to our ETag/Last-Modified validators."""
+
+
 def make_source_key(source: NewsSource) -> str:
     """Generate normalized source_key (lowercase) for consistent matching with feed rules."""
     raw_key = source.key or source.url
@@ -49,6 +54,15 @@ class NewsIngestService:
         self.max_concurrency = max_concurrency
         self._client: Optional[httpx.AsyncClient] = None
         self._sem = asyncio.Semaphore(max(1, max_concurrency))
+        # source_key -> (etag, last_modified), loaded by _should_fetch_now and
+        # refreshed from each 200 response
+        self._validators: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self.stats: Dict[str, Any] = {
+            "bytes_fetched": 0,
+            "not_modified": 0,
+            "rows_persisted": 0,
+            "persist_seconds": 0.0,
+        }
 
     async def __aenter__(self) -> "NewsIngestService":
         self._client = httpx.AsyncClient(
@@ -65,7 +79,7 @@ class NewsIngestService:
         source_key = make_source_key(source)
         row = await fetchrow(
             """
-            SELECT next_refresh_at
+            SELECT next_refresh_at, etag, last_modified
             FROM news_source_state
             WHERE source_key = $1
             """,
@@ -73,6 +87,7 @@ class NewsIngestService:
         )
         if not row:
             return True
+        self._validators[source_key] = (row.get("etag"), row.get("last_modified"))
         next_refresh_at = row.get("next_refresh_at")
         if not next_refresh_at:
             return True
@@ -83,17 +98,18 @@ class NewsIngestService:
         now = datetime.now(timezone.utc)
         refresh_minutes = source.refresh_minutes
         next_refresh = now + timedelta(minutes=refresh_minutes)
+        etag, last_modified = self._validators.get(source_key, (None, None))
         await execute(
             """
             INSERT INTO news_source_state (
                 source_key, source_name, source_url, category, language, region,
                 refresh_minutes, last_fetched_at, next_refresh_at,
-                consecutive_failures, last_error, created_at, updated_at
+                consecutive_failures, last_error, etag, last_modified, created_at, updated_at
             )
             VALUES (
                 $1,$2,$3,$4,$5,$6,
                 $7,$8,$9,
-                0,NULL,NOW(),NOW()
+                0,NULL,$10,$11,NOW(),NOW()
             )
             ON CONFLICT (source_key) DO UPDATE
             SET source_name = EXCLUDED.source_name,
@@ -106,6 +122,8 @@ class NewsIngestService:
                 next_refresh_at = EXCLUDED.next_refresh_at,
                 consecutive_failures = 0,
                 last_error = NULL,
+                etag = EXCLUDED.etag,
+                last_modified = EXCLUDED.last_modified,
                 updated_at = NOW();
             """,
             source_key,
@@ -117,6 +135,8 @@ class NewsIngestService:
             refresh_minutes,
             now,
             next_refresh,
+            etag,
+            last_modified,
         )
         logger.info(
             "news_ingest_source_success",
@@ -175,13 +195,31 @@ class NewsIngestService:
         )
 
     async def _fetch_feed(self, source: NewsSource) -> Optional[bytes]:
+        """Conditional GET of the feed; raises FeedNotModified on 304."""
         if not self._client:
             raise RuntimeError("NewsIngestService client not initialized")
+        source_key = make_source_key(source)
+        etag, last_modified = self._validators.get(source_key, (None, None))
+        headers: Dict[str, str] = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
         try:
             async with self._sem:
-                response = await self._client.get(source.url)
+                response = await self._client.get(source.url, headers=headers)
+            if response.status_code == 304:
+                raise FeedNotModified(source.url)
             response.raise_for_status()
-            return response.content
+            content = response.content
+            self.stats["bytes_fetched"] += len(content)
+            self._validators[source_key] = (
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+            )
+            return content
+        except FeedNotModified:
+            raise
         except Exception as exc:
             logger.warning(
                 "news_ingest_feed_failed",
@@ -325,54 +363,112 @@ class NewsIngestService:
             "ingest_hash": ingest_hash,
         }
 
-    async def _persist_items(self, items: List[Dict[str, Any]]) -> int:
-        inserted = 0
-        for item in items:
-            try:
-                raw_entry_json = json.dumps(item["raw_entry"], ensure_ascii=False)
-                result = await execute(
-                    """
-                    INSERT INTO raw_ingested_news (
-                        source_key, source_name, source_url,
-                        category, language, region,
-                        title, summary, content, author,
-                        link, image_url, published_at,
-                        ingest_hash, raw_entry
-                    ) VALUES (
-                        $1,$2,$3,
-                        $4,$5,$6,
-                        $7,$8,$9,$10,
-                        $11,$12,$13,
-                        $14,$15
-                    )
-                    ON CONFLICT (source_key, ingest_hash) DO NOTHING;
-                    """,
-                    item["source_key"],
-                    item["source_name"],
-                    item["source_url"],
-                    item["category"],
-                    item["language"],
-                    item["region"],
-                    item["title"],
-                    item.get("summary"),
-                    item.get("content"),
-                    item.get("author"),
-                    item["link"],
-                    item.get("image_url"),
-                    item["published_at"],
-                    item["ingest_hash"],
-                    raw_entry_json,
-                )
-                if result and "INSERT" in result.upper():
-                    inserted += 1
-            except Exception as exc:
-                logger.error(
-                    "news_ingest_persist_error",
-                    source_key=item.get("source_key"),
-                    link=item.get("link"),
-                    error=str(exc),
+    async def _insert_rows(self, items: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Insert rows in one statement. Rows whose link was already ingested with a
+        published_at in the last 24 hours are dropped in the same statement.
+        """
+        return await fetch(
+            """
+            WITH incoming AS (
+                SELECT *
+                FROM unnest(
+                    $1::text[], $2::text[], $3::text[],
+                    $4::text[], $5::text[], $6::text[],
+                    $7::text[], $8::text[], $9::text[], $10::text[],
+                    $11::text[], $12::text[], $13::timestamptz[],
+                    $14::text[], $15::text[]
+                ) AS t(
+                    source_key, source_name, source_url,
+                    category, language, region,
+                    title, summary, content, author,
+                    link, image_url, published_at,
+                    ingest_hash, raw_entry
                 )
-        return inserted
+            )
+            INSERT INTO raw_ingested_news (
+                source_key, source_name, source_url,
+                category, language, region,
+                title, summary, content, author,
+                link, image_url, published_at,
+                ingest_hash, raw_entry
+            )
+            SELECT
+                i.source_key, i.source_name, i.source_url,
+                i.category, i.language, i.region,
+                i.title, i.summary, i.content, i.author,
+                i.link, i.image_url, i.published_at,
+                i.ingest_hash, i.raw_entry::jsonb
+            FROM incoming i
+            WHERE i.link = ''
+               OR NOT EXISTS (
+                    SELECT 1
+                    FROM raw_ingested_news r
+                    WHERE r.link = i.link
+                      AND r.published_at >= NOW() - INTERVAL '24 hours'
+               )
+            ON CONFLICT (source_key, ingest_hash) DO NOTHING
+            RETURNING link;
+            """,
+            [item["source_key"] for item in items],
+            [item["source_name"] for item in items],
+            [item["source_url"] for item in items],
+            [item["category"] for item in items],
+            [item["language"] for item in items],
+            [item["region"] for item in items],
+            [item["title"] for item in items],
+            [item.get("summary") for item in items],
+            [item.get("content") for item in items],
+            [item.get("author") for item in items],
+            [item["link"] or "" for item in items],
+            [item.get("image_url") for item in items],
+            [item["published_at"] for item in items],
+            [item["ingest_hash"] for item in items],
+            [json.dumps(item["raw_entry"], ensure_ascii=False) for item in items],
+        )
+
+    async def _persist_items(self, items: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        Insert a feed's rows in one statement; returns (inserted, failed).
+
+        If the batch fails (one bad row fails the whole statement), the rows are
+        inserted one by one so only the bad rows are lost.
+        """
+        if not items:
+            return 0, 0
+        started = time.perf_counter()
+        failed = 0
+        try:
+            rows = await self._insert_rows(items)
+        except Exception as exc:
+            logger.error(
+                "news_ingest_persist_error",
+                source_key=items[0].get("source_key"),
+                items=len(items),
+                error=str(exc),
+            )
+            rows = []
+            for item in items:
+                try:
+                    rows.extend(await self._insert_rows([item]))
+                except Exception as row_exc:
+                    failed += 1
+                    logger.error(
+                        "news_ingest_persist_item_error",
+                        source_key=item.get("source_key"),
+                        url=item.get("link"),
+                        error=str(row_exc),
+                    )
+        inserted = len(rows)
+        self.stats["rows_persisted"] += inserted
+        self.stats["persist_seconds"] += time.perf_counter() - started
+        if inserted + failed < len(items):
+            logger.info(
+                "news_ingest_duplicates_skipped",
+                source_key=items[0].get("source_key"),
+                skipped=len(items) - inserted - failed,
+            )
+        return inserted, failed
 
     async def ingest_source(self, source: NewsSource) -> Dict[str, Any]:
         source_key = make_source_key(source)
@@ -408,7 +504,14 @@ class NewsIngestService:
                 legal_checks_passed=True,
             )
 
-        raw_feed = await self._fetch_feed(source)
+        previous_validators = self._validators.get(source_key)
+        try:
+            raw_feed = await self._fetch_feed(source)
+        except FeedNotModified:
+            self.stats["not_modified"] += 1
+            logger.info("news_ingest_feed_not_modified", source=source.name, source_key=source_key)
+            await self._mark_source_success(source, 0)
+            return {"source_key": source_key, "skipped": True, "not_modified": True, "inserted": 0, "failed_items": 0}
         if raw_feed is None:
             return {"source_key": source_key, "skipped": False, "inserted": 0, "failed_items": 0}
 
@@ -442,44 +545,27 @@ class NewsIngestService:
                 legal=legal_meta,
             )
 
-        deduped_items: List[SanitizedNewsItem] = []
-        for sanitized in sanitized_items:
-            if await self._is_recent_duplicate(sanitized.url):
-                logger.info(
-                    "news_ingest_duplicate_skipped",
-                    source=source.name,
-                    url=sanitized.url,
-                )
-                continue
-            deduped_items.append(sanitized)
-
-        rows = [self._sanitized_item_to_row(source, item) for item in deduped_items]
-
-        inserted = await self._persist_items(rows)
-        await self._mark_source_success(source, inserted)
+        rows = [self._sanitized_item_to_row(source, item) for item in sanitized_items]
+
+        inserted, failed_rows = await self._persist_items(rows)
+        if failed_rows:
+            # Keep the validators from before this fetch: saving the new ones would
+            # answer the next run with 304 and the failed rows would never be retried
+            if previous_validators is None:
+                self._validators.pop(source_key, None)
+            else:
+                self._validators[source_key] = previous_validators
+            await self._mark_source_failure(source, f"persist failed for {failed_rows} of {len(rows)} items")
+        else:
+            await self._mark_source_success(source, inserted)
 
         return {
             "source_key": source_key,
             "skipped": False,
             "inserted": inserted,
-            "failed_items": len(norm_errors),
+            "failed_items": len(norm_errors) + failed_rows,
         }
 
-    async def _is_recent_duplicate(self, link: str) -> bool:
-        if not link:
-            return False
-        row = await fetchrow(
-            """
-            SELECT 1
-            FROM raw_ingested_news
-            WHERE link = $1
-              AND published_at >= NOW() - INTERVAL '24 hours'
-            LIMIT 1
-            """,
-            link,
-        )
-        return bool(row)
-
 
 async def ingest_all_sources(limit: Optional[int] = None) -> Dict[str, Any]:
     sources = get_all_news_sources()
@@ -495,10 +581,16 @@ async def ingest_all_sources(limit: Optional[int] = None) -> Dict[str, Any]:
             "total_skipped": 0,
             "failed_feeds": 0,
             "degraded": False,
+            "bytes_fetched": 0,
+            "feeds_not_modified": 0,
+            "rows_per_sec": 0.0,
         }
 
     async with NewsIngestService() as service:
         results = await asyncio.gather(*(service.ingest_source(src) for src in sources))
+    stats = getattr(service, "stats", {})
+    persist_seconds = stats.get("persist_seconds", 0.0)
+    rows_per_sec = round(stats.get("rows_persisted", 0) / persist_seconds, 1) if persist_seconds else 0.0
 
     total_inserted = sum(r.get("inserted", 0) for r in results)
     total_failed_items = sum(r.get("failed_items", 0) for r in results)
@@ -520,6 +612,9 @@ async def ingest_all_sources(limit: Optional[int] = None) -> Dict[str, Any]:
         total_skipped=total_skipped,
         failed_feeds=failed_feeds,
         degraded=degraded,
+        bytes_fetched=stats.get("bytes_fetched", 0),
+        feeds_not_modified=stats.get("not_modified", 0),
+        rows_per_sec=rows_per_sec,
     )
 
     return {
@@ -529,5 +624,8 @@ async def ingest_all_sources(limit: Optional[int] = None) -> Dict[str, Any]:
         "total_skipped": total_skipped,
         "failed_feeds": failed_feeds,
         "degraded": degraded,
+        "bytes_fetched": stats.get("bytes_fetched", 0),
+        "feeds_not_modified": stats.get("not_modified", 0),
+        "rows_per_sec": rows_per_sec,
     }
 
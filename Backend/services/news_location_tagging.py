@@ -1,10 +1,27 @@
+"""
+News location tagging - derives local/origin/none for a news item from AI mentions
+plus deterministic NL/TR city alias matching (configs/news_city_tags.yml).
+
+Alias matching runs through an AliasMatcher compiled once per loaded config
+(app.models.news_city_tags.load_city_tags identity): a character trie over the
+single-word aliases and a token trie over the multi-word ones. Semantics match the
+original per-alias scan:
+
+- a single-word alias matches when any token starts with it; the first such token
+  (in text order) is reported
+- a multi-word alias matches as a whole-token phrase; the alias itself is reported
+- matches are emitted NL first, then TR, each in alias config order
+"""
+
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence, Tuple
+import re
+import threading
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
 import unicodedata
 
-from app.models.news_city_tags import get_aliases
+from app.models.news_city_tags import CityTag, get_aliases, load_city_tags
 
 CountryCode = str
 
@@ -16,14 +33,19 @@ TAG_ORIGIN = "origin"
 TAG_NONE = "none"
 
 
+# Runs of characters for which str.isalnum() is true (\w minus underscore)
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
 def _normalize_text_to_tokens(value: Optional[str]) -> List[str]:
     if not value:
         return []
+    if value.isascii():
+        # NFKD and combining-mark stripping are no-ops; casefold == lower
+        return _TOKEN_RE.findall(value.lower())
     text = unicodedata.normalize("NFKD", value)
     text = "".join(ch for ch in text if not unicodedata.combining(ch))
-    text = text.casefold()
-    sanitized = "".join(ch if ch.isalnum() else " " for ch in text)
-    return [token for token in sanitized.split() if token]
+    return _TOKEN_RE.findall(text.casefold())
 
 
 def _normalize_country(value: Any) -> Optional[str]:
@@ -75,44 +97,133 @@ def _extract_ai_matches(ai_mentions: Sequence[Any]) -> List[Dict[str, Any]]:
     return matches
 
 
+# Trie nodes are plain dicts keyed by character (or token); the "" key holds the
+# indices of the aliases that end at that node.
+_END = ""
+
+
+class AliasMatcher:
+    """Immutable compiled matcher over the NL/TR alias maps of one config."""
+
+    def __init__(self, entries: Sequence[Tuple[str, CityTag, float]], source: Any = None):
+        self.source = source
+        self._entries: Tuple[Tuple[str, CityTag, float], ...] = tuple(entries)
+        self._prefix_trie: Dict[str, Any] = {}
+        self._phrase_trie: Dict[str, Any] = {}
+        for index, (alias, _tag, _confidence) in enumerate(self._entries):
+            words = alias.split(" ")
+            if len(words) == 1:
+                node = self._prefix_trie
+                for ch in alias:
+                    node = node.setdefault(ch, {})
+            else:
+                node = self._phrase_trie
+                for word in words:
+                    node = node.setdefault(word, {})
+            node.setdefault(_END, []).append(index)
+
+    @classmethod
+    def from_config(cls, config_path: Optional[Path] = None, source: Any = None) -> "AliasMatcher":
+        entries: List[Tuple[str, CityTag, float]] = []
+        for country in (LOCAL_COUNTRY, ORIGIN_COUNTRY):
+            confidence = 0.8 if country == LOCAL_COUNTRY else 0.7
+            for alias, tag in get_aliases(country, path=config_path).items():
+                if alias:
+                    entries.append((alias, tag, confidence))
+        return cls(entries, source=source)
+
+    @property
+    def alias_count(self) -> int:
+        return len(self._entries)
+
+    def match_tokens(self, tokens: Sequence[str]) -> List[Dict[str, Any]]:
+        """Text matches for normalized tokens (see _normalize_text_to_tokens)."""
+        hits: Dict[int, str] = {}
+
+        prefix_trie = self._prefix_trie
+        if prefix_trie:
+            for token in dict.fromkeys(tokens):
+                node = prefix_trie
+                for ch in token:
+                    node = node.get(ch)
+                    if node is None:
+                        break
+                    ended = node.get(_END)
+                    if ended:
+                        for index in ended:
+                            hits.setdefault(index, token)
+
+        phrase_trie = self._phrase_trie
+        if phrase_trie:
+            for start in range(len(tokens)):
+                node = phrase_trie.get(tokens[start])
+                pos = start + 1
+                while node is not None:
+                    ended = node.get(_END)
+                    if ended:
+                        for index in ended:
+                            hits.setdefault(index, self._entries[index][0])
+                    if pos >= len(tokens):
+                        break
+                    node = node.get(tokens[pos])
+                    pos += 1
+
+        matches: List[Dict[str, Any]] = []
+        for index in sorted(hits):
+            alias, tag, confidence = self._entries[index]
+            matches.append(
+                {
+                    "city_key": tag.city_key,
+                    "country": tag.country,
+                    "confidence": confidence,
+                    "source": "text",
+                    "alias": alias,
+                    "token": hits[index],
+                }
+            )
+        return matches
+
+
+_matchers: Dict[Optional[str], AliasMatcher] = {}
+_matchers_lock = threading.Lock()
+_MAX_MATCHERS = 8
+
+
+def get_alias_matcher(config_path: Optional[Path] = None) -> AliasMatcher:
+    """
+    Return the compiled matcher for the current city tags config.
+
+    Hot path is a dict lookup plus an identity check on the cached registry; the
+    tries are rebuilt only after clear_city_tags_cache() (or for a new config path).
+    """
+    key = str(config_path) if config_path else None
+    source = load_city_tags(config_path)
+    matcher = _matchers.get(key)
+    if matcher is not None and matcher.source is source:
+        return matcher
+
+    with _matchers_lock:
+        matcher = _matchers.get(key)
+        if matcher is not None and matcher.source is source:
+            return matcher
+        matcher = AliasMatcher.from_config(config_path, source=source)
+        if len(_matchers) >= _MAX_MATCHERS:
+            _matchers.clear()
+        _matchers[key] = matcher
+        return matcher
+
+
+def reset_alias_matchers() -> None:
+    """Drop the compiled matchers (tests)."""
+    with _matchers_lock:
+        _matchers.clear()
+
+
 def _extract_text_matches(text: str, *, config_path: Optional[Path] = None) -> List[Dict[str, Any]]:
     tokens = _normalize_text_to_tokens(text)
     if not tokens:
         return []
-
-    normalized_text = f" {' '.join(tokens)} "
-    matches: List[Dict[str, Any]] = []
-
-    for country in (LOCAL_COUNTRY, ORIGIN_COUNTRY):
-        alias_map = get_aliases(country, path=config_path)
-        confidence = 0.8 if country == LOCAL_COUNTRY else 0.7
-        for alias, tag in alias_map.items():
-            if not alias:
-                continue
-
-            found = False
-            for token in tokens:
-                if token == alias or token.startswith(alias):
-                    found = True
-                    matched_token = token
-                    break
-
-            if not found and f" {alias} " in normalized_text:
-                found = True
-                matched_token = alias
-
-            if found:
-                matches.append(
-                    {
-                        "city_key": tag.city_key,
-                        "country": tag.country,
-                        "confidence": confidence,
-                        "source": "text",
-                        "alias": alias,
-                        "token": matched_token,
-                    }
-                )
-    return matches
+    return get_alias_matcher(config_path).match_tokens(tokens)
 
 
 def _dedupe_matches(matches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -142,6 +253,22 @@ def _compute_tag(matches: Sequence[Dict[str, Any]]) -> str:
     return TAG_NONE
 
 
+def _derive(
+    matcher: AliasMatcher,
+    title: Optional[str],
+    summary: Optional[str],
+    content: Optional[str],
+    ai_mentions: Optional[Sequence[Any]],
+) -> Tuple[str, Dict[str, Any]]:
+    matches = _extract_ai_matches(ai_mentions or [])
+    tokens = _normalize_text_to_tokens(_coerce_article_text((title, summary, content)))
+    if tokens:
+        matches.extend(matcher.match_tokens(tokens))
+    matches = _dedupe_matches(matches)
+    tag = _compute_tag(matches)
+    return tag, {"matches": matches}
+
+
 def derive_location_tag(
     *,
     title: Optional[str],
@@ -156,10 +283,28 @@ def derive_location_tag(
     Returns:
         (location_tag, context_dict)
     """
-    article_text = _coerce_article_text((title, summary, content))
-    matches = _extract_ai_matches(ai_mentions or [])
-    matches.extend(_extract_text_matches(article_text, config_path=config_path))
-    matches = _dedupe_matches(matches)
-    tag = _compute_tag(matches)
-    return tag, {"matches": matches}
+    return _derive(get_alias_matcher(config_path), title, summary, content, ai_mentions)
+
 
+def derive_location_tags(
+    articles: Sequence[Mapping[str, Any]],
+    *,
+    config_path: Optional[Path] = None,
+) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Batch variant of derive_location_tag.
+
+    Each article is a mapping with optional title, summary, content and ai_mentions
+    keys. The matcher is resolved once for the whole batch; results keep input order.
+    """
+    matcher = get_alias_matcher(config_path)
+    return [
+        _derive(
+            matcher,
+            article.get("title"),
+            article.get("summary"),
+            article.get("content"),
+            article.get("ai_mentions"),
+        )
+        for article in articles
+    ]
@@ -31,6 +31,8 @@ class NewsPageRawRecord:
     processing_errors: Optional[Dict[str, Any]]
     fetched_at: datetime
     created_at: datetime
+    reduced_body: Optional[str] = None
+    reduced_version: Optional[int] = None
 
     @classmethod
     def from_row(cls, row: Dict[str, Any]) -> "NewsPageRawRecord":
@@ -59,6 +61,8 @@ class NewsPageRawRecord:
             processing_errors=errors if isinstance(errors, dict) else None,
             fetched_at=row["fetched_at"],
             created_at=row["created_at"],
+            reduced_body=row.get("reduced_body"),
+            reduced_version=row.get("reduced_version"),
         )
 
     def to_model(self) -> NewsPageRaw:
@@ -75,6 +79,8 @@ class NewsPageRawRecord:
             processing_errors=self.processing_errors,
             fetched_at=self.fetched_at,
             created_at=self.created_at,
+            reduced_body=self.reduced_body,
+            reduced_version=self.reduced_version,
         )
 
 
@@ -160,7 +166,9 @@ async def fetch_pending_news_pages(*, limit: int = 50) -> List[NewsPageRaw]:
             processing_state,
             processing_errors,
             fetched_at,
-            created_at
+            created_at,
+            reduced_body,
+            reduced_version
         FROM news_pages_raw
         WHERE processing_state = 'pending'
         ORDER BY fetched_at ASC
@@ -219,3 +227,25 @@ async def update_news_page_processing_state(
 
 
 
+
+
+async def update_news_page_reduced_body(page_id: int, reduced_body: str, version: int) -> None:
+    """
+    Cache the reduced text of a page (see html_reduction_service).
+    
+    Args:
+        page_id: ID of the news page raw record
+        reduced_body: Output of reduce_html for the page's response_body
+        version: REDUCER_VERSION that produced it
+    """
+    await execute(
+        """
+        UPDATE news_pages_raw
+        SET reduced_body = $2,
+            reduced_version = $3
+        WHERE id = $1
+        """,
+        page_id,
+        reduced_body,
+        version,
+    )
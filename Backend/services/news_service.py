@@ -10,6 +10,7 @@ from app.models.news_public import NewsItem
 from app.core.logging import get_logger
 from services.ai_config_service import get_ai_config, initialize_ai_config
 from services.db_service import fetch, fetchrow
+from services.reaction_counter_service import reactions_join_sql
 from services.news_feed_rules import (
     FeedThresholds,
     FeedType,
@@ -29,6 +30,10 @@ _SCORE_COLUMN_BY_FEED: Dict[FeedType, str] = {
 TRENDING_WINDOW_HOURS = 48
 _SNIPPET_MAX_LEN = 280
 logger = get_logger().bind(module="news_service")
+
+_NEWS_REACTIONS_JOIN = reactions_join_sql("news", "raw_ingested_news.id")
+_TRENDING_REACTIONS_JOIN = reactions_join_sql("news", "ranked.id")
+
 # Deprecated: ALLOWED_NEWS_THEMES is no longer used.
 # NL/TR feeds now use RSS category-based filtering instead of AI theme filtering.
 # Keeping for backward compatibility if needed, but not used in code.
@@ -309,20 +314,10 @@ async def list_news_by_feed(
             topics,
             location_tag,
             {score_column} AS relevance_score,
-            COALESCE(
-                (
-                    SELECT json_object_agg(reaction_type, count)
-                    FROM (
-                        SELECT reaction_type, COUNT(*)::int as count
-                        FROM news_reactions
-                        WHERE news_id = raw_ingested_news.id
-                        GROUP BY reaction_type
-                    ) reaction_counts
-                ),
-                '{{}}'::json
-            ) as reactions,
+            COALESCE(rc.reactions, '{{}}'::jsonb) as reactions,
             NULL as user_reaction
         FROM raw_ingested_news
+        {_NEWS_REACTIONS_JOIN}
         WHERE {where_clause}
         ORDER BY {order_clause}
         LIMIT {limit_placeholder} OFFSET {offset_placeholder}
@@ -362,7 +357,7 @@ async def list_trending_news(
         limit,
         offset,
     ]
-    query = """
+    query = f"""
         WITH ranked AS (
             SELECT
                 id,
@@ -405,20 +400,10 @@ async def list_trending_news(
             ) AS trending_score,
             ranked.hours_since,
             ranked.source_freq,
-            COALESCE(
-                (
-                    SELECT json_object_agg(reaction_type, count)
-                    FROM (
-                        SELECT reaction_type, COUNT(*)::int as count
-                        FROM news_reactions
-                        WHERE news_id = ranked.id
-                        GROUP BY reaction_type
-                    ) reaction_counts
-                ),
-                '{}'::json
-            ) as reactions,
+            COALESCE(rc.reactions, '{{}}'::jsonb) as reactions,
             NULL as user_reaction
         FROM ranked
+        {_TRENDING_REACTIONS_JOIN}
         ORDER BY trending_score DESC, ranked.published_at DESC
         LIMIT $5 OFFSET $6
     """
@@ -469,7 +454,7 @@ async def search_news(
     if len(normalized) < 2:
         return [], 0
 
-    search_sql = """
+    search_sql = f"""
         WITH q AS (
             SELECT websearch_to_tsquery('simple', $1) AS tsq
         )
@@ -488,20 +473,11 @@ async def search_news(
                 ts_rank(news_search_tsv, q.tsq) * 0.7
                 + COALESCE(relevance_diaspora, 0) * 0.3
             ) AS search_score,
-            COALESCE(
-                (
-                    SELECT json_object_agg(reaction_type, count)
-                    FROM (
-                        SELECT reaction_type, COUNT(*)::int as count
-                        FROM news_reactions
-                        WHERE news_id = raw_ingested_news.id
-                        GROUP BY reaction_type
-                    ) reaction_counts
-                ),
-                '{}'::json
-            ) as reactions,
+            COALESCE(rc.reactions, '{{}}'::jsonb) as reactions,
             NULL as user_reaction
-        FROM raw_ingested_news, q
+        FROM raw_ingested_news
+        CROSS JOIN q
+        {_NEWS_REACTIONS_JOIN}
         WHERE
             processing_state = 'classified'
             AND published_at IS NOT NULL
@@ -14,6 +14,7 @@ from pydantic import BaseModel, ValidationError
 from app.config import settings, require_openai
 from app.models.ai import AIQuotaExceededError
 from services.db_service import ai_log  # logt naar jouw ai_logs-schema
+from services import ai_response_cache
 
 _JSON_HINT = (
     "Reageer uitsluitend met één geldige JSON, zonder uitleg, "
@@ -93,6 +94,23 @@ def _sanitize_null_bytes(text: str) -> str:
         return text
     return text.replace("\x00", "").replace("\u0000", "")
 
+def _schedule_ai_log(owner_loop: Optional[asyncio.AbstractEventLoop], **kwargs: Any) -> None:
+    """
+    Fire-and-forget ai_log. Works from the event loop thread (create_task) and from
+    worker threads (e.g. classify_bot pipeline via run_in_executor), where the log
+    is handed back to the loop that owns the DB pool.
+    """
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is not None:
+        running.create_task(ai_log(**kwargs))
+    elif owner_loop is not None and owner_loop.is_running():
+        asyncio.run_coroutine_threadsafe(ai_log(**kwargs), owner_loop)
+    # No loop at all (plain sync script): skip logging rather than failing the call
+
+
 class OpenAIService:
     """
     JSON-gedwongen AI-service met Pydantic-validatie en logging naar ai_logs.
@@ -105,6 +123,11 @@ class OpenAIService:
         self.max_retries = max_retries
         self.timeout_s = timeout_s
         self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        # Loop that owns the DB pool; used for ai_log when called from a worker thread
+        try:
+            self._owner_loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+        except RuntimeError:
+            self._owner_loop = None
 
     def _build_messages(self, system_prompt: str, user_prompt: str, schema: Dict[str, Any]) -> list[dict]:
         schema_hint = json.dumps(schema, ensure_ascii=False)
@@ -127,9 +150,15 @@ class OpenAIService:
         location_id: Optional[int] = None,
         news_id: Optional[int] = None,
         event_raw_id: Optional[int] = None,
+        cache: Optional[bool] = None,
+        prompt_version: Optional[str] = None,
     ) -> Tuple[BaseModel, Dict[str, Any]]:
         """
         Returns: (parsed_model_instance, meta_dict)
+
+        Responses are memoized in services.ai_response_cache for the action types
+        in AI_CACHE_ACTION_TYPES; `cache=True/False` overrides that per call and
+        `prompt_version` overrides the derived prompt template version.
         """
         schema = _pydantic_schema_dict(response_model)
         messages = self._build_messages(system_prompt, user_prompt, schema)
@@ -138,6 +167,53 @@ class OpenAIService:
         last_err: Optional[Exception] = None
         t0 = time.perf_counter()
 
+        cache_key: Optional[ai_response_cache.CacheKey] = None
+        if ai_response_cache.is_cache_active(action_type, cache):
+            cache_key = ai_response_cache.make_cache_key(
+                model=self.model,
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                schema=schema,
+                prompt_version=prompt_version,
+            )
+            cached, cache_source = ai_response_cache.lookup(cache_key)
+            if cached is not None:
+                try:
+                    parsed = response_model.model_validate(cached["data"])
+                except ValidationError:
+                    # Schema drifted without a prompt change; treat as miss
+                    ai_response_cache.forget(cache_key)
+                else:
+                    duration_ms = int((time.perf_counter() - t0) * 1000)
+                    _schedule_ai_log(
+                        self._owner_loop,
+                        location_id=location_id,
+                        news_id=news_id,
+                        event_raw_id=event_raw_id,
+                        action_type=action_type,
+                        prompt=prompt_payload,
+                        raw_response={
+                            "raw": None,
+                            "usage": cached.get("usage"),
+                            "duration_ms": duration_ms,
+                            "cache": {"source": cache_source, "key": cache_key.key},
+                        },
+                        validated_output=cached["data"],
+                        model_used=self.model,
+                        is_success=True,
+                        error_message=None,
+                        cache_hit=True,
+                    )
+                    return parsed, {
+                        "ok": True,
+                        "model": self.model,
+                        "raw_text": json.dumps(cached["data"], ensure_ascii=False),
+                        "usage": None,
+                        "duration_ms": duration_ms,
+                        "cache_hit": True,
+                        "cache_source": cache_source,
+                    }
+
         for attempt in range(self.max_retries + 1):
             try:
                 completion = self.client.chat.completions.create(
@@ -159,8 +235,12 @@ class OpenAIService:
 
                 duration_ms = int((time.perf_counter() - t0) * 1000)
 
+                if cache_key is not None:
+                    ai_response_cache.store(cache_key, action_type, data, usage_plain)
+
                 # Logging → aansluitend op jouw schema (async safe)
-                asyncio.create_task(ai_log(
+                _schedule_ai_log(
+                    self._owner_loop,
                     location_id=location_id,
                     news_id=news_id,
                     event_raw_id=event_raw_id,
@@ -175,7 +255,7 @@ class OpenAIService:
                     model_used=self.model,
                     is_success=True,
                     error_message=None,
-                ))
+                )
 
                 return parsed, {
                     "ok": True,
@@ -208,7 +288,8 @@ class OpenAIService:
         duration_ms = int((time.perf_counter() - t0) * 1000)
 
         # Failure logging (async safe)
-        asyncio.create_task(ai_log(
+        _schedule_ai_log(
+            self._owner_loop,
             location_id=location_id,
             news_id=news_id,
             event_raw_id=event_raw_id,
@@ -219,5 +300,5 @@ class OpenAIService:
             model_used=self.model,
             is_success=False,
             error_message=str(last_err),
-        ))
+        )
         raise RuntimeError(f"OpenAIService failed after retries: {last_err}")
\ No newline at end of file
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+OsmExtractPlacesService — discovery from a local OSM extract instead of Overpass
+- Streams the extract once: Overpass JSON dump (.json), one element per line
+  (.jsonl/.ndjson) or an OSM PBF file (.osm.pbf, needs `pip install osmium`); .gz ok
+- Keeps only elements matching the configured categories.yml osm_tags (plus the
+  catch-all fallback tags and Turkish hints), so memory scales with POIs, not the extract
+- Answers search_nearby() from an in-memory grid with Overpass semantics: distance
+  to the node (or way center) <= radius, node/way/relation then id order, capped
+  like `out center N`
+- Returns the same normalized dicts as OsmPlacesService; no rate limits, delays or
+  telemetry rows, so subdivision and union mode work unchanged
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import math
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import structlog
+
+from services.osm_service import FALLBACK_PLACE_TAGS, OsmPlacesService
+
+logger = structlog.get_logger()
+
+OSM_EXTRACT_PATH = os.getenv("OSM_EXTRACT_PATH", "")
+# Grid bucket size in degrees (~1.1km north-south)
+OSM_EXTRACT_GRID_DEG = float(os.getenv("OSM_EXTRACT_GRID_DEG", "0.01"))
+
+_TYPE_ORDER = {"node": 0, "way": 1, "relation": 2}
+_EARTH_RADIUS_M = 6371000.0
+
+
+def _haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * _EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _open_text(path: Path):
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return path.open("r", encoding="utf-8")
+
+
+def _element_position(element: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    if element.get("type", "node") == "node":
+        lat, lng = element.get("lat"), element.get("lon")
+    else:
+        center = element.get("center") or {}
+        lat, lng = center.get("lat"), center.get("lon")
+    if lat is None or lng is None:
+        return None
+    return float(lat), float(lng)
+
+
+class OsmExtractPlacesService(OsmPlacesService):
+    def __init__(
+        self,
+        extract_path: Optional[str] = None,
+        *,
+        category_osm_tags: Optional[List[List[Dict[str, Any]]]] = None,
+        grid_deg: float = OSM_EXTRACT_GRID_DEG,
+        **kwargs: Any,
+    ):
+        """
+        Args:
+            extract_path: Extract file (defaults to OSM_EXTRACT_PATH)
+            category_osm_tags: osm_tags of every category that will be queried; elements
+                matching none of them (nor the fallback tags / Turkish hints) are dropped
+                while loading. None keeps every element with an amenity/shop/office tag.
+            grid_deg: Grid bucket size in degrees
+            **kwargs: Passed to OsmPlacesService (max_results, turkish_hints, ...)
+        """
+        kwargs["cache_mode"] = "off"
+        super().__init__(**kwargs)
+        self.scheduler = None  # no network, nothing to schedule
+        path = extract_path or OSM_EXTRACT_PATH
+        if not path:
+            raise ValueError("OsmExtractPlacesService needs an extract path (OSM_EXTRACT_PATH)")
+        self.extract_path = Path(path)
+        self.category_osm_tags = category_osm_tags
+        self.grid_deg = grid_deg
+        self._grid: Dict[Tuple[int, int], List[Tuple[int, int, float, float, Dict[str, Any]]]] = {}
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self.stats = {"scanned": 0, "kept": 0, "load_seconds": 0.0, "searches": 0}
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    def _keep(self, tags: Dict[str, Any]) -> bool:
+        if self.category_osm_tags is None:
+            return any(key in tags for key in ("amenity", "shop", "office")) or self._tags_match_turkish_hints(tags)
+        if self._tags_match_osm_tags(tags, [{"any": list(FALLBACK_PLACE_TAGS)}]):
+            return True
+        if self._tags_match_turkish_hints(tags):
+            return True
+        return any(self._tags_match_osm_tags(tags, osm_tags) for osm_tags in self.category_osm_tags)
+
+    def _iter_json_elements(self) -> Iterator[Dict[str, Any]]:
+        name = self.extract_path.name.lower()
+        with _open_text(self.extract_path) as fh:
+            if name.endswith((".jsonl", ".jsonl.gz", ".ndjson", ".ndjson.gz")):
+                for line in fh:
+                    line = line.strip()
+                    if line:
+                        yield json.loads(line)
+            else:
+                # Whole Overpass dump in memory while parsing; prefer .jsonl for large extracts
+                yield from (json.load(fh).get("elements") or [])
+
+    def _iter_pbf_elements(self) -> Iterator[Dict[str, Any]]:
+        try:
+            import osmium
+        except ImportError as e:
+            raise RuntimeError("Reading .pbf extracts requires pyosmium (pip install osmium)") from e
+
+        # Ways need node locations for their center; only the kept elements are materialized
+        for obj in osmium.FileProcessor(str(self.extract_path)).with_locations():
+            if obj.is_relation() or not obj.tags:
+                continue
+            tags = {tag.k: tag.v for tag in obj.tags}
+            self.stats["scanned"] += 1
+            if not self._keep(tags):
+                continue
+            if obj.is_node():
+                if not obj.location.valid():
+                    continue
+                yield {"type": "node", "id": obj.id, "lat": obj.location.lat, "lon": obj.location.lon, "tags": tags}
+            else:
+                lats = [n.lat for n in obj.nodes if n.location.valid()]
+                lons = [n.lon for n in obj.nodes if n.location.valid()]
+                if not lats:
+                    continue
+                # Same as Overpass `out center`: center of the bounding box
+                center = {"lat": (min(lats) + max(lats)) / 2, "lon": (min(lons) + max(lons)) / 2}
+                yield {"type": "way", "id": obj.id, "center": center, "tags": tags}
+
+    def _load(self) -> None:
+        started = time.perf_counter()
+        name = self.extract_path.name.lower()
+        if name.endswith(".pbf"):
+            elements = self._iter_pbf_elements()
+            prefiltered = True
+        else:
+            elements = self._iter_json_elements()
+            prefiltered = False
+
+        for element in elements:
+            if not prefiltered:
+                self.stats["scanned"] += 1
+                tags = element.get("tags")
+                if not isinstance(tags, dict) or not self._keep(tags):
+                    continue
+            position = _element_position(element)
+            if position is None:
+                continue
+            lat, lng = position
+            bucket = (math.floor(lat / self.grid_deg), math.floor(lng / self.grid_deg))
+            type_rank = _TYPE_ORDER.get(element.get("type", "node"), 3)
+            self._grid.setdefault(bucket, []).append((type_rank, int(element.get("id", 0)), lat, lng, element))
+            self.stats["kept"] += 1
+
+        self.stats["load_seconds"] = round(time.perf_counter() - started, 3)
+        logger.info(
+            "osm_extract_loaded",
+            provider="osm_extract",
+            path=str(self.extract_path),
+            scanned=self.stats["scanned"],
+            kept=self.stats["kept"],
+            buckets=len(self._grid),
+            load_seconds=self.stats["load_seconds"],
+        )
+
+    async def ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if not self._loaded:
+                await asyncio.to_thread(self._load)
+                self._loaded = True
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+    def _candidates(self, lat: float, lng: float, radius: int) -> Iterator[Tuple[int, int, float, float, Dict[str, Any]]]:
+        lat_pad = radius / 111320.0
+        lng_pad = radius / (111320.0 * max(0.01, math.cos(math.radians(lat))))
+        lat_lo, lat_hi = math.floor((lat - lat_pad) / self.grid_deg), math.floor((lat + lat_pad) / self.grid_deg)
+        lng_lo, lng_hi = math.floor((lng - lng_pad) / self.grid_deg), math.floor((lng + lng_pad) / self.grid_deg)
+        for i in range(lat_lo, lat_hi + 1):
+            for j in range(lng_lo, lng_hi + 1):
+                yield from self._grid.get((i, j), ())
+
+    async def search_nearby(
+        self,
+        *,
+        lat: float,
+        lng: float,
+        radius: int,
+        included_types: Optional[List[str]] = None,
+        max_results: Optional[int] = None,
+        language: Optional[str] = None,
+        category_osm_tags: Optional[List[List[Dict[str, Any]]]] = None,
+        cell_id: Optional[str] = None,
+        attempt: int = 1,
+        include_tags: bool = False
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """Local equivalent of OsmPlacesService.search_nearby (same arguments and result)."""
+        await self.ensure_loaded()
+        if max_results is None:
+            max_results = self.max_results
+
+        osm_tags_list = self._query_osm_tags(category_osm_tags)
+        has_filters = any("any" in group or "all" in group for osm_tags in osm_tags_list for group in osm_tags)
+        matched = []
+        for type_rank, element_id, el_lat, el_lng, element in self._candidates(lat, lng, radius):
+            tags = element.get("tags") or {}
+            if has_filters:
+                ok = self._tags_match_turkish_hints(tags) or any(
+                    self._tags_match_osm_tags(tags, osm_tags) for osm_tags in osm_tags_list
+                )
+            else:
+                # Same fallback as _build_union_query when no filters render
+                ok = any(key in tags for key in ("amenity", "shop", "office"))
+            if ok and _haversine_m(lat, lng, el_lat, el_lng) <= radius:
+                matched.append((type_rank, element_id, element))
+
+        matched.sort(key=lambda m: (m[0], m[1]))
+        elements, normalized = self._normalize_elements([m[2] for m in matched[:max_results]], include_tags)
+        self.stats["searches"] += 1
+        return normalized[:max_results], len(elements) >= max_results
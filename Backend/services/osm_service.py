@@ -6,24 +6,37 @@ OsmPlacesService — Enhanced Overpass API integration for discovery
 - Normalizes results to internal place shape
 - Handles rate limiting, endpoint rotation, and robust retry/backoff
 - Supports adaptive cell subdivision and Turkish hints filtering
+- Optional on-disk response cache with record/replay (OVERPASS_CACHE_MODE)
+- Optional concurrent scheduling across all mirrors (OVERPASS_SCHEDULER_ENABLED)
 - Full OSM/Overpass policy compliance
 """
 
 from __future__ import annotations
 
 import asyncio
+import gzip
+import hashlib
 import json
 import os
 import random
+import re
 import time
 import uuid
+from contextlib import asynccontextmanager
 from json import JSONDecodeError
+from pathlib import Path
 from typing import Any, Dict, List, Optional, Set, Tuple
 from urllib.parse import urlencode
 
 import httpx
 import structlog
 
+from services.overpass_scheduler import (
+    OVERPASS_SCHEDULER_ENABLED,
+    OverpassMirrorScheduler,
+    get_overpass_scheduler,
+)
+
 logger = structlog.get_logger()
 
 # Environment configuration
@@ -58,6 +71,17 @@ DEFAULT_SLEEP_JITTER_PCT = float(os.getenv("DISCOVERY_SLEEP_JITTER_PCT", "0.20")
 DEFAULT_BACKOFF_SERIES = [int(x) for x in os.getenv("DISCOVERY_BACKOFF_SERIES", "20,60,180,420").split(",")]
 DEFAULT_MAX_SUBDIVIDE_DEPTH = int(os.getenv("MAX_SUBDIVIDE_DEPTH", "2"))
 DEFAULT_TURKISH_HINTS = os.getenv("OSM_TURKISH_HINTS", "1").lower() == "true"
+TURKISH_NAME_HINT_PATTERN = "kebab|döner|doner|baklava|börek|borek|simit|pide|lahmacun|ocakbaşı|ocakbasi|lokum"
+_TURKISH_NAME_HINT_RE = re.compile(TURKISH_NAME_HINT_PATTERN, re.IGNORECASE)
+# Queried when no category tags are given (catch-all discovery)
+FALLBACK_PLACE_TAGS = (
+    {"amenity": "restaurant"},
+    {"shop": "bakery"},
+    {"shop": "supermarket"},
+    {"shop": "hairdresser"},
+    {"amenity": "place_of_worship"},
+    {"office": "travel_agent"},
+)
 
 # New Overpass safety configuration (industry-grade defaults)
 DEFAULT_MAX_CONCURRENT_PER_ENDPOINT = int(os.getenv("OVERPASS_MAX_CONCURRENT_PER_ENDPOINT", "1"))
@@ -68,6 +92,17 @@ DEFAULT_BACKOFF_JITTER_FRACTION = float(os.getenv("OVERPASS_BACKOFF_JITTER_FRACT
 DEFAULT_ENABLE_ENDPOINT_FALLBACK = os.getenv("OVERPASS_ENABLE_ENDPOINT_FALLBACK", "false").lower() == "true"
 OVERPASS_PRIMARY_ENDPOINT = os.getenv("OVERPASS_PRIMARY_ENDPOINT")  # Optional override
 
+# Overpass response cache, content-addressed by the rendered query (endpoint-agnostic)
+# off: disabled; readwrite: serve fresh entries, fetch and store misses;
+# record: always fetch, store every response; replay: cache only, a miss raises OverpassCacheMiss
+OVERPASS_CACHE_MODES = ("off", "readwrite", "record", "replay")
+OVERPASS_CACHE_MODE = os.getenv("OVERPASS_CACHE_MODE", "off").strip().lower()
+OVERPASS_CACHE_DIR = os.getenv(
+    "OVERPASS_CACHE_DIR", str(Path(__file__).resolve().parent.parent / ".cache" / "overpass")
+)
+OVERPASS_CACHE_TTL_SECONDS = int(os.getenv("OVERPASS_CACHE_TTL_SECONDS", "86400"))
+OVERPASS_CACHE_MAX_MB = int(os.getenv("OVERPASS_CACHE_MAX_MB", "512"))
+
 # Module-level per-endpoint concurrency control
 # These dictionaries are shared across all OsmPlacesService instances to enforce
 # global rate limits per Overpass endpoint (respecting public usage guidelines:
@@ -98,6 +133,120 @@ class TokenBucket:
         else:
             self.tokens -= tokens
 
+_TIMEOUT_DIRECTIVE_RE = re.compile(r"\[timeout:\d+\]")
+
+
+class OverpassCacheMiss(RuntimeError):
+    """Raised in replay mode when a query has no cached response."""
+
+
+class OverpassResponseCache:
+    """
+    Gzipped Overpass responses on disk, one file per query.
+
+    The key is the sha256 of the rendered query with whitespace collapsed and the
+    [timeout:N] directive removed, so any mirror (and any timeout setting) shares
+    entries. Entries older than ttl_s are ignored unless ignore_ttl is set. File
+    mtime doubles as last-use time; once the directory grows past max_bytes the
+    least recently used entries are removed until it is back under 90%.
+    """
+
+    def __init__(self, directory: str = OVERPASS_CACHE_DIR, ttl_s: int = OVERPASS_CACHE_TTL_SECONDS,
+                 max_bytes: int = OVERPASS_CACHE_MAX_MB * 1024 * 1024):
+        self.directory = Path(directory)
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self._total_bytes: Optional[int] = None
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "stores": 0, "evictions": 0}
+
+    @staticmethod
+    def key_for(query: str) -> str:
+        canonical = " ".join(_TIMEOUT_DIRECTIVE_RE.sub("", query).split())
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json.gz"
+
+    def get(self, query: str, *, ignore_ttl: bool = False) -> Optional[Dict[str, Any]]:
+        """Return the cached Overpass payload for this query, or None."""
+        path = self._path(self.key_for(query))
+        try:
+            with gzip.open(path, "rb") as fh:
+                entry = json.loads(fh.read())
+        except FileNotFoundError:
+            self.stats["misses"] += 1
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("overpass_cache_read_failed", path=str(path), error=str(e))
+            self.stats["misses"] += 1
+            return None
+
+        if not ignore_ttl and self.ttl_s > 0 and time.time() - float(entry.get("stored_at", 0)) > self.ttl_s:
+            self.stats["expired"] += 1
+            self.stats["misses"] += 1
+            return None
+
+        try:
+            os.utime(path)  # mark as recently used for eviction
+        except OSError:
+            pass
+        self.stats["hits"] += 1
+        return entry.get("data")
+
+    def put(self, query: str, data: Dict[str, Any]) -> None:
+        """Store a successful Overpass payload. Never raises: a failed write only costs a refetch."""
+        key = self.key_for(query)
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            old_size = path.stat().st_size if path.exists() else 0
+            body = gzip.compress(
+                json.dumps({"query": query, "stored_at": time.time(), "data": data}).encode("utf-8")
+            )
+            tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+            tmp.write_bytes(body)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("overpass_cache_write_failed", path=str(path), error=str(e))
+            return
+
+        self.stats["stores"] += 1
+        if self._total_bytes is None:
+            self._total_bytes = self._scan_size()
+        else:
+            self._total_bytes += len(body) - old_size
+        if self.max_bytes > 0 and self._total_bytes > self.max_bytes:
+            self._evict()
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        entries = []
+        for path in self.directory.glob("*/*.json.gz"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            self.stats["evictions"] += 1
+        self._total_bytes = total
+
+
 class OsmPlacesService:
     def __init__(
         self,
@@ -110,7 +259,10 @@ class OsmPlacesService:
         sleep_jitter_pct: float = DEFAULT_SLEEP_JITTER_PCT,
         backoff_series: List[int] = DEFAULT_BACKOFF_SERIES,
         turkish_hints: bool = DEFAULT_TURKISH_HINTS,
-        max_subdivide_depth: int = DEFAULT_MAX_SUBDIVIDE_DEPTH
+        max_subdivide_depth: int = DEFAULT_MAX_SUBDIVIDE_DEPTH,
+        cache_mode: str = OVERPASS_CACHE_MODE,
+        response_cache: Optional[OverpassResponseCache] = None,
+        scheduler: Optional[OverpassMirrorScheduler] = None
     ):
         self.endpoints = OVERPASS_ENDPOINTS.copy()
         self.current_endpoint_index = 0
@@ -131,6 +283,19 @@ class OsmPlacesService:
         self.backoff_series = backoff_series
         self.turkish_hints = turkish_hints
         self.max_subdivide_depth = max_subdivide_depth
+
+        if cache_mode not in OVERPASS_CACHE_MODES:
+            raise ValueError(f"OVERPASS_CACHE_MODE must be one of {OVERPASS_CACHE_MODES}, got {cache_mode!r}")
+        self.cache_mode = cache_mode
+        if cache_mode != "off" and response_cache is None:
+            response_cache = OverpassResponseCache()
+        self.response_cache = response_cache if cache_mode != "off" else None
+
+        # With a scheduler every attempt picks a mirror from self.endpoints (token bucket +
+        # AIMD window per mirror) instead of the fixed endpoint semaphore and min delay
+        if scheduler is None and OVERPASS_SCHEDULER_ENABLED:
+            scheduler = get_overpass_scheduler(self.endpoints)
+        self.scheduler = scheduler
         
         # Legacy rate limiter (kept for backward compat, but superseded by per-endpoint semaphore + delay)
         self.rate_limiter = TokenBucket(capacity=1.0, refill_rate=rate_limit_qps)
@@ -158,6 +323,22 @@ class OsmPlacesService:
                 _endpoint_semaphores[endpoint] = asyncio.Semaphore(max_concurrent)
             return _endpoint_semaphores[endpoint]
 
+    @asynccontextmanager
+    async def _endpoint_slot(self, exclude: List[str]):
+        """Endpoint for one request attempt: scheduler lease, or the semaphore + min delay on self.endpoint."""
+        if self.scheduler is None:
+            semaphore = await self._get_endpoint_semaphore(self.endpoint)
+            async with semaphore:
+                await self._enforce_min_delay(self.endpoint)
+                yield self.endpoint
+            return
+
+        endpoint = await self.scheduler.acquire(exclude=exclude)
+        try:
+            yield endpoint
+        finally:
+            await self.scheduler.release(endpoint)
+
     async def _enforce_min_delay(self, endpoint: str) -> None:
         """
         Enforce minimum delay since last request to this endpoint.
@@ -249,7 +430,7 @@ class OsmPlacesService:
         # Turkish cuisine and food-related filters
         turkish_filters = [
             '["cuisine"="turkish"]',
-            '["name"~"kebab|döner|doner|baklava|börek|borek|simit|pide|lahmacun|ocakbaşı|ocakbasi|lokum",i]',
+            f'["name"~"{TURKISH_NAME_HINT_PATTERN}",i]',
             '["name:tr"]'
         ]
         return turkish_filters
@@ -273,6 +454,8 @@ class OsmPlacesService:
         raw_preview_json: Optional[Dict[str, Any]] = None,
     ):
         """Log Overpass API call to database for telemetry."""
+        if self.scheduler is not None:
+            self.scheduler.observe(endpoint, status_code, duration_ms, error_message, retry_after_s)
         try:
             from services.db_service import execute
 
@@ -464,6 +647,68 @@ out center;
         
         return query
 
+    def _query_osm_tags(self, category_osm_tags: Optional[List[List[Dict[str, Any]]]]) -> List[List[Dict[str, Any]]]:
+        """Use provided OSM tags or fallback to basic place types (also used by catch-all)."""
+        if category_osm_tags:
+            return category_osm_tags
+        return [[{"any": list(FALLBACK_PLACE_TAGS)}]]
+
+    def _tags_match_osm_tags(self, tags: Dict[str, Any], osm_tags: List[Dict[str, Any]]) -> bool:
+        """Client-side equivalent of the selectors _build_union_query renders for one category."""
+        for tag_group in osm_tags:
+            if "any" in tag_group:
+                if any(tags.get(key) == str(value) for tag_dict in tag_group["any"] for key, value in tag_dict.items()):
+                    return True
+            elif "all" in tag_group:
+                pairs = [(key, value) for tag_dict in tag_group["all"] for key, value in tag_dict.items()]
+                if pairs and all(tags.get(key) == str(value) for key, value in pairs):
+                    return True
+        return False
+
+    def _tags_match_turkish_hints(self, tags: Dict[str, Any]) -> bool:
+        """Client-side equivalent of _get_turkish_hints_filters()."""
+        if not self.turkish_hints:
+            return False
+        if tags.get("cuisine") == "turkish" or "name:tr" in tags:
+            return True
+        return bool(_TURKISH_NAME_HINT_RE.search(str(tags.get("name") or "")))
+
+    def _normalize_elements(self, elements: Any, include_tags: bool = False) -> Tuple[List[Any], List[Dict[str, Any]]]:
+        """Coerce an Overpass `elements` value to a list and normalize it; returns (elements, normalized)."""
+        # Defensive conversions for elements
+        if isinstance(elements, str):
+            try:
+                elements = json.loads(elements)
+            except Exception:
+                elements = []
+        elif not isinstance(elements, list):
+            elements = []
+
+        # Normalize results with defensive element handling
+        normalized = []
+        for element in elements:
+            try:
+                # Skip non-dict elements safely
+                if not isinstance(element, dict):
+                    _trace(f"skipping non-dict element: {type(element).__name__}")
+                    continue
+
+                normalized_element = self._normalize_osm_result(element)
+                if normalized_element and normalized_element.get("location"):  # Only include if we have coordinates
+                    if include_tags:
+                        tags = element.get("tags")
+                        normalized_element["osm_tags"] = tags if isinstance(tags, dict) else {}
+                    normalized.append(normalized_element)
+            except Exception as e:
+                logger.warning(
+                    "osm_normalization_error",
+                    provider="osm",
+                    element_id=element.get("id") if isinstance(element, dict) else "unknown",
+                    error=str(e)
+                )
+                continue
+        return elements, normalized
+
     def _normalize_osm_result(self, element: Dict[str, Any]) -> Dict[str, Any]:
         """Normalize OSM element to internal place shape with defensive type checking."""
         # Defensive: ensure element is a dict
@@ -546,7 +791,8 @@ out center;
         language: Optional[str] = None,
         category_osm_tags: Optional[List[List[Dict[str, Any]]]] = None,
         cell_id: Optional[str] = None,
-        attempt: int = 1
+        attempt: int = 1,
+        include_tags: bool = False
     ) -> Tuple[List[Dict[str, Any]], bool]:
         """
         Search for places near the given coordinates using Overpass API with robust retry logic.
@@ -561,9 +807,14 @@ out center;
             category_osm_tags: List of OSM tag configurations for each category
             cell_id: Unique identifier for this cell (for telemetry)
             attempt: Attempt number for this cell
+            include_tags: Keep the raw OSM tags on each result under "osm_tags"
+                (used to split union results per category client-side)
             
         Returns:
             Tuple of (normalized place dictionaries, needs_subdivision)
+
+        Raises:
+            OverpassCacheMiss: in replay mode when the query is not cached
         """
         if max_results is None:
             max_results = self.max_results
@@ -574,21 +825,7 @@ out center;
         # Rate limiting is now handled via per-endpoint semaphore + min delay in _make_request
         # Legacy TokenBucket and fixed sleep are replaced by industry-grade controls
         
-        # Use provided OSM tags or fallback to basic types
-        if category_osm_tags:
-            osm_tags_list = category_osm_tags
-        else:
-            # Fallback to basic place types
-            osm_tags_list = [[{
-                "any": [
-                    {"amenity": "restaurant"},
-                    {"shop": "bakery"},
-                    {"shop": "supermarket"},
-                    {"shop": "hairdresser"},
-                    {"amenity": "place_of_worship"},
-                    {"office": "travel_agent"}
-                ]
-            }]]
+        osm_tags_list = self._query_osm_tags(category_osm_tags)
         
         query = self._build_union_query(lat, lng, radius, osm_tags_list, max_results, self.timeout_s)
         
@@ -607,9 +844,27 @@ out center;
             attempt=attempt
         )
         
-        # Get semaphore for this endpoint (enforces max concurrent requests)
-        semaphore = await self._get_endpoint_semaphore(self.endpoint)
-        
+        # Cache hits skip the semaphore and the politeness delay entirely
+        if self.response_cache is not None and self.cache_mode in ("readwrite", "replay"):
+            cached = self.response_cache.get(query, ignore_ttl=self.cache_mode == "replay")
+            if cached is not None:
+                elements, normalized = self._normalize_elements(cached.get("elements", []), include_tags)
+                result = normalized[:max_results]
+                needs_subdivision = len(elements) >= max_results
+                logger.info(
+                    "osm_search_cache_hit",
+                    provider="osm",
+                    found=len(elements),
+                    normalized=len(result),
+                    lat=lat,
+                    lng=lng,
+                    needs_subdivision=needs_subdivision,
+                    cell_id=cell_id
+                )
+                return result, needs_subdivision
+            if self.cache_mode == "replay":
+                raise OverpassCacheMiss(f"No cached Overpass response for cell {cell_id} (OVERPASS_CACHE_MODE=replay)")
+
         # Retry logic with exponential backoff
         max_retries = DEFAULT_MAX_RETRIES
         backoff_base = DEFAULT_BACKOFF_BASE_SECONDS
@@ -617,22 +872,23 @@ out center;
         last_exception = None
         last_status_code = None
         retry_after_s = None
+        failed_endpoints: List[str] = []  # scheduler: retry on a different mirror
         
         for retry_attempt in range(max_retries + 1):  # 0 to max_retries (inclusive)
             current_attempt = retry_attempt + 1
+            endpoint = self.endpoint
             start_time = time.time()
             status_code = 0
             error_message = None
             should_retry = False
             
             try:
-                # Acquire semaphore and enforce minimum delay between requests
-                async with semaphore:
-                    await self._enforce_min_delay(self.endpoint)
+                # Acquire semaphore and enforce minimum delay between requests (or a scheduler lease)
+                async with self._endpoint_slot(failed_endpoints) as endpoint:
                     
                     # Make the request with proper form encoding
                     response = await self._client.post(
-                        self.endpoint,
+                        endpoint,
                         data={'data': query},
                         headers={
                             "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
@@ -658,7 +914,7 @@ out center;
                         # Log and return empty (don't retry syntax errors)
                         duration_ms = int((time.time() - start_time) * 1000)
                         await self._log_overpass_call(
-                            endpoint=self.endpoint,
+                            endpoint=endpoint,
                             bbox_or_center=f"{lat},{lng}",
                             radius_m=radius,
                             query_bytes=len(query),
@@ -689,6 +945,9 @@ out center;
                             max_retries=max_retries
                         )
                         should_retry = retry_attempt < max_retries
+                        if should_retry and self.scheduler is not None:
+                            # Retried attempts are not logged to overpass_calls; tell the scheduler directly
+                            self.scheduler.observe(endpoint, status_code, int((time.time() - start_time) * 1000), error_message, retry_after_s)
                         last_exception = httpx.HTTPStatusError("Rate limited", request=response.request, response=response)
                         if not should_retry:
                             raise last_exception
@@ -707,6 +966,8 @@ out center;
                             max_retries=max_retries
                         )
                         should_retry = retry_attempt < max_retries
+                        if should_retry and self.scheduler is not None:
+                            self.scheduler.observe(endpoint, status_code, int((time.time() - start_time) * 1000), error_message)
                         last_exception = httpx.HTTPStatusError("Server error", request=response.request, response=response)
                         if not should_retry:
                             raise last_exception
@@ -717,37 +978,10 @@ out center;
                         
                         # Use defensive JSON parsing
                         data = self._parse_overpass_response(response)
-                        elements = data.get("elements", [])
-                        
-                        # Defensive conversions for elements
-                        if isinstance(elements, str):
-                            try:
-                                elements = json.loads(elements)
-                            except Exception:
-                                elements = []
-                        elif not isinstance(elements, list):
-                            elements = []
-                        
-                        # Normalize results with defensive element handling
-                        normalized = []
-                        for element in elements:
-                            try:
-                                # Skip non-dict elements safely
-                                if not isinstance(element, dict):
-                                    _trace(f"skipping non-dict element: {type(element).__name__}")
-                                    continue
-                                    
-                                normalized_element = self._normalize_osm_result(element)
-                                if normalized_element and normalized_element.get("location"):  # Only include if we have coordinates
-                                    normalized.append(normalized_element)
-                            except Exception as e:
-                                logger.warning(
-                                    "osm_normalization_error",
-                                    provider="osm",
-                                    element_id=element.get("id") if isinstance(element, dict) else "unknown",
-                                    error=str(e)
-                                )
-                                continue
+                        if self.response_cache is not None and self.cache_mode in ("readwrite", "record") and not data.get("remark"):
+                            # Responses with a remark are Overpass runtime errors/timeouts: don't cache
+                            self.response_cache.put(query, data)
+                        elements, normalized = self._normalize_elements(data.get("elements", []), include_tags)
                         
                         # Limit results
                         result = normalized[:max_results]
@@ -811,7 +1045,7 @@ out center;
                             preview_json = {"truncated": None, "error": "preview_json_build_failed"}
                             
                         await self._log_overpass_call(
-                            endpoint=self.endpoint,
+                            endpoint=endpoint,
                             bbox_or_center=f"{lat},{lng}",
                             radius_m=radius,
                             query_bytes=len(query),
@@ -850,7 +1084,7 @@ out center;
                 
                 # Log timeout attempt
                 await self._log_overpass_call(
-                    endpoint=self.endpoint,
+                    endpoint=endpoint,
                     bbox_or_center=f"{lat},{lng}",
                     radius_m=radius,
                     query_bytes=len(query),
@@ -897,7 +1131,7 @@ out center;
                 
                 # Log this attempt
                 await self._log_overpass_call(
-                    endpoint=self.endpoint,
+                    endpoint=endpoint,
                     bbox_or_center=f"{lat},{lng}",
                     radius_m=radius,
                     query_bytes=len(query),
@@ -938,7 +1172,7 @@ out center;
                 error_message = self._categorize_error_message(e, None)
                 
                 await self._log_overpass_call(
-                    endpoint=self.endpoint,
+                    endpoint=endpoint,
                     bbox_or_center=f"{lat},{lng}",
                     radius_m=radius,
                     query_bytes=len(query),
@@ -965,6 +1199,12 @@ out center;
             
             # Calculate backoff and retry
             if should_retry:
+                failed_endpoints.append(endpoint)
+                if self.scheduler is not None and len(set(failed_endpoints)) < len(self.scheduler.mirrors):
+                    # Requeue right away on another mirror; the failed one backs off in the scheduler
+                    logger.info("osm_retry_other_mirror", provider="osm", attempt=current_attempt, failed_endpoint=endpoint)
+                    continue
+
                 # For 429, respect Retry-After header if present
                 if last_status_code == 429 and retry_after_s:
                     wait_time = retry_after_s
@@ -982,7 +1222,7 @@ out center;
                     attempt=current_attempt,
                     max_retries=max_retries,
                     wait_seconds=total_wait,
-                    endpoint=self.endpoint
+                    endpoint=endpoint
                 )
                 
                 await asyncio.sleep(total_wait)
@@ -1085,4 +1325,116 @@ out center;
             total_cells_processed=len(cells_to_process) + 1
         )
         
-        return unique_results
\ No newline at end of file
+        return unique_results
+
+    async def search_nearby_multi_category(
+        self,
+        *,
+        lat: float,
+        lng: float,
+        radius: int,
+        category_osm_tags: Dict[str, List[Dict[str, Any]]],
+        max_results: Optional[int] = None,
+        language: Optional[str] = None,
+        max_depth: Optional[int] = None
+    ) -> Tuple[Dict[str, List[Dict[str, Any]]], int]:
+        """
+        One union Overpass query per cell for several categories at once.
+
+        Returns per category exactly what search_nearby_with_subdivision would have
+        returned for that category alone, plus the number of Overpass calls made:
+        - union results are split client-side with the same tag filters (Turkish
+          hints match every category, as they are part of every category query);
+        - each category keeps its first `max_results` elements in Overpass output
+          order, and a cell is subdivided only for the categories that hit the cap;
+        - the union query is capped at `max_results` x active categories; if that
+          cap is hit, every active category is treated as capped.
+
+        Args:
+            category_osm_tags: category key -> osm_tags (list of any/all tag groups), in priority order
+            max_results: Per-category cap per cell (uses self.max_results if None)
+            max_depth: Maximum subdivision depth (uses self.max_subdivide_depth if None)
+        """
+        if max_results is None:
+            max_results = self.max_results
+        if max_depth is None:
+            max_depth = self.max_subdivide_depth
+
+        per_category: Dict[str, List[Dict[str, Any]]] = {cat: [] for cat in category_osm_tags}
+        cells_to_process = [(lat, lng, radius, 0, list(category_osm_tags))]  # (lat, lng, radius, depth, active categories)
+        calls = 0
+
+        while cells_to_process:
+            current_lat, current_lng, current_radius, current_depth, active = cells_to_process.pop(0)
+            cell_id = self._generate_cell_id(current_lat, current_lng, current_radius)
+            union_limit = max_results * len(active)
+
+            results, union_capped = await self.search_nearby(
+                lat=current_lat,
+                lng=current_lng,
+                radius=current_radius,
+                included_types=active,
+                max_results=union_limit,
+                language=language,
+                category_osm_tags=[category_osm_tags[cat] for cat in active],
+                cell_id=cell_id,
+                attempt=1,
+                include_tags=True
+            )
+            calls += 1
+
+            needs_subdivision: List[str] = []
+            for cat in active:
+                matched = [
+                    r for r in results
+                    if self._tags_match_osm_tags(r["osm_tags"], category_osm_tags[cat])
+                    or self._tags_match_turkish_hints(r["osm_tags"])
+                ]
+                per_category[cat].extend(matched[:max_results])
+                if union_capped or len(matched) >= max_results:
+                    needs_subdivision.append(cat)
+
+            if needs_subdivision and current_depth < max_depth:
+                subcells = self._subdivide_cell(current_lat, current_lng, current_radius)
+                for sub_lat, sub_lng, sub_radius in subcells:
+                    cells_to_process.append((sub_lat, sub_lng, sub_radius, current_depth + 1, needs_subdivision))
+
+                logger.info(
+                    "osm_cell_subdivided",
+                    provider="osm",
+                    original_cell=cell_id,
+                    subcells_created=len(subcells),
+                    depth=current_depth + 1,
+                    max_depth=max_depth,
+                    categories=needs_subdivision
+                )
+            elif needs_subdivision:
+                logger.warning(
+                    "osm_cell_max_depth_reached",
+                    provider="osm",
+                    cell_id=cell_id,
+                    depth=current_depth,
+                    max_depth=max_depth,
+                    categories=needs_subdivision
+                )
+
+        # Per-category dedupe (same as search_nearby_with_subdivision); drop the raw tags
+        for cat, results in per_category.items():
+            seen_ids: Set[str] = set()
+            unique_results = []
+            for result in results:
+                place_id = result.get("id")
+                if place_id and place_id not in seen_ids:
+                    seen_ids.add(place_id)
+                    unique_results.append({k: v for k, v in result.items() if k != "osm_tags"})
+            per_category[cat] = unique_results
+
+        logger.info(
+            "osm_search_multi_category_complete",
+            provider="osm",
+            categories=len(category_osm_tags),
+            overpass_calls=calls,
+            total_results=sum(len(v) for v in per_category.values())
+        )
+
+        return per_category, calls
@@ -19,6 +19,7 @@ import os
 
 from app.core.logging import get_logger
 from services.db_service import fetch, execute
+from services.email import EmailMessage, EmailSendResult
 from services.email_service import get_email_service
 from services.email_template_service import get_email_template_service
 from services.mapview_link_service import generate_mapview_link
@@ -185,13 +186,16 @@ async def send_queued_emails(limit: int = 50, skip_retry_logic: bool = False) ->
     
     Process:
     1. Get queued emails (via get_queued_emails)
-    2. For each email:
-       - Generate mapview link
+    2. For each email (up to the remaining daily quota):
+       - Check consent and unsubscribes
+       - Generate mapview and opt-out links
        - Render email template
-       - Send email via email service
-       - Update status to 'sent'
-       - Record in rate limiting service
-    3. Return statistics
+    3. Send all prepared emails in one batch over the pooled email connections
+       (the remaining quota is the batch budget, so the limit is read once)
+    4. For each result:
+       - Update status to 'sent' and record in rate limiting service, or
+       - Mark for retry / bounced
+    5. Return statistics
     
     Args:
         limit: Maximum number of emails to process
@@ -209,9 +213,10 @@ async def send_queued_emails(limit: int = 50, skip_retry_logic: bool = False) ->
     consent_service = get_consent_service()
     
     # Check if we can send emails today (skip for manual sending)
+    budget: Optional[int] = None
     if not skip_retry_logic:
-        can_send = await rate_limiting_service.can_send_email()
-        if not can_send:
+        budget = await rate_limiting_service.get_remaining_quota()
+        if budget <= 0:
             logger.info(
                 "outreach_rate_limit_reached",
                 daily_limit=rate_limiting_service.daily_limit,
@@ -239,16 +244,17 @@ async def send_queued_emails(limit: int = 50, skip_retry_logic: bool = False) ->
     failed_count = 0
     skipped_count = 0
     errors = []
+    prepared: List[Dict[str, Any]] = []
     
     for email_record in queued_emails:
-        # Check rate limiting before each email (skip for manual sending)
-        if not skip_retry_logic:
-            if not await rate_limiting_service.can_send_email():
-                logger.info(
-                    "outreach_rate_limit_reached_during_sending",
-                    sent_so_far=sent_count,
-                )
-                break
+        # Stop preparing once the day's remaining quota is covered (skip for manual sending)
+        if budget is not None and len(prepared) >= budget:
+            logger.info(
+                "outreach_rate_limit_reached_during_sending",
+                prepared=len(prepared),
+                remaining_quota=budget,
+            )
+            break
         
         # Check consent before sending
         email_address = email_record["email"]
@@ -355,75 +361,43 @@ async def send_queued_emails(limit: int = 50, skip_retry_logic: bool = False) ->
             else:
                 subject = f"Uw locatie staat op Turkspot - {email_record['location_name']}"
             
-            # Send email and get message ID
-            try:
-                message_id = await email_service.send_email_with_message_id(
-                    to_email=email_record["email"],
+            prepared.append({
+                "record": email_record,
+                "mapview_link": mapview_link,
+                "message": EmailMessage(
+                    to=email_record["email"],
                     subject=subject,
                     html_body=html_body,
                     text_body=text_body,
-                )
-                
-                if not message_id:
-                    raise Exception("Email service returned no message ID")
-                
-            except Exception as e:
-                # Handle specific error types
-                error_str = str(e).lower()
-                
-                # SES throttling error (soft fail - retry)
-                if "throttling" in error_str or "rate" in error_str:
-                    error_msg = f"SES throttling error for location {email_record['location_id']}: {str(e)}"
-                    errors.append(error_msg)
-                    logger.warning(
-                        "outreach_ses_throttling",
-                        location_id=email_record["location_id"],
-                        email=email_record["email"],
-                        error=str(e),
-                    )
-                    # Mark for retry (increment retry_count)
-                    await _mark_for_retry(email_record["id"], email_record.get("retry_count", 0))
-                    continue
-                
-                # Invalid email address
-                elif "invalid" in error_str or "bounce" in error_str or "rejected" in error_str:
-                    error_msg = f"Invalid email address for location {email_record['location_id']}: {str(e)}"
-                    errors.append(error_msg)
-                    logger.warning(
-                        "outreach_invalid_email",
-                        location_id=email_record["location_id"],
-                        email=email_record["email"],
-                        error=str(e),
-                    )
-                    # Mark as bounced
-                    await _update_email_status(
-                        email_record["id"],
-                        status="bounced",
-                        bounce_reason=str(e),
-                    )
-                    failed_count += 1
-                    continue
-                
-                # Other errors (soft fail - retry if retry_count < 2)
-                else:
-                    error_msg = f"Email send failed for location {email_record['location_id']}: {str(e)}"
-                    errors.append(error_msg)
-                    logger.error(
-                        "outreach_email_send_failed",
-                        location_id=email_record["location_id"],
-                        email=email_record["email"],
-                        error=str(e),
-                        exc_info=True,
-                    )
-                    
-                    retry_count = email_record.get("retry_count", 0)
-                    if retry_count < 2:
-                        # Mark for retry
-                        await _mark_for_retry(email_record["id"], retry_count)
-                    else:
-                        # Max retries reached - mark as failed
-                        failed_count += 1
-                    continue
+                ),
+            })
+            
+        except Exception as e:
+            error_msg = f"Unexpected error processing email for location {email_record['location_id']}: {str(e)}"
+            errors.append(error_msg)
+            logger.error(
+                "outreach_email_processing_error",
+                location_id=email_record["location_id"],
+                email=email_record["email"],
+                error=str(e),
+                exc_info=True,
+            )
+            failed_count += 1
+    
+    # Send everything prepared in one pooled batch
+    results = await email_service.send_batch(
+        [item["message"] for item in prepared],
+        budget=budget,
+    )
+    
+    for item, result in zip(prepared, results):
+        email_record = item["record"]
+        try:
+            if not result.ok:
+                failed_count += await _handle_send_failure(email_record, result, errors)
+                continue
+            
+            message_id = result.message_id
             
             # Update email status to 'sent' with message ID
             await _update_email_status(
@@ -466,7 +440,7 @@ async def send_queued_emails(limit: int = 50, skip_retry_logic: bool = False) ->
                 "outreach_email_sent",
                 location_id=email_record["location_id"],
                 email=email_record["email"],
-                mapview_link=mapview_link,
+                mapview_link=item["mapview_link"],
             )
             
         except Exception as e:
@@ -498,6 +472,71 @@ async def send_queued_emails(limit: int = 50, skip_retry_logic: bool = False) ->
     }
 
 
+async def _handle_send_failure(
+    email_record: Dict[str, Any],
+    result: EmailSendResult,
+    errors: List[str],
+) -> int:
+    """
+    Apply the retry/bounce policy to a message the provider did not accept.
+    
+    Returns:
+        1 if the email counts as failed, 0 if it stays queued (retry or quota)
+    """
+    # Quota ran out mid-batch: leave queued for the next run
+    if result.error_type == "RateLimited":
+        return 0
+    
+    error_str = (result.error or "").lower()
+    
+    # SES throttling error (soft fail - retry)
+    if "throttling" in error_str or "rate" in error_str:
+        errors.append(f"SES throttling error for location {email_record['location_id']}: {result.error}")
+        logger.warning(
+            "outreach_ses_throttling",
+            location_id=email_record["location_id"],
+            email=email_record["email"],
+            error=result.error,
+        )
+        # Mark for retry (increment retry_count)
+        await _mark_for_retry(email_record["id"], email_record.get("retry_count", 0))
+        return 0
+    
+    # Invalid email address
+    if "invalid" in error_str or "bounce" in error_str or "rejected" in error_str:
+        errors.append(f"Invalid email address for location {email_record['location_id']}: {result.error}")
+        logger.warning(
+            "outreach_invalid_email",
+            location_id=email_record["location_id"],
+            email=email_record["email"],
+            error=result.error,
+        )
+        # Mark as bounced
+        await _update_email_status(
+            email_record["id"],
+            status="bounced",
+            bounce_reason=result.error,
+        )
+        return 1
+    
+    # Other errors (soft fail - retry if retry_count < 2)
+    errors.append(f"Email send failed for location {email_record['location_id']}: {result.error}")
+    logger.error(
+        "outreach_email_send_failed",
+        location_id=email_record["location_id"],
+        email=email_record["email"],
+        error=result.error,
+        error_type=result.error_type,
+    )
+    retry_count = email_record.get("retry_count", 0)
+    if retry_count < 2:
+        # Mark for retry
+        await _mark_for_retry(email_record["id"], retry_count)
+        return 0
+    # Max retries reached - mark as failed
+    return 1
+
+
 async def _update_email_status(
     email_id: int,
     status: str,
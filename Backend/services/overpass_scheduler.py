@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+OverpassMirrorScheduler — spreads Overpass requests over all configured mirrors
+- Per mirror: a token bucket (one request per OVERPASS_MIRROR_MIN_INTERVAL_SECONDS,
+  the same politeness budget as the serial loop) and an AIMD concurrency window
+- The window grows by 1/window per fast success and is multiplied by
+  OVERPASS_AIMD_DECREASE on 429s, timeouts, 5xx and responses slower than
+  OVERPASS_MIRROR_LATENCY_TARGET_MS; a 429 also pauses the mirror for Retry-After
+- Outcomes come from OsmPlacesService._log_overpass_call, i.e. the same telemetry
+  that is written to overpass_calls
+- acquire() picks the mirror that can start soonest (free window slot, earliest
+  token, lowest latency EWMA); retries pass the failed mirrors as `exclude`
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+import structlog
+
+logger = structlog.get_logger()
+
+OVERPASS_SCHEDULER_ENABLED = os.getenv("OVERPASS_SCHEDULER_ENABLED", "false").lower() == "true"
+OVERPASS_MIRROR_MIN_INTERVAL_SECONDS = float(
+    os.getenv("OVERPASS_MIRROR_MIN_INTERVAL_SECONDS", os.getenv("OVERPASS_MIN_DELAY_SECONDS", "8"))
+)
+OVERPASS_MIRROR_MAX_WINDOW = int(os.getenv("OVERPASS_MIRROR_MAX_WINDOW", "3"))
+OVERPASS_MIRROR_LATENCY_TARGET_MS = int(os.getenv("OVERPASS_MIRROR_LATENCY_TARGET_MS", "20000"))
+OVERPASS_AIMD_DECREASE = float(os.getenv("OVERPASS_AIMD_DECREASE", "0.5"))
+# Cells DiscoveryBot keeps in flight when the scheduler is enabled
+OVERPASS_SCHEDULER_MAX_INFLIGHT_CELLS = int(os.getenv("OVERPASS_SCHEDULER_MAX_INFLIGHT_CELLS", "8"))
+
+_LATENCY_EWMA_ALPHA = 0.3
+
+
+@dataclass
+class MirrorState:
+    endpoint: str
+    window: float = 1.0
+    in_flight: int = 0
+    next_token_at: float = 0.0
+    cooldown_until: float = 0.0
+    latency_ewma_ms: Optional[float] = None
+    requests: int = 0
+    successes: int = 0
+    rate_limited: int = 0
+    errors: int = 0
+
+    def has_slot(self) -> bool:
+        return self.in_flight < max(1, int(self.window))
+
+    def snapshot(self, now: float) -> Dict[str, object]:
+        return {
+            "endpoint": self.endpoint,
+            "window": round(self.window, 2),
+            "in_flight": self.in_flight,
+            "cooldown_s": round(max(0.0, self.cooldown_until - now), 1),
+            "latency_ewma_ms": round(self.latency_ewma_ms) if self.latency_ewma_ms is not None else None,
+            "requests": self.requests,
+            "successes": self.successes,
+            "rate_limited": self.rate_limited,
+            "errors": self.errors,
+        }
+
+
+class OverpassMirrorScheduler:
+    def __init__(
+        self,
+        endpoints: Iterable[str],
+        *,
+        min_interval_s: float = OVERPASS_MIRROR_MIN_INTERVAL_SECONDS,
+        max_window: int = OVERPASS_MIRROR_MAX_WINDOW,
+        latency_target_ms: int = OVERPASS_MIRROR_LATENCY_TARGET_MS,
+        decrease: float = OVERPASS_AIMD_DECREASE,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.mirrors: Dict[str, MirrorState] = {ep: MirrorState(ep) for ep in endpoints}
+        if not self.mirrors:
+            raise ValueError("OverpassMirrorScheduler needs at least one endpoint")
+        self.min_interval_s = min_interval_s
+        self.max_window = max(1, max_window)
+        self.latency_target_ms = latency_target_ms
+        self.decrease = decrease
+        self._clock = clock
+        self._changed = asyncio.Condition()
+
+    def _pick(self, exclude: Iterable[str]) -> Optional[MirrorState]:
+        now = self._clock()
+        excluded = set(exclude)
+        candidates = [m for m in self.mirrors.values() if m.endpoint not in excluded]
+        if not candidates:  # every mirror failed this cell: fall back to all of them
+            candidates = list(self.mirrors.values())
+        ready = [m for m in candidates if m.has_slot() and m.cooldown_until <= now]
+        if not ready:
+            return None
+        return min(
+            ready,
+            key=lambda m: (
+                max(0.0, m.next_token_at - now),
+                m.latency_ewma_ms if m.latency_ewma_ms is not None else 0.0,
+                m.in_flight / m.window,
+            ),
+        )
+
+    def _next_change_in(self) -> float:
+        now = self._clock()
+        cooldowns = [m.cooldown_until - now for m in self.mirrors.values() if m.cooldown_until > now]
+        return max(0.05, min(cooldowns)) if cooldowns else 1.0
+
+    async def acquire(self, exclude: Iterable[str] = ()) -> str:
+        """Reserve a window slot and the next token of the best mirror; waits for its token."""
+        exclude = tuple(exclude)
+        async with self._changed:
+            while True:
+                mirror = self._pick(exclude)
+                if mirror is not None:
+                    break
+                try:
+                    await asyncio.wait_for(self._changed.wait(), timeout=self._next_change_in())
+                except asyncio.TimeoutError:
+                    pass
+            now = self._clock()
+            start_at = max(now, mirror.next_token_at)
+            mirror.next_token_at = start_at + self.min_interval_s
+            mirror.in_flight += 1
+            mirror.requests += 1
+        delay = start_at - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return mirror.endpoint
+
+    async def release(self, endpoint: str) -> None:
+        async with self._changed:
+            mirror = self.mirrors.get(endpoint)
+            if mirror is not None:
+                mirror.in_flight = max(0, mirror.in_flight - 1)
+            self._changed.notify_all()
+
+    def observe(
+        self,
+        endpoint: str,
+        status_code: int,
+        duration_ms: int,
+        error_message: Optional[str] = None,
+        retry_after_s: Optional[int] = None,
+    ) -> None:
+        """Feed one request outcome into the mirror's AIMD window."""
+        mirror = self.mirrors.get(endpoint)
+        if mirror is None:
+            return
+        now = self._clock()
+        if status_code == 429:
+            mirror.rate_limited += 1
+            mirror.window = max(1.0, mirror.window * self.decrease)
+            mirror.cooldown_until = max(mirror.cooldown_until, now + (retry_after_s or self.min_interval_s * 4))
+        elif status_code == 0 or status_code >= 500:
+            # Timeouts are logged as 504, connection/unexpected errors as 0
+            mirror.errors += 1
+            mirror.window = max(1.0, mirror.window * self.decrease)
+            mirror.cooldown_until = max(mirror.cooldown_until, now + self.min_interval_s)
+        elif status_code < 400:
+            mirror.successes += 1
+            mirror.latency_ewma_ms = (
+                float(duration_ms) if mirror.latency_ewma_ms is None
+                else (1 - _LATENCY_EWMA_ALPHA) * mirror.latency_ewma_ms + _LATENCY_EWMA_ALPHA * duration_ms
+            )
+            if duration_ms > self.latency_target_ms:
+                mirror.window = max(1.0, mirror.window * self.decrease)
+            else:
+                mirror.window = min(float(self.max_window), mirror.window + 1.0 / mirror.window)
+        # 400/422 are query errors: say nothing about the mirror
+
+        if status_code == 429 or status_code == 0 or status_code >= 500:
+            logger.info(
+                "overpass_mirror_backoff",
+                endpoint=endpoint,
+                status_code=status_code,
+                window=round(mirror.window, 2),
+                error=error_message,
+            )
+
+    def stats(self) -> List[Dict[str, object]]:
+        now = self._clock()
+        return [m.snapshot(now) for m in self.mirrors.values()]
+
+
+_shared_scheduler: Optional[OverpassMirrorScheduler] = None
+
+
+def get_overpass_scheduler(endpoints: Iterable[str]) -> OverpassMirrorScheduler:
+    """Process-wide scheduler, shared like the per-endpoint semaphores in osm_service."""
+    global _shared_scheduler
+    if _shared_scheduler is None:
+        _shared_scheduler = OverpassMirrorScheduler(endpoints)
+    return _shared_scheduler
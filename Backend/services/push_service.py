@@ -1,25 +1,91 @@
 # Backend/services/push_service.py
 from __future__ import annotations
 
+import asyncio
 import json
 import os
-from typing import Dict, Any, List, Optional
-from datetime import datetime, timezone
-
-from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.primitives.asymmetric import ec
-import pywebpush
-from pywebpush import webpush, WebPushException
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from py_vapid import Vapid
+from pywebpush import WebPusher, WebPushException
 
 from services.db_service import fetch, execute
 from app.core.logging import get_logger
 
 logger = get_logger()
 
+# Web pushes in flight at once (thread pool size)
+PUSH_FANOUT_CONCURRENCY = int(os.getenv("PUSH_FANOUT_CONCURRENCY", "16"))
+# Per-push HTTP timeout (seconds)
+PUSH_SEND_TIMEOUT_SECONDS = float(os.getenv("PUSH_SEND_TIMEOUT_SECONDS", "10"))
+# Rows per push_notification_log INSERT
+PUSH_LOG_BATCH_SIZE = int(os.getenv("PUSH_LOG_BATCH_SIZE", "1000"))
+
+# Push services answer 404/410 for subscriptions that no longer exist
+GONE_STATUS_CODES = (404, 410)
+# Signed VAPID headers are valid 12h; re-sign when less than 1h is left
+VAPID_CLAIM_TTL_SECONDS = 12 * 60 * 60
+VAPID_RESIGN_MARGIN_SECONDS = 60 * 60
+
+DEFAULT_PREFERENCES = {
+    "enabled": True,
+    "poll_notifications": True,
+    "trending_notifications": False,
+    "activity_notifications": False,
+}
+
+
+@dataclass(frozen=True)
+class PushMessage:
+    """One notification for one user (delivered to each of their active devices)."""
+
+    user_id: str
+    notification_type: str
+    title: str
+    body: str
+    data: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class _Delivery:
+    message_index: int
+    device_token_id: int
+    subscription_json: str
+    delivered: bool = False
+    error_message: Optional[str] = None
+    gone: bool = False
+
+
+def _skip_reason(prefs: Dict[str, Any], notification_type: str) -> Optional[str]:
+    """Why the user's preferences block this notification type (None when allowed)."""
+    if not prefs.get("enabled", True):
+        return "notifications_disabled"
+    type_enabled = {
+        "poll": prefs.get("poll_notifications", True),
+        "trending": prefs.get("trending_notifications", False),
+        "activity": prefs.get("activity_notifications", False),
+        "system": True,  # System notifications always enabled if notifications are enabled
+    }.get(notification_type, False)
+    if not type_enabled:
+        return f"{notification_type}_notifications_disabled"
+    return None
+
 
 class PushService:
     """
     Service for sending push notifications via Web Push API.
+
+    send_notifications() is the fan-out path: preferences and active device tokens
+    for all targeted users in one query, web pushes on a bounded thread pool (one
+    requests.Session per thread, so connections to each push service are reused),
+    then one batched log insert and one bulk deactivation of gone subscriptions.
     """
     
     def __init__(self):
@@ -32,6 +98,12 @@ class PushService:
                 "vapid_keys_missing",
                 message="VAPID keys not configured. Push notifications will not work."
             )
+
+        self._vapid: Optional[Vapid] = None
+        self._vapid_headers: Dict[str, Tuple[float, Dict[str, str]]] = {}
+        self._vapid_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread_local = threading.local()
     
     async def send_notification(
         self,
@@ -54,194 +126,260 @@ class PushService:
         Returns:
             Dict with delivery results
         """
-        # Check user preferences
-        prefs_sql = """
-            SELECT enabled, poll_notifications, trending_notifications, activity_notifications
-            FROM push_notification_preferences
-            WHERE user_id = $1::uuid
+        message = PushMessage(user_id, notification_type, title, body, data)
+        return (await self._fan_out([message]))[0]
+
+    async def send_notifications(self, messages: Sequence[PushMessage]) -> Dict[str, Any]:
         """
-        prefs_rows = await fetch(prefs_sql, user_id)
-        
-        if not prefs_rows:
-            # Default preferences if not set
-            enabled = True
-            poll_notifications = True
-            trending_notifications = False
-            activity_notifications = False
-        else:
-            prefs = prefs_rows[0]
-            enabled = prefs.get("enabled", True)
-            poll_notifications = prefs.get("poll_notifications", True)
-            trending_notifications = prefs.get("trending_notifications", False)
-            activity_notifications = prefs.get("activity_notifications", False)
-        
-        # Check if this notification type is enabled
-        if not enabled:
-            return {"sent": 0, "failed": 0, "skipped": 1, "reason": "notifications_disabled"}
-        
-        type_enabled = {
-            "poll": poll_notifications,
-            "trending": trending_notifications,
-            "activity": activity_notifications,
-            "system": True,  # System notifications always enabled if notifications are enabled
-        }.get(notification_type, False)
-        
-        if not type_enabled:
-            return {"sent": 0, "failed": 0, "skipped": 1, "reason": f"{notification_type}_notifications_disabled"}
-        
-        # Get active device tokens
-        tokens_sql = """
-            SELECT id, token, platform
-            FROM device_tokens
-            WHERE user_id = $1::uuid AND is_active = true
+        Fan out many notifications (any mix of users and types) in one pass.
+
+        Returns totals: sent, failed, skipped (by reason), deactivated tokens and
+        the first few error messages.
         """
-        token_rows = await fetch(tokens_sql, user_id)
-        
-        if not token_rows:
-            return {"sent": 0, "failed": 0, "skipped": 1, "reason": "no_active_tokens"}
-        
-        # Prepare notification payload
-        payload = {
-            "title": title,
-            "body": body,
-            "icon": "/icon-192x192.png",  # Default icon
-            "badge": "/badge-72x72.png",
-            "data": data or {},
+        results = await self._fan_out(messages)
+        skipped: Dict[str, int] = {}
+        errors: List[str] = []
+        for result in results:
+            if result.get("reason"):
+                skipped[result["reason"]] = skipped.get(result["reason"], 0) + 1
+            errors.extend(result.get("errors", []))
+        return {
+            "messages": len(results),
+            "sent": sum(r["sent"] for r in results),
+            "failed": sum(r["failed"] for r in results),
+            "skipped": sum(skipped.values()),
+            "skipped_by_reason": skipped,
+            "deactivated": sum(r.get("deactivated", 0) for r in results),
+            "errors": errors[:5],
         }
-        
-        sent_count = 0
-        failed_count = 0
-        errors = []
-        
-        # Send to each device
-        for token_row in token_rows:
-            device_token_id = token_row["id"]
-            token_json = token_row["token"]
-            platform = token_row["platform"]
-            
-            try:
-                # Parse subscription from token
-                subscription = json.loads(token_json)
-                
-                # Send notification
-                if platform == "web":
-                    await self._send_web_push(subscription, payload)
-                else:
+
+    async def _fan_out(self, messages: Sequence[PushMessage]) -> List[Dict[str, Any]]:
+        """Per-message results, in input order."""
+        if not messages:
+            return []
+        targets = await self._load_targets(sorted({m.user_id for m in messages}))
+
+        results: List[Dict[str, Any]] = []
+        deliveries: List[_Delivery] = []
+        payloads: List[Optional[str]] = []
+        for index, message in enumerate(messages):
+            prefs, tokens = targets.get(message.user_id, (DEFAULT_PREFERENCES, []))
+            payloads.append(None)
+            reason = _skip_reason(prefs, message.notification_type)
+            if reason is None and not tokens:
+                reason = "no_active_tokens"
+            if reason:
+                results.append({"sent": 0, "failed": 0, "skipped": 1, "reason": reason})
+                continue
+            results.append({"sent": 0, "failed": 0, "errors": []})
+            payloads[index] = json.dumps(
+                {
+                    "title": message.title,
+                    "body": message.body,
+                    "icon": "/icon-192x192.png",  # Default icon
+                    "badge": "/badge-72x72.png",
+                    "data": message.data or {},
+                }
+            )
+            for token in tokens:
+                if token["platform"] != "web":
                     # Future: FCM for mobile
                     logger.warning(
                         "unsupported_platform",
-                        platform=platform,
-                        device_token_id=device_token_id
+                        platform=token["platform"],
+                        device_token_id=token["id"],
                     )
                     continue
-                
-                # Log success
-                await self._log_notification(
-                    user_id=user_id,
-                    device_token_id=device_token_id,
-                    notification_type=notification_type,
-                    title=title,
-                    body=body,
-                    data=data,
-                    delivered=True,
+                deliveries.append(_Delivery(index, token["id"], token["token"]))
+
+        if deliveries:
+            loop = asyncio.get_running_loop()
+            executor = self._get_executor()
+            await asyncio.gather(
+                *(
+                    loop.run_in_executor(executor, self._deliver, delivery, payloads[delivery.message_index])
+                    for delivery in deliveries
                 )
-                
-                sent_count += 1
-                
-            except Exception as e:
-                error_msg = str(e)
-                logger.error(
-                    "push_notification_failed",
-                    user_id=user_id,
-                    device_token_id=device_token_id,
-                    error=error_msg,
-                    exc_info=True,
+            )
+
+        gone_token_ids = sorted({d.device_token_id for d in deliveries if d.gone})
+        for delivery in deliveries:
+            result = results[delivery.message_index]
+            if delivery.delivered:
+                result["sent"] += 1
+                continue
+            result["failed"] += 1
+            if len(result["errors"]) < 5:
+                result["errors"].append(delivery.error_message)
+            if delivery.gone:
+                result["deactivated"] = result.get("deactivated", 0) + 1
+            logger.error(
+                "push_notification_failed",
+                user_id=messages[delivery.message_index].user_id,
+                device_token_id=delivery.device_token_id,
+                error=delivery.error_message,
+            )
+
+        await self._log_notifications(messages, deliveries)
+        await self._deactivate_tokens(gone_token_ids)
+        return results
+
+    async def _load_targets(
+        self,
+        user_ids: Sequence[str],
+    ) -> Dict[str, Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """{user_id: (preferences, active device tokens)} for all users in one query."""
+        rows = await fetch(
+            """
+            SELECT
+                u.user_id::text AS user_id,
+                p.user_id IS NOT NULL AS has_preferences,
+                p.enabled,
+                p.poll_notifications,
+                p.trending_notifications,
+                p.activity_notifications,
+                dt.id AS device_token_id,
+                dt.token,
+                dt.platform
+            FROM unnest($1::uuid[]) AS u(user_id)
+            LEFT JOIN push_notification_preferences p ON p.user_id = u.user_id
+            LEFT JOIN device_tokens dt ON dt.user_id = u.user_id AND dt.is_active = true
+            ORDER BY u.user_id, dt.id
+            """,
+            list(user_ids),
+        )
+        targets: Dict[str, Tuple[Dict[str, Any], List[Dict[str, Any]]]] = {}
+        canonical = {str(user_id).lower(): str(user_id) for user_id in user_ids}
+        for row in rows or []:
+            user_id = canonical.get(row["user_id"], row["user_id"])
+            if user_id not in targets:
+                prefs = (
+                    {key: row[key] for key in DEFAULT_PREFERENCES}
+                    if row["has_preferences"]
+                    else DEFAULT_PREFERENCES
                 )
-                
-                # Log failure
-                await self._log_notification(
-                    user_id=user_id,
-                    device_token_id=device_token_id,
-                    notification_type=notification_type,
-                    title=title,
-                    body=body,
-                    data=data,
-                    delivered=False,
-                    error_message=error_msg,
+                targets[user_id] = (prefs, [])
+            if row["device_token_id"] is not None:
+                targets[user_id][1].append(
+                    {"id": row["device_token_id"], "token": row["token"], "platform": row["platform"]}
                 )
-                
-                failed_count += 1
-                errors.append(error_msg)
-        
-        return {
-            "sent": sent_count,
-            "failed": failed_count,
-            "errors": errors[:5],  # Limit error messages
-        }
-    
-    async def _send_web_push(
-        self,
-        subscription: Dict[str, Any],
-        payload: Dict[str, Any],
-    ) -> None:
+        return targets
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max(1, PUSH_FANOUT_CONCURRENCY),
+                thread_name_prefix="webpush",
+            )
+        return self._executor
+
+    def _session(self) -> requests.Session:
+        """Per-thread session; its connection pools are keyed by push service host."""
+        session = getattr(self._thread_local, "session", None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=4)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._thread_local.session = session
+        return session
+
+    def _headers_for(self, endpoint: str) -> Dict[str, str]:
+        """Signed VAPID headers for the endpoint's push service, cached until close to expiry."""
+        url = urlparse(endpoint)
+        aud = f"{url.scheme}://{url.netloc}"
+        now = time.time()
+        cached = self._vapid_headers.get(aud)
+        if cached and cached[0] - now > VAPID_RESIGN_MARGIN_SECONDS:
+            return cached[1]
+        with self._vapid_lock:
+            if self._vapid is None:
+                self._vapid = Vapid.from_string(private_key=self.vapid_private_key)
+            exp = int(now) + VAPID_CLAIM_TTL_SECONDS
+            headers = self._vapid.sign({"sub": f"mailto:{self.vapid_email}", "aud": aud, "exp": exp})
+            self._vapid_headers[aud] = (exp, headers)
+            return headers
+
+    def _deliver(self, delivery: _Delivery, payload: Optional[str]) -> None:
+        """Runs on the push thread pool; records the outcome on the delivery."""
+        try:
+            subscription = json.loads(delivery.subscription_json)
+            self._send_web_push(subscription, payload or "")
+            delivery.delivered = True
+        except WebPushException as e:
+            status = getattr(e.response, "status_code", None)
+            delivery.error_message = str(e)
+            if status in GONE_STATUS_CODES:
+                delivery.gone = True
+                logger.info("subscription_expired", device_token_id=delivery.device_token_id, status=status)
+        except Exception as e:
+            delivery.error_message = str(e)
+
+    def _send_web_push(self, subscription: Dict[str, Any], data: str) -> requests.Response:
         """
-        Send Web Push notification using pywebpush.
+        Send one Web Push message (blocking; called from the push thread pool).
         """
         if not self.vapid_private_key or not self.vapid_public_key:
             raise ValueError("VAPID keys not configured")
-        
-        # Convert VAPID keys to proper format
-        vapid_claims = {
-            "sub": f"mailto:{self.vapid_email}",
-        }
-        
-        try:
-            webpush(
-                subscription_info=subscription,
-                data=json.dumps(payload),
-                vapid_private_key=self.vapid_private_key,
-                vapid_claims=vapid_claims,
+
+        headers = dict(self._headers_for(subscription.get("endpoint", "")))
+        response = WebPusher(subscription, requests_session=self._session()).send(
+            data,
+            headers,
+            timeout=PUSH_SEND_TIMEOUT_SECONDS,
+        )
+        if response.status_code > 202:
+            raise WebPushException(
+                "Push failed: {} {}\nResponse body:{}".format(response.status_code, response.reason, response.text),
+                response=response,
             )
-        except WebPushException as e:
-            # Handle specific Web Push errors
-            if "410" in str(e) or "Gone" in str(e):
-                # Subscription expired, mark as inactive
-                logger.info("subscription_expired", subscription=str(subscription.get("endpoint", "")))
-            raise
-    
-    async def _log_notification(
-        self,
-        user_id: str,
-        device_token_id: int,
-        notification_type: str,
-        title: str,
-        body: str,
-        data: Optional[Dict[str, Any]],
-        delivered: bool,
-        error_message: Optional[str] = None,
-    ) -> None:
+        return response
+
+    async def _log_notifications(self, messages: Sequence[PushMessage], deliveries: Sequence[_Delivery]) -> None:
         """
-        Log notification to push_notification_log table.
+        Log deliveries to push_notification_log, PUSH_LOG_BATCH_SIZE rows per INSERT.
         """
         sql = """
             INSERT INTO push_notification_log (
                 user_id, device_token_id, notification_type,
                 title, body, data, sent_at, delivered, error_message
             )
-            VALUES ($1::uuid, $2, $3, $4, $5, $6::jsonb, now(), $7, $8)
+            SELECT r.user_id, r.device_token_id, r.notification_type,
+                   r.title, r.body, r.data::jsonb, now(), r.delivered, r.error_message
+            FROM unnest(
+                $1::uuid[], $2::bigint[], $3::text[], $4::text[],
+                $5::text[], $6::text[], $7::boolean[], $8::text[]
+            ) AS r(user_id, device_token_id, notification_type, title, body, data, delivered, error_message)
         """
-        
+        batch_size = max(1, PUSH_LOG_BATCH_SIZE)
+        for start in range(0, len(deliveries), batch_size):
+            chunk = deliveries[start:start + batch_size]
+            chunk_messages = [messages[d.message_index] for d in chunk]
+            await execute(
+                sql,
+                [m.user_id for m in chunk_messages],
+                [d.device_token_id for d in chunk],
+                [m.notification_type for m in chunk_messages],
+                [m.title for m in chunk_messages],
+                [m.body for m in chunk_messages],
+                [json.dumps(m.data) if m.data else None for m in chunk_messages],
+                [d.delivered for d in chunk],
+                [d.error_message for d in chunk],
+            )
+
+    async def _deactivate_tokens(self, device_token_ids: Sequence[int]) -> None:
+        """Mark subscriptions the push service reported gone (404/410) as inactive."""
+        if not device_token_ids:
+            return
         await execute(
-            sql,
-            user_id,
-            device_token_id,
-            notification_type,
-            title,
-            body,
-            json.dumps(data) if data else None,
-            delivered,
-            error_message,
+            """
+            UPDATE device_tokens
+            SET is_active = false
+            WHERE id = ANY($1::bigint[]) AND is_active = true
+            """,
+            list(device_token_ids),
         )
+        logger.info("push_subscriptions_deactivated", count=len(device_token_ids))
 
 
 # Singleton instance
@@ -0,0 +1,223 @@
+# Backend/services/reaction_counter_service.py
+"""
+Reaction Counter Service - denormalized reaction counts per (entity_type, entity_id, reaction_type).
+
+The *_reactions tables keep one row per identity and reaction; list and search
+endpoints used to group them per returned item. reaction_counters (migration 103)
+keeps the counts instead:
+
+- toggle_reaction() flips the reaction row and adjusts its counter in one transaction
+- reactions_join_sql() is the LATERAL join list queries use to read the counts
+- reconcile_reaction_counters() rebuilds counters from the source tables (reaction
+  rows written elsewhere, e.g. seed scripts or cascaded deletes), run daily by
+  app.workers.reaction_counters_reconcile_worker
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from app.core.logging import get_logger
+from services.db_service import (
+    execute_with_conn,
+    fetch,
+    fetch_with_conn,
+    fetchrow_with_conn,
+    run_in_transaction,
+)
+
+logger = get_logger()
+
+
+@dataclass(frozen=True)
+class ReactionSource:
+    table: str
+    id_column: str
+
+
+REACTION_SOURCES: Dict[str, ReactionSource] = {
+    "news": ReactionSource("news_reactions", "news_id"),
+    "event": ReactionSource("event_reactions", "event_id"),
+    "activity": ReactionSource("activity_reactions", "activity_id"),
+    "shared_link": ReactionSource("shared_link_reactions", "link_id"),
+}
+
+
+def _source(entity_type: str) -> ReactionSource:
+    source = REACTION_SOURCES.get(entity_type)
+    if source is None:
+        raise ValueError(f"Unknown reaction entity_type: {entity_type}")
+    return source
+
+
+def reactions_join_sql(entity_type: str, id_expr: str, alias: str = "rc") -> str:
+    """
+    LEFT JOIN LATERAL exposing `{alias}.reactions` (jsonb {reaction_type: count}, NULL
+    when the entity has none) for the row identified by id_expr. It reads only the
+    entity's counter rows (primary key lookup), whatever the number of reactions.
+    """
+    _source(entity_type)
+    return f"""
+        LEFT JOIN LATERAL (
+            SELECT jsonb_object_agg(rcn.reaction_type, rcn.count) AS reactions
+            FROM reaction_counters rcn
+            WHERE rcn.entity_type = '{entity_type}'
+              AND rcn.entity_id = {id_expr}
+              AND rcn.count > 0
+        ) {alias} ON TRUE
+    """
+
+
+async def toggle_reaction(
+    entity_type: str,
+    entity_id: int,
+    reaction_type: str,
+    *,
+    user_id: Optional[Any] = None,
+    client_id: Optional[str] = None,
+) -> Tuple[bool, int]:
+    """
+    Add the reaction if this identity (user_id, else client_id) has not given it yet,
+    remove it otherwise. Returns (is_active, count for this reaction_type).
+    """
+    source = _source(entity_type)
+    identity_column, identity = ("user_id", user_id) if user_id else ("client_id", client_id)
+
+    async with run_in_transaction() as conn:
+        removed = await fetch_with_conn(
+            conn,
+            f"""
+            DELETE FROM {source.table}
+            WHERE {source.id_column} = $1 AND {identity_column} = $2 AND reaction_type = $3
+            RETURNING id
+            """,
+            entity_id,
+            identity,
+            reaction_type,
+        )
+        if removed:
+            row = await fetchrow_with_conn(
+                conn,
+                """
+                UPDATE reaction_counters
+                SET count = GREATEST(count - $4, 0), updated_at = now()
+                WHERE entity_type = $1 AND entity_id = $2 AND reaction_type = $3
+                RETURNING count
+                """,
+                entity_type,
+                entity_id,
+                reaction_type,
+                len(removed),
+            )
+            return False, int(row["count"]) if row else 0
+
+        inserted = await fetchrow_with_conn(
+            conn,
+            f"""
+            INSERT INTO {source.table} ({source.id_column}, {identity_column}, reaction_type)
+            VALUES ($1, $2, $3)
+            ON CONFLICT DO NOTHING
+            RETURNING id
+            """,
+            entity_id,
+            identity,
+            reaction_type,
+        )
+        if inserted is None:
+            # A concurrent toggle by the same identity won; report the current count
+            row = await fetchrow_with_conn(
+                conn,
+                """
+                SELECT count FROM reaction_counters
+                WHERE entity_type = $1 AND entity_id = $2 AND reaction_type = $3
+                """,
+                entity_type,
+                entity_id,
+                reaction_type,
+            )
+            return True, int(row["count"]) if row else 0
+
+        row = await fetchrow_with_conn(
+            conn,
+            """
+            INSERT INTO reaction_counters (entity_type, entity_id, reaction_type, count)
+            VALUES ($1, $2, $3, 1)
+            ON CONFLICT (entity_type, entity_id, reaction_type)
+            DO UPDATE SET count = reaction_counters.count + 1, updated_at = now()
+            RETURNING count
+            """,
+            entity_type,
+            entity_id,
+            reaction_type,
+        )
+        return True, int(row["count"])
+
+
+async def get_reaction_counts(entity_type: str, entity_id: int) -> Dict[str, int]:
+    """{reaction_type: count} for one entity, highest count first."""
+    _source(entity_type)
+    rows = await fetch(
+        """
+        SELECT reaction_type, count
+        FROM reaction_counters
+        WHERE entity_type = $1 AND entity_id = $2 AND count > 0
+        ORDER BY count DESC, reaction_type ASC
+        """,
+        entity_type,
+        entity_id,
+    )
+    return {row["reaction_type"]: int(row["count"]) for row in rows}
+
+
+def _reconcile_sql(entity_type: str) -> str:
+    source = _source(entity_type)
+    return f"""
+        WITH src AS (
+            SELECT {source.id_column} AS entity_id, reaction_type, COUNT(*)::int AS count
+            FROM {source.table}
+            GROUP BY {source.id_column}, reaction_type
+        ),
+        upserted AS (
+            INSERT INTO reaction_counters (entity_type, entity_id, reaction_type, count, updated_at)
+            SELECT '{entity_type}', entity_id, reaction_type, count, now() FROM src
+            ON CONFLICT (entity_type, entity_id, reaction_type)
+            DO UPDATE SET count = EXCLUDED.count, updated_at = now()
+            WHERE reaction_counters.count IS DISTINCT FROM EXCLUDED.count
+            RETURNING 1
+        ),
+        removed AS (
+            DELETE FROM reaction_counters rcn
+            WHERE rcn.entity_type = '{entity_type}'
+              AND NOT EXISTS (
+                  SELECT 1 FROM src
+                  WHERE src.entity_id = rcn.entity_id AND src.reaction_type = rcn.reaction_type
+              )
+            RETURNING 1
+        )
+        SELECT
+            (SELECT COUNT(*) FROM src)::int AS source_counters,
+            (SELECT COUNT(*) FROM upserted)::int AS corrected,
+            (SELECT COUNT(*) FROM removed)::int AS removed
+    """
+
+
+async def reconcile_reaction_counters(entity_types: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, int]]:
+    """
+    Rebuild reaction_counters from the *_reactions tables, one transaction per entity type.
+
+    The source table is locked in SHARE mode for the duration, so toggles wait instead
+    of racing the rebuild (and an in-flight toggle finishes before it starts).
+    Returns {entity_type: {"source_counters", "corrected", "removed"}}.
+    """
+    results: Dict[str, Dict[str, int]] = {}
+    for entity_type in entity_types or REACTION_SOURCES:
+        source = _source(entity_type)
+        async with run_in_transaction() as conn:
+            await execute_with_conn(conn, f"LOCK TABLE {source.table} IN SHARE MODE")
+            rows = await fetch_with_conn(conn, _reconcile_sql(entity_type))
+        stats = {key: int(value) for key, value in dict(rows[0]).items()}
+        results[entity_type] = stats
+        if stats["corrected"] or stats["removed"]:
+            logger.warning("reaction_counters_drift_corrected", entity_type=entity_type, **stats)
+    return results
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+from uuid import uuid4
+
+import pytest
+
+from app.workers import activity_stream_ingest_worker as worker
+
+
+class FakeDb:
+    """Just enough of run_in_transaction/fetch_with_conn/execute_with_conn for the bulk path."""
+
+    def __init__(self, rows: List[Dict[str, Any]], fail_insert_for: set[int] | None = None) -> None:
+        self.rows = {r["id"]: dict(r) for r in rows}
+        self.processed: set[int] = set()
+        self.activity: List[tuple] = []
+        self.fail_insert_for = fail_insert_for or set()
+        self.transactions = 0
+        self.bulk_inserts = 0
+
+    @asynccontextmanager
+    async def tx(self):
+        self.transactions += 1
+        pending = {"activity": [], "processed": set()}
+        yield pending
+        self.activity.extend(pending["activity"])
+        self.processed |= pending["processed"]
+
+    async def fetch_with_conn(self, conn, sql, *args):
+        if "SKIP LOCKED" in sql and "LIMIT $1" in sql:
+            limit, exclude = args
+            free = [r for i, r in sorted(self.rows.items()) if i not in self.processed and i not in exclude]
+            return free[:limit]
+        (row_id,) = args
+        return [] if row_id in self.processed else [{"id": row_id}]
+
+    async def execute_with_conn(self, conn, sql, *args):
+        if sql is worker.BULK_INSERT_ACTIVITY_SQL:
+            self.bulk_inserts += 1
+            payloads = args[7]
+            if any(json.loads(p).get("poll_id") in self.fail_insert_for for p in payloads):
+                raise RuntimeError("bad row")
+            conn["activity"].extend(zip(*args))
+        elif sql is worker.INSERT_ACTIVITY_SQL:
+            if json.loads(args[7]).get("poll_id") in self.fail_insert_for:
+                raise RuntimeError("bad row")
+            conn["activity"].append(args)
+        else:
+            conn["processed"] |= set(args[0])
+        return "OK"
+
+
+def _poll_rows(n: int) -> List[Dict[str, Any]]:
+    now = datetime.now(timezone.utc)
+    return [
+        {"id": i, "poll_id": i, "user_id": uuid4(), "client_id": None, "created_at": now}
+        for i in range(1, n + 1)
+    ]
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    def install(db: FakeDb) -> FakeDb:
+        monkeypatch.setattr(worker, "run_in_transaction", db.tx)
+        monkeypatch.setattr(worker, "fetch_with_conn", db.fetch_with_conn)
+        monkeypatch.setattr(worker, "execute_with_conn", db.execute_with_conn)
+        return db
+
+    return install
+
+
+@pytest.mark.asyncio
+async def test_bulk_claims_batches_and_marks_in_same_transaction(fake_db):
+    db = fake_db(FakeDb(_poll_rows(7)))
+
+    processed = await worker.process_source_bulk("poll_responses", 100, batch_size=3)
+
+    assert processed == 7
+    assert db.bulk_inserts == 3  # 3 + 3 + 1
+    assert db.processed == set(range(1, 8))
+    assert len(db.activity) == 7
+    assert {a[3] for a in db.activity} == {"poll_response"}
+    claim = worker.SOURCES["poll_responses"].claim_sql()
+    assert "FOR UPDATE OF pr SKIP LOCKED" in claim and "ANY($2::bigint[])" in claim
+
+
+@pytest.mark.asyncio
+async def test_bulk_failure_falls_back_per_row_and_skips_bad_row(fake_db):
+    db = fake_db(FakeDb(_poll_rows(5), fail_insert_for={3}))
+
+    processed = await worker.process_source_bulk("poll_responses", 100, batch_size=10)
+
+    assert processed == 4
+    assert db.processed == {1, 2, 4, 5}
+    assert sorted(json.loads(a[7])["poll_id"] for a in db.activity) == [1, 2, 4, 5]
+
+
+def test_city_keys_batch_lookup_and_bulletin_city(monkeypatch):
+    calls: List[tuple] = []
+
+    def fake_batch(lats, lngs):
+        calls.append((list(lats), list(lngs)))
+        return [("rotterdam", "centrum") for _ in lats]
+
+    monkeypatch.setattr(worker, "get_city_districts_from_coords_batch", fake_batch)
+    rows = [
+        {"id": 1, "city": "Den Haag", "lat": 52.0, "lng": 4.3},
+        {"id": 2, "city": None, "lat": 51.9, "lng": 4.5},
+        {"id": 3, "city": None, "lat": None, "lng": None},
+    ]
+    assert worker._city_keys(worker.SOURCES["bulletin_posts"], rows) == ["den_haag", "rotterdam", None]
+    assert calls == [([51.9], [4.5])]
@@ -215,3 +215,62 @@ async def test_get_ai_log_detail_requires_admin(anon_client: AsyncClient) -> Non
     assert resp.status_code == 401
 
 
+
+
+async def test_get_ai_logs_cache_hit_filter(admin_client: AsyncClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    recorded: Dict[str, Any] = {}
+
+    async def fake_fetch(query: str, *args: Any, **kwargs: Any):
+        recorded["query"] = query
+        recorded["params"] = args
+        return [
+            {
+                "id": 8,
+                "location_id": 5,
+                "news_id": None,
+                "action_type": "classify",
+                "model_used": "gpt",
+                "validated_output": {"category": "bakery"},
+                "is_success": True,
+                "error_message": None,
+                "cache_hit": True,
+                "created_at": datetime.now(timezone.utc),
+            }
+        ]
+
+    async def fake_fetchrow(query: str, *args: Any, **kwargs: Any):
+        return {"total": 1}
+
+    monkeypatch.setattr("api.routers.admin_ai_logs.fetch", fake_fetch)
+    monkeypatch.setattr("api.routers.admin_ai_logs.fetchrow", fake_fetchrow)
+
+    resp = await admin_client.get("/api/v1/admin/ai/logs", params={"cache_hit": True})
+    assert resp.status_code == 200
+    assert "ai.cache_hit = $1" in recorded["query"]
+    assert recorded["params"][0] is True
+    assert resp.json()["items"][0]["cache_hit"] is True
+
+
+async def test_get_ai_cache_stats(admin_client: AsyncClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    async def fake_fetch(query: str, *args: Any, **kwargs: Any):
+        assert "FILTER (WHERE cache_hit)" in query
+        assert args == (6,)
+        return [
+            {"action_type": "classify", "total": 40, "hits": 10},
+            {"action_type": "news.classify", "total": 10, "hits": 0},
+        ]
+
+    async def fake_fetchrow(query: str, *args: Any, **kwargs: Any):
+        return {"entries": 120, "expired": 3, "total_hits": 55}
+
+    monkeypatch.setattr("api.routers.admin_ai_logs.fetch", fake_fetch)
+    monkeypatch.setattr("api.routers.admin_ai_logs.fetchrow", fake_fetchrow)
+
+    resp = await admin_client.get("/api/v1/admin/ai/cache/stats", params={"hours": 6})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["total"] == 50 and data["hits"] == 10
+    assert data["hit_rate"] == 0.2
+    assert data["by_action_type"][0] == {"action_type": "classify", "total": 40, "hits": 10, "hit_rate": 0.25}
+    assert data["cache_entries"] == 120
+    assert "lru_size" in data["process"]
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+from pydantic import BaseModel
+
+from services import ai_response_cache, openai_service
+
+
+class Answer(BaseModel):
+    action: str
+    confidence_score: float
+
+
+class FakeCompletions:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def create(self, **kwargs: Any):
+        self.calls += 1
+        content = json.dumps({"action": "keep", "confidence_score": 0.9})
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage={"prompt_tokens": 100, "completion_tokens": 10, "total_tokens": 110},
+        )
+
+
+def _service() -> tuple[openai_service.OpenAIService, FakeCompletions]:
+    completions = FakeCompletions()
+    svc = object.__new__(openai_service.OpenAIService)
+    svc.model = "gpt-test"
+    svc.max_retries = 0
+    svc.timeout_s = 5
+    svc.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    svc._owner_loop = None
+    return svc, completions
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(monkeypatch):
+    logged: List[Dict[str, Any]] = []
+
+    async def fake_ai_log(**kwargs: Any) -> None:
+        logged.append(kwargs)
+
+    monkeypatch.setattr(ai_response_cache, "AI_CACHE_ENABLED", True)
+    monkeypatch.setattr(ai_response_cache, "AI_CACHE_DB_ENABLED", False)
+    monkeypatch.setattr(openai_service, "ai_log", fake_ai_log)
+    ai_response_cache.reset_ai_cache()
+    ai_response_cache.set_ai_cache_bypass(False)
+    yield logged
+    ai_response_cache.set_ai_cache_bypass(False)
+    ai_response_cache.reset_ai_cache()
+
+
+def test_cache_key_normalizes_input_and_tracks_prompt_version():
+    a = ai_response_cache.make_cache_key(model="m", system_prompt="sys", user_prompt="Naam:  Kebab\n Rotterdam ")
+    b = ai_response_cache.make_cache_key(model="m", system_prompt="sys", user_prompt="Naam: Kebab Rotterdam")
+    c = ai_response_cache.make_cache_key(model="m", system_prompt="sys v2", user_prompt="Naam: Kebab Rotterdam")
+    d = ai_response_cache.make_cache_key(model="other", system_prompt="sys", user_prompt="Naam: Kebab Rotterdam")
+    assert a.key == b.key
+    assert c.prompt_version != b.prompt_version and c.input_hash == b.input_hash
+    assert d.key != b.key
+
+
+@pytest.mark.asyncio
+async def test_generate_json_second_identical_call_is_served_from_cache(_isolated_cache):
+    svc, completions = _service()
+
+    first, meta1 = svc.generate_json("sys", "input 1", Answer, action_type="news.classify")
+    second, meta2 = svc.generate_json("sys", "input  1", Answer, action_type="news.classify")
+    await asyncio.sleep(0)
+
+    assert completions.calls == 1
+    assert first == second
+    assert not meta1.get("cache_hit")
+    assert meta2["cache_hit"] is True and meta2["cache_source"] == "lru"
+    assert [entry.get("cache_hit", False) for entry in _isolated_cache] == [False, True]
+    stats = ai_response_cache.get_ai_cache_stats()
+    assert stats["hits_lru"] == 1 and stats["misses"] == 1 and stats["hit_rate"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_generate_json_respects_action_types_override_and_bypass():
+    svc, completions = _service()
+
+    # "generic" is not cached unless the caller opts in
+    svc.generate_json("sys", "x", Answer)
+    svc.generate_json("sys", "x", Answer)
+    assert completions.calls == 2
+
+    svc.generate_json("sys", "x", Answer, cache=True)
+    svc.generate_json("sys", "x", Answer, cache=True)
+    assert completions.calls == 3
+
+    ai_response_cache.set_ai_cache_bypass(True)
+    svc.generate_json("sys", "x", Answer, cache=True)
+    assert completions.calls == 4
+
+
+def test_lru_evicts_and_expires(monkeypatch):
+    lru = ai_response_cache._LRU(2)
+    now = [1000.0]
+    monkeypatch.setattr(ai_response_cache.time, "time", lambda: now[0])
+
+    lru.put("a", {"data": 1}, expires_at=2000.0)
+    lru.put("b", {"data": 2}, expires_at=1500.0)
+    assert lru.get("a") == {"data": 1}  # a is now most recent
+    lru.put("c", {"data": 3}, expires_at=2000.0)
+    assert lru.get("b") is None  # evicted as least recently used
+    now[0] = 2500.0
+    assert lru.get("a") is None  # expired
+
+
+@pytest.mark.asyncio
+async def test_ai_log_writes_cache_hit_column_only_for_hits(monkeypatch):
+    from services import db_service
+
+    statements: List[tuple] = []
+
+    async def fake_execute(sql: str, *params: Any) -> None:
+        statements.append((sql, params))
+
+    monkeypatch.setattr(db_service, "execute", fake_execute)
+    common = dict(
+        location_id=1, action_type="news.classify", prompt={"q": "x"}, raw_response=None,
+        validated_output=None, model_used="gpt-test", is_success=True, error_message=None,
+    )
+    await db_service.ai_log(**common)
+    await db_service.ai_log(**common, cache_hit=True)
+
+    (miss_sql, miss_params), (hit_sql, hit_params) = statements
+    # API-call logs do not need migration 099
+    assert "cache_hit" not in miss_sql and len(miss_params) == 10
+    assert "cache_hit" in hit_sql and hit_params[-1] is True and "$11" in hit_sql
+    assert "CAST($5 AS JSONB)" in miss_sql and miss_params[4] == '{"q": "x"}'
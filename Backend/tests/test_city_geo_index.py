@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from services import city_geo_index
+from services.city_geo_index import CityGeoIndex
+
+
+CONFIG = {
+    "cities": {
+        "rotterdam": {
+            "districts": {
+                "centrum": {"lat_min": 51.90, "lat_max": 51.93, "lng_min": 4.45, "lng_max": 4.50},
+                "noord": {"lat_min": 51.92, "lat_max": 51.95, "lng_min": 4.46, "lng_max": 4.49},
+                "broken": {"lat": 51.9, "lng": 4.4},
+            },
+        },
+        "schiedam": {
+            "districts": {
+                # Overlaps rotterdam/centrum: rotterdam wins (config order)
+                "oost": {"lat_min": 51.91, "lat_max": 51.92, "lng_min": 4.40, "lng_max": 4.46},
+            },
+        },
+        "zuid_holland": {
+            "lat_min": 51.5, "lat_max": 52.5, "lng_min": 3.8, "lng_max": 5.0,
+        },
+    }
+}
+
+
+def _linear(config, lat, lng):
+    cities = config["cities"]
+    for city_key, city in cities.items():
+        for district_key, d in (city.get("districts") or {}).items():
+            if all(k in d for k in ("lat_min", "lat_max", "lng_min", "lng_max")):
+                if d["lat_min"] <= lat <= d["lat_max"] and d["lng_min"] <= lng <= d["lng_max"]:
+                    return city_key, district_key
+    for city_key, city in cities.items():
+        if all(k in city for k in ("lat_min", "lat_max", "lng_min", "lng_max")):
+            if city["lat_min"] <= lat <= city["lat_max"] and city["lng_min"] <= lng <= city["lng_max"]:
+                return city_key, None
+    return None, None
+
+
+def test_lookup_respects_config_order_and_city_fallback():
+    index = CityGeoIndex.from_config(CONFIG)
+
+    assert index.lookup(51.925, 4.47) == ("rotterdam", "centrum")
+    assert index.lookup(51.915, 4.455) == ("rotterdam", "centrum")
+    assert index.lookup(51.915, 4.41) == ("schiedam", "oost")
+    assert index.lookup(52.2, 4.0) == ("zuid_holland", None)
+    assert index.lookup(40.0, 4.0) == (None, None)
+    assert index.lookup(None, 4.0) == (None, None)
+
+
+def test_lookup_many_matches_linear_scan():
+    index = CityGeoIndex.from_config(CONFIG)
+    rng = random.Random(1)
+    lats = [51.4 + rng.random() * 1.2 for _ in range(2000)] + [None]
+    lngs = [3.7 + rng.random() * 1.4 for _ in range(2000)] + [4.0]
+
+    expected = [_linear(CONFIG, la, ln) if la is not None else (None, None) for la, ln in zip(lats, lngs)]
+    assert index.lookup_many(lats, lngs) == expected
+    assert [index.lookup(la, ln) for la, ln in zip(lats, lngs)] == expected
+
+
+def test_wide_boxes_keep_priority(monkeypatch):
+    monkeypatch.setattr(city_geo_index, "MAX_CELLS_PER_BOX", 4)
+    index = CityGeoIndex.from_config(CONFIG)
+
+    assert index.lookup(51.925, 4.47) == ("rotterdam", "centrum")
+    assert index.lookup(52.2, 4.0) == ("zuid_holland", None)
+
+
+def test_get_city_geo_index_rebuilds_only_on_config_version_change(monkeypatch):
+    import services.config_cache_service as config_cache
+
+    state = {"version": "db:1"}
+    monkeypatch.setattr(config_cache, "get_cities_config", lambda: CONFIG)
+    monkeypatch.setattr(config_cache, "get_config_version", lambda name: state["version"])
+    city_geo_index.reset_city_geo_index()
+
+    first = city_geo_index.get_city_geo_index()
+    second = city_geo_index.get_city_geo_index()
+    state["version"] = "db:2"
+    third = city_geo_index.get_city_geo_index()
+
+    assert first is second
+    assert third is not first
+    assert third.version == "db:2"
+    city_geo_index.reset_city_geo_index()
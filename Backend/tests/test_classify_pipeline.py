@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, List
+
+import pytest
+
+from app.workers import classify_bot
+from services import ai_token_budget, db_service
+from services.ai_token_budget import TokenBudget, usage_total_tokens
+
+
+class DummyClassifyService:
+    system_prompt = "system"
+    fewshot = "fewshot"
+    JSON_SCHEMA = {"type": "object"}
+
+    def __init__(self, fail_on: str | None = None) -> None:
+        self.fail_on = fail_on
+        self.threads: set[str] = set()
+        self._lock = threading.Lock()
+
+    def classify(self, *, name: str, address: str | None, typ: str | None, location_id: int | None = None):
+        with self._lock:
+            self.threads.add(threading.current_thread().name)
+        if name == self.fail_on:
+            raise RuntimeError("boom")
+        idx = int(name.split()[-1])
+        payload = {
+            "action": "keep" if idx % 3 else "ignore",
+            "category": "bakery" if idx % 3 else None,
+            "confidence_score": 0.5 if idx % 5 == 0 else 0.85,
+            "reason": f"row {idx}",
+        }
+        return payload, {"usage": {"total_tokens": 40}}
+
+
+def _rows(n: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": i,
+            "name": f"Zaak {i}",
+            "address": "Straat 1",
+            "category": "bakery",
+            "state": "CANDIDATE",
+            "confidence_score": None,
+            "is_retired": False,
+            "notes": None,
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_pipelined_batches_writes_and_matches_sequential_counters():
+    writes: List[List[Dict[str, Any]]] = []
+    progress: List[int] = []
+
+    async def writer(batch):
+        writes.append(list(batch))
+
+    async def on_progress(done: int) -> None:
+        progress.append(done)
+
+    svc = DummyClassifyService()
+    counters = await classify_bot.classify_rows_pipelined(
+        _rows(20),
+        svc=svc,
+        model=None,
+        min_conf=0.7,
+        dry_run=False,
+        concurrency=4,
+        write_batch_size=5,
+        on_progress=on_progress,
+        writer=writer,
+    )
+
+    # rows 5, 10, 15, 20 are below min_conf; of the rest, multiples of 3 are "ignore"
+    assert counters["classified"] == 20
+    assert counters["skipped_low_conf"] == 4
+    assert counters["ignore"] == 5
+    assert counters["keep"] == 11
+    assert sorted(progress) == list(range(1, 21))
+    assert [len(b) for b in writes] == [5, 5, 5, 1]
+    written = {item["id"]: item for batch in writes for item in batch}
+    assert written[3]["action"] == "ignore" and written[3]["category"] is None
+    assert written[1]["category"] == "bakery"
+    assert all(t.startswith("classify") for t in svc.threads)
+
+
+@pytest.mark.asyncio
+async def test_pipelined_flushes_finished_results_then_raises():
+    writes: List[Dict[str, Any]] = []
+
+    async def writer(batch):
+        writes.extend(batch)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        await classify_bot.classify_rows_pipelined(
+            _rows(6),
+            svc=DummyClassifyService(fail_on="Zaak 4"),
+            model=None,
+            min_conf=0.7,
+            dry_run=False,
+            concurrency=1,
+            write_batch_size=100,
+            writer=writer,
+        )
+    assert [w["id"] for w in writes] == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_token_budget_waits_for_refill_and_settles(monkeypatch):
+    now = [0.0]
+    sleeps: List[float] = []
+
+    async def fake_sleep(delay: float) -> None:
+        sleeps.append(delay)
+        now[0] += delay
+
+    monkeypatch.setattr(ai_token_budget.asyncio, "sleep", fake_sleep)
+    budget = TokenBudget(600, clock=lambda: now[0])  # 10 tokens/s
+
+    assert await budget.acquire(600) == 0.0
+    waited = await budget.acquire(50)
+    assert waited == pytest.approx(5.0)
+    # Actual usage was lower than reserved: refund shortens the next wait
+    budget.settle(50, 20)
+    assert await budget.acquire(30) == 0.0
+    assert budget.stats()["used_total"] == 20
+
+    assert usage_total_tokens({"usage": {"prompt_tokens": 10, "completion_tokens": 5}}) == 15
+    assert usage_total_tokens({"usage": None}) is None
+
+
+@pytest.mark.asyncio
+async def test_bulk_classification_update_applies_canonical_rules(monkeypatch):
+    current = {
+        1: {"id": 1, "state": "CANDIDATE", "is_retired": False, "category": "other", "confidence_score": None},
+        2: {"id": 2, "state": "VERIFIED", "is_retired": False, "category": "bakery", "confidence_score": 0.95},
+        3: {"id": 3, "state": "RETIRED", "is_retired": True, "category": "bakery", "confidence_score": 0.4},
+    }
+    executed: List[tuple] = []
+
+    async def fake_fetch_with_conn(conn, sql, ids):
+        return [current[i] for i in ids if i in current]
+
+    async def fake_execute_with_conn(conn, sql, *args):
+        executed.append(args)
+        return "UPDATE"
+
+    monkeypatch.setattr(db_service, "fetch_with_conn", fake_fetch_with_conn)
+    monkeypatch.setattr(db_service, "execute_with_conn", fake_execute_with_conn)
+
+    applied = await db_service.update_location_classifications_bulk(
+        [
+            {"id": 1, "action": "keep", "category": "bakery", "confidence_score": 0.85, "reason": "r1"},
+            {"id": 2, "action": "keep", "category": "bakery", "confidence_score": 0.95, "reason": ""},
+            {"id": 3, "action": "keep", "category": "bakery", "confidence_score": 0.92, "reason": "r3"},
+            {"id": 1, "action": "ignore", "category": None, "confidence_score": 0.9, "reason": "r1b"},
+        ],
+        conn=object(),
+    )
+
+    assert applied == 4
+    assert len(executed) == 2  # duplicate id 1 goes to a second statement
+    ids, categories, confidences, states, reasons, clears = executed[0]
+    assert ids == [1, 2, 3]
+    assert states == ["PENDING_VERIFICATION", None, "RETIRED"]  # 2 = no-op re-verify
+    assert categories == ["bakery", None, "bakery"]
+    assert confidences == [0.85, None, 0.92]
+    assert clears == [False, False, False]
+    assert executed[1][0] == [1] and executed[1][3] == ["RETIRED"]
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from services import config_cache_service as cache
+
+
+CITIES_DB = {"cities": {"rotterdam": {"city_name": "Rotterdam", "districts": {}}}}
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    cache.invalidate_config_cache()
+    cache.reset_config_cache_stats()
+    yield
+    cache.invalidate_config_cache()
+    cache.reset_config_cache_stats()
+
+
+def _patch_db(monkeypatch, versions, loads):
+    import services.db_service as db_service
+    import services.cities_db_service as cities_db_service
+
+    async def fake_fetchrow(query, *args):
+        return {"row_count": 1, "updated_at": versions[-1], "child_count": 0, "child_updated_at": None}
+
+    async def fake_load():
+        loads.append(1)
+        return CITIES_DB
+
+    monkeypatch.setattr(db_service, "fetchrow", fake_fetchrow)
+    monkeypatch.setattr(cities_db_service, "load_cities_config_from_db", fake_load)
+
+
+@pytest.mark.asyncio
+async def test_db_first_load_then_zero_parses_in_steady_state(monkeypatch):
+    versions, loads = ["t1"], []
+    _patch_db(monkeypatch, versions, loads)
+
+    await cache.refresh_config_cache()
+    for _ in range(100):
+        assert cache.get_cities_config() is CITIES_DB
+
+    stats = cache.get_config_cache_stats()["cities"]
+    assert stats["source"] == "db"
+    assert stats["hits"] == 100
+    assert stats["yaml_parses"] == 0
+    assert loads == [1]
+
+
+@pytest.mark.asyncio
+async def test_version_check_reloads_only_on_change(monkeypatch):
+    versions, loads = ["t1"], []
+    _patch_db(monkeypatch, versions, loads)
+
+    await cache.refresh_config("cities")
+    await cache.refresh_config("cities")
+    assert len(loads) == 1
+
+    versions.append("t2")
+    await cache.refresh_config("cities")
+    assert len(loads) == 2
+    assert cache.get_config_cache_stats()["cities"]["reloads"] == 1
+
+
+@pytest.mark.asyncio
+async def test_miss_inside_event_loop_serves_yaml_and_refreshes_in_background(monkeypatch):
+    versions, loads = ["t1"], []
+    _patch_db(monkeypatch, versions, loads)
+
+    first = cache.get_cities_config()
+    assert "cities" in first
+    assert cache.get_config_cache_stats()["cities"]["source"] == "yaml"
+
+    # Let the scheduled background refresh run
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert cache.get_cities_config() is CITIES_DB
+    stats = cache.get_config_cache_stats()["cities"]
+    assert stats["yaml_parses"] == 1
+    assert stats["source"] == "db"
+
+
+@pytest.mark.asyncio
+async def test_db_failure_falls_back_to_yaml_once(monkeypatch):
+    import services.db_service as db_service
+
+    async def failing_fetchrow(query, *args):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(db_service, "fetchrow", failing_fetchrow)
+
+    await cache.refresh_config("categories")
+    await cache.refresh_config("categories")
+    cache.get_categories_config()
+
+    stats = cache.get_config_cache_stats()["categories"]
+    assert stats["source"] == "yaml"
+    assert stats["yaml_parses"] == 1
+    assert stats["errors"] == 2
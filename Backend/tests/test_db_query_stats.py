@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import pytest
+from fastapi import HTTPException
+
+from api.routers import admin_metrics
+from services import db_query_stats
+
+
+@pytest.fixture(autouse=True)
+def _reset_stats(monkeypatch):
+    monkeypatch.setattr(db_query_stats, "DB_QUERY_STATS_ENABLED", True)
+    monkeypatch.setattr(db_query_stats, "DB_QUERY_STATS_SAMPLE_RATE", 1.0)
+    db_query_stats.reset_query_stats()
+    yield
+    db_query_stats.reset_query_stats()
+
+
+def test_fingerprint_ignores_literals_lists_and_whitespace():
+    a = db_query_stats.fingerprint("SELECT id FROM locations WHERE state = 'VERIFIED' AND id IN (1, 2, 3) LIMIT 10")
+    b = db_query_stats.fingerprint(
+        "SELECT id\n  FROM locations -- verified only\n WHERE state = 'CANDIDATE' AND id IN (7,8) LIMIT 500"
+    )
+    c = db_query_stats.fingerprint("SELECT id FROM locations WHERE state = $1 LIMIT $2")
+
+    assert a == b
+    assert a[1] == "SELECT id FROM locations WHERE state = ? AND id IN (?, ...) LIMIT ?"
+    assert c[0] != a[0] and "$1" in c[1]
+
+
+def test_histogram_percentiles_within_bucket_error():
+    hist = db_query_stats.LatencyHistogram()
+    for ms in range(1, 101):  # 1..100ms
+        hist.record(float(ms))
+
+    stats = hist.stats()
+    assert stats["count"] == 100 and stats["max_ms"] == 100.0 and stats["mean_ms"] == 50.5
+    assert 50 <= stats["p50_ms"] <= 50 * 1.25
+    assert 99 <= stats["p99_ms"] <= 100
+    assert hist.cumulative((1.0, 10.0, 100.0)) == [1, 10, 100]
+
+
+def test_record_query_aggregates_per_fingerprint():
+    sql = "UPDATE locations SET next_check_at = NOW() WHERE id = {}"
+    for i in range(4):
+        db_query_stats.record_query(sql.format(i), "execute", 2.0 + i, result="UPDATE 3", acquire_ms=0.5)
+    db_query_stats.record_query(sql.format(9), "execute", 40.0, error=True)
+    db_query_stats.record_query("SELECT 1", "fetch", 1.0, result=[{"x": 1}])
+    db_query_stats.record_transaction(12.0, 3.0)
+
+    stats = db_query_stats.get_query_stats()
+    top = stats["queries"][0]
+    assert stats["fingerprints_tracked"] == 3 and stats["sampled_calls"] == 7
+    assert top["query"] == "UPDATE locations SET next_check_at = NOW() WHERE id = ?"
+    assert top["calls"] == 5 and top["errors"] == 1 and top["rows"] == 12
+    assert top["total_ms"] == 54.0 and top["latency"]["max_ms"] == 40.0
+    assert top["pool_wait"]["count"] == 4 and top["pool_wait"]["mean_ms"] == 0.5
+    assert db_query_stats.get_query_stats(sort="calls")["queries"][0]["fingerprint"] == top["fingerprint"]
+    tx = next(q for q in stats["queries"] if q["methods"] == {"transaction": 1})
+    assert tx["query"] == db_query_stats.TRANSACTION_QUERY and tx["pool_wait"]["max_ms"] == 3.0
+
+
+def test_fingerprint_limit_and_sampling(monkeypatch):
+    monkeypatch.setattr(db_query_stats, "DB_QUERY_STATS_MAX_FINGERPRINTS", 2)
+    for table in ("a", "b", "c", "d"):
+        db_query_stats.record_query(f"SELECT * FROM {table}", "fetch", 1.0, result=[])
+    ids = {q["fingerprint"] for q in db_query_stats.get_query_stats()["queries"]}
+    assert len(ids) == 3 and db_query_stats.OTHER_FINGERPRINT in ids
+
+    monkeypatch.setattr(db_query_stats, "DB_QUERY_STATS_SAMPLE_RATE", 0.0)
+    assert not db_query_stats.should_sample()
+    monkeypatch.setattr(db_query_stats, "DB_QUERY_STATS_ENABLED", False)
+    monkeypatch.setattr(db_query_stats, "DB_QUERY_STATS_SAMPLE_RATE", 1.0)
+    assert not db_query_stats.should_sample()
+
+
+@pytest.mark.asyncio
+async def test_prometheus_endpoint_requires_token(monkeypatch):
+    db_query_stats.record_query("SELECT * FROM news WHERE id = 5", "fetchrow", 3.0, result={"id": 5})
+
+    with pytest.raises(HTTPException) as exc:
+        await admin_metrics.get_db_query_metrics_prometheus(authorization="Bearer x")
+    assert exc.value.status_code == 404
+
+    monkeypatch.setattr(db_query_stats, "DB_QUERY_STATS_PROMETHEUS_TOKEN", "s3cret")
+    with pytest.raises(HTTPException) as exc:
+        await admin_metrics.get_db_query_metrics_prometheus(authorization="Bearer x")
+    assert exc.value.status_code == 401
+
+    response = await admin_metrics.get_db_query_metrics_prometheus(authorization="Bearer s3cret")
+    body = response.body.decode()
+    fid = db_query_stats.fingerprint("SELECT * FROM news WHERE id = 5")[0]
+    assert f'tda_db_query_duration_seconds_bucket{{fingerprint="{fid}",le="0.005"}} 1' in body
+    assert f'tda_db_query_duration_seconds_bucket{{fingerprint="{fid}",le="0.0025"}} 0' in body
+    assert f'tda_db_query_rows_total{{fingerprint="{fid}"}} 1' in body
+    assert 'query="SELECT * FROM news WHERE id = ?"' in body
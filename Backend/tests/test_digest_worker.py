@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+from uuid import UUID
+
+import pytest
+
+from app.workers import digest_worker
+from services.email import EmailSendResult
+
+USERS = [
+    {"user_id": UUID(int=i), "email": f"u{i}@example.com", "display_name": f"U{i}", "city_key": city, "language_pref": lang}
+    for i, city, lang in [(1, "rotterdam", "nl"), (2, "rotterdam", "tr"), (3, "amsterdam", "en"), (4, "utrecht", "nl")]
+]
+TRENDING = {
+    "rotterdam": [
+        {"location_id": n, "name": f"R{n}", "category": "bakery", "score": 10.0 - n,
+         "check_ins_count": n, "reactions_count": 0, "notes_count": 0}
+        for n in range(7)
+    ],
+    "amsterdam": [
+        {"location_id": 99, "name": "A", "category": "cafe", "score": 1.0,
+         "check_ins_count": 1, "reactions_count": 1, "notes_count": 1}
+    ],
+}
+POLLS = [
+    {"id": 10 - n, "title": f"P{n}", "question": "?", "poll_type": "single", "is_sponsored": False,
+     "created_at": n, "option_count": 2}
+    for n in range(7)
+]
+ANSWERED = {str(UUID(int=1)): {10, 8}, str(UUID(int=3)): {p["id"] for p in POLLS}}
+ACTIVITY = {
+    str(UUID(int=1)): {"check_ins": 3, "reactions": 1, "notes": 0, "favorites": 2, "unique_locations": 2},
+    str(UUID(int=2)): {"check_ins": 0, "reactions": 4, "notes": 1, "favorites": 0, "unique_locations": 1},
+}
+STREAKS = {str(UUID(int=1)): {"total_xp": 120, "current_streak_days": 3, "longest_streak_days": 9}}
+
+
+def install_fake_fetch(monkeypatch) -> List[str]:
+    calls: List[str] = []
+
+    async def fake_fetch(sql: str, *args: Any):
+        calls.append(sql)
+        if "FROM auth.users" in sql:
+            return USERS
+        if "ROW_NUMBER()" in sql:
+            keys, limit = args
+            return [{"city_key": key, **row} for key in keys for row in TRENDING.get(key, [])[:limit]]
+        if "FROM trending_locations" in sql:
+            city_key, limit = args
+            return TRENDING.get(city_key, [])[:limit]
+        if "FROM polls p" in sql and "NOT EXISTS" in sql:
+            return [p for p in POLLS if p["id"] not in ANSWERED.get(str(args[0]), set())][:5]
+        if "FROM polls p" in sql:
+            return POLLS
+        if "FROM poll_responses" in sql:
+            poll_ids, user_ids = args
+            return [
+                {"user_id": uid, "poll_id": pid}
+                for uid in user_ids
+                for pid in ANSWERED.get(uid, set())
+                if pid in poll_ids
+            ]
+        if "FROM activity_stream" in sql and "GROUP BY user_id" in sql:
+            return [{"user_id": uid, **ACTIVITY[uid]} for uid in args[0] if uid in ACTIVITY]
+        if "FROM activity_stream" in sql:
+            return [ACTIVITY.get(str(args[0]), digest_worker.EMPTY_ACTIVITY)]
+        if "FROM user_streaks" in sql and "ANY(" in sql:
+            return [{"user_id": uid, **STREAKS[uid]} for uid in args[0] if uid in STREAKS]
+        if "FROM user_streaks" in sql:
+            row = STREAKS.get(str(args[0]))
+            return [row] if row else []
+        raise AssertionError(sql)
+
+    monkeypatch.setattr(digest_worker, "fetch", fake_fetch)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_cohort_contents_match_per_user_content(monkeypatch):
+    calls = install_fake_fetch(monkeypatch)
+
+    expected = [await digest_worker.generate_digest_content(user) for user in USERS]
+    calls.clear()
+
+    trending = await digest_worker.get_trending_locations_for_cities(u["city_key"] for u in USERS)
+    polls = await digest_worker.get_recent_polls(days=7)
+    contents = await digest_worker.generate_digest_contents(USERS, trending, polls, days=7)
+
+    assert contents == expected
+    assert [len(c["new_polls"]) for c in contents] == [5, 5, 0, 5]
+    assert trending["utrecht"] == [] and len(trending["rotterdam"]) == 5
+    # shared trending + polls, then one query per per-user section for the whole cohort
+    assert len(calls) == 5
+
+
+@pytest.mark.asyncio
+async def test_run_digest_once_sends_one_batch_per_cohort(monkeypatch):
+    calls = install_fake_fetch(monkeypatch)
+    monkeypatch.setattr(digest_worker, "DIGEST_COHORT_SIZE", 3)
+    monkeypatch.setattr(digest_worker, "DIGEST_SEND_RATE_PER_SEC", 2.5)
+
+    batches: List[Dict[str, Any]] = []
+
+    class FakeEmailService:
+        async def send_batch(self, messages, *, rate_per_sec=None, **kwargs):
+            batches.append({"messages": list(messages), "rate_per_sec": rate_per_sec})
+            return [
+                EmailSendResult(m.to, message_id=None if m.to == "u4@example.com" else f"<{m.to}>",
+                                error="550 mailbox unavailable" if m.to == "u4@example.com" else None)
+                for m in messages
+            ]
+
+    monkeypatch.setattr(digest_worker, "get_email_service", lambda: FakeEmailService())
+
+    stats = await digest_worker.run_digest_once()
+
+    assert stats == {"users_processed": 4, "emails_sent": 3, "emails_failed": 1, "errors": []}
+    assert [len(b["messages"]) for b in batches] == [3, 1]
+    assert {b["rate_per_sec"] for b in batches} == {2.5}
+    by_to = {m.to: m for b in batches for m in b["messages"]}
+    assert by_to["u2@example.com"].subject.startswith("Turkspot Haftalık Özet")
+    assert "R0" in by_to["u1@example.com"].html_body and "R0" in by_to["u1@example.com"].text_body
+    # users + trending + polls, then 3 per-user section queries per cohort (2 cohorts)
+    assert len(calls) == 3 + 2 * 3
@@ -89,3 +89,76 @@ def test_counters_aggregation():
     """
     pass
 
+
+
+def test_split_bulk_generations_separates_shared_keys():
+    """
+    Rows sharing a place_id or fuzzy key must land in later generations so the
+    set-based path sees earlier inserts, just like the sequential loop.
+    """
+    from app.workers.discovery_bot import split_bulk_generations
+
+    rows = [
+        {"place_id": "node/1", "name": "Bakkerij A", "lat": 51.92441, "lng": 4.47771},
+        {"place_id": "node/2", "name": "Other", "lat": 51.9, "lng": 4.4},
+        {"place_id": "node/3", "name": " bakkerij a ", "lat": 51.92439, "lng": 4.47769},
+        {"place_id": "node/1", "name": "Bakkerij A2", "lat": 52.0, "lng": 4.0},
+    ]
+    generations = split_bulk_generations(rows)
+
+    assert [[r["place_id"] for r in g] for g in generations] == [
+        ["node/1", "node/2"],
+        ["node/3", "node/1"],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_insert_candidates_bulk_maps_counters(monkeypatch):
+    from app.workers import discovery_bot
+
+    async def fake_init():
+        return None
+
+    async def fake_fetch(query, *args):
+        assert "unnest" in query
+        # 4 rows: 1 place_id hit, 1 fuzzy hit, 1 inserted, 1 lost ON CONFLICT race
+        return [{"place_hits": 1, "fuzzy_hits": 1, "inserted": 1, "updated": 1}]
+
+    monkeypatch.setattr(discovery_bot, "init_db_pool", fake_init)
+    monkeypatch.setattr(discovery_bot, "fetch", fake_fetch)
+
+    rows = [{"place_id": f"node/{i}", "name": f"n{i}", "lat": 51.0 + i, "lng": 4.0} for i in range(4)]
+    counters = await discovery_bot.insert_candidates_bulk(rows)
+
+    assert counters == {
+        "discovered": 4,
+        "inserted": 1,
+        "deduped_place_id": 2,
+        "deduped_fuzzy": 1,
+        "updated_existing": 1,
+        "failed": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_insert_candidates_bulk_falls_back_per_row(monkeypatch):
+    from app.workers import discovery_bot
+
+    async def fake_init():
+        return None
+
+    async def failing_fetch(query, *args):
+        raise RuntimeError("invalid input syntax")
+
+    async def fake_loop(rows):
+        return {"inserted": len(rows) - 1, "deduped_place_id": 0, "deduped_fuzzy": 0, "updated_existing": 0, "failed": 1}
+
+    monkeypatch.setattr(discovery_bot, "init_db_pool", fake_init)
+    monkeypatch.setattr(discovery_bot, "fetch", failing_fetch)
+    monkeypatch.setattr(discovery_bot, "insert_candidates", fake_loop)
+
+    rows = [{"place_id": f"node/{i}", "name": f"n{i}", "lat": 51.0 + i, "lng": 4.0} for i in range(3)]
+    counters = await discovery_bot.insert_candidates_bulk(rows)
+
+    assert counters["inserted"] == 2
+    assert counters["failed"] == 1
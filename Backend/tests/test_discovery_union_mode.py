@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import json
+import math
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Set, Tuple
+
+import httpx
+import pytest
+
+from app.workers import discovery_bot
+from app.workers.discovery_bot import DiscoveryBot, DiscoveryConfig
+from services import osm_service
+
+FIXTURE = json.loads(
+    (Path(__file__).parent / "fixtures" / "overpass_discovery_cells.json").read_text(encoding="utf-8")
+)
+
+CATEGORIES = {
+    "restaurant": {"osm_tags": {"any": [{"amenity": "restaurant"}]}},
+    "bakery": {"osm_tags": {"any": [{"shop": "bakery"}]}},
+    "supermarket": {"osm_tags": {"any": [{"shop": "supermarket"}]}},
+    "barber": {"osm_tags": {"any": [{"shop": "hairdresser"}]}},
+    "mosque": {"osm_tags": {"all": [{"amenity": "place_of_worship"}, {"religion": "muslim"}]}},
+    "butcher": {"osm_tags": {"any": [{"shop": "butcher"}]}},
+}
+POINTS = [(51.92, 4.48), (51.925, 4.49)]
+
+_SELECTOR_RE = re.compile(r"(node|way|relation)((?:\[[^\]]*\])+)\(around:(\d+),([-\d.]+),([-\d.]+)\);")
+_FILTER_RE = re.compile(r'\["([^"]+)"(?:(=|~)"([^"]*)"(,i)?)?\]')
+_TYPE_ORDER = {"node": 0, "way": 1, "relation": 2}
+
+
+def _distance_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 6371000 * 2 * math.asin(math.sqrt(a))
+
+
+def _tag_matches(tags: Dict[str, Any], key: str, op: str, value: str, flags: str) -> bool:
+    if key not in tags:
+        return False
+    if op == "~":
+        return re.search(value, tags[key], re.IGNORECASE if flags else 0) is not None
+    return op == "" or tags[key] == value
+
+
+class FakeOverpass:
+    """Evaluates rendered union queries against the recorded elements."""
+
+    def __init__(self, elements: List[Dict[str, Any]]) -> None:
+        self.elements = elements
+        self.calls = 0
+
+    async def post(self, url, data=None, headers=None):
+        self.calls += 1
+        query = data["data"]
+        limit = re.search(r"out center (\d+);", query)
+        matched: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        for el_type, filters, radius, lat, lng in _SELECTOR_RE.findall(query):
+            for el in self.elements:
+                if el["type"] != el_type:
+                    continue
+                tags = el["tags"]
+                if not all(_tag_matches(tags, *f) for f in _FILTER_RE.findall(filters)):
+                    continue
+                pos = el.get("center") or el
+                if _distance_m(float(lat), float(lng), pos["lat"], pos["lon"]) <= int(radius):
+                    matched[(el_type, el["id"])] = el
+        elements = [matched[key] for key in sorted(matched, key=lambda k: (_TYPE_ORDER[k[0]], k[1]))]
+        if limit:
+            elements = elements[: int(limit.group(1))]
+        return httpx.Response(200, json={"elements": elements}, request=httpx.Request("POST", url))
+
+
+async def _run(monkeypatch, osm_mode: str, max_per_cell: int) -> Tuple[Set[Tuple[str, str]], int]:
+    inserted: List[Dict[str, Any]] = []
+
+    async def fake_ingest(rows):
+        inserted.extend(rows)
+        return {"discovered": len(rows), "inserted": len(rows)}
+
+    async def no_log(**kwargs):
+        return None
+
+    monkeypatch.setattr(discovery_bot, "ingest_candidates", fake_ingest)
+    cfg = DiscoveryConfig(
+        city="rotterdam", categories=list(CATEGORIES), center_lat=51.92, center_lng=4.48,
+        nearby_radius_m=1000, grid_span_km=2.0, max_per_cell_per_category=max_per_cell,
+        inter_call_sleep_s=0, max_total_inserts=0, max_cells_per_category=0, chunks=1,
+        chunk_index=0, language=None, osm_mode=osm_mode,
+    )
+    bot = DiscoveryBot(cfg, {"categories": CATEGORIES})
+    bot.osm_service.turkish_hints = False
+    fake = FakeOverpass(FIXTURE["elements"])
+    await bot.osm_service.aclose()
+    monkeypatch.setattr(bot.osm_service, "_client", fake)
+    monkeypatch.setattr(bot.osm_service, "_log_overpass_call", no_log)
+
+    await bot._run_osm_discovery(POINTS, set(), 0)
+    return {(r["place_id"], r["category"]) for r in inserted}, fake.calls
+
+
+@pytest.fixture(autouse=True)
+def _no_overpass_delay(monkeypatch):
+    monkeypatch.setattr(osm_service, "DEFAULT_MIN_DELAY_SECONDS", 0)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_per_cell", [20, 5])
+async def test_union_mode_matches_per_category_candidates(monkeypatch, max_per_cell):
+    legacy, legacy_calls = await _run(monkeypatch, "per_category", max_per_cell)
+    union, union_calls = await _run(monkeypatch, "union", max_per_cell)
+
+    assert union == legacy
+    assert ("node/999", "restaurant") in union  # restaurant comes before butcher
+    churches = {f"{e['type']}/{e['id']}" for e in FIXTURE["elements"] if e["tags"].get("religion") == "christian"}
+    assert not {pid for pid, _ in union} & churches  # "all" groups need every tag
+    if max_per_cell == 20:
+        # No cell is capped: one union query per point instead of one per category per point
+        assert legacy_calls == len(CATEGORIES) * len(POINTS)
+        assert union_calls == len(POINTS)
+    else:
+        # Capped categories are subdivided in both modes; subcells shared by several
+        # capped categories are queried once
+        assert union_calls > len(POINTS)
+        assert union_calls <= legacy_calls - (len(CATEGORIES) - 1) * len(POINTS)
@@ -4,11 +4,15 @@ Tests for email service and email providers (SMTP, SES).
 
 from __future__ import annotations
 
+import asyncio
 import os
+import socketserver
+import threading
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from services.email.send_pool import EmailMessage, EmailSendPool
 from services.email.ses_provider import SESEmailProvider
 from services.email.smtp_provider import SMTPEmailProvider
 from services.email_service import EmailService
@@ -477,3 +481,152 @@ def test_email_service_ses_provider_selection():
         assert isinstance(provider, SESEmailProvider)
 
 
+# ============================================================================
+# Send Pool Tests
+# ============================================================================
+
+
+class SmtpSink(socketserver.ThreadingTCPServer):
+    """Minimal local SMTP sink: accepts AUTH, counts connections and messages.
+
+    Recipients starting with "reject" get 550. After messages_per_connection
+    messages the server silently closes the connection.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, messages_per_connection: int = 0):
+        self.messages_per_connection = messages_per_connection
+        self.connections = 0
+        self.messages: list = []
+        self.lock = threading.Lock()
+        super().__init__(("127.0.0.1", 0), SmtpSinkHandler)
+
+
+class SmtpSinkHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        sink: SmtpSink = self.server  # type: ignore[assignment]
+        with sink.lock:
+            sink.connections += 1
+        delivered = 0
+        self.reply("220 sink ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip().upper()
+            if command.startswith("EHLO"):
+                self.reply("250-sink\r\n250-AUTH PLAIN LOGIN\r\n250 OK")
+            elif command.startswith("AUTH"):
+                self.reply("235 2.7.0 Authentication successful")
+            elif command.startswith("RCPT") and "<REJECT" in command:
+                self.reply("550 5.1.1 mailbox unavailable")
+            elif command == "DATA":
+                self.reply("354 go ahead")
+                body = []
+                while (data := self.rfile.readline()) not in (b".\r\n", b""):
+                    body.append(data)
+                with sink.lock:
+                    sink.messages.append(b"".join(body))
+                self.reply("250 2.0.0 queued")
+                delivered += 1
+                if sink.messages_per_connection and delivered >= sink.messages_per_connection:
+                    return
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("250 OK")
+
+    def reply(self, text: str) -> None:
+        self.wfile.write(f"{text}\r\n".encode())
+
+
+def _sink_provider(sink: SmtpSink) -> SMTPEmailProvider:
+    return SMTPEmailProvider(
+        smtp_host="127.0.0.1",
+        smtp_port=sink.server_address[1],
+        smtp_user="user",
+        smtp_password="password",
+        smtp_use_tls=False,
+        from_email="noreply@turkspot.nl",
+    )
+
+
+@pytest.fixture
+def smtp_sink():
+    sinks = []
+
+    def start(**kwargs):
+        sink = SmtpSink(**kwargs)
+        threading.Thread(target=sink.serve_forever, daemon=True).start()
+        sinks.append(sink)
+        return sink
+
+    yield start
+    for sink in sinks:
+        sink.shutdown()
+        sink.server_close()
+
+
+@pytest.mark.asyncio
+async def test_send_pool_reuses_smtp_connections(smtp_sink):
+    """Test the pool sends a batch over at most `connections` persistent SMTP connections."""
+    sink = smtp_sink()
+    pool = EmailSendPool(_sink_provider(sink), connections=2, rate_per_sec=0)
+    messages = [EmailMessage(f"user{i}@example.com", f"Subject {i}", f"<p>{i}</p>", str(i)) for i in range(12)]
+    messages[5] = EmailMessage("reject@example.com", "Subject 5", "<p>5</p>")
+
+    try:
+        results = await pool.send_batch(messages)
+        again = await pool.send_batch(messages[:4])
+    finally:
+        pool.close()
+
+    assert [r.to for r in results] == [m.to for m in messages]
+    assert [r.ok for r in results] == [i != 5 for i in range(12)]
+    assert results[5].error_type == "SMTPRecipientsRefused"
+    assert len({r.message_id for r in results if r.ok}) == 11
+    assert all(r.ok for r in again)
+    assert len(sink.messages) == 15
+    assert sink.connections <= 2 and pool.stats["connections_opened"] == sink.connections
+
+
+@pytest.mark.asyncio
+async def test_send_pool_budget_and_reconnect(smtp_sink):
+    """Test the budget caps sends and dropped connections are reopened once."""
+    sink = smtp_sink(messages_per_connection=2)
+    pool = EmailSendPool(_sink_provider(sink), connections=1, rate_per_sec=0)
+    messages = [EmailMessage(f"user{i}@example.com", "Subject", "<p>x</p>") for i in range(8)]
+
+    try:
+        results = await pool.send_batch(messages, budget=5)
+    finally:
+        pool.close()
+
+    assert [r.ok for r in results] == [True] * 5 + [False] * 3
+    assert {r.error_type for r in results[5:]} == {"RateLimited"}
+    assert len(sink.messages) == 5
+    assert pool.stats["reconnects"] == 2 and sink.connections == 3
+
+
+@pytest.mark.asyncio
+async def test_send_pool_rate_limit():
+    """Test the token bucket spaces sends to the configured rate after the burst."""
+    sent_at = []
+    provider = AsyncMock()
+    provider.is_configured = MagicMock(return_value=True)
+
+    async def send_email(**kwargs):
+        sent_at.append(asyncio.get_running_loop().time())
+        return "id"
+
+    provider.send_email = send_email
+    pool = EmailSendPool(provider, connections=4, rate_per_sec=50)
+
+    results = await pool.send_batch([EmailMessage("a@example.com", "s", "b")] * 60)
+
+    assert all(r.ok for r in results)
+    # 50-token burst, then 10 more at 50/s
+    assert sent_at[-1] - sent_at[0] >= 0.18
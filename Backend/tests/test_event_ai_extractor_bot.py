@@ -86,6 +86,7 @@ async def test_run_extractor_creates_event(monkeypatch):
 
     monkeypatch.setattr(bot, "mark_worker_run_running", _noop)
     monkeypatch.setattr(bot, "update_worker_run_progress", _noop)
+    monkeypatch.setattr(bot, "update_event_page_reduced_body", _noop)
     monkeypatch.setattr(bot, "finish_worker_run", fake_finish_worker_run)
     async def fake_fetch_pages(limit):
         return [_make_page()]
@@ -135,6 +136,7 @@ async def test_run_extractor_missing_source_marks_error(monkeypatch):
 
     monkeypatch.setattr(bot, "mark_worker_run_running", _noop)
     monkeypatch.setattr(bot, "update_worker_run_progress", _noop)
+    monkeypatch.setattr(bot, "update_event_page_reduced_body", _noop)
     monkeypatch.setattr(bot, "finish_worker_run", _noop)
 
     async def fake_fetch_pages(limit):
@@ -186,6 +188,7 @@ async def test_run_extractor_handles_ediz(monkeypatch):
 
     monkeypatch.setattr(bot, "mark_worker_run_running", _noop)
     monkeypatch.setattr(bot, "update_worker_run_progress", _noop)
+    monkeypatch.setattr(bot, "update_event_page_reduced_body", _noop)
     monkeypatch.setattr(bot, "finish_worker_run", fake_finish_worker_run)
 
     async def fake_fetch_pages(limit):
@@ -215,3 +218,103 @@ async def test_run_extractor_handles_ediz(monkeypatch):
     assert captured["raw"]
     assert captured["states"][-1][1] == "extracted"
 
+
+
+@pytest.mark.asyncio
+async def test_process_page_sends_reduced_text_and_caches_it(monkeypatch):
+    stored = []
+    calls = []
+
+    class RecordingExtractionService(FakeExtractionService):
+        def extract_events_from_html(self, **kwargs):
+            calls.append(kwargs)
+            return super().extract_events_from_html(**kwargs)
+
+    async def fake_get_source(source_id):
+        return _make_source()
+
+    async def fake_store_reduced(page_id, reduced_body, version):
+        stored.append((page_id, reduced_body, version))
+
+    async def fake_insert_event_raw(raw):
+        return 101
+
+    async def _noop(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(bot, "get_event_source", fake_get_source)
+    monkeypatch.setattr(bot, "update_event_page_reduced_body", fake_store_reduced)
+    monkeypatch.setattr(bot, "insert_event_raw", fake_insert_event_raw)
+    monkeypatch.setattr(bot, "update_event_page_processing_state", _noop)
+
+    page = _make_page()
+    page.response_body = (
+        "<html><head><script>var tracking = 1;</script></head><body>"
+        "<nav><a href='/'>Home</a></nav>"
+        "<h2><a href='/e/1'>Community Night</a></h2><time datetime='2025-01-02T18:00'>2 jan</time>"
+        "</body></html>"
+    )
+    cached = page.model_copy(update={"id": 12, "reduced_body": "## Cached", "reduced_version": bot.REDUCER_VERSION})
+    counters = {
+        "pages_failed": 0, "pages_processed": 0, "chunks_sent": 0, "events_extracted_total": 0,
+        "events_created_new": 0, "events_skipped_existing": 0,
+    }
+    for p in (page, cached):
+        await bot._process_page(
+            p,
+            chunk_size=16000,
+            extraction_service=RecordingExtractionService(),
+            source_cache={},
+            counters=counters,
+        )
+
+    assert [c["content_format"] for c in calls] == ["reduced", "reduced"]
+    assert "tracking" not in calls[0]["html"] and "Home" not in calls[0]["html"]
+    assert "## [Community Night](https://sahmeran.nl/e/1)" in calls[0]["html"]
+    assert "2 jan (2025-01-02T18:00)" in calls[0]["html"]
+    assert calls[1]["html"] == "## Cached"
+    # only the page without a current cached copy is reduced and stored
+    assert stored == [(11, calls[0]["html"], bot.REDUCER_VERSION)]
+    assert counters["chunks_sent"] == 2 and counters["pages_processed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_process_page_falls_back_to_raw_html_without_page_content(monkeypatch):
+    calls = []
+    stored = []
+
+    class RecordingExtractionService(FakeExtractionService):
+        def extract_events_from_html(self, **kwargs):
+            calls.append(kwargs)
+            return super().extract_events_from_html(**kwargs)
+
+    async def fake_store_reduced(page_id, reduced_body, version):
+        stored.append(reduced_body)
+
+    async def fake_insert_event_raw(raw):
+        return 101
+
+    async def _noop(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(bot, "update_event_page_reduced_body", fake_store_reduced)
+    monkeypatch.setattr(bot, "insert_event_raw", fake_insert_event_raw)
+    monkeypatch.setattr(bot, "update_event_page_processing_state", _noop)
+
+    page = _make_page()
+    page.response_body = "<html><head><title>Agenda</title></head><body><div id='app'></div></body></html>"
+    counters = {
+        "pages_failed": 0, "pages_processed": 0, "chunks_sent": 0, "events_extracted_total": 0,
+        "events_created_new": 0, "events_skipped_existing": 0,
+    }
+    await bot._process_page(
+        page,
+        chunk_size=16000,
+        extraction_service=RecordingExtractionService(),
+        source_cache={1: _make_source()},
+        counters=counters,
+    )
+
+    assert stored == [""]
+    assert [(c["content_format"], c["html"]) for c in calls] == [("html", page.response_body)]
+    assert counters["pages_processed"] == 1
@@ -95,5 +95,57 @@ async def test_run_dedupe_keeps_canonical(monkeypatch: pytest.MonkeyPatch) -> No
     assert "duplicate" not in recorded
 
 
+@pytest.mark.asyncio
+async def test_resolve_duplicates_blocks_and_clusters() -> None:
+    existing = _ctx(candidate_id=1, title="Community Meetup")
+    batch = [
+        _ctx(candidate_id=2, title="COMMUNITY MEETUP"),
+        _ctx(candidate_id=3, title="Iftar Dinner", location_text="Mosque"),
+        _ctx(candidate_id=4, title="Iftar dinner 2025", location_text="Mosque"),
+        _ctx(candidate_id=5, title="Community Meetup", city_key="amsterdam"),
+        _ctx(candidate_id=6, title="Community Meetup", start_offset_hours=24 * 10),
+    ]
+
+    results, stats = await event_dedupe_service.resolve_duplicates(batch, pool=[existing])
+
+    assert [(r.candidate_id, r.duplicate_of_id) for r in results] == [
+        (2, 1),
+        (3, None),
+        (4, 3),
+        (5, None),
+        (6, None),
+    ]
+    assert results[3].reason == "no_candidates"  # other city
+    assert results[4].reason == "no_candidates"  # outside the time window
+    # Only the two real duplicate pairs are scored; unrelated titles never share a block
+    assert stats["pairs_compared"] == 2
+    assert stats["duplicates"] == 2
+
+
+@pytest.mark.asyncio
+async def test_run_dedupe_batch_writes_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    batch = [_ctx(candidate_id=8, title="Community Meetup"), _ctx(candidate_id=9, title="Community meetup!")]
+    executed = []
+
+    async def fake_fetch_candidate_contexts(candidate_ids):
+        return batch
+
+    async def fake_fetch_dedupe_pool(contexts):
+        return list(contexts)
+
+    async def fake_execute(sql, *args):
+        executed.append((sql, args))
+
+    monkeypatch.setattr(event_dedupe_service, "_fetch_candidate_contexts", fake_fetch_candidate_contexts)
+    monkeypatch.setattr(event_dedupe_service, "_fetch_dedupe_pool", fake_fetch_dedupe_pool)
+    monkeypatch.setattr(event_dedupe_service, "execute", fake_execute)
 
+    results = await event_dedupe_service.run_dedupe_batch([9, 8, 10])
 
+    assert [r.reason for r in results] == ["duplicate", "no_candidates", "missing_candidate"]
+    assert results[0].duplicate_of_id == 8
+    assert len(executed) == 1
+    sql, args = executed[0]
+    assert "unnest($1::bigint[], $2::bigint[], $3::double precision[])" in sql
+    assert args[0] == [8, 9] and args[1] == [None, 8]
+    assert args[2][0] is None and args[2][1] >= event_dedupe_service.DUPLICATE_SCORE_THRESHOLD
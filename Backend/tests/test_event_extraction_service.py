@@ -45,6 +45,24 @@ def test_extract_events_from_html_calls_openai():
     assert dummy.calls
     call = dummy.calls[0]
     assert call["action_type"] == "events.extract_from_html"
+    assert "HTML snippet:\n<div>Event</div>" in call["user_prompt"]
+
+
+def test_extract_events_labels_reduced_text():
+    dummy = DummyOpenAI()
+    service = EventExtractionService(openai_client=dummy)
+
+    service.extract_events_from_html(
+        html="## Community Night\n[Tickets](https://sahmeran.nl/t)",
+        source_key="sahmeran_events",
+        page_url="https://sahmeran.nl/events",
+        event_source_id=1,
+        content_format="reduced",
+    )
+
+    prompt = dummy.calls[0]["user_prompt"]
+    assert "HTML snippet" not in prompt
+    assert "Page text (reduced from HTML" in prompt
 
 
 def test_extract_events_requires_html():
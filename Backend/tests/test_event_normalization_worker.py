@@ -152,3 +152,56 @@ async def test_run_normalization_handles_normalization_error(monkeypatch):
     assert finished_payload["counters"]["errors"] == 1
 
 
+
+
+@pytest.mark.asyncio
+async def test_run_normalization_dedupes_inserted_candidates_when_run_fails(monkeypatch):
+    raws = [_make_event_raw(id=5), _make_event_raw(id=6, ingest_hash="c" * 40)]
+    source = _make_event_source()
+    deduped = []
+    finished_payload = {}
+    progress_calls = []
+
+    async def fake_fetch_pending(limit):
+        return raws
+
+    async def fake_get_source(source_id):
+        return source
+
+    async def fake_insert_candidate(candidate):
+        return 11
+
+    async def fake_update_state(row_id, *, state, errors):
+        return None
+
+    async def fake_mark(*args, **kwargs):
+        return None
+
+    async def fake_update_progress(run_id, progress):
+        progress_calls.append(progress)
+        if len(progress_calls) == 3:  # start, first row, then fail before the second row
+            raise RuntimeError("worker_runs unavailable")
+
+    async def fake_dedupe(candidate_ids):
+        deduped.append(list(candidate_ids))
+        return []
+
+    async def fake_finish(run_id, status, progress, counters, error_message):
+        finished_payload["status"] = status
+        finished_payload["counters"] = counters
+
+    monkeypatch.setattr(bot, "fetch_pending_event_raw", fake_fetch_pending)
+    monkeypatch.setattr(bot, "get_event_source", fake_get_source)
+    monkeypatch.setattr(bot, "insert_event_candidate", fake_insert_candidate)
+    monkeypatch.setattr(bot, "update_event_raw_processing_state", fake_update_state)
+    monkeypatch.setattr(bot, "mark_worker_run_running", fake_mark)
+    monkeypatch.setattr(bot, "update_worker_run_progress", fake_update_progress)
+    monkeypatch.setattr(bot, "run_dedupe_batch", fake_dedupe)
+    monkeypatch.setattr(bot, "finish_worker_run", fake_finish)
+
+    exit_code = await bot.run_normalization(limit=10, worker_run_id=uuid4())
+
+    assert exit_code == 1
+    assert deduped == [[11]]
+    assert finished_payload["status"] == "failed"
+    assert finished_payload["counters"]["dedupe_checked"] == 1
@@ -10,6 +10,7 @@ from services.event_pages_raw_service import (
     fetch_pending_event_pages,
     insert_event_page_raw,
     update_event_page_processing_state,
+    update_event_page_reduced_body,
 )
 
 
@@ -104,3 +105,19 @@ async def test_update_event_page_processing_state(monkeypatch):
     assert captured["args"][0] == 10
     assert captured["args"][1] == "extracted"
 
+
+@pytest.mark.asyncio
+async def test_update_event_page_reduced_body(monkeypatch):
+    captured = {}
+
+    async def fake_execute(query, *args):
+        captured["query"] = query
+        captured["args"] = args
+
+    monkeypatch.setattr(event_pages_raw_service, "execute", fake_execute)
+
+    await update_event_page_reduced_body(10, "# Title", 1)
+
+    assert "UPDATE event_pages_raw" in captured["query"]
+    assert "reduced_version" in captured["query"]
+    assert captured["args"] == (10, "# Title", 1)
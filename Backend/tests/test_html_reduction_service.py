@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import json
+
+from services.html_reduction_service import chunk_reduced_text, estimate_tokens, reduce_html
+
+PAGE = """<!doctype html>
+<html><head>
+  <title>Agenda | Meervaart</title>
+  <meta name="description" content="Alle voorstellingen">
+  <meta property="og:image" content="/img/og.jpg">
+  <style>.card { color: red; }</style>
+  <script>window.dataLayer = [];</script>
+  <script type="application/ld+json">
+    {"@context": "https://schema.org", "@graph": [
+      {"@type": "WebSite", "name": "Meervaart"},
+      {"@type": "Event", "name": "Sezen Aksu", "startDate": "2025-03-01T20:00"}
+    ]}
+  </script>
+</head>
+<body class="home cookies-not-set">
+  <header class="site-header"><a href="/">Logo</a><nav><a href="/agenda">Agenda</a></nav></header>
+  <div id="cookie-notice">Wij gebruiken cookies <button>Akkoord</button></div>
+  <main>
+    <h1>Agenda</h1>
+    <ul>
+      <li><a href="/e/1"><div class="card"><h3>Sezen Aksu</h3>
+        <p><time datetime="2025-03-01T20:00">za 1 maart</time></p>
+        <img src="data:image/gif;base64,R0lG" data-src="/i/1.jpg" alt="Sezen Aksu"></div></a></li>
+      <li><a href="https://tickets.example/x">Tickets</a> voor <strong>Rode Zaal</strong></li>
+    </ul>
+    <table><tr><th>Datum</th><th>Zaal</th></tr><tr><td>2 mrt</td><td>Rode Zaal</td></tr></table>
+  </main>
+  <footer><a href="/privacy">Privacy</a></footer>
+</body></html>
+"""
+
+
+def test_reduce_html_keeps_structure_and_drops_boilerplate():
+    text = reduce_html(PAGE, page_url="https://meervaart.nl/agenda/")
+
+    assert text.startswith("Title: Agenda | Meervaart\nDescription: Alle voorstellingen\n")
+    assert "Image: https://meervaart.nl/img/og.jpg" in text
+    assert "# Agenda" in text.splitlines()
+    assert "### Sezen Aksu" in text.splitlines()
+    assert "za 1 maart (2025-03-01T20:00)" in text
+    assert "![Sezen Aksu](https://meervaart.nl/i/1.jpg)" in text
+    assert "[link](https://meervaart.nl/e/1)" in text
+    assert "- [Tickets](https://tickets.example/x) voor Rode Zaal" in text
+    assert "Datum | Zaal\n2 mrt | Rode Zaal" in text
+    for dropped in ("dataLayer", "color: red", "Logo", "cookies", "Akkoord", "Privacy", "base64"):
+        assert dropped not in text
+
+
+def test_reduce_html_keeps_json_ld_compact():
+    text = reduce_html(PAGE, page_url="https://meervaart.nl/agenda/")
+    json_ld = text.split("JSON-LD:\n", 1)[1].split("\n\n", 1)[0].splitlines()
+
+    # the WebSite node only describes the site and is skipped
+    assert [json.loads(line)["@type"] for line in json_ld] == ["Event"]
+    assert json_ld[0] == '{"@type":"Event","name":"Sezen Aksu","startDate":"2025-03-01T20:00"}'
+
+
+def test_reduce_html_is_much_smaller_and_empty_for_blank_pages():
+    padded = PAGE.replace("<style>", "<style>" + ".x{margin:0}" * 2000)
+    text = reduce_html(padded, page_url="https://meervaart.nl/agenda/")
+
+    assert estimate_tokens(text) * 10 < estimate_tokens(padded)
+    assert reduce_html("   ") == ""
+    assert reduce_html("<html><body><script>app()</script></body></html>") == ""
+
+
+def test_reduce_html_keeps_form_wrapped_page():
+    page = (
+        "<html><head><title>Agenda</title></head><body><form id='aspnetForm' action='/agenda.aspx'>"
+        "<input type='hidden' name='__VIEWSTATE' value='dDwtMTA4'>"
+        "<h2>Iftar avond</h2><time datetime='2026-03-10T18:00'>10 maart</time>"
+        "<p>Moskee Mevlana, Rotterdam</p><button>Zoeken</button></form></body></html>"
+    )
+    text = reduce_html(page, page_url="https://example.nl/agenda.aspx")
+
+    assert text == "Title: Agenda\n\n## Iftar avond\n10 maart (2026-03-10T18:00)\nMoskee Mevlana, Rotterdam"
+
+
+def test_reduce_html_keeps_cookie_marked_page_wrapper():
+    page = (
+        "<html><head><title>Agenda</title></head><body>"
+        "<div class='page cookie-bar-visible'><main><h2>Iftar avond</h2><p>Moskee Mevlana</p></main>"
+        "<div class='cookie-bar'><p>Wij gebruiken cookies</p></div></div></body></html>"
+    )
+    text = reduce_html(page)
+
+    assert "## Iftar avond\nMoskee Mevlana" in text
+    assert "cookies" not in text
+
+
+def test_reduce_html_is_empty_without_page_content():
+    # title and JSON-LD alone are not page content: callers fall back to the raw HTML
+    shell = (
+        "<html><head><title>Agenda</title>"
+        "<script type='application/ld+json'>{\"@type\": \"Event\", \"name\": \"Iftar\"}</script>"
+        "</head><body><div id='root'></div><script>app()</script></body></html>"
+    )
+    assert reduce_html(shell) == ""
+
+
+def test_chunk_reduced_text_splits_at_headings():
+    events = "\n\n".join(f"## Event {n}\n{'x' * 60}\n[link](https://e.nl/{n})" for n in range(6))
+    chunks = chunk_reduced_text(events, chunk_size=250)
+
+    assert len(chunks) == 3
+    assert all(len(chunk) <= 250 for chunk in chunks)
+    assert all(chunk.startswith("## Event") for chunk in chunks)
+    assert "\n\n".join(chunks) == events
+
+
+def test_chunk_reduced_text_splits_oversized_blocks():
+    block = "## Long\n" + "\n".join(f"line {n} " + "y" * 40 for n in range(10)) + "\n" + "z" * 120
+    chunks = chunk_reduced_text(block, chunk_size=100)
+
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert "".join(c.replace("\n", "") for c in chunks) == block.replace("\n", "")
+    assert chunk_reduced_text("", 100) == []
+    assert chunk_reduced_text("short", 100) == ["short"]
@@ -8,9 +8,12 @@ This test suite ensures that:
 """
 
 import pytest
+from app.core import location_filters
 from app.core.location_filters import (
     get_verified_filter_sql,
     get_verified_filter_params,
+    get_public_map_filter_sql,
+    tile_key_ranges,
     VERIFIED_CONFIDENCE_THRESHOLD,
 )
 
@@ -29,8 +32,9 @@ def test_verified_filter_sql_basic():
     assert params[0] == VERIFIED_CONFIDENCE_THRESHOLD
 
 
-def test_verified_filter_sql_with_bbox():
+def test_verified_filter_sql_with_bbox(monkeypatch):
     """Test verified filter SQL generation with bounding box."""
+    monkeypatch.setattr(location_filters, "LOCATION_TILE_INDEX_ENABLED", True)
     bbox = (51.85, 51.98, 4.35, 4.55)
     sql, params = get_verified_filter_sql(bbox=bbox)
     
@@ -39,7 +43,8 @@ def test_verified_filter_sql_with_bbox():
     assert "lat BETWEEN $2 AND $3" in sql
     assert "lng BETWEEN $4 AND $5" in sql
     
-    assert len(params) == 5  # confidence threshold + 4 bbox values
+    # confidence threshold + 4 bbox values + (lo, hi) per tile_key range
+    assert len(params) == 5 + 2 * len(tile_key_ranges(bbox))
     assert params[0] == VERIFIED_CONFIDENCE_THRESHOLD
     assert params[1] == 51.85  # lat_min
     assert params[2] == 51.98  # lat_max
@@ -126,6 +131,20 @@ def test_filter_sql_combines_conditions():
     assert and_count >= 4  # At least 4 AND operators for base filters
 
 
+def test_public_map_filter_applies_bbox_once():
+    """Public map filter = (VERIFIED OR high-confidence pending) AND bbox."""
+    bbox = (51.85, 51.98, 4.35, 4.55)
+    sql, params = get_public_map_filter_sql(bbox=bbox, alias="l")
+
+    assert sql.startswith("((") and ") OR (" in sql
+    assert "l.state IN ('PENDING_VERIFICATION', 'CANDIDATE')" in sql
+    assert "l.confidence_score >= 0.90" in sql
+    assert sql.count("l.lat BETWEEN") == 1
+    assert "l.lat BETWEEN $2 AND $3" in sql
+    assert "l.lng BETWEEN $4 AND $5" in sql
+    assert params[:5] == [VERIFIED_CONFIDENCE_THRESHOLD, *bbox]
+
+
 @pytest.mark.skip(reason="Requires database connection - integration test")
 def test_admin_api_parity():
     """
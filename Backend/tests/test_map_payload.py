@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+import orjson
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from services import map_payload_service as svc
+
+
+def _row(i: int, lat: float, lng: float, category: str = "restaurant", state: str = "VERIFIED") -> Dict[str, Any]:
+    return {
+        "id": i,
+        "name": f"Loc {i}",
+        "address": None,
+        "lat": lat,
+        "lng": lng,
+        "category": category,
+        "state": state,
+        "confidence_score": 0.9123,
+        "claim_status": "approved" if i == 1 else None,
+    }
+
+
+class FakeLocations:
+    def __init__(self, rows: List[Dict[str, Any]]) -> None:
+        self.rows = rows
+        self.version = 1
+        self.queries: List[tuple] = []
+
+    async def fetch(self, sql, *params):
+        self.queries.append(params)
+        return self.rows
+
+    async def fetchval(self, sql, *params):
+        assert sql is svc.MAP_VERSION_SQL
+        return self.version
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    # Re-check the version on every request so invalidation is visible immediately
+    monkeypatch.setattr(svc, "MAP_CACHE_CHECK_INTERVAL_S", 0.0)
+    svc.reset_map_payload_cache()
+    db = FakeLocations([
+        _row(1, 51.91, 4.47),
+        _row(2, 51.92, 4.48, category="bakery", state="PENDING_VERIFICATION"),
+        _row(3, 52.37, 4.89),  # other tile
+    ])
+    monkeypatch.setattr(svc, "fetch", db.fetch)
+    monkeypatch.setattr(svc, "fetchval", db.fetchval)
+    yield db
+    svc.reset_map_payload_cache()
+
+
+@pytest.mark.asyncio
+async def test_map_payload_is_columnar_and_cached_per_tile(fake_db):
+    bbox = (51.9, 51.95, 4.4, 4.49)
+
+    body, etag = await svc.get_map_payload(bbox)
+    payload = orjson.loads(body)
+
+    assert payload["states"] == list(svc.STATES)
+    assert [t["tile"] for t in payload["tiles"]] == ["207:17"]
+    tile = payload["tiles"][0]
+    assert tile["id"] == [1, 2]
+    assert tile["lat"] == [51.91, 51.92]
+    assert tile["state"] == [0, 1]
+    assert tile["conf"] == [0.912, 0.912]
+    assert tile["badge"] == [1, 0]
+    assert [payload["categories"][c][0] for c in tile["cat"]] == ["restaurant", "bakery"]
+
+    # Second request is served from the tile cache; a matching ETag yields no body
+    body2, etag2 = await svc.get_map_payload(bbox)
+    assert body2 == body and etag2 == etag
+    assert await svc.get_map_payload(bbox, if_none_match=f'"x", {etag}') == (None, etag)
+    assert len(fake_db.queries) == 1
+    assert svc.get_map_payload_stats()["not_modified"] == 1
+
+
+@pytest.mark.asyncio
+async def test_map_payload_invalidates_on_version_bump(fake_db):
+    bbox = (51.9, 51.95, 4.4, 4.49)
+    _, etag = await svc.get_map_payload(bbox)
+
+    fake_db.version = 2
+    fake_db.rows = fake_db.rows[:1]
+    body, new_etag = await svc.get_map_payload(bbox, if_none_match=etag)
+
+    assert new_etag != etag
+    assert orjson.loads(body)["tiles"][0]["id"] == [1]
+    assert len(fake_db.queries) == 2
+    assert svc.get_map_payload_stats()["invalidations"] == 1
+
+
+def test_snap_bbox_rejects_oversized_bbox(monkeypatch):
+    monkeypatch.setattr(svc, "MAP_MAX_TILES", 4)
+    assert svc.snap_bbox_to_tiles((51.9, 52.1, 4.4, 4.6), 0.25) == [(207, 17), (207, 18), (208, 17), (208, 18)]
+    assert svc.snap_bbox_to_tiles(None) == [svc.WORLD_TILE]
+    with pytest.raises(svc.MapBBoxTooLarge):
+        svc.snap_bbox_to_tiles((50.0, 54.0, 3.0, 7.0), 0.25)
+
+
+@pytest.mark.asyncio
+async def test_map_endpoint_sends_etag_and_304(fake_db):
+    from app.main import app
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        resp = await client.get("/api/v1/locations/map", params={"bbox": "4.4,51.9,4.49,51.95"})
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/json"
+        etag = resp.headers["etag"]
+        assert resp.json()["tiles"][0]["id"] == [1, 2]
+
+        resp = await client.get(
+            "/api/v1/locations/map",
+            params={"bbox": "4.4,51.9,4.49,51.95"},
+            headers={"If-None-Match": etag},
+        )
+        assert resp.status_code == 304
+        assert resp.headers["etag"] == etag
+
+        resp = await client.get("/api/v1/locations/map", params={"bbox": "-10,40,20,60"})
+        assert resp.status_code == 400
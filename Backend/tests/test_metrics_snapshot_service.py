@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, List
+
+import pytest
+
+from app.models.metrics import (
+    CityProgress,
+    Discovery,
+    Latency,
+    MetricsSnapshot,
+    Quality,
+    WorkerStatus,
+)
+from services import metrics_service, metrics_snapshot_service
+
+CITIES = {
+    "cities": {
+        "rotterdam": {"districts": {"centrum": {"lat_min": 51.9, "lat_max": 51.93, "lng_min": 4.45, "lng_max": 4.5}}},
+        "den_haag": {"districts": {"centrum": {"lat_min": 52.06, "lat_max": 52.09, "lng_min": 4.28, "lng_max": 4.33}}},
+        "no_districts": {"districts": {}},
+    }
+}
+
+
+def _snapshot(verified: int = 1) -> MetricsSnapshot:
+    return MetricsSnapshot(
+        city_progress=CityProgress(cities={}),
+        quality=Quality(conversion_rate_verified_14d=0.0, task_error_rate_60m=0.0, google429_last60m=0),
+        discovery=Discovery(new_candidates_per_week=verified),
+        latency=Latency(p50_ms=0, avg_ms=0, max_ms=0),
+    )
+
+
+@pytest.fixture(autouse=True)
+def _reset_store():
+    metrics_snapshot_service.reset_metrics_snapshot_state()
+    yield
+    metrics_snapshot_service.reset_metrics_snapshot_state()
+
+
+@pytest.mark.asyncio
+async def test_city_progress_is_one_grouped_query(monkeypatch):
+    calls: List[Any] = []
+
+    async def fake_fetch(sql, *args):
+        calls.append((sql, args))
+        return [
+            {"city_key": "rotterdam", "verified_count": 30, "candidate_count": 10, "cur": 6, "prev": 4, "stale_count": 2},
+            {"city_key": "den_haag", "verified_count": 0, "candidate_count": 5, "cur": 1, "prev": 0, "stale_count": 0},
+        ]
+
+    monkeypatch.setattr(metrics_service, "load_cities_config", lambda: CITIES)
+    monkeypatch.setattr(metrics_service, "fetch", fake_fetch)
+
+    progress = await metrics_service._all_city_progress()
+
+    assert len(calls) == 1
+    sql, args = calls[0]
+    assert "GROUP BY c.city_key" in sql and "l.state = 'VERIFIED'" in sql
+    assert args[1] == ["rotterdam", "den_haag"]  # after the confidence threshold
+    assert progress["rotterdam"] == metrics_service._progress_from_counts(30, 10, 6, 4)
+    assert progress["rotterdam"].coverage_ratio == 0.75 and progress["rotterdam"].growth_weekly == 50.0
+    assert progress["den_haag"].growth_weekly == 100.0
+
+
+@pytest.mark.asyncio
+async def test_generate_runs_sections_concurrently_within_limit(monkeypatch):
+    running = 0
+    peak = 0
+
+    def section(value: Any):
+        async def run(*args, **kwargs):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return value
+
+        return run
+
+    async def city_counts(city_bboxes, stale_days=7):
+        assert set(city_bboxes) == {"rotterdam", "den_haag"}
+        return {"rotterdam": {"verified_count": 3, "candidate_count": 1, "cur": 1, "prev": 1, "stale_count": 4}}
+
+    async def stale(days=7, by_city=None):
+        assert by_city == {}
+        return {"total_stale": 4, "by_source": {"OSM_OVERPASS": 4}, "by_city": {}, "days_threshold": days}
+
+    def status(worker_id):
+        return section(WorkerStatus(
+            id=worker_id, label=worker_id, last_run=None, duration_seconds=None,
+            processed_count=None, error_count=None, status="ok",
+        ))
+
+    monkeypatch.setattr(metrics_service, "METRICS_SNAPSHOT_CONCURRENCY", 3)
+    monkeypatch.setattr(metrics_service, "load_cities_config", lambda: CITIES)
+    monkeypatch.setattr(metrics_service, "_conversion_rate_14d", section(0.5))
+    monkeypatch.setattr(metrics_service, "_task_error_rate", section(0.0))
+    monkeypatch.setattr(metrics_service, "_google429_bursts", section(0))
+    monkeypatch.setattr(metrics_service, "_latency_stats", section((10, 12, 40)))
+    monkeypatch.setattr(metrics_service, "_weekly_candidates_series", section([]))
+    monkeypatch.setattr(metrics_service, "_news_trending_metrics", section(None))
+    monkeypatch.setattr(metrics_service, "_active_worker_runs", section([]))
+    monkeypatch.setattr(metrics_service, "_city_location_counts", city_counts)
+    monkeypatch.setattr(metrics_service, "_stale_candidates_metrics", stale)
+    monkeypatch.setattr(
+        metrics_service,
+        "_WORKER_STATUS_PROBES",
+        tuple((wid, wid, status(wid)) for wid, _, _ in metrics_service._WORKER_STATUS_PROBES),
+    )
+
+    snapshot = await metrics_service.generate_metrics_snapshot()
+
+    assert peak == 3
+    assert [w.id for w in snapshot.workers][-1] == "alert_bot"
+    assert [w.id for w in snapshot.workers][:-1] == [p[0] for p in metrics_service._WORKER_STATUS_PROBES]
+    assert snapshot.city_progress.cities["rotterdam"].coverage_ratio == 0.75
+    assert snapshot.stale_candidates.by_city == {"rotterdam": 4}
+    assert snapshot.latency.p50_ms == 10 and snapshot.quality.conversion_rate_verified_14d == 0.5
+
+
+@pytest.mark.asyncio
+async def test_snapshot_served_from_memory_with_staleness(monkeypatch):
+    generated: List[int] = []
+
+    async def fake_generate():
+        generated.append(1)
+        await asyncio.sleep(0.01)
+        return _snapshot(len(generated))
+
+    monkeypatch.setattr(metrics_snapshot_service, "generate_metrics_snapshot", fake_generate)
+
+    # Concurrent first loads share one generation run
+    first = await asyncio.gather(*(metrics_snapshot_service.get_metrics_snapshot() for _ in range(5)))
+    assert len(generated) == 1
+    assert all(s.discovery.new_candidates_per_week == 1 for s in first)
+    assert first[0].generated_at is not None and first[0].stale is False and first[0].age_seconds < 1
+
+    again = await metrics_snapshot_service.get_metrics_snapshot()
+    assert len(generated) == 1 and again.generated_at == first[0].generated_at
+
+    refreshed = await metrics_snapshot_service.get_metrics_snapshot(refresh=True)
+    assert len(generated) == 2 and refreshed.discovery.new_candidates_per_week == 2
+
+    # Old snapshot: served immediately and flagged, refreshed in the background
+    monkeypatch.setattr(metrics_snapshot_service, "_generated_mono", metrics_snapshot_service._generated_mono - 600)
+    old = await metrics_snapshot_service.get_metrics_snapshot()
+    assert old.stale is True and old.age_seconds >= 600 and old.discovery.new_candidates_per_week == 2
+    background = metrics_snapshot_service._background_task
+    assert background is not None
+    await background
+    assert len(generated) == 3
+    assert metrics_snapshot_service.get_metrics_snapshot_stats()["refreshes"] == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_last_snapshot(monkeypatch):
+    fail = False
+
+    async def fake_generate():
+        if fail:
+            raise RuntimeError("db down")
+        return _snapshot()
+
+    monkeypatch.setattr(metrics_snapshot_service, "generate_metrics_snapshot", fake_generate)
+    monkeypatch.setattr(metrics_snapshot_service, "METRICS_SNAPSHOT_REFRESH_S", 0.01)
+
+    metrics_snapshot_service.start_metrics_snapshot_refresher()
+    await asyncio.sleep(0.02)
+    fail = True
+    await asyncio.sleep(0.05)
+    await metrics_snapshot_service.stop_metrics_snapshot_refresher()
+
+    stats = metrics_snapshot_service.get_metrics_snapshot_stats()
+    assert stats["refreshes"] >= 1 and stats["failures"] >= 1 and stats["last_error"] == "db down"
+    served = await metrics_snapshot_service.get_metrics_snapshot()
+    assert served.discovery.new_candidates_per_week == 1
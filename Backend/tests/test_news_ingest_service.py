@@ -1,17 +1,20 @@
 from __future__ import annotations
 
 import time
+from datetime import datetime, timezone
 from types import SimpleNamespace
 
+import httpx
 import pytest
 
 from app.models.news_sources import NewsSource
 from services import news_ingest_service
-from services.news_ingest_service import NewsIngestService, ingest_all_sources
+from services.news_ingest_service import FeedNotModified, NewsIngestService, ingest_all_sources
 
 
 def _make_source(name: str = "Test Source") -> NewsSource:
     return NewsSource(
+        key=name.replace(" ", "_").lower(),
         name=name,
         url=f"https://{name.replace(' ', '').lower()}.example/rss",
         language="nl",
@@ -31,15 +34,21 @@ async def test_ingest_source_persists_entries(monkeypatch):
     inserts: list[str] = []
 
     async def fake_execute(query, *args):
-        inserts.append(query)
         return "INSERT 0 1"
 
+    async def fake_fetch(query, *args):
+        inserts.append(query)
+        return [{"link": link} for link in args[10]]
+
     async def fake_fetchrow(query, *args):
         return None
 
     async def fake_fetch_feed(self, source):
         return b"<rss></rss>"
 
+    async def fake_legal_gate(self, source):
+        return None
+
     dummy_entry = {
         "title": "Hello World",
         "link": "https://example.com/hello",
@@ -51,8 +60,10 @@ async def test_ingest_source_persists_entries(monkeypatch):
     dummy_feed = SimpleNamespace(entries=[dummy_entry])
 
     monkeypatch.setattr(news_ingest_service, "execute", fake_execute)
+    monkeypatch.setattr(news_ingest_service, "fetch", fake_fetch)
     monkeypatch.setattr(news_ingest_service, "fetchrow", fake_fetchrow)
     monkeypatch.setattr(NewsIngestService, "_fetch_feed", fake_fetch_feed, raising=False)
+    monkeypatch.setattr(NewsIngestService, "_enforce_legal_gate", fake_legal_gate, raising=False)
     monkeypatch.setattr(news_ingest_service.feedparser, "parse", lambda raw: dummy_feed)
 
     source = _make_source()
@@ -64,6 +75,159 @@ async def test_ingest_source_persists_entries(monkeypatch):
     assert any("raw_ingested_news" in query for query in inserts)
 
 
+@pytest.mark.asyncio
+async def test_conditional_get_skips_unchanged_feed(monkeypatch):
+    source = _make_source()
+    sent_headers: list[dict] = []
+    saved_state: list[tuple] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "GET":
+            sent_headers.append(dict(request.headers))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=b"<rss></rss>", headers={"ETag": '"v1"', "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"})
+
+    async def fake_fetchrow(query, *args):
+        if saved_state:
+            return {"next_refresh_at": None, "etag": saved_state[-1][9], "last_modified": saved_state[-1][10]}
+        return None
+
+    async def fake_execute(query, *args):
+        if "news_source_state" in query:
+            saved_state.append(args)
+        return "INSERT 0 1"
+
+    async def fake_fetch(query, *args):
+        return []
+
+    def fail_parse(raw):
+        raise AssertionError("304 responses must not be parsed")
+
+    monkeypatch.setattr(news_ingest_service, "execute", fake_execute)
+    monkeypatch.setattr(news_ingest_service, "fetch", fake_fetch)
+    monkeypatch.setattr(news_ingest_service, "fetchrow", fake_fetchrow)
+
+    async with NewsIngestService() as service:
+        await service._client.aclose()
+        service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        first = await service.ingest_source(source)
+        assert first["skipped"] is False
+        assert saved_state[-1][9:] == ('"v1"', "Wed, 01 Jan 2025 00:00:00 GMT")
+
+        monkeypatch.setattr(news_ingest_service.feedparser, "parse", fail_parse)
+        with pytest.raises(FeedNotModified):
+            await service._fetch_feed(source)
+        second = await service.ingest_source(source)
+
+    assert "if-none-match" not in sent_headers[0]
+    assert sent_headers[1]["if-none-match"] == '"v1"'
+    assert sent_headers[1]["if-modified-since"] == "Wed, 01 Jan 2025 00:00:00 GMT"
+    assert second == {"source_key": first["source_key"], "skipped": True, "not_modified": True, "inserted": 0, "failed_items": 0}
+    assert service.stats["not_modified"] == 1
+    assert service.stats["bytes_fetched"] == len(b"<rss></rss>")
+    # Validators survive the 304 so the next run sends them again
+    assert saved_state[-1][9] == '"v1"'
+
+
+@pytest.mark.asyncio
+async def test_persist_items_is_one_statement(monkeypatch):
+    calls: list[tuple] = []
+
+    async def fake_fetch(query, *args):
+        calls.append((query, args))
+        # Second link counts as already ingested in the last 24 hours
+        return [{"link": args[10][0]}, {"link": args[10][2]}]
+
+    monkeypatch.setattr(news_ingest_service, "fetch", fake_fetch)
+    source = _make_source()
+    service = NewsIngestService()
+    rows = [
+        {
+            "source_key": "test", "source_name": source.name, "source_url": source.url,
+            "category": source.category, "language": source.language, "region": source.region,
+            "title": f"Item {i}", "summary": None, "link": f"https://example.com/{i}",
+            "published_at": datetime(2025, 1, 1, tzinfo=timezone.utc),
+            "raw_entry": {"i": i}, "ingest_hash": f"{i:040d}",
+        }
+        for i in range(3)
+    ]
+
+    inserted, failed = await service._persist_items(rows)
+
+    assert (inserted, failed) == (2, 0) and len(calls) == 1
+    query, args = calls[0]
+    assert "ON CONFLICT (source_key, ingest_hash) DO NOTHING" in query
+    assert "INTERVAL '24 hours'" in query and "RETURNING" in query
+    assert args[6] == ["Item 0", "Item 1", "Item 2"]
+    assert args[14] == ['{"i": 0}', '{"i": 1}', '{"i": 2}']
+    assert service.stats["rows_persisted"] == 2
+    assert await service._persist_items([]) == (0, 0) and len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_persist_failure_keeps_previous_validators(monkeypatch):
+    source = _make_source()
+    sent_headers: list[dict] = []
+    saved_state: list[tuple] = []
+    batches: list[list] = []
+    bad_link = "https://example.com/bad"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent_headers.append(dict(request.headers))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=b"<rss></rss>", headers={"ETag": '"v1"'})
+
+    async def fake_fetchrow(query, *args):
+        if "consecutive_failures" in query:
+            return None
+        if saved_state:
+            return {"next_refresh_at": None, "etag": saved_state[-1][9], "last_modified": saved_state[-1][10]}
+        return None
+
+    async def fake_execute(query, *args):
+        if "etag" in query:
+            saved_state.append(args)
+        return "INSERT 0 1"
+
+    async def fake_fetch(query, *args):
+        links = list(args[10])
+        batches.append(links)
+        if bad_link in links:
+            raise ValueError("invalid byte sequence")
+        return [{"link": link} for link in links]
+
+    entries = [
+        {"title": f"Item {i}", "link": link, "summary": "s", "published_parsed": time.gmtime(0)}
+        for i, link in enumerate(["https://example.com/ok", bad_link])
+    ]
+    monkeypatch.setattr(news_ingest_service, "execute", fake_execute)
+    monkeypatch.setattr(news_ingest_service, "fetch", fake_fetch)
+    monkeypatch.setattr(news_ingest_service, "fetchrow", fake_fetchrow)
+    monkeypatch.setattr(news_ingest_service.feedparser, "parse", lambda raw: SimpleNamespace(entries=entries))
+
+    async def no_legal_gate(self, source):
+        return None
+
+    monkeypatch.setattr(NewsIngestService, "_enforce_legal_gate", no_legal_gate)
+
+    async with NewsIngestService() as service:
+        await service._client.aclose()
+        service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        first = await service.ingest_source(source)
+        second = await service.ingest_source(source)
+
+    # batch failed, per-row fallback kept the good row and counted the bad one
+    assert batches[:3] == [["https://example.com/ok", bad_link], ["https://example.com/ok"], [bad_link]]
+    assert first["inserted"] == 1 and first["failed_items"] == 1
+    # the new ETag was not saved, so the second run fetched the feed again in full
+    assert saved_state == []
+    assert "if-none-match" not in sent_headers[0]
+    assert "if-none-match" not in sent_headers[1]
+    assert second["skipped"] is False and second["failed_items"] == 1
+
+
 @pytest.mark.asyncio
 async def test_ingest_all_sources_flags_degraded(monkeypatch):
     source = _make_source()
@@ -3,11 +3,14 @@ from __future__ import annotations
 import json
 from pathlib import Path
 
+from app.models import news_city_tags as city_tags
+from services import news_location_tagging as tagging
 from services.news_location_tagging import (
     TAG_LOCAL,
     TAG_NONE,
     TAG_ORIGIN,
     derive_location_tag,
+    derive_location_tags,
 )
 
 FIXTURES = json.loads(
@@ -54,5 +57,87 @@ def test_conflicting_countries_fall_back_to_none():
     assert tag == TAG_NONE
 
 
+def _legacy_text_matches(text, config_path):
+    """The original per-alias scan the compiled matcher replaces."""
+    tokens = tagging._normalize_text_to_tokens(text)
+    normalized_text = f" {' '.join(tokens)} "
+    matches = []
+    for country, confidence in (("nl", 0.8), ("tr", 0.7)):
+        for alias, tag in city_tags.get_aliases(country, path=config_path).items():
+            matched = next((t for t in tokens if t.startswith(alias)), None)
+            if matched is None and f" {alias} " in normalized_text:
+                matched = alias
+            if matched is not None:
+                matches.append(
+                    {
+                        "city_key": tag.city_key,
+                        "country": tag.country,
+                        "confidence": confidence,
+                        "source": "text",
+                        "alias": alias,
+                        "token": matched,
+                    }
+                )
+    return matches
 
 
+def test_compiled_matcher_matches_alias_scan(tmp_path: Path):
+    cfg = tmp_path / "news_city_tags.yml"
+    cfg.write_text(
+        """
+version: 1
+nl:
+  - city_key: den_haag
+    aliases: ["Den Haag", "s-Gravenhage", "haag"]
+  - city_key: rotterdam
+    aliases: ["Rotterdam", "r'dam", "rdam"]
+  - city_key: rotterdam_south
+    aliases: ["Rotterdam Zuid", "rotterdam-zuid"]
+tr:
+  - city_key: istanbul
+    aliases: ["İstanbul", "istanbul"]
+  - city_key: ankara
+    aliases: ["Ankara"]
+""",
+        encoding="utf-8",
+    )
+    texts = [
+        "Rotterdam-Zuid en Rotterdammers vieren feest in Den Haag",
+        "Istanbulse koffie in 's-Gravenhage, niet in Ankara of R'dam",
+        "den den haag haagse",
+        "Geen steden hier",
+        "",
+    ]
+    city_tags.clear_city_tags_cache()
+    try:
+        for text in texts:
+            assert tagging._extract_text_matches(text, config_path=cfg) == _legacy_text_matches(text, cfg)
+
+        first = tagging.get_alias_matcher(cfg)
+        assert tagging.get_alias_matcher(cfg) is first
+        city_tags.clear_city_tags_cache()
+        assert tagging.get_alias_matcher(cfg) is not first
+    finally:
+        city_tags.clear_city_tags_cache()
+
+
+def test_batch_matches_single_calls():
+    articles = [
+        {**FIXTURES[key], "ai_mentions": mentions}
+        for key, mentions in (
+            ("local", [{"city_key": "rotterdam", "country": "nl", "confidence": 0.92}]),
+            ("origin", None),
+            ("none", []),
+        )
+    ]
+    expected = [
+        derive_location_tag(
+            title=article["title"],
+            summary=article["summary"],
+            content=article["content"],
+            ai_mentions=article["ai_mentions"],
+        )
+        for article in articles
+    ]
+    assert derive_location_tags(articles) == expected
+    assert [tag for tag, _ in expected] == [TAG_LOCAL, TAG_ORIGIN, TAG_NONE]
@@ -10,6 +10,7 @@ from services.news_pages_raw_service import (
     fetch_pending_news_pages,
     insert_news_page_raw,
     update_news_page_processing_state,
+    update_news_page_reduced_body,
 )
 
 
@@ -124,19 +125,19 @@ async def test_update_news_page_processing_state_invalid(monkeypatch):
         )
 
 
+@pytest.mark.asyncio
+async def test_update_news_page_reduced_body(monkeypatch):
+    """Test that the reduced text and its version are stored on the page."""
+    captured = {}
 
+    async def fake_execute(query, *args):
+        captured["query"] = query
+        captured["args"] = args
 
+    monkeypatch.setattr(news_pages_raw_service, "execute", fake_execute)
 
+    await update_news_page_reduced_body(10, "# Title", 1)
 
-
-
-
-
-
-
-
-
-
-
-
-
+    assert "UPDATE news_pages_raw" in captured["query"]
+    assert "reduced_version" in captured["query"]
+    assert captured["args"] == (10, "# Title", 1)
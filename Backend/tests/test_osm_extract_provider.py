@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import gzip
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+from app.services.provider_factory import get_places_provider
+from app.workers import discovery_bot
+from app.workers.discovery_bot import DiscoveryBot, DiscoveryConfig
+from services import osm_service
+from services.osm_extract_service import OsmExtractPlacesService
+from services.osm_service import OsmPlacesService
+from tests.test_discovery_union_mode import FakeOverpass
+
+SAMPLE = Path(__file__).parent / "fixtures" / "osm_extract_rotterdam_sample.jsonl.gz"
+CATEGORY_TAGS = {
+    "restaurant": [{"any": [{"amenity": "restaurant"}]}],
+    "mosque": [{"all": [{"amenity": "place_of_worship"}, {"religion": "muslim"}]}],
+    "automotive": [{"any": [{"shop": "car"}, {"shop": "car_dealer"}, {"shop": "car_repair"}]}],
+}
+
+
+def _sample_elements() -> List[Dict[str, Any]]:
+    with gzip.open(SAMPLE, "rt", encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh]
+
+
+@pytest.fixture(autouse=True)
+def _no_overpass_delay(monkeypatch):
+    monkeypatch.setattr(osm_service, "DEFAULT_MIN_DELAY_SECONDS", 0)
+
+
+def test_factory_selects_provider(tmp_path):
+    assert type(get_places_provider("overpass")) is OsmPlacesService
+    provider = get_places_provider("osm_extract", extract_path=str(SAMPLE), max_results=7)
+    assert isinstance(provider, OsmExtractPlacesService) and provider.max_results == 7
+    with pytest.raises(ValueError):
+        get_places_provider("google")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("hints", [False, True])
+async def test_extract_search_matches_overpass(monkeypatch, hints):
+    async def no_log(**kwargs):
+        return None
+
+    overpass = OsmPlacesService(turkish_hints=hints)
+    await overpass.aclose()
+    monkeypatch.setattr(overpass, "_client", FakeOverpass(_sample_elements()))
+    monkeypatch.setattr(overpass, "_log_overpass_call", no_log)
+    extract = OsmExtractPlacesService(
+        str(SAMPLE), category_osm_tags=list(CATEGORY_TAGS.values()), turkish_hints=hints
+    )
+
+    cases = [([tags], 20) for tags in CATEGORY_TAGS.values()]
+    cases += [(list(CATEGORY_TAGS.values()), 60), (None, 10)]  # union query, catch-all fallback
+    for lat, lng in [(51.92, 4.48), (51.95, 4.43), (51.88, 4.52)]:
+        for category_osm_tags, max_results in cases:
+            kwargs = dict(lat=lat, lng=lng, radius=1000, max_results=max_results,
+                          category_osm_tags=category_osm_tags, include_tags=True)
+            assert await extract.search_nearby(**kwargs) == await overpass.search_nearby(**kwargs)
+
+    # Only POIs are kept in memory
+    assert extract.stats["scanned"] == len(_sample_elements())
+    assert 0 < extract.stats["kept"] < extract.stats["scanned"] / 3
+    await extract.aclose()
+
+
+@pytest.mark.asyncio
+async def test_discovery_bot_runs_city_from_extract(monkeypatch):
+    inserted: List[Dict[str, Any]] = []
+
+    async def fake_ingest(rows):
+        inserted.extend(rows)
+        return {"discovered": len(rows), "inserted": len(rows)}
+
+    monkeypatch.setattr(discovery_bot, "ingest_candidates", fake_ingest)
+    categories = {key: {"osm_tags": tags[0]} for key, tags in CATEGORY_TAGS.items()}
+    cfg = DiscoveryConfig(
+        city="rotterdam", categories=list(categories), center_lat=51.92, center_lng=4.48,
+        nearby_radius_m=1000, grid_span_km=4.0, max_per_cell_per_category=20,
+        inter_call_sleep_s=0, max_total_inserts=0, max_cells_per_category=0, chunks=1,
+        chunk_index=0, language=None, osm_extract=str(SAMPLE),
+    )
+    bot = DiscoveryBot(cfg, {"categories": categories})
+    assert isinstance(bot.osm_service, OsmExtractPlacesService)
+
+    await bot.run()
+    await bot.osm_service.aclose()
+
+    place_ids = [r["place_id"] for r in inserted]
+    assert len(place_ids) == len(set(place_ids)) > 100
+    assert {r["category"] for r in inserted} == set(categories)
+    assert all(r["source"] == "OSM_OVERPASS" for r in inserted)
+
+
+@pytest.mark.asyncio
+async def test_pbf_extract(tmp_path):
+    osmium = pytest.importorskip("osmium")
+    path = tmp_path / "sample.osm.pbf"
+    writer = osmium.SimpleWriter(str(path))
+    writer.add_node(osmium.osm.mutable.Node(id=1, location=(4.48, 51.92), tags={"shop": "bakery", "name": "Simit"}))
+    writer.add_node(osmium.osm.mutable.Node(id=2, location=(4.481, 51.921), tags={}))
+    writer.add_node(osmium.osm.mutable.Node(id=3, location=(4.483, 51.923), tags={}))
+    writer.add_node(osmium.osm.mutable.Node(id=4, location=(4.49, 51.93), tags={"natural": "tree"}))
+    writer.add_way(osmium.osm.mutable.Way(id=10, nodes=[2, 3], tags={"amenity": "restaurant", "name": "Lokanta"}))
+    writer.close()
+
+    provider = OsmExtractPlacesService(str(path), category_osm_tags=[], turkish_hints=False)
+    results, capped = await provider.search_nearby(lat=51.92, lng=4.48, radius=1000)
+
+    assert [(r["id"], r["displayName"]["text"]) for r in results] == [("node/1", "Simit"), ("way/10", "Lokanta")]
+    assert results[1]["location"] == pytest.approx({"lat": 51.922, "lng": 4.482})
+    assert capped is False and provider.stats["kept"] == 2
+    await provider.aclose()
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, List
+
+import httpx
+import pytest
+
+from services import osm_service
+from services.osm_service import OsmPlacesService, OverpassCacheMiss, OverpassResponseCache
+
+ELEMENTS = [
+    {"type": "node", "id": 1, "lat": 51.92, "lon": 4.48, "tags": {"shop": "bakery", "name": "Simit Sarayı"}},
+    {"type": "way", "id": 2, "center": {"lat": 51.93, "lon": 4.47}, "tags": {"amenity": "restaurant", "name": "Ocakbaşı"}},
+]
+
+
+class FakeClient:
+    def __init__(self, payload: Dict[str, Any]) -> None:
+        self.payload = payload
+        self.queries: List[str] = []
+
+    async def post(self, url, data=None, headers=None):
+        self.queries.append(data["data"])
+        return httpx.Response(200, json=self.payload, request=httpx.Request("POST", url))
+
+
+@pytest.fixture(autouse=True)
+def _no_overpass_delay(monkeypatch):
+    monkeypatch.setattr(osm_service, "DEFAULT_MIN_DELAY_SECONDS", 0)
+    # Tests below fake time.time(); keep their request timestamps out of the shared table
+    monkeypatch.setattr(osm_service, "_endpoint_last_request", {})
+
+
+async def _service(monkeypatch, cache: OverpassResponseCache, mode: str, payload=None, **kwargs) -> OsmPlacesService:
+    async def no_log(**kw):
+        return None
+
+    svc = OsmPlacesService(cache_mode=mode, response_cache=cache, turkish_hints=False, **kwargs)
+    await svc.aclose()
+    monkeypatch.setattr(svc, "_client", FakeClient(payload or {"elements": ELEMENTS}))
+    monkeypatch.setattr(svc, "_log_overpass_call", no_log)
+    return svc
+
+
+def test_cache_key_ignores_endpoint_timeout_and_whitespace():
+    svc = OsmPlacesService(turkish_hints=False)
+    tags = [[{"any": [{"shop": "bakery"}]}]]
+    q1 = svc._build_union_query(51.92, 4.48, 1000, tags, 20, timeout_s=25)
+    q2 = svc._build_union_query(51.92, 4.48, 1000, tags, 20, timeout_s=60)
+
+    assert OverpassResponseCache.key_for(q1) == OverpassResponseCache.key_for(q2)
+    assert OverpassResponseCache.key_for(q1) == OverpassResponseCache.key_for(q1.replace("\n", "\n  "))
+    assert OverpassResponseCache.key_for(q1) != OverpassResponseCache.key_for(q1.replace("bakery", "butcher"))
+
+
+@pytest.mark.asyncio
+async def test_readwrite_serves_second_call_from_cache(monkeypatch, tmp_path):
+    cache = OverpassResponseCache(str(tmp_path), ttl_s=3600, max_bytes=10 * 1024 * 1024)
+    svc = await _service(monkeypatch, cache, "readwrite")
+
+    first = await svc.search_nearby(lat=51.92, lng=4.48, radius=1000, max_results=2)
+    # A different mirror shares the entry
+    svc.endpoint = "https://overpass.example.org/api/interpreter"
+    second = await svc.search_nearby(lat=51.92, lng=4.48, radius=1000, max_results=2)
+
+    assert first == second
+    assert [p["id"] for p in first[0]] == ["node/1", "way/2"] and first[1] is True
+    assert len(svc._client.queries) == 1
+    assert cache.stats["hits"] == 1 and cache.stats["stores"] == 1
+
+
+@pytest.mark.asyncio
+async def test_replay_serves_recorded_responses_and_fails_on_miss(monkeypatch, tmp_path):
+    cache = OverpassResponseCache(str(tmp_path), ttl_s=1, max_bytes=0)
+    recorder = await _service(monkeypatch, cache, "record")
+    recorded = await recorder.search_nearby(lat=51.92, lng=4.48, radius=1000, max_results=20)
+
+    # Replay ignores the TTL and never touches the network
+    monkeypatch.setattr(osm_service.time, "time", lambda: 4102444800.0)
+    replayer = await _service(monkeypatch, cache, "replay")
+    assert await replayer.search_nearby(lat=51.92, lng=4.48, radius=1000, max_results=20) == recorded
+    assert replayer._client.queries == []
+
+    with pytest.raises(OverpassCacheMiss):
+        await replayer.search_nearby(lat=52.37, lng=4.89, radius=1000, max_results=20)
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_and_error_remarks_are_refetched(monkeypatch, tmp_path):
+    cache = OverpassResponseCache(str(tmp_path), ttl_s=3600, max_bytes=0)
+    svc = await _service(monkeypatch, cache, "readwrite",
+                         payload={"elements": [], "remark": "runtime error: Query timed out"})
+    await svc.search_nearby(lat=51.92, lng=4.48, radius=1000)
+    await svc.search_nearby(lat=51.92, lng=4.48, radius=1000)
+    assert len(svc._client.queries) == 2 and cache.stats["stores"] == 0
+
+    svc._client.payload = {"elements": ELEMENTS}
+    await svc.search_nearby(lat=51.92, lng=4.48, radius=1000)
+    monkeypatch.setattr(cache, "ttl_s", -1)  # <= 0 disables expiry
+    await svc.search_nearby(lat=51.92, lng=4.48, radius=1000)
+    assert len(svc._client.queries) == 3
+
+    monkeypatch.setattr(cache, "ttl_s", 1)
+    monkeypatch.setattr(osm_service.time, "time", lambda: 4102444800.0)
+    await svc.search_nearby(lat=51.92, lng=4.48, radius=1000)
+    assert len(svc._client.queries) == 4 and cache.stats["expired"] == 1
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path):
+    cache = OverpassResponseCache(str(tmp_path), ttl_s=0, max_bytes=0)
+    payload = {"elements": [{"type": "node", "id": i, "tags": {"name": os.urandom(200).hex()}} for i in range(5)]}
+    for i in range(4):
+        cache.put(f"query {i}", payload)
+        path = cache._path(cache.key_for(f"query {i}"))
+        os.utime(path, (1000 + i, 1000 + i))
+    cache.get("query 0")  # touch: now the most recently used
+
+    entry_size = cache._path(cache.key_for("query 0")).stat().st_size
+    cache.max_bytes = int(entry_size * 3.5)
+    cache.put("query 4", payload)
+
+    assert cache.get("query 0") is not None and cache.get("query 4") is not None
+    assert cache.get("query 1") is None and cache.get("query 2") is None
+    assert cache.stats["evictions"] == 2
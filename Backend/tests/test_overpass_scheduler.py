@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Dict, List
+
+import httpx
+import pytest
+
+from app.workers import discovery_bot
+from app.workers.discovery_bot import DiscoveryBot, DiscoveryConfig
+from services import osm_service
+from services.osm_service import OsmPlacesService
+from services.overpass_scheduler import OverpassMirrorScheduler
+from tests.test_discovery_union_mode import CATEGORIES, FIXTURE, FakeOverpass
+
+MIRRORS = ["http://fast.test/api", "http://slow.test/api", "http://limited.test/api"]
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeMirrors:
+    """Local Overpass mirrors with per-endpoint latency and status profiles."""
+
+    def __init__(self, profiles: Dict[str, Dict[str, Any]]) -> None:
+        self.profiles = profiles
+        self.requests: Dict[str, int] = {url: 0 for url in profiles}
+        self.in_flight: Dict[str, int] = {url: 0 for url in profiles}
+        self.max_in_flight: Dict[str, int] = {url: 0 for url in profiles}
+
+    async def post(self, url, data=None, headers=None):
+        profile = self.profiles[url]
+        self.requests[url] += 1
+        self.in_flight[url] += 1
+        self.max_in_flight[url] = max(self.max_in_flight[url], self.in_flight[url])
+        try:
+            await asyncio.sleep(profile["latency_s"])
+        finally:
+            self.in_flight[url] -= 1
+        request = httpx.Request("POST", url)
+        status = profile.get("status", 200)
+        if status != 200:
+            return httpx.Response(status, headers={"Retry-After": "1"}, text="busy", request=request)
+        element = {"type": "node", "id": self.requests[url], "lat": 51.92, "lon": 4.48, "tags": {"shop": "bakery"}}
+        return httpx.Response(200, json={"elements": [element]}, request=request)
+
+
+def test_aimd_window_grows_on_fast_success_and_backs_off():
+    clock = FakeClock()
+    scheduler = OverpassMirrorScheduler(["m"], min_interval_s=1, max_window=4, latency_target_ms=1000, clock=clock)
+    mirror = scheduler.mirrors["m"]
+
+    for _ in range(20):
+        scheduler.observe("m", 200, 200)
+    assert mirror.window == 4
+
+    scheduler.observe("m", 200, 5000)  # slower than the target
+    assert mirror.window == 2
+    scheduler.observe("m", 400, 10)  # query error: no signal about the mirror
+    assert mirror.window == 2
+
+    scheduler.observe("m", 429, 50, retry_after_s=30)
+    assert mirror.window == 1 and mirror.cooldown_until == clock.now + 30
+    scheduler.observe("m", 504, 45000)
+    assert mirror.window == 1 and mirror.errors == 1 and mirror.rate_limited == 1
+
+
+@pytest.mark.asyncio
+async def test_acquire_spreads_over_mirrors_and_honours_exclude():
+    scheduler = OverpassMirrorScheduler(["a", "b"], min_interval_s=0.05, max_window=2)
+
+    first = await scheduler.acquire()
+    second = await scheduler.acquire()
+    assert {first, second} == {"a", "b"}  # the other mirror has a token right now
+    await scheduler.release(first)
+    await scheduler.release(second)
+
+    picked = await scheduler.acquire(exclude=["a"])
+    assert picked == "b"
+    await scheduler.release(picked)
+    picked = await scheduler.acquire(exclude=["a", "b"])  # all failed: any mirror
+    await scheduler.release(picked)
+
+    # A mirror in cooldown is skipped; a full window blocks until release()
+    scheduler.mirrors["a"].cooldown_until = time.monotonic() + 60
+    assert await scheduler.acquire() == "b"
+    waiter = asyncio.create_task(scheduler.acquire())
+    await asyncio.sleep(0.1)
+    assert not waiter.done()
+    await scheduler.release("b")
+    assert await asyncio.wait_for(waiter, 1) == "b"
+
+
+@pytest.mark.asyncio
+async def test_cells_are_requeued_on_healthy_mirrors(monkeypatch):
+    async def no_db(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr("services.db_service.execute", no_db)
+    mirrors = FakeMirrors({
+        MIRRORS[0]: {"latency_s": 0.01},
+        MIRRORS[1]: {"latency_s": 0.05},
+        MIRRORS[2]: {"latency_s": 0.01, "status": 429},
+    })
+    scheduler = OverpassMirrorScheduler(MIRRORS, min_interval_s=0.005, max_window=3, latency_target_ms=1000)
+    svc = OsmPlacesService(scheduler=scheduler, turkish_hints=False)
+    await svc.aclose()
+    svc._client = mirrors
+
+    results = await asyncio.gather(*(
+        svc.search_nearby(lat=51.92 + i * 0.001, lng=4.48, radius=500, max_results=5) for i in range(30)
+    ))
+
+    assert all(len(places) == 1 for places, _ in results)
+    stats = {m["endpoint"]: m for m in scheduler.stats()}
+    assert stats[MIRRORS[2]]["rate_limited"] >= 1 and stats[MIRRORS[2]]["window"] == 1
+    assert stats[MIRRORS[2]]["successes"] == 0
+    assert mirrors.requests[MIRRORS[2]] <= 3  # paused by Retry-After after the first 429s
+    assert mirrors.max_in_flight[MIRRORS[0]] > 1  # the fast mirror's window opened up
+    assert stats[MIRRORS[0]]["successes"] + stats[MIRRORS[1]]["successes"] == 30
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("osm_mode", ["union", "per_category"])
+async def test_discovery_with_scheduler_matches_serial_candidates(monkeypatch, osm_mode):
+    monkeypatch.setattr(osm_service, "DEFAULT_MIN_DELAY_SECONDS", 0)
+    monkeypatch.setattr(discovery_bot, "OVERPASS_SCHEDULER_MAX_INFLIGHT_CELLS", 4)
+    points = [(51.92 + dy, 4.48 + dx) for dy in (-0.006, 0.0, 0.006) for dx in (-0.01, 0.0, 0.01)]
+
+    async def run(scheduler):
+        inserted: List[Dict[str, Any]] = []
+
+        async def fake_ingest(rows):
+            inserted.extend(rows)
+            return {"inserted": len(rows)}
+
+        async def no_log(**kwargs):
+            return None
+
+        monkeypatch.setattr(discovery_bot, "ingest_candidates", fake_ingest)
+        cfg = DiscoveryConfig(
+            city="rotterdam", categories=list(CATEGORIES), center_lat=51.92, center_lng=4.48,
+            nearby_radius_m=1000, grid_span_km=2.0, max_per_cell_per_category=5,
+            inter_call_sleep_s=0, max_total_inserts=0, max_cells_per_category=0, chunks=1,
+            chunk_index=0, language=None, osm_mode=osm_mode,
+        )
+        bot = DiscoveryBot(cfg, {"categories": CATEGORIES})
+        bot.osm_service.turkish_hints = False
+        bot.osm_service.scheduler = scheduler
+        await bot.osm_service.aclose()
+        monkeypatch.setattr(bot.osm_service, "_client", FakeOverpass(FIXTURE["elements"]))
+        monkeypatch.setattr(bot.osm_service, "_log_overpass_call", no_log)
+        await bot._run_osm_discovery(points, set(), 0)
+        return [(r["place_id"], r["category"]) for r in inserted]
+
+    serial = await run(None)
+    concurrent = await run(OverpassMirrorScheduler(MIRRORS[:2], min_interval_s=0, max_window=3))
+    assert concurrent == serial  # same rows in the same order
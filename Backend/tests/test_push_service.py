@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+import pytest
+from pywebpush import WebPushException
+
+from services import push_service
+from services.push_service import PushMessage, PushService
+
+ALICE = "00000000-0000-0000-0000-00000000000a"
+BOB = "00000000-0000-0000-0000-00000000000b"
+CAROL = "00000000-0000-0000-0000-00000000000c"
+
+
+def _token(token_id: int, endpoint: str, platform: str = "web") -> Dict[str, Any]:
+    return {
+        "user_id": None,
+        "has_preferences": False,
+        "device_token_id": token_id,
+        "token": json.dumps({"endpoint": endpoint, "keys": {}}),
+        "platform": platform,
+    }
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    calls: Dict[str, List[Tuple[str, Tuple[Any, ...]]]] = {"fetch": [], "execute": []}
+    rows = [
+        {**_token(1, "https://push.example/ok/1"), "user_id": ALICE},
+        {**_token(2, "https://push.example/gone/2"), "user_id": ALICE},
+        {**_token(3, "https://push.example/ok/3"), "user_id": BOB,
+         "has_preferences": True, "enabled": True, "poll_notifications": True,
+         "trending_notifications": False, "activity_notifications": False},
+        {"user_id": CAROL, "has_preferences": False, "device_token_id": None, "token": None, "platform": None},
+    ]
+
+    async def fake_fetch(sql, *args):
+        calls["fetch"].append((sql, args))
+        return rows
+
+    async def fake_execute(sql, *args):
+        calls["execute"].append((sql, args))
+        return "OK"
+
+    monkeypatch.setattr(push_service, "fetch", fake_fetch)
+    monkeypatch.setattr(push_service, "execute", fake_execute)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_fan_out_batches_queries_logs_and_deactivation(fake_db, monkeypatch):
+    service = PushService()
+    pushed: List[str] = []
+
+    def fake_send(subscription, data):
+        pushed.append(subscription["endpoint"])
+        if "/gone/" in subscription["endpoint"]:
+            raise WebPushException("Push failed: 410 Gone", response=SimpleNamespace(status_code=410))
+        return SimpleNamespace(status_code=201)
+
+    monkeypatch.setattr(service, "_send_web_push", fake_send)
+
+    result = await service.send_notifications(
+        [
+            PushMessage(ALICE, "system", "Hi", "Alice"),
+            PushMessage(BOB, "trending", "Trending", "Bob"),  # Bob opted out of trending
+            PushMessage(BOB, "poll", "Poll", "Bob"),
+            PushMessage(CAROL, "system", "Hi", "Carol"),  # no devices
+        ]
+    )
+
+    assert result["sent"] == 2 and result["failed"] == 1 and result["deactivated"] == 1
+    assert result["skipped_by_reason"] == {"trending_notifications_disabled": 1, "no_active_tokens": 1}
+    assert sorted(pushed) == ["https://push.example/gone/2", "https://push.example/ok/1", "https://push.example/ok/3"]
+
+    assert len(fake_db["fetch"]) == 1
+    assert fake_db["fetch"][0][1][0] == sorted([ALICE, BOB, CAROL])
+    log_sql, log_args = fake_db["execute"][0]
+    assert "INSERT INTO push_notification_log" in log_sql and "unnest(" in log_sql
+    assert log_args[1] == [1, 2, 3] and log_args[6] == [True, False, True]
+    deactivate_sql, deactivate_args = fake_db["execute"][1]
+    assert "UPDATE device_tokens" in deactivate_sql and deactivate_args == ([2],)
+    assert len(fake_db["execute"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_send_notification_keeps_single_user_shape(fake_db, monkeypatch):
+    service = PushService()
+    monkeypatch.setattr(service, "_send_web_push", lambda subscription, data: SimpleNamespace(status_code=201))
+
+    assert await service.send_notification(BOB, "trending", "t", "b") == {
+        "sent": 0,
+        "failed": 0,
+        "skipped": 1,
+        "reason": "trending_notifications_disabled",
+    }
+    assert await service.send_notification(BOB, "poll", "t", "b") == {"sent": 1, "failed": 0, "errors": []}
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+import pytest
+
+from app.core import rate_limiting
+
+
+@pytest.fixture(autouse=True)
+def _reset_state(monkeypatch):
+    # No background flush task inside tests; flush() is called explicitly
+    monkeypatch.setattr(rate_limiting, "_ensure_flusher", lambda backend: None)
+    rate_limiting.reset_rate_limit_state()
+    yield
+    rate_limiting.reset_rate_limit_state()
+
+
+class FakeRateLimitsTable:
+    def __init__(self) -> None:
+        self.counts: Dict[tuple, int] = {}
+        self.queries: List[str] = []
+        self.fail_flush = False
+
+    async def fetch(self, sql, *args):
+        if sql is rate_limiting.HYDRATE_SQL:
+            self.queries.append("hydrate")
+            key_type, key_value, action, since = args
+            return [
+                {"bucket": b, "count": c}
+                for (kt, kv, a, b), c in self.counts.items()
+                if (kt, kv, a) == (key_type, key_value, action) and b >= since.timestamp()
+            ]
+        assert sql is rate_limiting.FLUSH_SQL
+        self.queries.append("flush")
+        if self.fail_flush:
+            raise RuntimeError("db down")
+        rows = []
+        for kt, kv, a, b, delta in zip(*args):
+            self.counts[(kt, kv, a, b)] = self.counts.get((kt, kv, a, b), 0) + delta
+            rows.append({"key_type": kt, "key_value": kv, "action": a, "bucket": b, "count": self.counts[(kt, kv, a, b)]})
+        return rows
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_limits_without_db_round_trips(monkeypatch):
+    table = FakeRateLimitsTable()
+    monkeypatch.setattr(rate_limiting, "fetch", table.fetch)
+    now = [1_000_020.0]
+    backend = rate_limiting.MemoryRateLimitBackend(clock=lambda: now[0])
+
+    results = [await backend.check_and_increment("client_id", "c1", "check_in", 3, 60) for _ in range(5)]
+
+    assert results == [True, True, True, False, False]
+    assert table.queries == ["hydrate"]  # only the first sighting of the key hits the DB
+    assert await backend.flush() == 1
+    assert table.counts == {("client_id", "c1", "check_in", 1_000_020 // 60 * 60): 3}
+
+    # Two minutes later the old bucket has slid out of the window
+    now[0] += 120
+    assert await backend.check_and_increment("client_id", "c1", "check_in", 3, 60) is True
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_flush_reconciles_other_instances_and_retries(monkeypatch):
+    table = FakeRateLimitsTable()
+    monkeypatch.setattr(rate_limiting, "fetch", table.fetch)
+    now = [1_000_020.0]
+    bucket = 1_000_020 // 60 * 60
+    backend = rate_limiting.MemoryRateLimitBackend(clock=lambda: now[0])
+
+    assert await backend.check_and_increment("ip", "1.2.3.4", "check_in", 5, 60)
+    # Another instance counted 3 in the same bucket meanwhile
+    table.counts[("ip", "1.2.3.4", "check_in", bucket)] = 3
+
+    table.fail_flush = True
+    assert await backend.flush() == 0
+    assert backend.stats()["pending_buckets"] == 1  # kept for the next flush
+
+    table.fail_flush = False
+    assert await backend.flush() == 1
+    assert table.counts[("ip", "1.2.3.4", "check_in", bucket)] == 4
+    # Local view now includes the remote increments: 4 + 1 allowed, then blocked
+    assert await backend.check_and_increment("ip", "1.2.3.4", "check_in", 5, 60) is True
+    assert await backend.check_and_increment("ip", "1.2.3.4", "check_in", 5, 60) is False
+
+
+@pytest.mark.asyncio
+async def test_check_and_increment_dispatches_backend_and_records_latency(monkeypatch):
+    calls: List[Any] = []
+
+    async def fake_fetch(sql, *args):
+        calls.append(("fetch", args))
+        return [{"total_count": 0}]
+
+    async def fake_execute(sql, *args):
+        calls.append(("execute", args))
+
+    monkeypatch.setattr(rate_limiting, "fetch", fake_fetch)
+    monkeypatch.setattr(rate_limiting, "execute", fake_execute)
+
+    assert await rate_limiting.check_and_increment_rate_limit("user_id", "u1", "reaction", backend="db")
+    assert [c[0] for c in calls] == ["fetch", "execute"]
+
+    stats = rate_limiting.get_rate_limit_stats()
+    assert stats["latency"]["db"]["calls"] == 1
+    assert stats["latency"]["db"]["p50_ms"] is not None and stats["latency"]["db"]["p99_ms"] is not None
+
+    recorder = rate_limiting._LatencyRecorder()
+    for ms in range(1, 101):
+        recorder.record(float(ms))
+    assert recorder.percentile(50) == 50.0 and recorder.percentile(99) == 99.0
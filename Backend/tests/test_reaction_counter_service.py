@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+from services import reaction_counter_service
+
+
+class FakeDb:
+    """Reaction rows keyed by (entity_id, identity, reaction_type) plus the counter table."""
+
+    def __init__(self) -> None:
+        self.reactions: Dict[Tuple[int, str, str], int] = {}
+        self.counters: Dict[Tuple[str, int, str], int] = {}
+        self.statements: List[str] = []
+        self.transactions = 0
+        self._next_id = 1
+
+    def install(self, monkeypatch) -> None:
+        db = self
+
+        @asynccontextmanager
+        async def run_in_transaction(readonly: bool = False):
+            db.transactions += 1
+            yield object()
+
+        async def fetch_with_conn(conn, sql, *args):
+            db.statements.append(sql)
+            if sql.lstrip().startswith("DELETE FROM"):
+                entity_id, identity, reaction_type = args
+                rid = db.reactions.pop((entity_id, identity, reaction_type), None)
+                return [{"id": rid}] if rid is not None else []
+            raise AssertionError(sql)
+
+        async def fetchrow_with_conn(conn, sql, *args):
+            db.statements.append(sql)
+            text = sql.strip()
+            if text.startswith("UPDATE reaction_counters"):
+                entity_type, entity_id, reaction_type, removed = args
+                key = (entity_type, entity_id, reaction_type)
+                if key not in db.counters:
+                    return None
+                db.counters[key] = max(db.counters[key] - removed, 0)
+                return {"count": db.counters[key]}
+            if text.startswith("INSERT INTO reaction_counters"):
+                key = tuple(args)
+                db.counters[key] = db.counters.get(key, 0) + 1
+                return {"count": db.counters[key]}
+            if text.startswith("INSERT INTO"):
+                entity_id, identity, reaction_type = args
+                if (entity_id, identity, reaction_type) in db.reactions:
+                    return None
+                db.reactions[(entity_id, identity, reaction_type)] = db._next_id
+                db._next_id += 1
+                return {"id": db._next_id - 1}
+            raise AssertionError(sql)
+
+        monkeypatch.setattr(reaction_counter_service, "run_in_transaction", run_in_transaction)
+        monkeypatch.setattr(reaction_counter_service, "fetch_with_conn", fetch_with_conn)
+        monkeypatch.setattr(reaction_counter_service, "fetchrow_with_conn", fetchrow_with_conn)
+
+
+@pytest.mark.asyncio
+async def test_toggle_keeps_counter_in_step(monkeypatch):
+    db = FakeDb()
+    db.install(monkeypatch)
+    toggle = reaction_counter_service.toggle_reaction
+
+    assert await toggle("news", 7, "🔥", client_id="a") == (True, 1)
+    assert await toggle("news", 7, "🔥", client_id="b") == (True, 2)
+    assert await toggle("news", 7, "❤️", client_id="a") == (True, 1)
+    assert await toggle("news", 7, "🔥", client_id="a") == (False, 1)
+    assert await toggle("activity", 7, "🔥", user_id="u1", client_id="a") == (True, 1)
+
+    assert db.counters == {("news", 7, "🔥"): 1, ("news", 7, "❤️"): 1, ("activity", 7, "🔥"): 1}
+    assert db.transactions == 5
+    assert any("FROM news_reactions" in s and "client_id = $2" in s for s in db.statements)
+    assert any("INSERT INTO activity_reactions (activity_id, user_id, reaction_type)" in s for s in db.statements)
+
+
+def test_join_sql_is_a_keyed_lateral_lookup():
+    sql = reaction_counter_service.reactions_join_sql("event", "ep.id")
+
+    assert "LEFT JOIN LATERAL" in sql and "rcn.entity_type = 'event'" in sql
+    assert "rcn.entity_id = ep.id" in sql and "event_reactions" not in sql
+    with pytest.raises(ValueError):
+        reaction_counter_service.reactions_join_sql("location", "l.id")
+
+
+@pytest.mark.asyncio
+async def test_location_notes_read_activity_counters(monkeypatch):
+    from api.routers import notes
+
+    queries: List[str] = []
+
+    async def fake_fetch(sql: str, *params: Any) -> List[Dict[str, Any]]:
+        queries.append(sql)
+        return []
+
+    monkeypatch.setattr(notes, "fetch", fake_fetch)
+    monkeypatch.setattr(notes, "require_feature", lambda name: None)
+    await notes.get_notes(location_id=1, limit=10, offset=0, sort_by="reactions_desc")
+
+    assert "rcn.entity_type = 'activity'" in queries[0] and "rcn.entity_id = note_activity.id" in queries[0]
+    assert "activity_reactions" not in queries[0]
+
+
+@pytest.mark.asyncio
+async def test_reconcile_locks_source_and_reports_drift(monkeypatch):
+    statements: List[Tuple[str, Any]] = []
+
+    @asynccontextmanager
+    async def run_in_transaction(readonly: bool = False):
+        statements.append(("BEGIN", None))
+        yield object()
+
+    async def execute_with_conn(conn, sql, *args):
+        statements.append(("execute", sql))
+        return "LOCK TABLE"
+
+    async def fetch_with_conn(conn, sql, *args):
+        statements.append(("fetch", sql))
+        corrected = 2 if "FROM shared_link_reactions" in sql else 0
+        return [{"source_counters": 10, "corrected": corrected, "removed": 0}]
+
+    monkeypatch.setattr(reaction_counter_service, "run_in_transaction", run_in_transaction)
+    monkeypatch.setattr(reaction_counter_service, "execute_with_conn", execute_with_conn)
+    monkeypatch.setattr(reaction_counter_service, "fetch_with_conn", fetch_with_conn)
+
+    result = await reaction_counter_service.reconcile_reaction_counters()
+
+    assert set(result) == {"news", "event", "activity", "shared_link"}
+    assert result["shared_link"] == {"source_counters": 10, "corrected": 2, "removed": 0}
+    assert statements[:3] == [
+        ("BEGIN", None),
+        ("execute", "LOCK TABLE news_reactions IN SHARE MODE"),
+        statements[2],
+    ]
+    assert "GROUP BY news_id, reaction_type" in statements[2][1]
+    assert "WHERE reaction_counters.count IS DISTINCT FROM EXCLUDED.count" in statements[2][1]
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List
+
+import pytest
+
+from app.workers import trending_worker
+
+
+def _row(window_idx: int, location_id: int, lat: float, ci: int, lr: int = 0, ln: int = 0, age: float = 0.0) -> Dict[str, Any]:
+    return {
+        "window_idx": window_idx,
+        "location_id": location_id,
+        "lat": lat,
+        "lng": 4.5,
+        "category": "bakery",
+        "check_ins_count": ci,
+        "reactions_count": lr,
+        "notes_count": ln,
+        "oldest_age_hours": age,
+    }
+
+
+@pytest.fixture
+def fake_activity(monkeypatch):
+    calls: List[tuple] = []
+    rows = [
+        _row(1, 1, 51.9, ci=1),
+        _row(1, 2, 51.9, ci=2, age=1.0),
+        _row(1, 3, 52.3, ci=0, lr=1),
+        _row(1, 4, 10.0, ci=9),  # outside every city
+        _row(2, 1, 51.9, ci=5, lr=2, ln=1, age=30.0),
+        _row(2, 3, 52.3, ci=1),
+    ]
+
+    async def fake_fetch(sql, category_key, hours):
+        calls.append((category_key, hours))
+        return [r for r in rows if r["window_idx"] <= len(hours)]
+
+    def fake_cities(lats, lngs):
+        return [("rotterdam", None) if lat == 51.9 else ("amsterdam", None) if lat == 52.3 else (None, None) for lat in lats]
+
+    monkeypatch.setattr(trending_worker, "fetch", fake_fetch)
+    monkeypatch.setattr(trending_worker, "get_city_districts_from_coords_batch", fake_cities)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_all_windows_single_query_scores_and_ranks_per_city(fake_activity):
+    results = await trending_worker.calculate_trending_all_windows(["5m", "24h"])
+
+    assert fake_activity == [(None, [5 / 60, 24.0])]
+    five = {(r["city_key"], r["location_id"]): r for r in results["5m"]}
+    assert set(five) == {("rotterdam", 1), ("rotterdam", 2), ("amsterdam", 3)}
+    assert five[("rotterdam", 2)]["rank"] == 1 and five[("rotterdam", 1)]["rank"] == 2
+    assert five[("amsterdam", 3)]["rank"] == 1
+    day = {r["location_id"]: r for r in results["24h"]}
+    assert day[1]["score"] == pytest.approx(
+        trending_worker.calculate_trending_score(check_ins=5, reactions=2, notes=1, age_hours=30.0)
+    )
+
+    only_rdam = await trending_worker.calculate_trending_for_window("rotterdam", None, 5 / 60)
+    assert [r["location_id"] for r in only_rdam] == [2, 1]
+
+
+@pytest.mark.asyncio
+async def test_update_trending_table_upserts_and_prunes_in_one_transaction(monkeypatch):
+    executed: List[tuple] = []
+    transactions: List[str] = []
+
+    @asynccontextmanager
+    async def fake_tx():
+        transactions.append("begin")
+        yield object()
+        transactions.append("commit")
+
+    async def fake_execute_with_conn(conn, sql, *args):
+        executed.append((sql, args))
+        return "OK"
+
+    monkeypatch.setattr(trending_worker, "run_in_transaction", fake_tx)
+    monkeypatch.setattr(trending_worker, "execute_with_conn", fake_execute_with_conn)
+
+    results = [
+        {"location_id": 2, "city_key": "rotterdam", "category_key": "bakery", "score": 5.9, "rank": 1,
+         "check_ins_count": 2, "reactions_count": 0, "notes_count": 0},
+        {"location_id": 1, "city_key": "rotterdam", "category_key": "bakery", "score": 3.0, "rank": 2,
+         "check_ins_count": 1, "reactions_count": 0, "notes_count": 0},
+    ]
+    updated = await trending_worker.update_trending_table("5m", ["rotterdam", "den_haag"], None, results)
+
+    assert updated == 2
+    assert transactions == ["begin", "commit"]
+    assert len(executed) == 2
+    upsert_sql, upsert_args = executed[0]
+    assert "unnest" in upsert_sql
+    assert upsert_args[0] == "5m" and upsert_args[1] == [2, 1] and upsert_args[5] == [1, 2]
+    delete_sql, delete_args = executed[1]
+    assert delete_sql is trending_worker.DELETE_STALE_TRENDING_SQL
+    assert delete_args == ("5m", ["rotterdam", "den_haag"], None)
+
+    # A city without activity still gets its old leaderboard cleared
+    executed.clear()
+    assert await trending_worker.update_trending_table("5m", "den_haag", None, []) == 0
+    assert [sql for sql, _ in executed] == [trending_worker.DELETE_STALE_TRENDING_SQL]
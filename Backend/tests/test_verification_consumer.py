@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+
+from app.workers import verification_consumer
+
+
+class FakeClassifier:
+    def __init__(self, fail_on: set[str] | None = None, latency_s: float = 0.0) -> None:
+        self.fail_on = fail_on or set()
+        self.latency_s = latency_s
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def classify(self, *, name: str, address: str | None, typ: str | None, location_id: int | None = None):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            time.sleep(self.latency_s)
+            if name in self.fail_on:
+                raise RuntimeError(f"llm error for {name}")
+            ignore = location_id % 4 == 0
+            payload = {
+                "action": "ignore" if ignore else "keep",
+                "category": None if ignore else "bakery",
+                "confidence_score": 0.92,
+                "reason": f"loc {location_id}",
+            }
+            return SimpleNamespace(model_dump=lambda: payload), {}
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class FakeDb:
+    """In-memory stand-in for the consumer's transactions and SQL helpers."""
+
+    def __init__(self, location_ids: List[int], fail_bulk_for: int | None = None) -> None:
+        self.locations = {
+            i: {"id": i, "name": f"Zaak {i}", "address": "Straat 1", "category": "bakery", "state": "CANDIDATE",
+                "confidence_score": None, "user_ratings_total": 0, "business_status": None,
+                "is_probable_not_open_yet": False, "last_verified_at": None, "next_check_at": None}
+            for i in location_ids
+        }
+        self.fail_bulk_for = fail_bulk_for
+        self.transactions = 0
+        self.location_fetches = 0
+        self.task_status: Dict[int, str] = {}
+        self.task_errors: Dict[int, str] = {}
+        self.classified: Dict[int, Dict[str, Any]] = {}
+        self.next_check: Dict[int, Any] = {}
+        self.audits: List[int] = []
+
+    def install(self, monkeypatch) -> None:
+        db = self
+
+        @asynccontextmanager
+        async def run_in_transaction(readonly: bool = False):
+            db.transactions += 1
+            staged = SimpleNamespace(status={}, errors={}, classified={}, next_check={}, audits=[])
+            yield staged
+            # Commit
+            db.task_status.update(staged.status)
+            db.task_errors.update(staged.errors)
+            db.classified.update(staged.classified)
+            db.next_check.update(staged.next_check)
+            db.audits.extend(staged.audits)
+
+        async def fetch_with_conn(conn, sql, ids):
+            db.location_fetches += 1
+            return [db.locations[i] for i in ids if i in db.locations]
+
+        async def execute_with_conn(conn, sql, *args):
+            if "UPDATE locations" in sql:
+                conn.next_check.update(dict(zip(args[0], args[1])))
+            elif "'COMPLETED'" in sql:
+                conn.status.update({i: "COMPLETED" for i in args[0]})
+            elif "'FAILED'" in sql:
+                conn.status.update({i: "FAILED" for i in args[0]})
+                conn.errors.update(dict(zip(args[0], args[1])))
+            elif "'PENDING'" in sql:
+                conn.status.update({i: "PENDING" for i in args[0]})
+            return "UPDATE"
+
+        async def bulk(items, conn=None):
+            if any(item["id"] == db.fail_bulk_for for item in items):
+                raise RuntimeError("constraint violation")
+            conn.classified.update({item["id"]: item for item in items})
+            return len(items)
+
+        async def audit_log(**kwargs):
+            kwargs["conn"].audits.append(kwargs["meta"]["task_id"])
+
+        monkeypatch.setattr(verification_consumer, "run_in_transaction", run_in_transaction)
+        monkeypatch.setattr(verification_consumer, "fetch_with_conn", fetch_with_conn)
+        monkeypatch.setattr(verification_consumer, "execute_with_conn", execute_with_conn)
+        monkeypatch.setattr(verification_consumer, "update_location_classifications_bulk", bulk)
+        monkeypatch.setattr(verification_consumer.audit_service, "log", audit_log)
+
+
+def _counters() -> Dict[str, Any]:
+    return {
+        "claimed": 0, "processed": 0, "completed": 0, "failed": 0, "skipped_no_location": 0,
+        "closed_detected": 0, "max_attempts_exceeded": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_pipelined_batch_outcomes_and_counters(monkeypatch):
+    db = FakeDb(location_ids=list(range(1, 37)))
+    db.install(monkeypatch)
+    claimed = [{"id": 100 + i, "location_id": i, "attempts": 1} for i in range(1, 37)]
+    claimed[4]["attempts"] = 3  # location 5 fails on its last attempt
+    claimed += [
+        {"id": 200, "location_id": None, "attempts": 1},
+        {"id": 201, "location_id": 999, "attempts": 1},  # location row is gone
+    ]
+    classifier = FakeClassifier(fail_on={"Zaak 5", "Zaak 6"}, latency_s=0.005)
+    progress: List[int] = []
+
+    async def on_progress(processed: int) -> None:
+        progress.append(processed)
+
+    counters = await verification_consumer.process_claimed_tasks(
+        claimed,
+        classify_service=classifier,
+        counters=_counters(),
+        max_attempts=3,
+        dry_run=False,
+        concurrency=4,
+        write_batch_size=10,
+        on_progress=on_progress,
+    )
+
+    assert classifier.peak == 4
+    assert db.location_fetches == 1 + 4  # prefetch + one refetch per written group
+    assert db.transactions == 1 + 4  # 38 outcomes in groups of 10
+    assert progress == [10, 20, 30, 38]
+    assert counters["processed"] == 38
+    assert counters["completed"] == 34
+    assert counters["failed"] == 4
+    assert counters["skipped_no_location"] == 1
+    assert counters["max_attempts_exceeded"] == 1
+    assert counters["closed_detected"] == sum(1 for i in range(1, 37) if i % 4 == 0 and i not in (5, 6))
+
+    assert db.task_status[105] == "FAILED" and db.task_errors[105].startswith("RuntimeError: llm error")
+    assert db.task_status[106] == "PENDING"
+    assert db.task_status[200] == "FAILED" and db.task_errors[200] == "Missing location_id"
+    assert db.task_status[201] == "FAILED" and db.task_errors[201] == "Location not found"
+    completed = {t for t, s in db.task_status.items() if s == "COMPLETED"}
+    assert completed == {100 + i for i in range(1, 37)} - {105, 106}
+    assert sorted(db.audits) == sorted(completed)
+    assert set(db.next_check) == {i for i in range(1, 37)} - {5, 6}
+    assert db.classified[4]["action"] == "ignore" and db.classified[4]["category"] is None
+    assert db.classified[1]["category"] == "bakery" and db.classified[1]["reason"] == "loc 1"
+
+
+@pytest.mark.asyncio
+async def test_failed_group_write_falls_back_per_task(monkeypatch):
+    db = FakeDb(location_ids=[1, 2, 3], fail_bulk_for=2)
+    db.install(monkeypatch)
+    claimed = [{"id": 10 + i, "location_id": i, "attempts": 1} for i in (1, 2, 3)]
+
+    counters = await verification_consumer.process_claimed_tasks(
+        claimed,
+        classify_service=FakeClassifier(),
+        counters=_counters(),
+        max_attempts=3,
+        dry_run=False,
+        concurrency=2,
+        write_batch_size=10,
+    )
+
+    # Task 12's classification could not be applied: retried later, like a processing error
+    assert db.task_status == {11: "COMPLETED", 12: "PENDING", 13: "COMPLETED"}
+    assert set(db.classified) == {1, 3}
+    assert counters["completed"] == 2 and counters["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_dry_run_writes_nothing(monkeypatch):
+    db = FakeDb(location_ids=[1, 2])
+    db.install(monkeypatch)
+    claimed = [{"id": 11, "location_id": 1, "attempts": 3}, {"id": 12, "location_id": 2, "attempts": 3}]
+
+    counters = await verification_consumer.process_claimed_tasks(
+        claimed,
+        classify_service=FakeClassifier(fail_on={"Zaak 2"}),
+        counters=_counters(),
+        max_attempts=3,
+        dry_run=True,
+    )
+
+    assert db.transactions == 1 and db.task_status == {}
+    assert counters["completed"] == 1 and counters["failed"] == 1
+    assert counters["max_attempts_exceeded"] == 0
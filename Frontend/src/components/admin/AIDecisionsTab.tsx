@@ -148,6 +148,11 @@ export default function AIDecisionsTab({ locationId }: Props) {
                                         >
                                             {formatActionType(log.action_type)}
                                         </Badge>
+                                        {log.cache_hit && (
+                                            <Badge variant="outline" className="text-xs" title="Served from the AI response cache (no OpenAI call)">
+                                                Cached
+                                            </Badge>
+                                        )}
                                         {log.category && (
                                             <Badge variant="default" className="text-xs capitalize">
                                                 {log.category}
@@ -650,6 +650,9 @@ export interface MetricsSnapshot {
   workers: WorkerStatus[];
   currentRuns: WorkerRun[];
   staleCandidates?: StaleCandidatesMetrics | null;
+  generatedAt?: string | null;
+  ageSeconds?: number | null;
+  stale?: boolean | null;
 }
 
 type RawWorkerStatus = {
@@ -711,6 +714,9 @@ type RawMetricsSnapshot = {
     by_city: Record<string, number>;
     days_threshold: number;
   } | null;
+  generated_at?: string | null;
+  age_seconds?: number | null;
+  stale?: boolean | null;
 };
 
 function normalizeWorkerStatus(raw: RawWorkerStatus): WorkerStatus {
@@ -812,6 +818,9 @@ function normalizeMetricsSnapshot(raw: RawMetricsSnapshot): MetricsSnapshot {
         daysThreshold: raw.stale_candidates.days_threshold,
       }
       : null,
+    generatedAt: raw.generated_at ?? null,
+    ageSeconds: raw.age_seconds ?? null,
+    stale: raw.stale ?? null,
   };
 }
 
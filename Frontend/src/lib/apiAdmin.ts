@@ -736,6 +736,7 @@ export type AILogItem = {
     validated_output?: Record<string, unknown> | null;
     is_success: boolean;
     error_message?: string | null;
+    cache_hit?: boolean;
     explanation: string;
     news_source_key?: string | null;
     news_source_name?: string | null;
@@ -759,12 +760,32 @@ export type AILogDetail = {
     validated_output?: Record<string, unknown> | string | null;
     is_success: boolean;
     error_message?: string | null;
+    cache_hit?: boolean;
     created_at: string;
     news_source_key?: string | null;
     news_source_name?: string | null;
     news_title?: string | null;
 };
 
+export type AICacheActionStats = {
+    action_type: string;
+    total: number;
+    hits: number;
+    hit_rate: number;
+};
+
+export type AICacheStatsResponse = {
+    window_hours: number;
+    total: number;
+    hits: number;
+    hit_rate: number;
+    by_action_type: AICacheActionStats[];
+    cache_entries: number;
+    cache_expired_entries: number;
+    cache_total_hits: number;
+    process: Record<string, unknown>;
+};
+
 export async function listAILogs(params?: {
     location_id?: number;
     action_type?: string;
@@ -775,6 +796,7 @@ export async function listAILogs(params?: {
     news_id?: number;
     source_key?: string;
     source_name?: string;
+    cache_hit?: boolean;
 }): Promise<AILogsResponse> {
     const q = new URLSearchParams();
     if (params?.location_id != null) q.set("location_id", String(params.location_id));
@@ -784,6 +806,7 @@ export async function listAILogs(params?: {
     if (params?.news_id != null) q.set("news_id", String(params.news_id));
     if (params?.source_key) q.set("source_key", params.source_key);
     if (params?.source_name) q.set("source_name", params.source_name);
+    if (params?.cache_hit !== undefined) q.set("cache_hit", String(params.cache_hit));
     q.set("limit", String(params?.limit ?? 20));
     q.set("offset", String(params?.offset ?? 0));
     return authFetch<AILogsResponse>(`/api/v1/admin/ai/logs?${q.toString()}`);
@@ -793,6 +816,10 @@ export async function getAILogDetail(id: number): Promise<AILogDetail> {
     return authFetch<AILogDetail>(`/api/v1/admin/ai/logs/${id}`);
 }
 
+export async function getAICacheStats(hours = 24): Promise<AICacheStatsResponse> {
+    return authFetch<AICacheStatsResponse>(`/api/v1/admin/ai/cache/stats?hours=${hours}`);
+}
+
 // --- Tasks ---
 
 export type TaskItem = {
@@ -0,0 +1,31 @@
+-- 099_ai_response_cache.sql
+-- Content-hash memoization cache for AI responses (services/ai_response_cache.py)
+-- Key: model + prompt template version + normalized input hash
+
+CREATE TABLE IF NOT EXISTS public.ai_response_cache (
+    cache_key TEXT PRIMARY KEY, -- '<model>:<prompt_version>:<input_hash>'
+    model TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    input_hash TEXT NOT NULL,
+    action_type TEXT NOT NULL,
+    response JSONB NOT NULL,
+    usage JSONB,
+    hit_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    last_hit_at TIMESTAMPTZ,
+    expires_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_ai_response_cache_expires_at ON public.ai_response_cache(expires_at);
+CREATE INDEX IF NOT EXISTS idx_ai_response_cache_action_type ON public.ai_response_cache(action_type, created_at DESC);
+
+-- Mark ai_logs rows that were served from the cache (no OpenAI call)
+ALTER TABLE IF EXISTS public.ai_logs
+    ADD COLUMN IF NOT EXISTS cache_hit BOOLEAN NOT NULL DEFAULT false;
+
+CREATE INDEX IF NOT EXISTS idx_ai_logs_created_at_action_type_cache_hit
+    ON public.ai_logs(created_at DESC, action_type, cache_hit);
+
+COMMENT ON TABLE public.ai_response_cache IS 'Memoized AI responses keyed by (model, prompt template version, normalized input hash); rows expire via expires_at';
+COMMENT ON COLUMN public.ai_response_cache.prompt_version IS 'sha256 prefix of system prompt + response schema (optionally prefixed by AI_CACHE_PROMPT_VERSION)';
+COMMENT ON COLUMN public.ai_logs.cache_hit IS 'True when the response came from ai_response_cache instead of an OpenAI call';
@@ -0,0 +1,36 @@
+-- 100_map_payload_version.sql
+-- Data version for the GET /locations/map tile cache (services/map_payload_service.py)
+-- A sequence instead of a counter row: nextval() takes no row lock, so concurrent
+-- writers to locations never queue behind each other on the version.
+
+CREATE SEQUENCE IF NOT EXISTS public.map_payload_version_seq;
+
+CREATE OR REPLACE FUNCTION public.bump_map_payload_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM nextval('public.map_payload_version_seq');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Deferred to commit time so the API does not cache a tile from before the change
+-- under the new version.
+DROP TRIGGER IF EXISTS trg_locations_map_payload_version ON public.locations;
+CREATE CONSTRAINT TRIGGER trg_locations_map_payload_version
+    AFTER INSERT OR DELETE OR UPDATE OF state, lat, lng, category, confidence_score, is_retired, name, address
+    ON public.locations
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW
+    EXECUTE FUNCTION public.bump_map_payload_version();
+
+-- Claim status drives the verified badge on the map
+DROP TRIGGER IF EXISTS trg_claims_map_payload_version ON public.business_location_claims;
+CREATE CONSTRAINT TRIGGER trg_claims_map_payload_version
+    AFTER INSERT OR DELETE OR UPDATE OF status, location_id
+    ON public.business_location_claims
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW
+    EXECUTE FUNCTION public.bump_map_payload_version();
+
+COMMENT ON SEQUENCE public.map_payload_version_seq IS 'Bumped on map-relevant writes to locations/business_location_claims; read by the /locations/map cache';
+COMMENT ON FUNCTION public.bump_map_payload_version() IS 'Advances map_payload_version_seq (map tile cache invalidation)';
@@ -0,0 +1,46 @@
+-- 101_locations_tile_key.sql
+-- Spatial access path for bbox queries (app/core/location_filters.py)
+-- tile_key is a Z-order (Morton) key over a 2^16 x 2^16 lat/lng grid (~300m x ~370m
+-- cells in NL). Postgres keeps it in sync on every insert/update of lat/lng, so no
+-- writer has to know about it. The Python side covers a bbox with a handful of key
+-- ranges; keep public.location_tile_key() and location_filters.location_tile_key()
+-- identical.
+
+CREATE OR REPLACE FUNCTION public.location_tile_key(p_lat double precision, p_lng double precision)
+RETURNS bigint AS $$
+DECLARE
+    y bigint;
+    x bigint;
+BEGIN
+    IF p_lat IS NULL OR p_lng IS NULL THEN
+        RETURN NULL;
+    END IF;
+    y := LEAST(65535, GREATEST(0, floor((p_lat + 90.0) / 180.0 * 65536.0)))::bigint;
+    x := LEAST(65535, GREATEST(0, floor((p_lng + 180.0) / 360.0 * 65536.0)))::bigint;
+    -- Spread 16 bits to the even bit positions (0x00FF00FF, 0x0F0F0F0F, 0x33333333, 0x55555555)
+    y := (y | (y << 8)) & 16711935;
+    y := (y | (y << 4)) & 252645135;
+    y := (y | (y << 2)) & 858993459;
+    y := (y | (y << 1)) & 1431655765;
+    x := (x | (x << 8)) & 16711935;
+    x := (x | (x << 4)) & 252645135;
+    x := (x | (x << 2)) & 858993459;
+    x := (x | (x << 1)) & 1431655765;
+    RETURN (y << 1) | x;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE;
+
+-- Rewrites the table once; run outside peak hours
+ALTER TABLE public.locations
+    ADD COLUMN IF NOT EXISTS tile_key bigint
+    GENERATED ALWAYS AS (public.location_tile_key(lat::double precision, lng::double precision)) STORED;
+
+-- (tile_key, id): range scans per bbox cover; id makes index-only keyset checks cheap
+CREATE INDEX IF NOT EXISTS idx_locations_tile_key_id
+    ON public.locations (tile_key, id);
+
+ANALYZE public.locations;
+
+COMMENT ON FUNCTION public.location_tile_key(double precision, double precision) IS 'Z-order tile key over a 2^16 x 2^16 lat/lng grid; mirrored by app.core.location_filters.location_tile_key';
+COMMENT ON COLUMN public.locations.tile_key IS 'Generated Z-order tile key of (lat, lng) used for bbox range lookups';
+COMMENT ON INDEX idx_locations_tile_key_id IS 'Tile-range bbox lookups for /locations, /locations/count, /locations/map and /activity/nearby';
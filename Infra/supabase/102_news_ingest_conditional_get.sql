@@ -0,0 +1,11 @@
+-- 102_news_ingest_conditional_get.sql
+-- HTTP validators per news source: NewsIngestService sends them as
+-- If-None-Match / If-Modified-Since so unchanged feeds answer 304 and are not parsed.
+-- The link index serves the recent-duplicate check inside the batched insert.
+
+ALTER TABLE news_source_state
+    ADD COLUMN IF NOT EXISTS etag TEXT NULL,
+    ADD COLUMN IF NOT EXISTS last_modified TEXT NULL;
+
+CREATE INDEX IF NOT EXISTS raw_ingested_news_link_published_idx
+    ON raw_ingested_news (link, published_at DESC);
@@ -0,0 +1,35 @@
+-- Migration 103: Reaction counters
+-- Denormalized per-(entity_type, entity_id, reaction_type) counts for news, event,
+-- activity and shared_link reactions. Maintained by the toggle endpoints in the same
+-- transaction as the reaction row; rebuilt from the source tables by
+-- app.workers.reaction_counters_reconcile_worker. List/search queries read these
+-- rows instead of grouping the *_reactions tables per returned item.
+
+CREATE TABLE IF NOT EXISTS public.reaction_counters (
+    entity_type text NOT NULL CHECK (entity_type IN ('news', 'event', 'activity', 'shared_link')),
+    entity_id bigint NOT NULL,
+    reaction_type text NOT NULL,
+    count integer NOT NULL DEFAULT 0 CHECK (count >= 0),
+    updated_at timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (entity_type, entity_id, reaction_type)
+);
+
+COMMENT ON TABLE public.reaction_counters IS 'Reaction counts per entity and reaction type (denormalized from *_reactions)';
+COMMENT ON COLUMN public.reaction_counters.entity_type IS 'news (news_reactions), event (event_reactions), activity (activity_reactions), shared_link (shared_link_reactions)';
+
+-- Backfill from the source tables
+INSERT INTO public.reaction_counters (entity_type, entity_id, reaction_type, count)
+SELECT 'news', news_id, reaction_type, COUNT(*)::int FROM public.news_reactions GROUP BY news_id, reaction_type
+ON CONFLICT (entity_type, entity_id, reaction_type) DO UPDATE SET count = EXCLUDED.count, updated_at = now();
+
+INSERT INTO public.reaction_counters (entity_type, entity_id, reaction_type, count)
+SELECT 'event', event_id, reaction_type, COUNT(*)::int FROM public.event_reactions GROUP BY event_id, reaction_type
+ON CONFLICT (entity_type, entity_id, reaction_type) DO UPDATE SET count = EXCLUDED.count, updated_at = now();
+
+INSERT INTO public.reaction_counters (entity_type, entity_id, reaction_type, count)
+SELECT 'activity', activity_id, reaction_type, COUNT(*)::int FROM public.activity_reactions GROUP BY activity_id, reaction_type
+ON CONFLICT (entity_type, entity_id, reaction_type) DO UPDATE SET count = EXCLUDED.count, updated_at = now();
+
+INSERT INTO public.reaction_counters (entity_type, entity_id, reaction_type, count)
+SELECT 'shared_link', link_id, reaction_type, COUNT(*)::int FROM public.shared_link_reactions GROUP BY link_id, reaction_type
+ON CONFLICT (entity_type, entity_id, reaction_type) DO UPDATE SET count = EXCLUDED.count, updated_at = now();
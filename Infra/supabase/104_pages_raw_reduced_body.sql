@@ -0,0 +1,17 @@
+-- 104_pages_raw_reduced_body.sql
+-- Cache of the HTML-to-text reduction (services/html_reduction_service.py) per stored page.
+-- The AI extractors send reduced_body instead of response_body; reduced_version is the
+-- REDUCER_VERSION it was produced with, so rows are reduced again after a format change.
+
+ALTER TABLE public.event_pages_raw
+    ADD COLUMN IF NOT EXISTS reduced_body TEXT NULL,
+    ADD COLUMN IF NOT EXISTS reduced_version SMALLINT NULL;
+
+ALTER TABLE public.news_pages_raw
+    ADD COLUMN IF NOT EXISTS reduced_body TEXT NULL,
+    ADD COLUMN IF NOT EXISTS reduced_version SMALLINT NULL;
+
+COMMENT ON COLUMN public.event_pages_raw.reduced_body IS 'response_body reduced to structured text (headings, links, dates, JSON-LD) for AI extraction.';
+COMMENT ON COLUMN public.event_pages_raw.reduced_version IS 'REDUCER_VERSION that produced reduced_body.';
+COMMENT ON COLUMN public.news_pages_raw.reduced_body IS 'response_body reduced to structured text (headings, links, dates, JSON-LD) for AI extraction.';
+COMMENT ON COLUMN public.news_pages_raw.reduced_version IS 'REDUCER_VERSION that produced reduced_body.';